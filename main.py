@@ -13,22 +13,57 @@ Uso sujeto a licencia. Prohibida la copia o distribucion no autorizada.
 
 import sys
 import os
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtGui import QIcon
-from src.ui.ventana_principal import VentanaPrincipal
+from importlib.util import find_spec
+from typing import Optional
+
+# Debe instalarse antes de cualquier otra importacion para medirlas todas
+from src.utils.tiempos_importacion import medidor_desde_argumentos, terminar_medicion
+MEDIDOR_IMPORTACIONES = medidor_desde_argumentos(sys.argv)
+
+from PyQt5.QtWidgets import QApplication, QMessageBox, QSplashScreen
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QColor, QFont, QPainter, QPixmap
 
 
 # Ruta al archivo de licencia
 LICENSE_FILE = "license.dat"
 
 
-def verificar_licencia(app: QApplication) -> bool:
+def mostrar_splash(app: QApplication) -> QSplashScreen:
+    """
+    Muestra la pantalla de inicio mientras se verifica la licencia y se
+    construye la ventana principal.
+    """
+    pixmap = QPixmap(420, 220)
+    pixmap.fill(QColor("#2c3e50"))
+    painter = QPainter(pixmap)
+    painter.setPen(Qt.white)
+    painter.setFont(QFont("Arial", 26, QFont.Bold))
+    painter.drawText(pixmap.rect().adjusted(0, 40, 0, -100), Qt.AlignCenter, "SoftSE")
+    painter.setFont(QFont("Arial", 11))
+    painter.drawText(pixmap.rect().adjusted(0, 110, 0, -60), Qt.AlignCenter,
+                     "Sistema de Estudios Socioeconomicos")
+    painter.end()
+    
+    splash = QSplashScreen(pixmap)
+    splash.show()
+    app.processEvents()
+    return splash
+
+
+def avisar_splash(app: QApplication, splash: QSplashScreen, mensaje: str):
+    """Actualiza el mensaje de la pantalla de inicio."""
+    splash.showMessage(mensaje, Qt.AlignBottom | Qt.AlignHCenter, Qt.white)
+    app.processEvents()
+
+
+def verificar_licencia(app: QApplication, splash: Optional[QSplashScreen] = None):
     """
     Verifica la licencia del software.
     Si no es valida, muestra dialogo de activacion.
     
     Returns:
-        bool: True si la licencia es valida, False si el usuario cancela
+        LicenseValidator con la licencia valida, o None si el usuario cancela
     """
     from src.licensing import LicenseValidator
     from src.ui.dialogo_activacion import DialogoActivacion
@@ -40,14 +75,16 @@ def verificar_licencia(app: QApplication) -> bool:
         # Licencia valida
         license_info = validator.get_license_info()
         print(f"Licencia valida: {message}")
-        return True
+        return validator
     else:
         # Mostrar dialogo de activacion
         print(f"Licencia no valida: {message}")
+        if splash is not None:
+            splash.hide()
         dialogo = DialogoActivacion(license_file=LICENSE_FILE)
         
         if dialogo.exec_() and dialogo.activated:
-            return True
+            return dialogo.validator
         else:
             QMessageBox.warning(
                 None,
@@ -55,7 +92,48 @@ def verificar_licencia(app: QApplication) -> bool:
                 "Este software requiere una licencia valida para funcionar.\n\n"
                 "Contacte a DINOS Tech para obtener su licencia."
             )
-            return False
+            return None
+
+
+def iniciar_reverificacion_hardware(validador, ventana):
+    """
+    Reverifica el hardware en segundo plano. Si ya no coincide con la
+    licencia se avisa y se cierra la ventana principal.
+    """
+    from src.ui.dialogo_activacion import VerificacionHardwareEnFondo
+    
+    def al_terminar(valida: bool, mensaje: str):
+        if valida:
+            return
+        print(f"Licencia no valida: {mensaje}")
+        QMessageBox.critical(
+            ventana,
+            "Licencia Requerida",
+            f"{mensaje}.\n\n"
+            "Contacte a DINOS Tech para obtener su licencia."
+        )
+        ventana.close()
+    
+    verificacion = VerificacionHardwareEnFondo(validador, ventana)
+    verificacion.terminada.connect(al_terminar)
+    verificacion.iniciar()
+    return verificacion
+
+
+def iniciar_vigilante_interfaz(app: QApplication, umbral_ms: float):
+    """
+    Vigila que el bucle de eventos no se detenga mas de umbral_ms; los
+    congelamientos se reportan en logs/congelamientos.log.
+    """
+    from src.utils.vigilante_interfaz import VigilanteInterfaz, INTERVALO_LATIDO_MS
+    
+    vigilante = VigilanteInterfaz(umbral_ms)
+    temporizador = QTimer(app)
+    temporizador.timeout.connect(vigilante.latido)
+    temporizador.start(INTERVALO_LATIDO_MS)
+    vigilante.iniciar()
+    app.aboutToQuit.connect(vigilante.detener)
+    return vigilante
 
 
 def verificar_estructura_directorios():
@@ -79,6 +157,8 @@ def verificar_estructura_directorios():
 def verificar_dependencias():
     """
     Verifica que todas las dependencias necesarias estén instaladas.
+    Solo localiza los paquetes (find_spec) sin importarlos; se cargan
+    hasta su primer uso.
     """
     modulos_requeridos = [
         'PyQt5',
@@ -92,8 +172,10 @@ def verificar_dependencias():
     
     for modulo in modulos_requeridos:
         try:
-            __import__(modulo)
-        except ImportError:
+            encontrado = find_spec(modulo) is not None
+        except (ImportError, ValueError):
+            encontrado = False
+        if not encontrado:
             modulos_faltantes.append(modulo)
     
     if modulos_faltantes:
@@ -119,9 +201,6 @@ def main():
         print("Ejecute: pip install -r requirements.txt")
         sys.exit(1)
     
-    # Verificar estructura de directorios
-    verificar_estructura_directorios()
-    
     # Crear aplicacion Qt
     app = QApplication(sys.argv)
     app.setApplicationName("SoftSE")
@@ -131,15 +210,37 @@ def main():
     # Establecer estilo
     app.setStyle('Fusion')
     
+    # Pantalla de inicio antes de cualquier trabajo de arranque
+    splash = mostrar_splash(app)
+    
+    # Verificar estructura de directorios
+    avisar_splash(app, splash, "Preparando directorios...")
+    verificar_estructura_directorios()
+    
+    # Instrumentacion de rendimiento, perfil de memoria y vigilante de
+    # congelamientos (desactivados salvo config.json)
+    from src.utils import instrumentacion, perfil_memoria
+    from src.utils.vigilante_interfaz import configuracion_vigilante
+    instrumentacion.configurar_desde_archivo()
+    perfil_memoria.configurar_desde_archivo()
+    umbral_vigilante = configuracion_vigilante()
+    
     # Verificar licencia antes de continuar
-    if not verificar_licencia(app):
+    avisar_splash(app, splash, "Verificando licencia...")
+    validador = verificar_licencia(app, splash)
+    if validador is None:
         sys.exit(0)
     
-    # Crear y mostrar ventana principal
+    # Crear y mostrar ventana principal (muestra el catalogo de estudios);
+    # el wizard y los exportadores se precalientan despues en segundo plano
+    avisar_splash(app, splash, "Cargando estudios...")
     try:
+        from src.ui.ventana_principal import VentanaPrincipal
         ventana = VentanaPrincipal()
         ventana.show()
+        splash.finish(ventana)
     except Exception as e:
+        splash.close()
         QMessageBox.critical(
             None,
             "Error Fatal",
@@ -151,6 +252,22 @@ def main():
         traceback.print_exc()
         sys.exit(1)
     
+    # Referencia local: las conexiones de Qt no mantienen vivo al vigilante
+    vigilante = None
+    if umbral_vigilante is not None:
+        vigilante = iniciar_vigilante_interfaz(app, umbral_vigilante)
+    
+    if validador.hardware_id_from_cache:
+        # Se valido con el cache del hardware ID: confirmar con las sondas
+        # completas ya con la ventana visible
+        iniciar_reverificacion_hardware(validador, ventana)
+    
+    if MEDIDOR_IMPORTACIONES is not None:
+        # Primer ciclo del bucle de eventos: la ventana ya se pinto
+        QTimer.singleShot(0, lambda: app.exit(
+            0 if terminar_medicion(MEDIDOR_IMPORTACIONES) else 1
+        ))
+    
     # Ejecutar bucle de eventos
     sys.exit(app.exec_())
 
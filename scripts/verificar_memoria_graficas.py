@@ -0,0 +1,176 @@
+"""
+Verificacion de memoria de la pagina de graficas.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Entra y sale de la pagina de visualizacion del wizard muchas veces sin
+pantalla (QT_QPA_PLATFORM=offscreen), con datos distintos en cada ciclo
+para que las graficas se vuelvan a dibujar sobre las figuras del pool. Cada
+CICLOS_CIERRE ciclos libera las graficas como al cerrar el wizard.
+
+Con perfil_memoria activo comprueba que:
+    - nunca hay mas lienzos de matplotlib vivos que graficas en la pagina
+      (una figura por grafica en el pool);
+    - al liberar las graficas no queda ningun lienzo vivo;
+    - el crecimiento de tracemalloc entre el calentamiento y el final (ambos
+      justo despues de liberar las graficas) queda por debajo del limite.
+
+Termina con codigo 1 si alguna comprobacion falla.
+
+Uso:
+    python scripts/verificar_memoria_graficas.py
+    python scripts/verificar_memoria_graficas.py --ciclos 100 --limite-kib 1024
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from PyQt5.QtWidgets import QApplication
+
+from src.models.estudio import EstudioSocioeconomico
+from src.ui.pagina_visualizacion import PaginaVisualizacionDatos
+from src.ui.render_graficas import CACHE_GRAFICAS, firma_datos
+from src.utils import perfil_memoria
+from src.utils.generador_datos_prueba import GeneradorDatosPrueba
+
+
+CICLOS = 40
+CICLOS_CIERRE = 5
+# Importaciones, cache de fuentes de matplotlib y primera figura de cada grafica
+CICLOS_CALENTAMIENTO = CICLOS_CIERRE
+LIMITE_CRECIMIENTO_KIB = 1024
+ESPERA_DIBUJO_S = 30.0
+SEMILLA = 20260101
+
+
+def esperar(condicion, limite_s: float) -> bool:
+    """Procesa eventos de Qt hasta que se cumple la condicion o vence el limite."""
+    app = QApplication.instance()
+    fin = time.monotonic() + limite_s
+    while not condicion():
+        if time.monotonic() > fin:
+            return False
+        app.processEvents()
+        time.sleep(0.005)
+    return True
+
+
+def pestana_dibujada(pagina: PaginaVisualizacionDatos, indice: int) -> bool:
+    """Todas las graficas de la pestaña muestran el PNG de los datos actuales."""
+    datos = pagina.estudio.datos
+    for clave, secciones, _ in pagina.PESTANAS[indice][1]:
+        firma = firma_datos({s: datos[s] for s in secciones if s in datos})
+        if CACHE_GRAFICAS.obtener(clave, firma) is None:
+            if pagina.etiquetas_graficas[clave].text().startswith("No se pudo"):
+                raise RuntimeError(f"no se pudo dibujar la grafica {clave}")
+            return False
+    return True
+
+
+def lienzos_vivos(perfil: perfil_memoria.PerfilMemoria) -> int:
+    for estado in perfil.estado():
+        if estado.categoria == 'FigureCanvas':
+            return estado.vivos
+    return 0
+
+
+def ciclo(pagina: PaginaVisualizacionDatos, numero: int):
+    """Cambia los datos, muestra la pagina en una pestaña y sale de ella."""
+    datos = pagina.estudio.datos
+    # Finanzas las leen las tres primeras pestañas; salud, el radar y estilo de vida
+    finanzas = datos['situacion_financiera']
+    finanzas['sueldo_mensual'] = (finanzas.get('sueldo_mensual') or 0) + 1
+    salud = datos['salud_intereses']
+    salud['gasto_mensual_medicamentos'] = (salud.get('gasto_mensual_medicamentos') or 0) + 1
+    # Sin aciertos de cache: cada visita dibuja sobre las figuras del pool
+    CACHE_GRAFICAS.limpiar()
+    indice = numero % pagina.tabs.count()
+    pagina.tabs.blockSignals(True)
+    pagina.tabs.setCurrentIndex(indice)
+    pagina.tabs.blockSignals(False)
+    pagina.initializePage()
+    if not esperar(lambda: pestana_dibujada(pagina, indice), ESPERA_DIBUJO_S):
+        raise RuntimeError(f"las graficas de la pestaña {indice} no se dibujaron "
+                           f"en {ESPERA_DIBUJO_S:.0f} s")
+    pagina.cleanupPage()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verifica que la pagina de graficas no acumule memoria")
+    parser.add_argument("--ciclos", type=int, default=CICLOS,
+                        help=f"Se redondea a multiplo de {CICLOS_CIERRE}")
+    parser.add_argument("--limite-kib", type=float, default=LIMITE_CRECIMIENTO_KIB,
+                        help="Crecimiento maximo de tracemalloc tras el calentamiento")
+    args = parser.parse_args(argv)
+    # Terminar justo despues de liberar, igual que la medicion base
+    ciclos = -(-max(args.ciclos, 1) // CICLOS_CIERRE) * CICLOS_CIERRE
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    # Un cuadro por asignacion: basta para el total y no frena tanto el dibujo
+    tracemalloc.start(1)
+    perfil = perfil_memoria.activar(ruta_reportes=None)
+
+    random.seed(SEMILLA)
+    estudio = EstudioSocioeconomico()
+    estudio.datos.update(GeneradorDatosPrueba.generar_estudio_completo())
+    pagina = PaginaVisualizacionDatos(estudio)
+    total_graficas = sum(len(graficas) for _, graficas in pagina.PESTANAS)
+
+    fallas = []
+    max_vivos = 0
+    base_kib = None
+    inicio = time.perf_counter()
+    for numero in range(CICLOS_CALENTAMIENTO + ciclos):
+        ciclo(pagina, numero)
+        vivos = lienzos_vivos(perfil)
+        max_vivos = max(max_vivos, vivos)
+        if vivos > total_graficas:
+            fallas.append(f"ciclo {numero}: {vivos} lienzos vivos (maximo {total_graficas})")
+
+        if numero % CICLOS_CIERRE == CICLOS_CIERRE - 1:
+            # Como al cerrar el wizard: el hilo de dibujo suelta su pool
+            pagina.liberar_graficas()
+            if not esperar(lambda: lienzos_vivos(perfil) == 0, 5.0):
+                fallas.append(f"ciclo {numero}: {lienzos_vivos(perfil)} lienzos vivos "
+                              f"despues de liberar las graficas")
+
+        if numero == CICLOS_CALENTAMIENTO - 1:
+            gc.collect()
+            base_kib = tracemalloc.get_traced_memory()[0] / 1024.0
+    duracion = time.perf_counter() - inicio
+
+    gc.collect()
+    final_kib = tracemalloc.get_traced_memory()[0] / 1024.0
+    crecimiento_kib = final_kib - base_kib
+    if crecimiento_kib > args.limite_kib:
+        fallas.append(f"tracemalloc crecio {crecimiento_kib:.1f} KiB "
+                      f"(limite {args.limite_kib:.0f} KiB)")
+
+    pagina.liberar_graficas()
+    pagina.deleteLater()
+    app.processEvents()
+    perfil_memoria.desactivar()
+    tracemalloc.stop()
+
+    print(f"Ciclos: {ciclos} (+{CICLOS_CALENTAMIENTO} de calentamiento) en {duracion:.1f} s")
+    print(f"Lienzos vivos: maximo {max_vivos} de {total_graficas} graficas")
+    print(f"tracemalloc: {base_kib:.1f} KiB -> {final_kib:.1f} KiB "
+          f"(crecimiento {crecimiento_kib:+.1f} KiB, limite {args.limite_kib:.0f} KiB)")
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    print("OK" if not fallas else "FALLO")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,464 @@
+"""
+Herramientas de linea de comandos sobre el archivo de estudios.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Uso:
+    python -m src.cli duplicados [--umbral 0.75] [--ruta data/estudios]
+    python -m src.cli consultar -f "riesgo_global>=4" -f "fecha_modificacion@30" \
+        [--texto garcia] [--orden riesgo_global] [--limite 50] [--cursor C]
+    python -m src.cli consultar --campos
+    python -m src.cli estadisticas [-c ingreso_total -c riesgo_global] [-f "riesgo_global>=3"]
+    python -m src.cli riesgos [-f "empresa_solicitante=ACME"] [--discrepancias 20]
+    python -m src.cli generar 100000 [--semilla 7] [--ingreso lognormal:9.7:0.55] [--procesos 4]
+    python -m src.cli rendimiento [--tamanos 1000 10000] [--base base.json --umbral 0.15 --delta-minimo 1]
+    python -m src.cli exportar --formato pdf [--destino export/lote] [--id ID ...] [--sin-cache]
+    python -m src.cli paquete ID [--destino export] [--zip] [--formato pdf --formato xlsx]
+"""
+
+import argparse
+import json
+import sys
+
+
+def comando_duplicados(args) -> int:
+    """Reporta los pares de estudios que parecen del mismo candidato."""
+    from src.models.indice_identidad import IndiceIdentidad
+
+    indice = IndiceIdentidad.obtener(args.ruta)
+    pares = indice.detectar_duplicados_archivo(args.umbral)
+
+    if args.json:
+        print(json.dumps(pares, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"Estudios revisados: {len(indice)}")
+    print(f"Posibles duplicados: {len(pares)}")
+    for par in pares:
+        print(f"\n  {par['nombre_a'] or 'Sin nombre'} ({par['id_a']})")
+        print(f"  {par['nombre_b'] or 'Sin nombre'} ({par['id_b']})")
+        print(f"    Coincidencias: {', '.join(par['coincidencias'])}")
+    return 0
+
+
+def comando_consultar(args) -> int:
+    """Ejecuta una consulta estructurada e imprime una pagina de resultados."""
+    from src.models.consulta_estudios import (
+        CAMPOS_CONSULTA, ConsultaEstudios, IndiceConsulta, interpretar_filtro
+    )
+
+    if args.campos:
+        for campo, (tipo, descripcion) in CAMPOS_CONSULTA.items():
+            print(f"  {campo:<28} {tipo:<7} {descripcion}")
+        print("\nOperadores: = != > >= < <=  ~ (contiene)  @ (ultimos N dias)")
+        return 0
+
+    try:
+        consulta = ConsultaEstudios(
+            filtros=[interpretar_filtro(f) for f in args.filtro],
+            texto=args.texto,
+            orden=args.orden,
+            descendente=not args.ascendente,
+            limite=args.limite
+        )
+        pagina = IndiceConsulta.obtener(args.ruta).ejecutar(consulta, args.cursor)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+
+    if args.json:
+        print(json.dumps(pagina, ensure_ascii=False, indent=2))
+        return 0
+
+    columnas = ["id", "nombre", "empresa_solicitante", "riesgo_global"]
+    if args.orden not in columnas:
+        columnas.append(args.orden)
+    for campo, _operador, _valor in consulta.filtros:
+        if campo not in columnas:
+            columnas.append(campo)
+
+    print(" | ".join(columnas))
+    for fila in pagina["resultados"]:
+        print(" | ".join(str(fila.get(c, "")) for c in columnas))
+    print(f"\nMostrando {len(pagina['resultados'])} de {pagina['total']} estudio(s)")
+    if pagina["cursor"]:
+        print(f"Siguiente pagina: --cursor {pagina['cursor']}")
+    return 0
+
+
+def comando_estadisticas(args) -> int:
+    """Imprime estadisticas del archivo leyendo el cache columnar."""
+    from src.models.cache_columnar import COLUMNAS, CacheColumnar
+    from src.models.consulta_estudios import ConsultaEstudios, IndiceConsulta, interpretar_filtro
+
+    columnas = args.columna or list(COLUMNAS)
+    desconocidas = [c for c in columnas if c not in COLUMNAS]
+    if desconocidas:
+        print(f"Error: columnas desconocidas: {', '.join(desconocidas)}")
+        print(f"Disponibles: {', '.join(COLUMNAS)}")
+        return 2
+
+    ids = None
+    if args.filtro:
+        try:
+            consulta = ConsultaEstudios(filtros=[interpretar_filtro(f) for f in args.filtro])
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 2
+        ids = list(IndiceConsulta.obtener(args.ruta).ids(consulta))
+
+    cache = CacheColumnar.obtener(args.ruta)
+    resultado = {c: cache.estadisticas(c, ids) for c in columnas}
+
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"Estudios: {len(cache) if ids is None else len(ids)}")
+    print(f"{'columna':<30} {'media':>12} {'mediana':>12} {'p90':>12} {'minimo':>12} {'maximo':>12}")
+    for columna, est in resultado.items():
+        print(f"{columna:<30} {est['media']:>12,.2f} {est['mediana']:>12,.2f} {est['p90']:>12,.2f} "
+              f"{est['minimo']:>12,.2f} {est['maximo']:>12,.2f}")
+    return 0
+
+
+def comando_riesgos(args) -> int:
+    """
+    Distribucion de niveles de riesgo de la cartera y revision del riesgo
+    global contra sus componentes, leyendo solo el cache columnar.
+    """
+    from src.logic.calculador_riesgos import COMPONENTES_GLOBAL, CalculadorRiesgos
+    from src.models.cache_columnar import CacheColumnar, contar_niveles
+    from src.models.consulta_estudios import (
+        CATEGORIAS_RIESGO, ConsultaEstudios, IndiceConsulta, interpretar_filtro
+    )
+
+    ids = None
+    if args.filtro:
+        try:
+            consulta = ConsultaEstudios(filtros=[interpretar_filtro(f) for f in args.filtro])
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 2
+        ids = sorted(IndiceConsulta.obtener(args.ruta).ids(consulta))
+
+    cache = CacheColumnar.obtener(args.ruta)
+    nombres = [f"riesgo_{c}" for c in CATEGORIAS_RIESGO]
+    filas, columnas = cache.columnas(nombres, ids, como_numpy=True)
+
+    distribucion = {c: contar_niveles(columnas[f"riesgo_{c}"]) for c in CATEGORIAS_RIESGO}
+
+    # Riesgo global recombinado de las columnas de sus componentes
+    recalculado = CalculadorRiesgos.combinar_riesgo_global_lote(
+        *(columnas[f"riesgo_{c}"] for c in COMPONENTES_GLOBAL)
+    )
+    discrepancias = [
+        {"id": id_estudio, "guardado": int(round(guardado)), "recalculado": nivel}
+        for id_estudio, guardado, nivel in zip(filas, columnas["riesgo_global"], recalculado)
+        if int(round(guardado)) != nivel
+    ]
+
+    if args.json:
+        print(json.dumps({"estudios": len(filas), "distribucion": distribucion,
+                          "discrepancias": discrepancias}, ensure_ascii=False, indent=2))
+        return 0
+
+    niveles = range(1, 6)
+    print(f"Estudios: {len(filas)}")
+    print(f"{'categoria':<14}" + "".join(f"{n:>9}" for n in niveles))
+    for categoria, conteo in distribucion.items():
+        print(f"{categoria:<14}" + "".join(f"{conteo.get(n, 0):>9,}" for n in niveles))
+    print(f"\nRiesgo global distinto de la ponderacion de sus componentes: {len(discrepancias)}")
+    for d in discrepancias[:args.discrepancias]:
+        print(f"  {d['id']}: guardado {d['guardado']}, recalculado {d['recalculado']}")
+    return 0
+
+
+def comando_generar(args) -> int:
+    """Genera un archivo sintetico de estudios para pruebas de carga."""
+    from src.utils.generador_archivo import Distribucion, ParametrosGeneracion, generar_archivo
+
+    try:
+        parametros = ParametrosGeneracion(
+            semilla=args.semilla,
+            prefijo=args.prefijo,
+            ingreso=Distribucion(args.ingreso),
+            deuda=Distribucion(args.deuda),
+            miembros=Distribucion(args.miembros),
+            fotos=args.fotos
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+
+    def progreso(generados, total):
+        print(f"\r  {generados:,} / {total:,} estudios", end="", flush=True)
+
+    resumen = generar_archivo(
+        args.ruta, args.cantidad, parametros,
+        ruta_fotos=args.fotos_dir if args.fotos > 0 else None,
+        procesos=args.procesos,
+        tamano_lote=args.lote,
+        progreso=None if args.json else progreso
+    )
+    if args.json:
+        print(json.dumps(resumen, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"\nGenerados {resumen['estudios']:,} estudios y {resumen['fotos']:,} fotos "
+          f"en {args.ruta} ({resumen['segundos']:.1f} s)")
+    return 0
+
+
+def comando_rendimiento(args) -> int:
+    """Ejecuta el banco de rendimiento y lo compara contra una base guardada."""
+    from src.utils.banco_rendimiento import DIRECTORIO_TRABAJO, OPERACIONES, comparar, ejecutar
+
+    try:
+        resultado = ejecutar(
+            tamanos=args.tamanos,
+            semilla=args.semilla,
+            directorio=args.trabajo or DIRECTORIO_TRABAJO,
+            operaciones=args.operacion or OPERACIONES,
+            muestras=args.muestras,
+            repeticiones=args.repeticiones,
+            progreso=None if args.json else print
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+
+    for ruta in filter(None, (args.salida, args.guardar_base)):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+    comparacion = []
+    if args.base:
+        try:
+            with open(args.base, "r", encoding="utf-8") as f:
+                base = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: no se pudo leer la base {args.base}: {e}")
+            return 2
+        comparacion = comparar(resultado, base, args.umbral, args.delta_minimo)
+    regresiones = [c for c in comparacion if c["regresion"]]
+
+    if args.json:
+        print(json.dumps({"resultado": resultado, "comparacion": comparacion},
+                         ensure_ascii=False, indent=2))
+        return 1 if regresiones else 0
+
+    print(f"\n{'tamano':>7} {'operacion':<26} {'mediana ms':>12} {'p90 ms':>12} {'n':>5}")
+    for tamano, operaciones in resultado["resultados"].items():
+        for operacion, medida in operaciones.items():
+            if "omitido" in medida:
+                print(f"{tamano:>7} {operacion:<26} {'omitido: ' + medida['omitido']}")
+                continue
+            print(f"{tamano:>7} {operacion:<26} {medida['mediana_ms']:>12,.2f} "
+                  f"{medida['p90_ms']:>12,.2f} {medida['n']:>5}")
+
+    if args.base:
+        print(f"\nComparacion contra {args.base} (umbral {args.umbral:.0%}, minimo {args.delta_minimo:g} ms):")
+        for c in comparacion:
+            marca = "REGRESION" if c["regresion"] else ""
+            print(f"{c['tamano']:>7} {c['operacion']:<26} {c['base_ms']:>10,.2f} -> "
+                  f"{c['actual_ms']:>10,.2f} ms  x{c['razon']:.2f} {marca}")
+        print(f"\n{len(regresiones)} regresion(es)")
+    return 1 if regresiones else 0
+
+
+def comando_exportar(args) -> int:
+    """Exporta estudios por lote a PDF o Word usando el cache de exportaciones."""
+    from src.export.cache_exportaciones import COPIADO, GENERADO, SIN_CAMBIOS, exportar_lote
+    from src.models.estudio import EstudioSocioeconomico
+
+    try:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config_empresa = json.load(f).get("empresa", {})
+    except (OSError, ValueError) as e:
+        print(f"Advertencia: no se pudo leer {args.config}: {e}")
+        config_empresa = {}
+
+    try:
+        if args.formato == "pdf":
+            from src.export.exportador_pdf import ExportadorPDF as Exportador
+        else:
+            from src.export.exportador_word import ExportadorWord as Exportador
+    except ImportError as e:
+        print(f"Error: dependencia no disponible: {e}")
+        return 2
+
+    ids = args.id or [info["id"] for info in EstudioSocioeconomico.listar_estudios(args.ruta)]
+
+    def progreso(exportados, total):
+        print(f"\r  {exportados:,} / {total:,} estudios", end="", flush=True)
+
+    conteo = exportar_lote(
+        Exportador(config_empresa), ids, args.destino, args.ruta,
+        usar_cache=not args.sin_cache,
+        progreso=None if args.json else progreso
+    )
+    if args.json:
+        print(json.dumps(conteo, ensure_ascii=False, indent=2))
+    else:
+        print(f"\nGenerados: {conteo[GENERADO]:,}  Copiados del cache: {conteo[COPIADO]:,}  "
+              f"Sin cambios: {conteo[SIN_CAMBIOS]:,}  Fallidos: {conteo['fallidos']:,}")
+    return 1 if conteo["fallidos"] else 0
+
+
+def comando_paquete(args) -> int:
+    """Exporta un estudio a PDF, Word y Excel en una sola pasada, opcionalmente en ZIP."""
+    from src.export.paquete_exportacion import FORMATOS, exportar_paquete
+    from src.models.estudio import EstudioSocioeconomico
+
+    estudio = EstudioSocioeconomico.cargar(args.id, args.ruta)
+    if estudio is None:
+        print(f"Error: no se encontro el estudio {args.id}")
+        return 2
+
+    try:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config_empresa = json.load(f).get("empresa", {})
+    except (OSError, ValueError) as e:
+        print(f"Advertencia: no se pudo leer {args.config}: {e}")
+        config_empresa = {}
+
+    resultado = exportar_paquete(
+        estudio.datos, args.destino, config_empresa,
+        formatos=args.formato or FORMATOS,
+        comprimir=args.zip,
+        usar_cache=not args.sin_cache,
+        ruta_base=args.ruta
+    )
+    if args.json:
+        print(json.dumps(resultado._asdict(), ensure_ascii=False, indent=2))
+        return 1 if resultado.fallidos else 0
+
+    for formato, ruta in resultado.archivos.items():
+        print(f"  {formato:<5} {ruta}")
+    for formato, motivo in resultado.fallidos.items():
+        print(f"  {formato:<5} fallo: {motivo}")
+    if resultado.zip:
+        print(f"ZIP: {resultado.zip}")
+    return 1 if resultado.fallidos else 0
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    """Construye el parser con todos los subcomandos."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Herramientas de SoftSE sobre el archivo de estudios"
+    )
+    parser.add_argument("--ruta", default="data/estudios",
+                        help="Directorio de estudios (por defecto: data/estudios)")
+    subparsers = parser.add_subparsers(dest="comando")
+
+    sub = subparsers.add_parser("duplicados", help="Detectar candidatos duplicados en el archivo")
+    sub.add_argument("--umbral", type=float, default=0.75,
+                     help="Similitud minima de nombre entre 0 y 1 (por defecto: 0.75)")
+    sub.add_argument("--json", action="store_true", help="Imprimir el reporte en JSON")
+    sub.set_defaults(funcion=comando_duplicados)
+
+    sub = subparsers.add_parser("consultar", help="Consultar estudios con filtros, orden y paginacion")
+    sub.add_argument("-f", "--filtro", action="append", default=[],
+                     help="Filtro campo<op>valor; se puede repetir (todos deben cumplirse)")
+    sub.add_argument("--texto", default="", help="Texto libre (nombre, CURP, observaciones...)")
+    sub.add_argument("--orden", default="fecha_modificacion", help="Campo de orden")
+    sub.add_argument("--ascendente", action="store_true", help="Orden ascendente")
+    sub.add_argument("--limite", type=int, default=50, help="Resultados por pagina (por defecto: 50)")
+    sub.add_argument("--cursor", default=None, help="Cursor de la pagina anterior")
+    sub.add_argument("--campos", action="store_true", help="Listar los campos consultables")
+    sub.add_argument("--json", action="store_true", help="Imprimir la pagina en JSON")
+    sub.set_defaults(funcion=comando_consultar)
+
+    sub = subparsers.add_parser("estadisticas", help="Estadisticas de los campos numericos del archivo")
+    sub.add_argument("-c", "--columna", action="append", default=[],
+                     help="Columna a resumir; se puede repetir (por defecto: todas)")
+    sub.add_argument("-f", "--filtro", action="append", default=[],
+                     help="Restringir a los estudios que cumplen el filtro (como en consultar)")
+    sub.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON")
+    sub.set_defaults(funcion=comando_estadisticas)
+
+    sub = subparsers.add_parser("riesgos", help="Distribucion de riesgos de la cartera desde el cache columnar")
+    sub.add_argument("-f", "--filtro", action="append", default=[],
+                     help="Restringir a los estudios que cumplen el filtro (como en consultar)")
+    sub.add_argument("--discrepancias", type=int, default=20,
+                     help="Discrepancias del riesgo global a listar (por defecto: 20)")
+    sub.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON")
+    sub.set_defaults(funcion=comando_riesgos)
+
+    sub = subparsers.add_parser("generar", help="Generar un archivo sintetico de estudios")
+    sub.add_argument("cantidad", type=int, help="Numero de estudios a generar")
+    sub.add_argument("--semilla", type=int, default=20260101, help="Semilla (mismo resultado con la misma semilla)")
+    sub.add_argument("--prefijo", default="SINT", help="Prefijo de los ids (por defecto: SINT)")
+    sub.add_argument("--ingreso", default="lognormal:9.7:0.55",
+                     help="Distribucion del ingreso mensual (por defecto: lognormal:9.7:0.55)")
+    sub.add_argument("--deuda", default="lognormal:10.2:1.1",
+                     help="Distribucion de la deuda total (por defecto: lognormal:10.2:1.1)")
+    sub.add_argument("--miembros", default="discreta:1=10,2=22,3=24,4=22,5=13,6=9",
+                     help="Distribucion del tamano del hogar (por defecto: discreta:1=10,2=22,...)")
+    sub.add_argument("--fotos", type=int, default=1, help="Fotografias de marcador por estudio (por defecto: 1)")
+    sub.add_argument("--fotos-dir", default="data/fotos", help="Directorio de fotografias (por defecto: data/fotos)")
+    sub.add_argument("--procesos", type=int, default=None, help="Procesos generadores (por defecto: uno por nucleo)")
+    sub.add_argument("--lote", type=int, default=500, help="Estudios por lote (por defecto: 500)")
+    sub.add_argument("--json", action="store_true", help="Imprimir el resumen en JSON")
+    sub.set_defaults(funcion=comando_generar)
+
+    sub = subparsers.add_parser("rendimiento", help="Banco de rendimiento sobre archivos sinteticos")
+    sub.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000],
+                     help="Estudios de cada archivo sintetico (por defecto: 1000 10000 100000)")
+    sub.add_argument("--semilla", type=int, default=20260101, help="Semilla del generador")
+    sub.add_argument("-o", "--operacion", action="append", default=[],
+                     help="Operacion a medir; se puede repetir (por defecto: todas)")
+    sub.add_argument("--muestras", type=int, default=200,
+                     help="Estudios por operacion individual (por defecto: 200)")
+    sub.add_argument("--repeticiones", type=int, default=3,
+                     help="Repeticiones del listado completo (por defecto: 3)")
+    sub.add_argument("--trabajo", default=None,
+                     help="Directorio de los archivos sinteticos (se reutilizan entre corridas)")
+    sub.add_argument("--salida", help="Guardar el resultado en este JSON")
+    sub.add_argument("--base", help="JSON de una corrida anterior contra el cual comparar")
+    sub.add_argument("--guardar-base", help="Guardar el resultado como nueva base")
+    sub.add_argument("--umbral", type=float, default=0.15,
+                     help="Aumento relativo de la mediana que cuenta como regresion (por defecto: 0.15)")
+    sub.add_argument("--delta-minimo", type=float, default=1.0,
+                     help="Aumento minimo en ms para contar como regresion (por defecto: 1.0)")
+    sub.add_argument("--json", action="store_true", help="Imprimir resultado y comparacion en JSON")
+    sub.set_defaults(funcion=comando_rendimiento)
+
+    sub = subparsers.add_parser("exportar", help="Exportar estudios por lote a PDF o Word")
+    sub.add_argument("--formato", choices=["pdf", "docx"], default="pdf", help="Formato (por defecto: pdf)")
+    sub.add_argument("--destino", default="export/lote", help="Directorio de salida (por defecto: export/lote)")
+    sub.add_argument("--id", action="append", default=[],
+                     help="Estudio a exportar; se puede repetir (por defecto: todos)")
+    sub.add_argument("--config", default="config.json", help="Configuracion de la empresa (por defecto: config.json)")
+    sub.add_argument("--sin-cache", action="store_true", help="Generar todos los documentos sin usar el cache")
+    sub.add_argument("--json", action="store_true", help="Imprimir el conteo en JSON")
+    sub.set_defaults(funcion=comando_exportar)
+
+    sub = subparsers.add_parser("paquete", help="Exportar un estudio a PDF, Word y Excel en una sola pasada")
+    sub.add_argument("id", help="Id del estudio")
+    sub.add_argument("--destino", default="export", help="Directorio de salida (por defecto: export)")
+    sub.add_argument("--formato", action="append", default=[], choices=["pdf", "docx", "xlsx"],
+                     help="Formato a incluir; se puede repetir (por defecto: los tres)")
+    sub.add_argument("--zip", action="store_true", help="Reunir los archivos en un ZIP")
+    sub.add_argument("--config", default="config.json", help="Configuracion de la empresa (por defecto: config.json)")
+    sub.add_argument("--sin-cache", action="store_true", help="Generar los documentos sin usar el cache")
+    sub.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON")
+    sub.set_defaults(funcion=comando_paquete)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """Punto de entrada de la linea de comandos."""
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, "funcion", None):
+        parser.print_help()
+        return 1
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Cache de resultados de exportacion (PDF y Word).
+Autor: DINOS Tech
+Version: 0.5.0
+
+Cada documento generado se guarda en data/estudios/.exportaciones con una
+llave SHA-256 de todo lo que determina su contenido: los datos del estudio,
+la configuracion de la empresa, el contenido del logo, el formato y la
+version del exportador, y lo que el exportador agregue en huella_adicional
+(fecha del dia, fotografias incrustadas). Volver a exportar un estudio sin
+cambios es una copia del archivo; si el destino ya tiene ese mismo
+documento no se escribe nada (las exportaciones por lote omiten los
+estudios sin cambios, ver exportar_lote).
+
+Los exportadores declaran FORMATO, VERSION_EXPORTADOR y huella_adicional().
+El cache se acota por tamano descartando las entradas usadas hace mas tiempo.
+Se desactiva con "interfaz": {"cache_exportaciones": false} en config.json.
+"""
+
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.utils.instrumentacion import contar
+
+
+# Resultados de CacheExportaciones.exportar
+GENERADO = 'generado'
+COPIADO = 'copiado'
+SIN_CAMBIOS = 'sin_cambios'
+
+MAX_BYTES_CACHE = 256 * 1024 * 1024
+
+_huellas: Dict[Tuple[str, int, int], str] = {}
+_lock_huellas = threading.Lock()
+
+
+def huella_archivo(ruta: Optional[str]) -> str:
+    """
+    SHA-256 del contenido de un archivo ('' si no existe). Se recuerda por
+    ruta, tamano y fecha de modificacion para no releer logos y fotografias.
+    """
+    if not ruta:
+        return ''
+    try:
+        estado = os.stat(ruta)
+    except OSError:
+        return ''
+    llave = (os.path.abspath(ruta), estado.st_size, estado.st_mtime_ns)
+    with _lock_huellas:
+        huella = _huellas.get(llave)
+    if huella is not None:
+        return huella
+
+    sha = hashlib.sha256()
+    try:
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloque)
+    except OSError:
+        return ''
+    huella = sha.hexdigest()
+    with _lock_huellas:
+        if len(_huellas) > 4096:
+            _huellas.clear()
+        _huellas[llave] = huella
+    return huella
+
+
+class CacheExportaciones:
+    """
+    Documentos exportados por llave de contenido.
+    Una instancia por directorio de estudios, obtenida con CacheExportaciones.obtener().
+    """
+
+    DIRECTORIO = ".exportaciones"
+
+    _instancias: Dict[str, "CacheExportaciones"] = {}
+    _lock_instancias = threading.Lock()
+
+    @classmethod
+    def obtener(cls, ruta_base: str = "data/estudios") -> "CacheExportaciones":
+        clave = os.path.abspath(ruta_base)
+        with cls._lock_instancias:
+            cache = cls._instancias.get(clave)
+            if cache is None:
+                cache = cls._instancias[clave] = cls(ruta_base)
+            return cache
+
+    def __init__(self, ruta_base: str = "data/estudios", max_bytes: int = MAX_BYTES_CACHE):
+        self.ruta = os.path.join(ruta_base, self.DIRECTORIO)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Tamano total de las entradas; se calcula en la primera escritura
+        self._bytes: Optional[int] = None
+
+    @staticmethod
+    def llave(exportador, datos: Dict) -> str:
+        """Llave del documento que produciria el exportador con estos datos."""
+        config = getattr(exportador, 'config', {}) or {}
+        contenido = {
+            'formato': exportador.FORMATO,
+            'version': exportador.VERSION_EXPORTADOR,
+            'datos': datos,
+            'config': config,
+            'logo': huella_archivo(config.get('logo')),
+            'adicional': exportador.huella_adicional(datos),
+        }
+        texto = json.dumps(contenido, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _entrada(self, llave: str, formato: str) -> str:
+        return os.path.join(self.ruta, llave[:2], f"{llave}.{formato}")
+
+    def copiar(self, exportador, datos: Dict, ruta_salida: str) -> str:
+        """
+        Copia el documento del cache sin generarlo.
+
+        Returns:
+            SIN_CAMBIOS si el destino ya tenia el documento, COPIADO si se
+            copio del cache, o '' si no esta en el cache o no se pudo copiar.
+        """
+        return self._copiar(self._entrada(self.llave(exportador, datos), exportador.FORMATO),
+                            ruta_salida)
+
+    def _copiar(self, entrada: str, ruta_salida: str) -> str:
+        if not os.path.exists(entrada):
+            return ''
+        try:
+            if os.path.exists(ruta_salida) and filecmp.cmp(entrada, ruta_salida, shallow=False):
+                contar('exportaciones.sin_cambios')
+                return SIN_CAMBIOS
+            directorio = os.path.dirname(ruta_salida)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            shutil.copyfile(entrada, ruta_salida)
+            # La fecha de modificacion marca el ultimo uso
+            os.utime(entrada)
+            contar('exportaciones.cache_acierto')
+            return COPIADO
+        except OSError as e:
+            print(f"Advertencia: no se pudo copiar la exportacion del cache: {e}")
+            return ''
+
+    def exportar(self, exportador, datos: Dict, ruta_salida: str, **opciones) -> str:
+        """
+        Exporta usando el cache.
+
+        Args:
+            opciones: Estado ya calculado a partir de los datos (riesgos,
+                graficas) que se pasa a exportador.exportar; no forma parte
+                de la llave.
+
+        Returns:
+            SIN_CAMBIOS si el destino ya tenia el documento, COPIADO si se
+            copio del cache, GENERADO si se genero, o '' si el exportador fallo.
+        """
+        entrada = self._entrada(self.llave(exportador, datos), exportador.FORMATO)
+        resultado = self._copiar(entrada, ruta_salida)
+        if resultado:
+            return resultado
+
+        contar('exportaciones.cache_fallo')
+        if not exportador.exportar(datos, ruta_salida, **opciones):
+            return ''
+        self._guardar(entrada, ruta_salida)
+        return GENERADO
+
+    def _guardar(self, entrada: str, ruta_salida: str):
+        try:
+            os.makedirs(os.path.dirname(entrada), exist_ok=True)
+            temporal = entrada + '.tmp'
+            shutil.copyfile(ruta_salida, temporal)
+            os.replace(temporal, entrada)
+            tamano = os.path.getsize(entrada)
+        except OSError as e:
+            print(f"Advertencia: no se pudo guardar la exportacion en cache: {e}")
+            return
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(tam for _, _, tam in self._entradas())
+            else:
+                self._bytes += tamano
+            if self._bytes > self.max_bytes:
+                self._recortar()
+
+    def _entradas(self):
+        """(fecha de uso, ruta, tamano) de cada documento en cache."""
+        if not os.path.isdir(self.ruta):
+            return
+        for carpeta in os.scandir(self.ruta):
+            if not carpeta.is_dir():
+                continue
+            for entrada in os.scandir(carpeta.path):
+                if entrada.name.endswith('.tmp'):
+                    continue
+                estado = entrada.stat()
+                yield estado.st_mtime, entrada.path, estado.st_size
+
+    def _recortar(self):
+        """Descarta las entradas usadas hace mas tiempo hasta bajar al 80% del limite."""
+        objetivo = self.max_bytes * 0.8
+        for _, ruta, tamano in sorted(self._entradas()):
+            if self._bytes <= objetivo:
+                break
+            try:
+                os.remove(ruta)
+                self._bytes -= tamano
+            except OSError:
+                pass
+
+    def limpiar(self):
+        """Vacia el cache."""
+        with self._lock:
+            shutil.rmtree(self.ruta, ignore_errors=True)
+            self._bytes = 0
+
+
+def exportar_lote(exportador, ids: List[str], directorio: str,
+                  ruta_base: str = "data/estudios", usar_cache: bool = True,
+                  progreso: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """
+    Exporta varios estudios a directorio/<id>.<formato>. Con el cache, los
+    estudios sin cambios desde la corrida anterior no se vuelven a escribir.
+
+    Returns:
+        Cuantos estudios se generaron, copiaron, omitieron sin cambios y fallaron.
+    """
+    from src.models.estudio import EstudioSocioeconomico
+
+    cache = CacheExportaciones.obtener(ruta_base) if usar_cache else None
+    conteo = {GENERADO: 0, COPIADO: 0, SIN_CAMBIOS: 0, 'fallidos': 0}
+    os.makedirs(directorio, exist_ok=True)
+
+    for numero, id_estudio in enumerate(ids, 1):
+        estudio = EstudioSocioeconomico.cargar(id_estudio, ruta_base)
+        ruta_salida = os.path.join(directorio, f"{id_estudio}.{exportador.FORMATO}")
+        try:
+            if estudio is None:
+                resultado = ''
+            elif cache is not None:
+                resultado = cache.exportar(exportador, estudio.datos, ruta_salida)
+            else:
+                resultado = GENERADO if exportador.exportar(estudio.datos, ruta_salida) else ''
+        except Exception as e:
+            print(f"Advertencia: no se pudo exportar el estudio {id_estudio}: {e}")
+            resultado = ''
+        conteo[resultado or 'fallidos'] += 1
+        if progreso:
+            progreso(numero, len(ids))
+    return conteo
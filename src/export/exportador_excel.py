@@ -8,9 +8,12 @@ import os
 from datetime import datetime
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from src.utils.instrumentacion import instrumentar
 
+
+@instrumentar('excel', 'exportar')
 class ExportadorExcel:
     """Clase para exportar múltiples estudios socioeconómicos a formato Excel."""
     
@@ -83,13 +86,16 @@ class ExportadorExcel:
         
         cell.fill = fill
     
-    def exportar(self, estudios_datos: List[Dict], ruta_salida: str) -> bool:
+    def exportar(self, estudios_datos: List[Dict], ruta_salida: str,
+                 riesgos: Optional[List[Dict]] = None) -> bool:
         """
         Exporta múltiples estudios a un archivo Excel con tabla comparativa.
         
         Args:
             estudios_datos: Lista de diccionarios con los datos de los estudios.
             ruta_salida: Ruta completa del archivo XLSX de salida.
+            riesgos: Riesgos ya calculados de cada estudio (mismo orden); si
+                se omiten se calculan aquí.
             
         Returns:
             True si se exportó correctamente, False en caso contrario.
@@ -157,7 +163,7 @@ class ExportadorExcel:
             # Datos de estudios
             row_num = 5
             
-            for estudio in estudios_datos:
+            for indice, estudio in enumerate(estudios_datos):
                 from src.logic.calculador_riesgos import CalculadorRiesgos
                 
                 dp = estudio.get("datos_personales", {})
@@ -168,8 +174,10 @@ class ExportadorExcel:
                 empleo = estudio.get("empleo_actual", {})
                 
                 # Calcular riesgos con justificaciones
-                calc = CalculadorRiesgos(estudio)
-                resultados = CalculadorRiesgos.calcular_todos_riesgos(estudio)
+                if riesgos is not None:
+                    resultados = riesgos[indice]
+                else:
+                    resultados = CalculadorRiesgos.calcular_todos_riesgos(estudio)
                 
                 # Calcular porcentaje gasto/ingreso
                 sueldo = fin.get("sueldo_mensual", 0)
@@ -18,6 +18,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from typing import Dict, Optional
 import tempfile
 
+from src.utils.instrumentacion import instrumentar
+
 # matplotlib imports for chart generation
 try:
     import matplotlib
@@ -29,9 +31,27 @@ except ImportError:
     MATPLOTLIB_AVAILABLE = False
 
 
+@instrumentar('pdf', 'exportar', '_crear_encabezado', '_crear_seccion_*',
+              '_crear_grafica_*', '_crear_graficos_*', 'renderizar_graficas')
 class ExportadorPDF:
     """Clase para exportar estudios socioeconómicos a PDF."""
     
+    # Forman parte de la llave del cache de exportaciones: incrementar la
+    # versión al cambiar el contenido o el formato del documento
+    FORMATO = "pdf"
+    VERSION_EXPORTADOR = 1
+    
+    # Gráficas del documento: (método, título, alto en pulgadas, salto de
+    # página antes)
+    GRAFICAS = (
+        ('_crear_grafica_ingresos_vs_gastos', "1. Analisis Financiero: Ingresos vs Gastos", 3, False),
+        ('_crear_grafica_distribucion_deudas', "2. Distribucion de Deudas", 3, False),
+        ('_crear_grafica_indicadores_financieros', "3. Indicadores Financieros Clave", 3, False),
+        ('_crear_grafica_distribucion_gastos', "4. Distribucion de Gastos Mensuales", 4, True),
+        ('_crear_grafica_radar_riesgos', "5. Radar de Indicadores de Riesgo", 4, False),
+        ('_crear_grafica_actividades', "6. Frecuencia de Actividades y Habitos", 3.5, False),
+    )
+    
     def __init__(self, config_empresa: Dict):
         """
         Inicializa el exportador con la configuración de la empresa.
@@ -1013,94 +1033,57 @@ class ExportadorPDF:
             
             elements.append(Spacer(1, 0.2*inch))
     
-    def _crear_graficos_completos(self, datos: Dict, elements: list):
-        """Crea todas las graficas del estudio (6 graficas en total)."""
+    def renderizar_graficas(self, datos: Dict) -> Dict[int, str]:
+        """
+        Dibuja las gráficas del estudio (ver GRAFICAS) y las guarda como PNG
+        temporales que se eliminan al terminar exportar().
+        
+        Returns:
+            Ruta del PNG por índice en GRAFICAS; las que no aplican se omiten.
+        """
         if not MATPLOTLIB_AVAILABLE:
-            return
+            return {}
         
+        graficas = {}
         try:
-            elements.append(PageBreak())
-            elements.append(Paragraph("GRAFICAS Y ANALISIS VISUAL", self.styles['CustomHeading']))
-            elements.append(Spacer(1, 0.1*inch))
-            
-            # ============================================
-            # GRAFICA 1: Ingresos vs Gastos vs Ahorros
-            # ============================================
-            fig1 = self._crear_grafica_ingresos_vs_gastos(datos)
-            if fig1:
-                temp_path1 = self._guardar_figura_temporal(fig1)
-                if temp_path1:
-                    elements.append(Paragraph("<b>1. Analisis Financiero: Ingresos vs Gastos</b>", self.styles['CustomBody']))
-                    img1 = Image(temp_path1, width=6*inch, height=3*inch)
-                    elements.append(img1)
-                    elements.append(Spacer(1, 0.2*inch))
-            
-            # ============================================
-            # GRAFICA 2: Distribucion de Deudas
-            # ============================================
-            fig2 = self._crear_grafica_distribucion_deudas(datos)
-            if fig2:
-                temp_path2 = self._guardar_figura_temporal(fig2)
-                if temp_path2:
-                    elements.append(Paragraph("<b>2. Distribucion de Deudas</b>", self.styles['CustomBody']))
-                    img2 = Image(temp_path2, width=6*inch, height=3*inch)
-                    elements.append(img2)
-                    elements.append(Spacer(1, 0.2*inch))
-            
-            # ============================================
-            # GRAFICA 3: Indicadores Financieros
-            # ============================================
-            fig3 = self._crear_grafica_indicadores_financieros(datos)
-            if fig3:
-                temp_path3 = self._guardar_figura_temporal(fig3)
-                if temp_path3:
-                    elements.append(Paragraph("<b>3. Indicadores Financieros Clave</b>", self.styles['CustomBody']))
-                    img3 = Image(temp_path3, width=6*inch, height=3*inch)
-                    elements.append(img3)
-                    elements.append(Spacer(1, 0.2*inch))
-            
-            elements.append(PageBreak())
-            
-            # ============================================
-            # GRAFICA 4: Distribucion de Gastos
-            # ============================================
-            fig4 = self._crear_grafica_distribucion_gastos(datos)
-            if fig4:
-                temp_path4 = self._guardar_figura_temporal(fig4)
-                if temp_path4:
-                    elements.append(Paragraph("<b>4. Distribucion de Gastos Mensuales</b>", self.styles['CustomBody']))
-                    img4 = Image(temp_path4, width=6*inch, height=4*inch)
-                    elements.append(img4)
-                    elements.append(Spacer(1, 0.2*inch))
-            
-            # ============================================
-            # GRAFICA 5: Radar de Riesgos
-            # ============================================
-            fig5 = self._crear_grafica_radar_riesgos(datos)
-            if fig5:
-                temp_path5 = self._guardar_figura_temporal(fig5)
-                if temp_path5:
-                    elements.append(Paragraph("<b>5. Radar de Indicadores de Riesgo</b>", self.styles['CustomBody']))
-                    img5 = Image(temp_path5, width=6*inch, height=4*inch)
-                    elements.append(img5)
-                    elements.append(Spacer(1, 0.2*inch))
-            
-            # ============================================
-            # GRAFICA 6: Actividades y Habitos
-            # ============================================
-            fig6 = self._crear_grafica_actividades(datos)
-            if fig6:
-                temp_path6 = self._guardar_figura_temporal(fig6)
-                if temp_path6:
-                    elements.append(Paragraph("<b>6. Frecuencia de Actividades y Habitos</b>", self.styles['CustomBody']))
-                    img6 = Image(temp_path6, width=6*inch, height=3.5*inch)
-                    elements.append(img6)
-                    elements.append(Spacer(1, 0.2*inch))
-            
+            for indice, (metodo, _, _, _) in enumerate(self.GRAFICAS):
+                fig = getattr(self, metodo)(datos)
+                if fig:
+                    temp_path = self._guardar_figura_temporal(fig)
+                    if temp_path:
+                        graficas[indice] = temp_path
         except Exception as e:
             print(f"Error creando graficos completos: {e}")
             import traceback
             traceback.print_exc()
+        return graficas
+    
+    def _crear_graficos_completos(self, datos: Dict, elements: list,
+                                  graficas: Optional[Dict[int, str]] = None):
+        """
+        Crea todas las graficas del estudio (6 graficas en total).
+        
+        Args:
+            graficas: Resultado de renderizar_graficas() si ya se dibujaron.
+        """
+        if not MATPLOTLIB_AVAILABLE:
+            return
+        
+        if graficas is None:
+            graficas = self.renderizar_graficas(datos)
+        
+        elements.append(PageBreak())
+        elements.append(Paragraph("GRAFICAS Y ANALISIS VISUAL", self.styles['CustomHeading']))
+        elements.append(Spacer(1, 0.1*inch))
+        
+        for indice, (_, titulo, alto, salto) in enumerate(self.GRAFICAS):
+            if salto:
+                elements.append(PageBreak())
+            temp_path = graficas.get(indice)
+            if temp_path:
+                elements.append(Paragraph(f"<b>{titulo}</b>", self.styles['CustomBody']))
+                elements.append(Image(temp_path, width=6*inch, height=alto*inch))
+                elements.append(Spacer(1, 0.2*inch))
     
     def _guardar_figura_temporal(self, fig) -> Optional[str]:
         """Guarda una figura matplotlib en archivo temporal y retorna la ruta."""
@@ -1395,9 +1378,10 @@ class ExportadorPDF:
             print(f"Error en grafica actividades: {e}")
             return None
     
-    def _crear_graficos_riesgos(self, datos: Dict, elements: list):
+    def _crear_graficos_riesgos(self, datos: Dict, elements: list,
+                                graficas: Optional[Dict[int, str]] = None):
         """Metodo legacy - ahora llama a _crear_graficos_completos."""
-        self._crear_graficos_completos(datos, elements)
+        self._crear_graficos_completos(datos, elements, graficas)
     
     def _crear_seccion_validacion_documental(self, datos: Dict, elements: list):
         """Crea la seccion de validacion documental."""
@@ -1709,13 +1693,26 @@ class ExportadorPDF:
             elements.append(Paragraph(f"<b>Observaciones Finales:</b> {inv.get('observaciones_finales')}", 
                                      self.styles['CustomBody']))
     
-    def exportar(self, datos: Dict, ruta_salida: str):
+    def huella_adicional(self, datos: Dict) -> list:
+        """
+        Lo que cambia el documento además de los datos y la configuración
+        (ver cache_exportaciones).
+        """
+        # Sin fecha de estudio el encabezado usa la del día; sin matplotlib
+        # el documento no lleva gráficas
+        fecha = datos.get('fecha_estudio', datetime.now().strftime('%d/%m/%Y'))
+        return [fecha, MATPLOTLIB_AVAILABLE]
+    
+    def exportar(self, datos: Dict, ruta_salida: str,
+                 graficas: Optional[Dict[int, str]] = None):
         """
         Genera el PDF del estudio socioeconómico.
         
         Args:
             datos: Diccionario con todos los datos del estudio.
             ruta_salida: Ruta donde se guardará el PDF.
+            graficas: Gráficas ya dibujadas con renderizar_graficas(); si
+                se omite se dibujan aquí.
         """
         doc = SimpleDocTemplate(
             ruta_salida,
@@ -1744,7 +1741,7 @@ class ExportadorPDF:
         
         # Análisis de riesgos y gráficos
         self._crear_seccion_analisis_riesgos(datos, elements)
-        self._crear_graficos_riesgos(datos, elements)
+        self._crear_graficos_riesgos(datos, elements, graficas)
         
         # Secciones institucionales
         self._crear_seccion_validacion_documental(datos, elements)
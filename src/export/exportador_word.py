@@ -9,12 +9,21 @@ from datetime import datetime
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from typing import Dict
+from typing import Dict, Optional
 
+from src.export.cache_exportaciones import huella_archivo
+from src.utils.instrumentacion import instrumentar
 
+
+@instrumentar('word', 'exportar', '_agregar_*')
 class ExportadorWord:
     """Clase para exportar estudios socioeconómicos a formato Word."""
     
+    # Forman parte de la llave del cache de exportaciones: incrementar la
+    # versión al cambiar el contenido o el formato del documento
+    FORMATO = "docx"
+    VERSION_EXPORTADOR = 1
+    
     def __init__(self, config_empresa: Dict):
         """
         Inicializa el exportador con la configuración de la empresa.
@@ -434,17 +443,22 @@ class ExportadorWord:
         
         doc.add_paragraph()
     
-    def _agregar_analisis_riesgos(self, doc: Document, datos: Dict):
-        """Agrega la sección de análisis de riesgos con justificaciones."""
+    def _agregar_analisis_riesgos(self, doc: Document, datos: Dict,
+                                  resultados: Optional[Dict] = None):
+        """
+        Agrega la sección de análisis de riesgos con justificaciones.
+        
+        Args:
+            resultados: Riesgos ya calculados con calcular_todos_riesgos();
+                si se omiten se calculan aquí.
+        """
         from src.logic.calculador_riesgos import CalculadorRiesgos
         
         self._agregar_seccion(doc, "ANÁLISIS DE RIESGOS")
         
-        # Crear instancia del calculador
-        calc = CalculadorRiesgos(datos)
-        
         # Calcular todos los riesgos con justificaciones
-        resultados = CalculadorRiesgos.calcular_todos_riesgos(datos)
+        if resultados is None:
+            resultados = CalculadorRiesgos.calcular_todos_riesgos(datos)
         
         # Tabla resumen de riesgos
         riesgos_data = []
@@ -540,13 +554,24 @@ class ExportadorWord:
                 except Exception as e:
                     print(f"Error al incluir fotografía: {e}")
     
-    def exportar(self, estudio_datos: Dict, ruta_salida: str) -> bool:
+    def huella_adicional(self, datos: Dict) -> list:
+        """
+        Lo que cambia el documento además de los datos y la configuración
+        (ver cache_exportaciones): la fecha de elaboración y el contenido de
+        las fotografías incrustadas.
+        """
+        fotos = [huella_archivo(foto.get("archivo")) for foto in datos.get("fotos", [])]
+        return [datetime.now().strftime('%d/%m/%Y'), fotos]
+    
+    def exportar(self, estudio_datos: Dict, ruta_salida: str,
+                 riesgos: Optional[Dict] = None) -> bool:
         """
         Exporta un estudio socioeconómico a formato Word.
         
         Args:
             estudio_datos: Diccionario con los datos del estudio.
             ruta_salida: Ruta completa del archivo DOCX de salida.
+            riesgos: Riesgos ya calculados; si se omiten se calculan aquí.
             
         Returns:
             True si se exportó correctamente, False en caso contrario.
@@ -591,7 +616,7 @@ class ExportadorWord:
             self._agregar_vivienda(doc, estudio_datos)
             self._agregar_historial_laboral(doc, estudio_datos)
             self._agregar_referencias(doc, estudio_datos)
-            self._agregar_analisis_riesgos(doc, estudio_datos)
+            self._agregar_analisis_riesgos(doc, estudio_datos, riesgos)
             self._agregar_conclusiones(doc, estudio_datos)
             self._agregar_fotografias(doc, estudio_datos)
             
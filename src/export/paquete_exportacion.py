@@ -0,0 +1,157 @@
+"""
+Exportacion de un estudio a PDF, Word y Excel en una sola pasada.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Exportar por separado a los tres formatos carga el estudio, calcula los
+riesgos y prepara el contenido tres veces. El paquete lo hace una vez:
+
+    1. calcula los riesgos (CalculadorRiesgos.calcular_todos_riesgos)
+    2. si el PDF esta en el cache de exportaciones lo copia; si no, dibuja
+       sus graficas en el hilo que llama (pyplot no admite varios hilos)
+    3. genera PDF, DOCX y el resumen XLSX al mismo tiempo, cada uno en su
+       hilo, a partir de esos datos
+    4. opcionalmente los reune en un ZIP para entregarlo a la empresa
+       solicitante
+
+El PDF y el Word pasan por el cache de exportaciones (cache_exportaciones),
+asi que volver a empaquetar un estudio sin cambios solo copia archivos.
+Si falta la dependencia de un formato, ese formato se reporta como fallido
+y los demas se generan.
+
+Uso:
+    python -m src.cli paquete ID [--destino export] [--zip] [--formato pdf --formato xlsx]
+"""
+
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from src.utils.instrumentacion import tramo
+
+
+FORMATOS = ('pdf', 'docx', 'xlsx')
+
+
+class ResultadoPaquete(NamedTuple):
+    """Archivos generados y formatos que fallaron (con el motivo)."""
+    archivos: Dict[str, str]
+    fallidos: Dict[str, str]
+    zip: Optional[str] = None
+
+
+def nombre_paquete(datos: Dict) -> str:
+    """Nombre base de los archivos, como los que sugiere la ventana principal."""
+    nombre = datos.get("datos_personales", {}).get("nombre_completo", "estudio") or "estudio"
+    return f"Estudio_{nombre.replace(' ', '_')}_{datos.get('id', '')}"
+
+
+def _exportar_documento(exportador, datos: Dict, ruta: str, cache, **opciones) -> bool:
+    if cache is not None:
+        return bool(cache.exportar(exportador, datos, ruta, **opciones))
+    return bool(exportador.exportar(datos, ruta, **opciones))
+
+
+def _exportar_resumen(exportador, datos: Dict, ruta: str, riesgos: Dict) -> bool:
+    return bool(exportador.exportar([datos], ruta, riesgos=[riesgos]))
+
+
+def exportar_paquete(datos: Dict, directorio: str, config_empresa: Dict,
+                     formatos: Sequence[str] = FORMATOS, comprimir: bool = False,
+                     usar_cache: bool = True,
+                     ruta_base: str = "data/estudios") -> ResultadoPaquete:
+    """
+    Exporta un estudio a varios formatos en una sola pasada.
+
+    Args:
+        datos: Datos del estudio (no se modifican).
+        directorio: Directorio de salida.
+        formatos: Subconjunto de FORMATOS.
+        comprimir: Reunir los archivos generados en <nombre>.zip.
+        usar_cache: Usar el cache de exportaciones para PDF y Word.
+        ruta_base: Directorio de estudios (ubicacion del cache).
+    """
+    from src.logic.calculador_riesgos import CalculadorRiesgos
+
+    desconocidos = [f for f in formatos if f not in FORMATOS]
+    if desconocidos:
+        raise ValueError(f"Formatos desconocidos: {', '.join(desconocidos)}")
+
+    os.makedirs(directorio, exist_ok=True)
+    base = os.path.join(directorio, nombre_paquete(datos))
+    cache = None
+    if usar_cache:
+        from src.export.cache_exportaciones import CacheExportaciones
+        cache = CacheExportaciones.obtener(ruta_base)
+
+    # Los tres documentos usan los mismos riesgos; la seccion de riesgos del
+    # PDF toma los almacenados en los datos
+    with tramo('paquete.riesgos'):
+        riesgos = CalculadorRiesgos.calcular_todos_riesgos(datos)
+    datos = dict(datos, riesgos=riesgos)
+
+    # formato -> (ruta, exportacion pendiente)
+    trabajos = {}
+    archivos: Dict[str, str] = {}
+    fallidos: Dict[str, str] = {}
+    for formato in formatos:
+        ruta = f"{base}.{formato}"
+        try:
+            if formato == 'pdf':
+                from src.export.exportador_pdf import ExportadorPDF
+                exportador = ExportadorPDF(config_empresa)
+                # La copia se hace aqui: si el trabajo pudiera generar sin
+                # graficas ya dibujadas, las dibujaria con pyplot en su hilo
+                if cache is not None and cache.copiar(exportador, datos, ruta):
+                    archivos[formato] = ruta
+                    continue
+                with tramo('paquete.graficas'):
+                    graficas = exportador.renderizar_graficas(datos)
+                trabajo = partial(_exportar_documento, exportador, datos, ruta, cache, graficas=graficas)
+            elif formato == 'docx':
+                from src.export.exportador_word import ExportadorWord
+                trabajo = partial(_exportar_documento, ExportadorWord(config_empresa), datos, ruta,
+                                  cache, riesgos=riesgos)
+            else:
+                from src.export.exportador_excel import ExportadorExcel
+                trabajo = partial(_exportar_resumen, ExportadorExcel(config_empresa), datos, ruta, riesgos)
+        except ImportError as e:
+            fallidos[formato] = f"dependencia no disponible: {e}"
+            continue
+        trabajos[formato] = (ruta, trabajo)
+
+    if trabajos:
+        with tramo('paquete.documentos'), ThreadPoolExecutor(len(trabajos)) as ejecutor:
+            futuros = {formato: ejecutor.submit(trabajo) for formato, (_, trabajo) in trabajos.items()}
+            for formato, futuro in futuros.items():
+                try:
+                    if futuro.result():
+                        archivos[formato] = trabajos[formato][0]
+                    else:
+                        fallidos[formato] = "el exportador no genero el archivo"
+                except Exception as e:
+                    print(f"Advertencia: no se pudo exportar el paquete a {formato}: {e}")
+                    fallidos[formato] = str(e)
+
+    ruta_zip = None
+    if comprimir and archivos:
+        ruta_zip = f"{base}.zip"
+        try:
+            _comprimir(ruta_zip, [archivos[f] for f in formatos if f in archivos])
+        except OSError as e:
+            print(f"Advertencia: no se pudo crear el ZIP del paquete: {e}")
+            ruta_zip = None
+
+    return ResultadoPaquete(archivos, fallidos, ruta_zip)
+
+
+def _comprimir(ruta_zip: str, rutas: List[str]):
+    """ZIP con los archivos del paquete, escrito en un temporal y renombrado."""
+    temporal = ruta_zip + '.tmp'
+    # PDF, DOCX y XLSX ya vienen comprimidos: se guardan sin volver a comprimir
+    with zipfile.ZipFile(temporal, 'w', zipfile.ZIP_STORED) as archivo_zip:
+        for ruta in rutas:
+            archivo_zip.write(ruta, os.path.basename(ruta))
+    os.replace(temporal, ruta_zip)
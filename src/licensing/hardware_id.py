@@ -1,13 +1,23 @@
 ﻿"""
 Generador de ID unico de hardware.
 Utilizado para vincular licencias a maquinas especificas.
+
+Las sondas (MAC, CPU, disco, nombre del equipo) se ejecutan en paralelo; las
+de Windows y macOS lanzan procesos con varios segundos de espera. El ID
+calculado se guarda en un cache firmado (HardwareIdCache) ligado a
+invariantes baratos de la maquina, para que el arranque no repita las sondas.
 Copyright (c) 2026 DINOS Tech. Todos los derechos reservados.
 """
 
 import hashlib
+import hmac
+import json
+import os
 import platform
 import subprocess
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
 
 
 def get_mac_address() -> str:
@@ -16,7 +26,7 @@ def get_mac_address() -> str:
     return ':'.join(('%012X' % mac)[i:i+2] for i in range(0, 12, 2))
 
 
-def get_cpu_id() -> str:
+def get_cpu_id(cpuinfo_path: str = '/proc/cpuinfo') -> str:
     """Obtiene identificador del procesador."""
     try:
         if platform.system() == "Windows":
@@ -34,7 +44,7 @@ def get_cpu_id() -> str:
             )
             return result.stdout.strip()
         else:  # Linux
-            with open('/proc/cpuinfo', 'r') as f:
+            with open(cpuinfo_path, 'r') as f:
                 for line in f:
                     if 'model name' in line.lower():
                         return line.split(':')[1].strip()
@@ -67,20 +77,47 @@ def get_disk_serial() -> str:
     return "UNKNOWN_DISK"
 
 
-def get_hardware_id() -> str:
+def get_computer_name() -> str:
+    """Obtiene el nombre del equipo."""
+    return platform.node()
+
+
+# Sondas en el orden en que entran al hash (no cambiar: invalidaria las
+# licencias emitidas)
+PROBES: Sequence[Callable[[], str]] = (
+    get_mac_address,
+    get_cpu_id,
+    get_disk_serial,
+    get_computer_name,
+)
+
+
+def get_hardware_components(probes: Optional[Sequence[Callable[[], str]]] = None) -> List[str]:
+    """
+    Ejecuta las sondas en paralelo y devuelve sus resultados en orden.
+    
+    Args:
+        probes: Sondas a ejecutar; PROBES si se omite (las pruebas pueden
+            pasar sondas simuladas).
+    """
+    probes = PROBES if probes is None else probes
+    with ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix="SondaHardware") as pool:
+        futures = [pool.submit(probe) for probe in probes]
+        return [future.result() for future in futures]
+
+
+def get_hardware_id(probes: Optional[Sequence[Callable[[], str]]] = None) -> str:
     """
     Genera un ID unico basado en el hardware de la maquina.
     Este ID se usa para vincular licencias a dispositivos especificos.
     
+    Args:
+        probes: Sondas a ejecutar; PROBES si se omite.
+    
     Returns:
         str: Hash SHA256 truncado del hardware ID (16 caracteres)
     """
-    components = [
-        get_mac_address(),
-        get_cpu_id(),
-        get_disk_serial(),
-        platform.node(),  # Nombre del equipo
-    ]
+    components = get_hardware_components(probes)
     
     # Combinar componentes y crear hash
     combined = "|".join(components)
@@ -90,15 +127,92 @@ def get_hardware_id() -> str:
     return hash_obj.hexdigest()[:16].upper()
 
 
-def get_hardware_id_display() -> str:
+def get_hardware_id_display(hw_id: Optional[str] = None) -> str:
     """
     Retorna el Hardware ID formateado para mostrar al usuario.
     Formato: XXXX-XXXX-XXXX-XXXX
     """
-    hw_id = get_hardware_id()
+    hw_id = hw_id or get_hardware_id()
     return f"{hw_id[:4]}-{hw_id[4:8]}-{hw_id[8:12]}-{hw_id[12:16]}"
 
 
+def get_cheap_invariants() -> str:
+    """
+    Datos de la maquina que se obtienen sin lanzar procesos. Si alguno
+    cambia, el cache del hardware ID deja de ser valido.
+    """
+    return "|".join([
+        get_mac_address(),
+        platform.node(),
+        platform.system(),
+        platform.machine(),
+    ])
+
+
+class HardwareIdCache:
+    """
+    Cache del hardware ID en disco, firmado con HMAC-SHA256 sobre el ID y
+    los invariantes de la maquina. Un archivo copiado a otro equipo o
+    editado a mano no pasa la verificacion y se ignora.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path: str, secret: str,
+                 invariants: Callable[[], str] = get_cheap_invariants):
+        """
+        Args:
+            path: Archivo del cache.
+            secret: Llave de la firma.
+            invariants: Funcion que devuelve los invariantes actuales.
+        """
+        self.path = path
+        self._secret = secret.encode('utf-8')
+        self._invariants = invariants
+    
+    def _signature(self, hw_id: str, invariants: str) -> str:
+        message = f"{self.VERSION}|{hw_id}|{invariants}".encode('utf-8')
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+    
+    def load(self) -> Optional[str]:
+        """Hardware ID guardado, o None si no existe o no es valido aqui."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            hw_id = data['hardware_id']
+            signature = data['signature']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        expected = self._signature(hw_id, self._invariants())
+        if not hmac.compare_digest(str(signature), expected):
+            return None
+        return hw_id
+    
+    def save(self, hw_id: str):
+        """Guarda el ID firmado (escritura atomica)."""
+        data = {
+            'version': self.VERSION,
+            'hardware_id': hw_id,
+            'signature': self._signature(hw_id, self._invariants()),
+        }
+        temporal = self.path + '.tmp'
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temporal, self.path)
+        except OSError as e:
+            print(f"Advertencia: no se pudo guardar el cache de hardware: {e}")
+    
+    def clear(self):
+        """Elimina el cache."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Advertencia: no se pudo eliminar el cache de hardware: {e}")
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("DINOS Tech - Generador de Hardware ID")
@@ -107,4 +221,4 @@ if __name__ == "__main__":
     print(f"\nMAC Address: {get_mac_address()}")
     print(f"CPU ID: {get_cpu_id()}")
     print(f"Disk Serial: {get_disk_serial()}")
-    print(f"Computer Name: {platform.node()}")
+    print(f"Computer Name: {get_computer_name()}")
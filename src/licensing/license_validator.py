@@ -10,7 +10,7 @@ import os
 from datetime import datetime
 from typing import Optional, Tuple
 
-from .hardware_id import get_hardware_id
+from .hardware_id import HardwareIdCache, get_hardware_id
 
 
 class LicenseValidator:
@@ -24,17 +24,39 @@ class LicenseValidator:
     # Secreto usado para validar licencias (ofuscado en el binario)
     _SECRET_SALT = "D1N0S_T3CH_2026_S0C10EC0N0M1C0"
     
-    def __init__(self, license_file: str = "license.dat"):
+    def __init__(self, license_file: str = "license.dat",
+                 cache_file: Optional[str] = None):
         """
         Inicializa el validador.
         
         Args:
             license_file: Ruta al archivo de licencia
+            cache_file: Cache firmado del hardware ID (por defecto junto a
+                la licencia, con extension .hwid)
         """
         self.license_file = license_file
         self._license_data: Optional[dict] = None
         self._is_valid = False
         self._error_message = ""
+        if cache_file is None:
+            cache_file = os.path.splitext(license_file)[0] + ".hwid"
+        self.hardware_cache = HardwareIdCache(cache_file, self._SECRET_SALT)
+        # True si el ultimo hardware ID salio del cache (falta reverificar)
+        self.hardware_id_from_cache = False
+    
+    def current_hardware_id(self) -> str:
+        """
+        Hardware ID de esta maquina: del cache si sigue siendo valido aqui;
+        si no, se ejecutan las sondas y se guarda en el cache.
+        """
+        hw_id = self.hardware_cache.load()
+        if hw_id is not None:
+            self.hardware_id_from_cache = True
+            return hw_id
+        hw_id = get_hardware_id()
+        self.hardware_cache.save(hw_id)
+        self.hardware_id_from_cache = False
+        return hw_id
     
     def _generate_expected_key(self, hardware_id: str, license_type: str, 
                                 expiry_date: str) -> str:
@@ -85,9 +107,15 @@ class LicenseValidator:
                 return False, f"Licencia invalida: falta campo {field}"
         
         # Verificar Hardware ID
-        current_hw_id = get_hardware_id()
+        current_hw_id = self.current_hardware_id()
         licensed_hw_id = self._license_data['hardware_id']
         
+        if current_hw_id != licensed_hw_id and self.hardware_id_from_cache:
+            # El cache puede haber quedado viejo (p. ej. cambio de disco o de
+            # tarjeta de red): se repiten las sondas antes de rechazar
+            self.hardware_cache.clear()
+            current_hw_id = self.current_hardware_id()
+        
         if current_hw_id != licensed_hw_id:
             return False, "Licencia no valida para este equipo"
         
@@ -121,6 +149,27 @@ class LicenseValidator:
         else:
             return True, f"Licencia {license_type} activa hasta {expiry_str} para: {licensed_to}"
     
+    def reverify(self) -> Tuple[bool, str]:
+        """
+        Vuelve a ejecutar las sondas de hardware ignorando el cache. Pensado
+        para correr en segundo plano despues de validar con el cache.
+        
+        Returns:
+            Tuple[bool, str]: (la licencia sigue siendo valida, mensaje)
+        """
+        hw_id = get_hardware_id()
+        if hw_id != self.hardware_cache.load():
+            self.hardware_cache.save(hw_id)
+        self.hardware_id_from_cache = False
+        
+        if self._license_data is None or not self._is_valid:
+            return self._is_valid, self._error_message
+        if hw_id != self._license_data.get('hardware_id'):
+            self._is_valid = False
+            self._error_message = "Licencia no valida para este equipo"
+            return False, self._error_message
+        return True, "Hardware verificado"
+    
     def is_valid(self) -> bool:
         """Retorna si la licencia es valida."""
         return self._is_valid
@@ -133,6 +182,7 @@ class LicenseValidator:
                 'license_type': self._license_data.get('license_type', ''),
                 'expiry_date': self._license_data.get('expiry_date', ''),
                 'company': self._license_data.get('company', ''),
+                'hardware_id': self._license_data.get('hardware_id', ''),
             }
         return None
     
@@ -155,8 +205,39 @@ class LicenseValidator:
             return False, "Formato de licencia invalido. Use: XXXX-XXXX-XXXX-XXXX-XXXX"
         
         # Obtener Hardware ID actual
-        hw_id = get_hardware_id()
+        hw_id = self.current_hardware_id()
+        license_data = self._find_license(hw_id, license_key)
+        if license_data is None and self.hardware_id_from_cache:
+            # La key pudo generarse con el ID real y el cache estar viejo
+            self.hardware_cache.clear()
+            hw_id = self.current_hardware_id()
+            license_data = self._find_license(hw_id, license_key)
+        if license_data is None:
+            return False, "Licencia invalida para este equipo"
+        
+        license_data.update({
+            'licensed_to': licensed_to,
+            'company': company,
+            'activation_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+        try:
+            with open(self.license_file, 'w', encoding='utf-8') as f:
+                json.dump(license_data, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            return False, f"Error al guardar licencia: {str(e)}"
         
+        self._license_data = license_data
+        self._is_valid = True
+        
+        license_type = license_data['license_type']
+        expiry = license_data['expiry_date']
+        if expiry == 'PERPETUA':
+            return True, f"Licencia {license_type} perpetua activada correctamente"
+        else:
+            return True, f"Licencia {license_type} activada hasta {expiry}"
+    
+    def _find_license(self, hw_id: str, license_key: str) -> Optional[dict]:
+        """Tipo y vencimiento cuya key esperada para hw_id coincide con license_key."""
         # Probar diferentes tipos de licencia y fechas
         license_types = ['PROFESIONAL', 'EMPRESARIAL', 'BASICA']
         expiry_options = ['PERPETUA']
@@ -172,32 +253,13 @@ class LicenseValidator:
             for expiry in expiry_options:
                 expected_key = self._generate_expected_key(hw_id, license_type, expiry)
                 if expected_key == license_key.upper():
-                    # Key valida - guardar licencia
-                    license_data = {
+                    return {
                         'hardware_id': hw_id,
                         'license_key': license_key.upper(),
                         'license_type': license_type,
                         'expiry_date': expiry,
-                        'licensed_to': licensed_to,
-                        'company': company,
-                        'activation_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                     }
-                    
-                    try:
-                        with open(self.license_file, 'w', encoding='utf-8') as f:
-                            json.dump(license_data, f, indent=2, ensure_ascii=False)
-                        
-                        self._license_data = license_data
-                        self._is_valid = True
-                        
-                        if expiry == 'PERPETUA':
-                            return True, f"Licencia {license_type} perpetua activada correctamente"
-                        else:
-                            return True, f"Licencia {license_type} activada hasta {expiry}"
-                    except Exception as e:
-                        return False, f"Error al guardar licencia: {str(e)}"
-        
-        return False, "Licencia invalida para este equipo"
+        return None
 
 
 def check_license_on_startup(license_file: str = "license.dat") -> Tuple[bool, str, Optional[dict]]:
@@ -4,9 +4,30 @@ Autor: DINOS Tech
 Versión: 0.2.0
 """
 
-from typing import Dict, Tuple, List
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple, List
 
+from src.logic.campos_derivados import valor_derivado
+from src.utils.instrumentacion import instrumentar
 
+
+# Secciones de estudio.datos que lee cada calculador de riesgo
+DEPENDENCIAS_RIESGO = {
+    "financiero": ("situacion_financiera",),
+    "familiar": ("informacion_familiar", "situacion_financiera"),
+    "vivienda": ("vivienda",),
+    "laboral": ("situacion_financiera", "empleo_actual", "historial_laboral"),
+    "salud": ("salud_intereses",),
+    "estilo_vida": ("estilo_vida", "vivienda", "salud_intereses"),
+}
+
+# Categorías que pondera el riesgo global
+COMPONENTES_GLOBAL = ("financiero", "familiar", "vivienda", "laboral")
+
+# Peso de cada componente en el riesgo global
+PONDERACION_GLOBAL = {"financiero": 0.35, "familiar": 0.25, "vivienda": 0.20, "laboral": 0.20}
+
+
+@instrumentar('riesgos', 'calcular_*', 'recalcular_riesgos')
 class CalculadorRiesgos:
     """
     Clase para calcular indicadores de riesgo socioeconómico con justificaciones automáticas.
@@ -25,12 +46,7 @@ class CalculadorRiesgos:
         justificaciones = []
         
         # Usar ingreso_total_mensual si está disponible, sino calcularlo
-        ingreso_total = fin.get("ingreso_total_mensual", 0)
-        if ingreso_total <= 0:
-            # Calcular desde componentes
-            sueldo = fin.get("sueldo_mensual", 0)
-            otros_ingresos = sum(ing.get("monto", 0) for ing in fin.get("otros_ingresos", []) if isinstance(ing, dict))
-            ingreso_total = sueldo + otros_ingresos
+        ingreso_total = valor_derivado(datos, "situacion_financiera.ingreso_total_mensual")
         
         if ingreso_total <= 0:
             justificaciones.append("Sin ingresos reportados")
@@ -42,15 +58,8 @@ class CalculadorRiesgos:
         ahorros = fin.get("monto_ahorros_mensuales", fin.get("ahorros", 0))
         
         # BUG 3 & 10 FIX: Properly aggregate all debts
-        # First check if total_deudas is already calculated
-        total_deudas = fin.get("total_deudas", 0)
-        if total_deudas <= 0:
-            # Aggregate from all debt sources
-            deuda_tarjetas = fin.get("deuda_tarjetas_total", 0)
-            prestamos_personales = fin.get("monto_prestamos_personales", 0)
-            hipoteca = fin.get("monto_hipoteca", 0)
-            prestamo_auto = fin.get("monto_prestamo_auto", 0)
-            total_deudas = deuda_tarjetas + prestamos_personales + hipoteca + prestamo_auto
+        # total_deudas guardado o, si falta, la suma de tarjetas y préstamos
+        total_deudas = valor_derivado(datos, "situacion_financiera.total_deudas")
         
         # Manejar tanto deudas como lista como string
         deudas_raw = fin.get("deudas", [])
@@ -149,7 +158,6 @@ class CalculadorRiesgos:
             Tupla (nivel_riesgo, lista_justificaciones)
         """
         fam = datos.get("informacion_familiar", {})
-        fin = datos.get("situacion_financiera", {})
         justificaciones = []
         
         num_hijos = fam.get("numero_hijos", 0)
@@ -167,15 +175,7 @@ class CalculadorRiesgos:
         dependencia_total = sum(1 for m in miembros if isinstance(m, dict) and m.get("dependencia_tipo", "") == "total")
         
         # BUG 6 FIX: Use pre-calculated ingreso_per_capita from JSON instead of recalculating
-        ingreso_per_capita = fam.get("ingreso_per_capita", 0)
-        if ingreso_per_capita <= 0:
-            # Fallback calculation only if not available
-            ingreso_total = fin.get("sueldo_mensual", 0) + sum(
-                ing.get("monto", 0) for ing in fin.get("otros_ingresos", []) if isinstance(ing, dict)
-            )
-            ingreso_per_capita = ingreso_total / max(1, num_miembros) if num_miembros > 0 else ingreso_total
-        else:
-            ingreso_total = fam.get("ingreso_familiar_total", 0)
+        ingreso_per_capita = valor_derivado(datos, "informacion_familiar.ingreso_per_capita")
         
         riesgo = 1
         
@@ -463,12 +463,23 @@ class CalculadorRiesgos:
         riesgo_viv, just_viv = CalculadorRiesgos.calcular_riesgo_vivienda(datos)
         riesgo_lab, just_lab = CalculadorRiesgos.calcular_riesgo_laboral(datos)
         
+        return CalculadorRiesgos.combinar_riesgo_global(riesgo_fin, riesgo_fam, riesgo_viv, riesgo_lab)
+    
+    @staticmethod
+    def combinar_riesgo_global(riesgo_fin: int, riesgo_fam: int,
+                               riesgo_viv: int, riesgo_lab: int) -> Tuple[int, List[str]]:
+        """
+        Combina los riesgos individuales ya calculados en el riesgo global.
+        
+        Returns:
+            Tupla (nivel_riesgo, lista_justificaciones)
+        """
         # Ponderar: financiero 35%, familiar 25%, vivienda 20%, laboral 20%
         riesgo_global = (
-            riesgo_fin * 0.35 +
-            riesgo_fam * 0.25 +
-            riesgo_viv * 0.20 +
-            riesgo_lab * 0.20
+            riesgo_fin * PONDERACION_GLOBAL["financiero"] +
+            riesgo_fam * PONDERACION_GLOBAL["familiar"] +
+            riesgo_viv * PONDERACION_GLOBAL["vivienda"] +
+            riesgo_lab * PONDERACION_GLOBAL["laboral"]
         )
         
         justificaciones = [
@@ -495,6 +506,36 @@ class CalculadorRiesgos:
         
         return int(round(riesgo_global)), justificaciones
     
+    @staticmethod
+    def combinar_riesgo_global_lote(financiero: Sequence[float], familiar: Sequence[float],
+                                    vivienda: Sequence[float], laboral: Sequence[float]) -> List[int]:
+        """
+        Riesgo global de muchos estudios a partir de columnas de riesgos por
+        categoría (p. ej. las del cache columnar), con la misma ponderación y
+        redondeo que combinar_riesgo_global. Usa NumPy si está instalado.
+        
+        Returns:
+            Lista de niveles, una por fila de las columnas.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if np is not None:
+            fin, fam, viv, lab = (np.asarray(c, dtype=np.float64)
+                                  for c in (financiero, familiar, vivienda, laboral))
+            ponderado = (fin * PONDERACION_GLOBAL["financiero"] +
+                         fam * PONDERACION_GLOBAL["familiar"] +
+                         viv * PONDERACION_GLOBAL["vivienda"] +
+                         lab * PONDERACION_GLOBAL["laboral"])
+            # np.rint redondea los empates al par, igual que round()
+            return np.rint(ponderado).astype(int).tolist()
+        return [
+            int(round(f * PONDERACION_GLOBAL["financiero"] + m * PONDERACION_GLOBAL["familiar"] +
+                      v * PONDERACION_GLOBAL["vivienda"] + l * PONDERACION_GLOBAL["laboral"]))
+            for f, m, v, l in zip(financiero, familiar, vivienda, laboral)
+        ]
+    
     @staticmethod
     def calcular_todos_riesgos(datos: Dict) -> Dict:
         """
@@ -667,6 +708,52 @@ class CalculadorRiesgos:
         
         return interpretaciones.get(nivel, "Sin evaluar")
     
+    @staticmethod
+    def categorias_afectadas(secciones: Iterable[str]) -> Set[str]:
+        """
+        Categorías de riesgo que dependen de alguna de las secciones indicadas.
+        Incluye "global" si cambia alguno de sus componentes.
+        """
+        secciones = set(secciones)
+        categorias = {c for c, deps in DEPENDENCIAS_RIESGO.items() if secciones.intersection(deps)}
+        if categorias.intersection(COMPONENTES_GLOBAL):
+            categorias.add("global")
+        return categorias
+    
+    @staticmethod
+    def recalcular_riesgos(datos: Dict, previos: Optional[Dict] = None,
+                           secciones: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Recalcula solo las categorías cuyas secciones de entrada cambiaron.
+        
+        Args:
+            datos: Datos del estudio (basta con las secciones de las que
+                dependen las categorías afectadas).
+            previos: Resultado anterior con la estructura de calcular_todos_riesgos.
+            secciones: Secciones modificadas; None recalcula todo.
+            
+        Returns:
+            Diccionario con la misma estructura de calcular_todos_riesgos.
+        """
+        if not previos or secciones is None:
+            categorias = set(DEPENDENCIAS_RIESGO) | {"global"}
+        else:
+            categorias = CalculadorRiesgos.categorias_afectadas(secciones)
+        
+        resultado = dict(previos or {})
+        for categoria in DEPENDENCIAS_RIESGO:
+            if categoria in categorias or categoria not in resultado:
+                calcular = getattr(CalculadorRiesgos, f"calcular_riesgo_{categoria}")
+                puntaje, justificaciones = calcular(datos)
+                resultado[categoria] = {"puntaje": puntaje, "justificaciones": justificaciones}
+        
+        if "global" in categorias or "global" not in resultado:
+            puntaje, justificaciones = CalculadorRiesgos.combinar_riesgo_global(
+                *(resultado[c]["puntaje"] for c in COMPONENTES_GLOBAL)
+            )
+            resultado["global"] = {"puntaje": puntaje, "justificaciones": justificaciones}
+        return resultado
+    
     def __init__(self, datos: Dict):
         """Inicializa el calculador con los datos del estudio."""
         self.datos = datos
@@ -0,0 +1,390 @@
+"""
+Motor de campos derivados del estudio.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Los valores calculados (totales, porcentajes, indices) se declaran una sola vez
+con las rutas de datos que leen. El motor arma con esas declaraciones un grafo
+de dependencias y, cuando cambia una entrada, recalcula solo los campos
+afectados en orden topologico. Lo usan el wizard, el validador, el calculo de
+riesgos, los indices de consulta y la importacion de respaldos.
+
+Las rutas tienen la forma "seccion.campo" (o "seccion.campo.subcampo").
+Cambiar una ruta afecta a las entradas que la contienen o que estan dentro
+de ella: cambiar "situacion_financiera" afecta a "situacion_financiera.gastos".
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+def _numero(valor: Any) -> float:
+    """Convierte a float; lo que no es numero cuenta como 0."""
+    if isinstance(valor, bool):
+        return float(valor)
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    try:
+        return float(str(valor).replace(",", "").replace("$", "").strip())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def obtener_ruta(datos: Dict, ruta: str, defecto: Any = None) -> Any:
+    """Valor en una ruta "seccion.campo" o defecto si no existe."""
+    actual: Any = datos
+    for parte in ruta.split("."):
+        if not isinstance(actual, dict) or parte not in actual:
+            return defecto
+        actual = actual[parte]
+    return actual
+
+
+def asignar_ruta(datos: Dict, ruta: str, valor: Any):
+    """Escribe un valor en una ruta, creando los diccionarios intermedios."""
+    partes = ruta.split(".")
+    actual = datos
+    for parte in partes[:-1]:
+        siguiente = actual.get(parte)
+        if not isinstance(siguiente, dict):
+            siguiente = actual[parte] = {}
+        actual = siguiente
+    actual[partes[-1]] = valor
+
+
+def _se_traslapan(a: str, b: str) -> bool:
+    """True si una ruta contiene a la otra (o son iguales)."""
+    return a == b or a.startswith(b + ".") or b.startswith(a + ".")
+
+
+class CampoDerivado:
+    """Declaracion de un campo calculado: ruta de salida, entradas y funcion."""
+
+    __slots__ = ("ruta", "entradas", "funcion", "descripcion")
+
+    def __init__(self, ruta: str, entradas: Iterable[str], funcion: Callable, descripcion: str = ""):
+        self.ruta = ruta
+        self.entradas = tuple(entradas)
+        self.funcion = funcion
+        self.descripcion = descripcion
+
+    @property
+    def seccion(self) -> str:
+        return self.ruta.split(".", 1)[0]
+
+
+# Ruta de salida -> declaracion, en orden de registro
+CAMPOS_DERIVADOS: Dict[str, CampoDerivado] = {}
+
+
+def derivado(ruta: str, *entradas: str):
+    """
+    Decorador que registra un campo derivado. La funcion recibe `v`, que
+    entrega el valor actual de cualquier ruta de entrada: v("seccion.campo").
+    """
+    def registrar(funcion):
+        CAMPOS_DERIVADOS[ruta] = CampoDerivado(ruta, entradas, funcion, (funcion.__doc__ or "").strip())
+        return funcion
+    return registrar
+
+
+# ----------------------------------------------------------------------
+# Situacion financiera
+# ----------------------------------------------------------------------
+
+FIN = "situacion_financiera"
+FAM = "informacion_familiar"
+VIV = "vivienda"
+
+
+def _porcentaje(parte: float, total: float) -> float:
+    return round(parte / total * 100, 2) if total > 0 else 0.0
+
+
+@derivado(f"{FIN}.gastos.total", f"{FIN}.gastos")
+def _gastos_total(v):
+    """Suma de los gastos mensuales por categoria."""
+    gastos = v(f"{FIN}.gastos") or {}
+    if not isinstance(gastos, dict):
+        return 0.0
+    return sum(_numero(monto) for categoria, monto in gastos.items() if categoria != "total")
+
+
+def _otros_ingresos(otros: Any) -> float:
+    """
+    Otros ingresos del candidato: lista de {fuente, monto, frecuencia} (wizard)
+    o un solo monto (campo DECIMAL del formulario modular).
+    """
+    if isinstance(otros, list):
+        return sum(_numero(ingreso.get("monto", 0)) for ingreso in otros if isinstance(ingreso, dict))
+    if isinstance(otros, dict):
+        return 0.0
+    return _numero(otros) if otros else 0.0
+
+
+@derivado(f"{FIN}.ingreso_total_mensual", f"{FIN}.sueldo_mensual", f"{FIN}.otros_ingresos")
+def _ingreso_total_mensual(v):
+    """Sueldo mas otros ingresos."""
+    return _numero(v(f"{FIN}.sueldo_mensual")) + _otros_ingresos(v(f"{FIN}.otros_ingresos"))
+
+
+# (monto, indicador "tiene_..."); un indicador ausente no excluye el monto
+_PRESTAMOS = (
+    ("monto_prestamos_personales", "tiene_prestamos_personales"),
+    ("monto_hipoteca", "tiene_prestamo_hipotecario"),
+    ("monto_prestamo_auto", "tiene_prestamo_auto"),
+)
+
+
+@derivado(f"{FIN}.total_deudas", f"{FIN}.deuda_tarjetas_total",
+          *(f"{FIN}.{c}" for par in _PRESTAMOS for c in par))
+def _total_deudas(v):
+    """Saldo de tarjetas mas los prestamos marcados como vigentes."""
+    total = _numero(v(f"{FIN}.deuda_tarjetas_total"))
+    for monto, indicador in _PRESTAMOS:
+        if v(f"{FIN}.{indicador}") is not False:
+            total += _numero(v(f"{FIN}.{monto}"))
+    return total
+
+
+# (pago mensual, indicador "tiene_..."); como en _PRESTAMOS
+_PAGOS_MENSUALES = (
+    ("pago_mensual_hipoteca", "tiene_prestamo_hipotecario"),
+    ("pago_mensual_auto", "tiene_prestamo_auto"),
+)
+
+
+@derivado(f"{FIN}.total_pagos_mensuales_deudas",
+          *(f"{FIN}.{c}" for par in _PAGOS_MENSUALES for c in par))
+def _total_pagos_mensuales(v):
+    """Pagos mensuales de hipoteca y auto de los prestamos marcados como vigentes."""
+    return sum(
+        _numero(v(f"{FIN}.{pago}")) for pago, indicador in _PAGOS_MENSUALES
+        if v(f"{FIN}.{indicador}") is not False
+    )
+
+
+@derivado(f"{FIN}.balance", f"{FIN}.sueldo_mensual", f"{FIN}.gastos.total",
+          f"{FIN}.total_pagos_mensuales_deudas")
+def _balance(v):
+    """Sueldo menos gastos y pagos de deudas (el balance de la pagina financiera)."""
+    return (_numero(v(f"{FIN}.sueldo_mensual")) - _numero(v(f"{FIN}.gastos.total"))
+            - _numero(v(f"{FIN}.total_pagos_mensuales_deudas")))
+
+
+@derivado(f"{FIN}.capacidad_pago", f"{FIN}.balance")
+def _capacidad_pago(v):
+    """Lo que queda del ingreso despues de gastos y pagos fijos (no negativo)."""
+    return max(0.0, _numero(v(f"{FIN}.balance")))
+
+
+@derivado(f"{FIN}.porcentaje_gastos_ingreso", f"{FIN}.gastos.total", f"{FIN}.ingreso_total_mensual")
+def _porcentaje_gastos(v):
+    return _porcentaje(_numero(v(f"{FIN}.gastos.total")), _numero(v(f"{FIN}.ingreso_total_mensual")))
+
+
+@derivado(f"{FIN}.porcentaje_ahorro", f"{FIN}.monto_ahorros_mensuales", f"{FIN}.ingreso_total_mensual")
+def _porcentaje_ahorro(v):
+    return _porcentaje(_numero(v(f"{FIN}.monto_ahorros_mensuales")), _numero(v(f"{FIN}.ingreso_total_mensual")))
+
+
+@derivado(f"{FIN}.porcentaje_deudas_ingreso", f"{FIN}.total_deudas", f"{FIN}.ingreso_total_mensual")
+def _porcentaje_deudas(v):
+    return _porcentaje(_numero(v(f"{FIN}.total_deudas")), _numero(v(f"{FIN}.ingreso_total_mensual")))
+
+
+# ----------------------------------------------------------------------
+# Informacion familiar
+# ----------------------------------------------------------------------
+
+def _miembros(v) -> List[Dict]:
+    miembros = v(f"{FAM}.miembros_hogar") or []
+    return [m for m in miembros if isinstance(m, dict)] if isinstance(miembros, list) else []
+
+
+def _personas_hogar(v) -> float:
+    return _numero(v(f"{FAM}.total_miembros_hogar")) or float(len(_miembros(v)))
+
+
+@derivado(f"{FAM}.ingreso_familiar_total", f"{FAM}.miembros_hogar")
+def _ingreso_familiar_total(v):
+    """Suma de los ingresos de los miembros del hogar."""
+    return sum(_numero(m.get("ingreso", 0)) for m in _miembros(v))
+
+
+@derivado(f"{FAM}.ingreso_per_capita", f"{FIN}.ingreso_total_mensual", f"{FAM}.miembros_hogar")
+def _ingreso_per_capita(v):
+    """Ingreso del candidato (sueldo mas otros ingresos) entre los miembros del hogar."""
+    miembros = v(f"{FAM}.miembros_hogar") or []
+    num_miembros = len(miembros) if isinstance(miembros, list) else 0
+    return _numero(v(f"{FIN}.ingreso_total_mensual")) / max(1, num_miembros)
+
+
+@derivado(f"{FAM}.porcentaje_dependientes", f"{FAM}.dependientes_sin_ingreso",
+          f"{FAM}.total_miembros_hogar", f"{FAM}.miembros_hogar")
+def _porcentaje_dependientes(v):
+    return _porcentaje(_numero(v(f"{FAM}.dependientes_sin_ingreso")), _personas_hogar(v))
+
+
+# ----------------------------------------------------------------------
+# Vivienda
+# ----------------------------------------------------------------------
+
+@derivado(f"{VIV}.indice_hacinamiento", f"{VIV}.numero_habitantes", f"{VIV}.numero_cuartos",
+          f"{FAM}.miembros_hogar")
+def _indice_hacinamiento(v):
+    """Personas por cuarto; sin habitantes capturados, miembros del hogar mas el candidato."""
+    cuartos = _numero(v(f"{VIV}.numero_cuartos"))
+    if cuartos <= 0:
+        return 0.0
+    habitantes = _numero(v(f"{VIV}.numero_habitantes")) or float(len(_miembros(v)) + 1)
+    return round(habitantes / cuartos, 2)
+
+
+@derivado(f"{VIV}.numero_servicios_basicos", f"{VIV}.servicios")
+def _numero_servicios(v):
+    servicios = v(f"{VIV}.servicios") or {}
+    return sum(1 for disponible in servicios.values() if disponible) if isinstance(servicios, dict) else 0
+
+
+@derivado(f"{VIV}.porcentaje_equipamiento", f"{VIV}.equipamiento")
+def _porcentaje_equipamiento(v):
+    """Porcentaje de los aparatos del equipamiento con que cuenta el hogar."""
+    equipamiento = v(f"{VIV}.equipamiento") or {}
+    if not isinstance(equipamiento, dict) or not equipamiento:
+        return 0.0
+    con_aparato = sum(1 for cantidad in equipamiento.values() if _numero(cantidad) > 0)
+    return round(con_aparato / len(equipamiento) * 100, 1)
+
+
+class MotorDerivados:
+    """Grafo de dependencias de los campos derivados."""
+
+    def __init__(self, campos: Dict[str, CampoDerivado]):
+        self.campos = campos
+        # salida -> salidas que la leen
+        self._dependientes: Dict[str, Set[str]] = {ruta: set() for ruta in campos}
+        for ruta, campo in campos.items():
+            for otra in campos:
+                if otra != ruta and any(_se_traslapan(e, otra) for e in campo.entradas):
+                    self._dependientes[otra].add(ruta)
+        self._orden = self._ordenar()
+        self._posicion = {ruta: i for i, ruta in enumerate(self._orden)}
+
+    def _ordenar(self) -> List[str]:
+        """Orden topologico (Kahn); falla si hay un ciclo entre derivados."""
+        grados = {ruta: 0 for ruta in self.campos}
+        for dependientes in self._dependientes.values():
+            for ruta in dependientes:
+                grados[ruta] += 1
+        pendientes = [ruta for ruta in self.campos if grados[ruta] == 0]
+        orden = []
+        while pendientes:
+            ruta = pendientes.pop(0)
+            orden.append(ruta)
+            for dependiente in sorted(self._dependientes[ruta], key=list(self.campos).index):
+                grados[dependiente] -= 1
+                if grados[dependiente] == 0:
+                    pendientes.append(dependiente)
+        if len(orden) != len(self.campos):
+            ciclo = [ruta for ruta in self.campos if grados[ruta] > 0]
+            raise ValueError(f"Ciclo entre campos derivados: {', '.join(ciclo)}")
+        return orden
+
+    def afectados(self, cambios: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Campos derivados que hay que recalcular, en orden de dependencia.
+
+        Args:
+            cambios: Rutas o secciones modificadas; None significa todas.
+        """
+        if cambios is None:
+            return list(self._orden)
+        cambios = list(cambios)
+        afectados = {
+            ruta for ruta, campo in self.campos.items()
+            if any(_se_traslapan(e, c) for e in campo.entradas for c in cambios)
+        }
+        pendientes = list(afectados)
+        while pendientes:
+            for dependiente in self._dependientes[pendientes.pop()]:
+                if dependiente not in afectados:
+                    afectados.add(dependiente)
+                    pendientes.append(dependiente)
+        return sorted(afectados, key=self._posicion.__getitem__)
+
+    def recalcular(self, datos: Dict, cambios: Optional[Iterable[str]] = None,
+                   solo_faltantes: bool = False) -> Set[str]:
+        """
+        Recalcula y escribe en datos los campos afectados por los cambios.
+
+        Args:
+            datos: estudio.datos (se modifica).
+            cambios: Rutas o secciones modificadas; None recalcula todo.
+            solo_faltantes: Solo llenar campos ausentes (importaciones de
+                estudios que ya traen sus propios calculos).
+
+        Returns:
+            Rutas cuyo valor cambio.
+        """
+        lectura = lambda ruta: obtener_ruta(datos, ruta)
+        modificados = set()
+        for ruta in self.afectados(cambios):
+            if solo_faltantes and obtener_ruta(datos, ruta) is not None:
+                continue
+            try:
+                valor = self.campos[ruta].funcion(lectura)
+            except Exception as e:
+                print(f"Advertencia: no se pudo calcular {ruta}: {e}")
+                continue
+            if obtener_ruta(datos, ruta) != valor:
+                asignar_ruta(datos, ruta, valor)
+                modificados.add(ruta)
+        return modificados
+
+    def calcular(self, datos: Dict, ruta: str) -> Any:
+        """
+        Calcula un campo desde sus entradas sin modificar datos; los derivados
+        intermedios tambien se calculan (no se usa lo guardado).
+        """
+        memo: Dict[str, Any] = {}
+
+        def lectura(r):
+            if r in self.campos:
+                if r not in memo:
+                    memo[r] = self.campos[r].funcion(lectura)
+                return memo[r]
+            return obtener_ruta(datos, r)
+        return lectura(ruta)
+
+    def valor(self, datos: Dict, ruta: str) -> float:
+        """
+        Valor guardado si es un numero positivo; si falta o es 0, el calculado.
+        Es el criterio para leer estudios capturados con versiones anteriores.
+        """
+        guardado = _numero(obtener_ruta(datos, ruta, 0))
+        if guardado > 0:
+            return guardado
+        return _numero(self.calcular(datos, ruta))
+
+    def secciones(self, rutas: Iterable[str]) -> Set[str]:
+        """Secciones a las que pertenecen las rutas."""
+        return {ruta.split(".", 1)[0] for ruta in rutas}
+
+
+MOTOR_DERIVADOS = MotorDerivados(CAMPOS_DERIVADOS)
+
+
+def recalcular_derivados(datos: Dict, cambios: Optional[Iterable[str]] = None,
+                         solo_faltantes: bool = False) -> Set[str]:
+    """Atajo de MOTOR_DERIVADOS.recalcular."""
+    return MOTOR_DERIVADOS.recalcular(datos, cambios, solo_faltantes)
+
+
+def calcular_derivado(datos: Dict, ruta: str) -> Any:
+    """Atajo de MOTOR_DERIVADOS.calcular."""
+    return MOTOR_DERIVADOS.calcular(datos, ruta)
+
+
+def valor_derivado(datos: Dict, ruta: str) -> float:
+    """Atajo de MOTOR_DERIVADOS.valor."""
+    return MOTOR_DERIVADOS.valor(datos, ruta)
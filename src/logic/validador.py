@@ -4,9 +4,13 @@ Autor: DINOS Tech
 Versión: 0.2.0
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from src.logic.campos_derivados import calcular_derivado
+from src.utils.instrumentacion import instrumentar
 
+
+@instrumentar('validador', 'validar_estudio_completo', 'detectar_posibles_duplicados')
 class ValidadorEstudio:
     """
     Clase para validar datos y detectar contradicciones o alertas en estudios.
@@ -67,8 +71,7 @@ class ValidadorEstudio:
         contradicciones = []
         
         sueldo = fin.get("sueldo_mensual", 0)
-        otros_ingresos = sum(ing.get("monto", 0) for ing in fin.get("otros_ingresos", []) if isinstance(ing, dict))
-        ingreso_total = sueldo + otros_ingresos
+        ingreso_total = calcular_derivado(datos, "situacion_financiera.ingreso_total_mensual")
         
         gastos_totales = fin.get("gastos", {}).get("total", 0)
         
@@ -79,11 +82,14 @@ class ValidadorEstudio:
         if gastos_excesivos:
             alertas.append(f"ALERTA: Gastos representan {porcentaje:.1f}% del ingreso (>80%)")
         
-        # Verificar balance vs cálculo
+        # Verificar balance vs cálculo: se acepta ingreso - gastos y también el
+        # balance de la página financiera (sueldo - gastos - pagos de deudas)
         balance_declarado = fin.get("balance", 0)
         balance_calculado = ingreso_total - gastos_totales
+        balance_captura = calcular_derivado(datos, "situacion_financiera.balance")
         
-        if abs(balance_declarado - balance_calculado) > 100:
+        if (abs(balance_declarado - balance_calculado) > 100
+                and abs(balance_declarado - balance_captura) > 100):
             contradicciones.append(
                 f"Balance declarado (${balance_declarado:,.2f}) no coincide con cálculo "
                 f"(${balance_calculado:,.2f})"
@@ -172,8 +178,7 @@ class ValidadorEstudio:
         
         # Agregar ingreso del candidato
         fin = datos.get("situacion_financiera", {})
-        ingreso_calculado += fin.get("sueldo_mensual", 0)
-        ingreso_calculado += sum(ing.get("monto", 0) for ing in fin.get("otros_ingresos", []) if isinstance(ing, dict))
+        ingreso_calculado += calcular_derivado(datos, "situacion_financiera.ingreso_total_mensual")
         
         if ingreso_declarado > 0 and abs(ingreso_declarado - ingreso_calculado) > 500:
             contradicciones.append(
@@ -203,17 +208,10 @@ class ValidadorEstudio:
         elif "rentada" in tenencia and renta == 0:
             alertas.append("Vivienda rentada sin monto de renta especificado")
         
-        # Verificar hacinamiento
-        num_cuartos = viv.get("numero_cuartos", 0)
-        num_habitantes = viv.get("numero_habitantes", 0)
-        
-        if num_habitantes == 0:
-            # Intentar obtener de miembros del hogar
-            miembros = datos.get("informacion_familiar", {}).get("miembros_hogar", [])
-            num_habitantes = len(miembros) + 1  # +1 por el candidato
+        # Verificar hacinamiento (sin habitantes capturados: miembros del hogar + candidato)
+        personas_por_cuarto = calcular_derivado(datos, "vivienda.indice_hacinamiento")
         
-        if num_cuartos > 0 and num_habitantes > 0:
-            personas_por_cuarto = num_habitantes / num_cuartos
+        if personas_por_cuarto > 0:
             if personas_por_cuarto > 3:
                 alertas.append(
                     f"ALERTA: Hacinamiento severo - {personas_por_cuarto:.1f} personas por cuarto"
@@ -305,6 +303,30 @@ class ValidadorEstudio:
             "alertas": alertas
         }
     
+    @staticmethod
+    def detectar_posibles_duplicados(datos: Dict, id_estudio: Optional[str] = None,
+                                     ruta_base: str = "data/estudios") -> List[Dict]:
+        """
+        Busca en el archivo estudios que parezcan del mismo candidato
+        (mismo CURP, RFC, NSS o teléfono, o nombre muy similar).
+        
+        Args:
+            datos: Dict del estudio a revisar
+            id_estudio: ID del propio estudio, para excluirlo
+            ruta_base: Directorio de estudios
+            
+        Returns:
+            Lista de candidatos (ver IndiceIdentidad.buscar_duplicados);
+            vacía si no hay coincidencias o el índice no está disponible
+        """
+        from src.models.indice_identidad import IndiceIdentidad
+        
+        try:
+            return IndiceIdentidad.obtener(ruta_base).buscar_duplicados(datos, id_estudio)
+        except Exception as e:
+            print(f"Advertencia: no se pudo revisar duplicados: {e}")
+            return []
+    
     @staticmethod
     def obtener_resumen_validacion(resultado_validacion: Dict) -> str:
         """
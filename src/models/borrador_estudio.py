@@ -0,0 +1,258 @@
+"""
+Diario de borradores para el autoguardado del wizard.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Mientras se captura un estudio, las secciones modificadas se agregan como una
+linea JSON al diario del estudio (data/estudios/.borradores/<id>.diario). La
+escritura ocurre en un hilo de fondo: la interfaz solo copia las secciones que
+cambiaron y las encola. Al terminar el wizard el estudio se guarda completo y
+el diario se descarta; si la aplicacion se cierra antes, el diario queda en
+disco y se ofrece recuperarlo al iniciar.
+"""
+
+import copy
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+
+DIRECTORIO_BORRADORES = ".borradores"
+EXTENSION = ".diario"
+
+
+class DiarioBorrador:
+    """Diario de cambios por seccion de un estudio en captura."""
+
+    # Entradas antes de reescribir el diario como una sola entrada
+    MAX_ENTRADAS = 200
+
+    def __init__(self, id_estudio: str, ruta_base: str = "data/estudios"):
+        self.id_estudio = id_estudio
+        self.ruta_base = ruta_base
+        self.ruta = os.path.join(ruta_base, DIRECTORIO_BORRADORES, id_estudio + EXTENSION)
+        self._entradas: Optional[int] = None
+
+    def existe(self) -> bool:
+        return os.path.exists(self.ruta)
+
+    def agregar(self, secciones: Dict):
+        """
+        Agrega una entrada con las secciones modificadas y la lleva a disco.
+
+        Args:
+            secciones: Seccion -> contenido completo de la seccion.
+        """
+        entrada = {"fecha": datetime.now().isoformat(), "secciones": secciones}
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entrada, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self._entradas is None:
+            self._entradas = len(self.leer_entradas())
+        else:
+            self._entradas += 1
+        if self._entradas >= self.MAX_ENTRADAS:
+            self.compactar()
+
+    def leer_entradas(self) -> List[Dict]:
+        """Entradas del diario en orden; se ignora una ultima linea truncada."""
+        entradas = []
+        if not self.existe():
+            return entradas
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    entradas.append(json.loads(linea))
+                except ValueError:
+                    # Linea truncada por un cierre inesperado
+                    continue
+        return entradas
+
+    def secciones(self) -> Dict:
+        """Ultimo contenido registrado de cada seccion."""
+        resultado = {}
+        for entrada in self.leer_entradas():
+            resultado.update(entrada.get("secciones", {}))
+        return resultado
+
+    def fecha(self) -> str:
+        """Fecha de la ultima entrada del diario."""
+        entradas = self.leer_entradas()
+        return entradas[-1].get("fecha", "") if entradas else ""
+
+    def compactar(self):
+        """Reescribe el diario como una sola entrada con el ultimo valor de cada seccion."""
+        entrada = {"fecha": datetime.now().isoformat(), "secciones": self.secciones()}
+        temporal = self.ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(json.dumps(entrada, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta)
+        self._entradas = 1
+
+    def descartar(self):
+        """Elimina el diario (el estudio ya se guardo o el usuario lo descarto)."""
+        try:
+            if self.existe():
+                os.remove(self.ruta)
+        except Exception as e:
+            print(f"Advertencia: no se pudo eliminar el borrador {self.id_estudio}: {e}")
+        self._entradas = None
+
+    def recuperar(self):
+        """
+        Reconstruye el estudio: el archivo guardado (o uno nuevo) con las
+        secciones del diario aplicadas en orden.
+
+        Returns:
+            EstudioSocioeconomico recuperado, o None si el diario esta vacio.
+        """
+        from src.models.estudio import EstudioSocioeconomico
+
+        secciones = self.secciones()
+        if not secciones:
+            return None
+        estudio = None
+        if os.path.exists(os.path.join(self.ruta_base, f"{self.id_estudio}.json")):
+            estudio = EstudioSocioeconomico.cargar(self.id_estudio, self.ruta_base)
+        if estudio is None:
+            estudio = EstudioSocioeconomico(self.id_estudio)
+        estudio.datos.update(secciones)
+        estudio.secciones_sin_guardar |= set(secciones)
+        return estudio
+
+
+def borradores_pendientes(ruta_base: str = "data/estudios") -> List[Dict]:
+    """
+    Borradores que quedaron sin compactar (la aplicacion se cerro durante la captura).
+
+    Returns:
+        Lista de {id, nombre, fecha, nuevo}, del mas reciente al mas antiguo.
+    """
+    directorio = os.path.join(ruta_base, DIRECTORIO_BORRADORES)
+    if not os.path.isdir(directorio):
+        return []
+
+    pendientes = []
+    for entrada in os.scandir(directorio):
+        if not entrada.name.endswith(EXTENSION):
+            continue
+        diario = DiarioBorrador(entrada.name[:-len(EXTENSION)], ruta_base)
+        try:
+            entradas = diario.leer_entradas()
+        except Exception as e:
+            print(f"Advertencia: borrador ilegible {entrada.name}: {e}")
+            continue
+        if not entradas:
+            diario.descartar()
+            continue
+        nombre = ""
+        for registro in entradas:
+            personales = registro.get("secciones", {}).get("datos_personales")
+            if isinstance(personales, dict) and personales.get("nombre_completo"):
+                nombre = personales["nombre_completo"]
+        nuevo = not os.path.exists(os.path.join(ruta_base, f"{diario.id_estudio}.json"))
+        pendientes.append({
+            "id": diario.id_estudio,
+            "nombre": nombre or "(sin nombre)",
+            "fecha": entradas[-1].get("fecha", ""),
+            "nuevo": nuevo,
+        })
+    pendientes.sort(key=lambda p: p["fecha"], reverse=True)
+    return pendientes
+
+
+class EscritorBorradores:
+    """
+    Hilo de fondo que escribe los diarios de borrador.
+    Las entradas encoladas para el mismo estudio se combinan en una sola linea.
+    """
+
+    _instancia: Optional["EscritorBorradores"] = None
+    _lock_instancia = threading.Lock()
+
+    @classmethod
+    def obtener(cls) -> "EscritorBorradores":
+        with cls._lock_instancia:
+            if cls._instancia is None:
+                cls._instancia = cls()
+            return cls._instancia
+
+    def __init__(self):
+        self._cola: "queue.Queue" = queue.Queue()
+        # Diarios abiertos por el hilo (conservan su numero de entradas)
+        self._diarios: Dict = {}
+        self._hilo = threading.Thread(target=self._ejecutar, name="EscritorBorradores", daemon=True)
+        self._hilo.start()
+
+    def encolar(self, id_estudio: str, datos: Dict, secciones: Iterable[str],
+                ruta_base: str = "data/estudios"):
+        """
+        Copia las secciones indicadas (en el hilo que llama) y las encola.
+
+        Args:
+            id_estudio: ID del estudio en captura.
+            datos: estudio.datos.
+            secciones: Llaves de datos que cambiaron desde la ultima entrada.
+            ruta_base: Directorio de estudios.
+        """
+        copia = {s: copy.deepcopy(datos[s]) for s in secciones if s in datos}
+        if copia:
+            self._cola.put(("agregar", ruta_base, id_estudio, copia))
+
+    def descartar(self, id_estudio: str, ruta_base: str = "data/estudios"):
+        """Encola la eliminacion del diario (despues de las escrituras pendientes)."""
+        self._cola.put(("descartar", ruta_base, id_estudio, None))
+
+    def esperar(self):
+        """Bloquea hasta que todas las operaciones encoladas terminen."""
+        self._cola.join()
+
+    def _ejecutar(self):
+        while True:
+            operaciones = [self._cola.get()]
+            while True:
+                try:
+                    operaciones.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._procesar(operaciones)
+            finally:
+                for _ in operaciones:
+                    self._cola.task_done()
+
+    def _procesar(self, operaciones: List):
+        # Combinar escrituras consecutivas del mismo estudio hasta un descarte
+        pendientes: Dict = {}
+        for operacion, ruta_base, id_estudio, secciones in operaciones:
+            clave = (ruta_base, id_estudio)
+            if operacion == "agregar":
+                pendientes.setdefault(clave, {}).update(secciones)
+                continue
+            pendientes.pop(clave, None)
+            self._diario(clave).descartar()
+            self._diarios.pop(clave, None)
+
+        for clave, secciones in pendientes.items():
+            try:
+                self._diario(clave).agregar(secciones)
+            except Exception as e:
+                print(f"Advertencia: no se pudo escribir el borrador {clave[1]}: {e}")
+
+    def _diario(self, clave) -> DiarioBorrador:
+        diario = self._diarios.get(clave)
+        if diario is None:
+            ruta_base, id_estudio = clave
+            diario = self._diarios[clave] = DiarioBorrador(id_estudio, ruta_base)
+        return diario
@@ -0,0 +1,468 @@
+"""
+Cache columnar de los campos numericos del archivo de estudios.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Cada campo numerico (ingresos, gastos por categoria, deudas, tamaño del
+hogar, hacinamiento, antiguedad, riesgos) se guarda como un arreglo contiguo
+de float64 en data/estudios/.indices/columnas/<campo>.f64, con una fila por
+estudio en el orden de ids.txt. Las estadisticas del archivo, las graficas y
+los recalculos masivos leen estos arreglos en lugar de abrir cada JSON.
+
+Al guardar un estudio solo se reescriben sus 8 bytes en cada columna (o se
+agrega una fila nueva). columna() y columnas() devuelven una copia tomada
+con el candado (un guardado concurrente no la altera); con NumPy, el
+ndarray comparte el buffer de esa copia en lugar de copiarla otra vez.
+"""
+
+import json
+import os
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.models.consulta_estudios import (
+    CATEGORIAS_RIESGO, extraer_campos_consulta, valor_numerico
+)
+
+
+CATEGORIAS_GASTO = ["alimentacion", "salud", "educacion", "vivienda",
+                    "transporte", "servicios", "recreacion", "otros", "total"]
+
+
+def _de_seccion(seccion: str, campo: str) -> Callable[[Dict, Dict], float]:
+    """Extractor de un campo numerico de una seccion del estudio."""
+    return lambda datos, derivados: valor_numerico(datos.get(seccion, {}).get(campo, 0))
+
+
+def _gasto(categoria: str) -> Callable[[Dict, Dict], float]:
+    """Extractor de un gasto mensual por categoria."""
+    def extraer(datos: Dict, derivados: Dict) -> float:
+        gastos = datos.get("situacion_financiera", {}).get("gastos", {})
+        return valor_numerico(gastos.get(categoria, 0)) if isinstance(gastos, dict) else 0.0
+    return extraer
+
+
+def _derivado(campo: str) -> Callable[[Dict, Dict], float]:
+    """Extractor de un campo derivado de consulta (mismas reglas que los filtros)."""
+    return lambda datos, derivados: derivados[campo]
+
+
+# Columnas del cache: nombre -> extractor(datos, campos_derivados) -> float
+COLUMNAS: Dict[str, Callable[[Dict, Dict], float]] = {
+    "ingreso_total": _derivado("ingreso_total"),
+    "sueldo_mensual": _de_seccion("situacion_financiera", "sueldo_mensual"),
+    "ahorros": _de_seccion("situacion_financiera", "ahorros"),
+    "monto_ahorros_mensuales": _de_seccion("situacion_financiera", "monto_ahorros_mensuales"),
+    "total_deudas": _derivado("total_deudas"),
+    "total_pagos_mensuales_deudas": _de_seccion("situacion_financiera", "total_pagos_mensuales_deudas"),
+    "deuda_tarjetas_total": _de_seccion("situacion_financiera", "deuda_tarjetas_total"),
+    "balance": _de_seccion("situacion_financiera", "balance"),
+    "renta_mensual": _derivado("renta_mensual"),
+    "porcentaje_renta_ingreso": _derivado("porcentaje_renta_ingreso"),
+    "porcentaje_gastos_ingreso": _derivado("porcentaje_gastos_ingreso"),
+    "total_miembros_hogar": _de_seccion("informacion_familiar", "total_miembros_hogar"),
+    "ingreso_familiar_total": _de_seccion("informacion_familiar", "ingreso_familiar_total"),
+    "dependientes_sin_ingreso": _de_seccion("informacion_familiar", "dependientes_sin_ingreso"),
+    "numero_habitantes": _de_seccion("vivienda", "numero_habitantes"),
+    "numero_cuartos": _de_seccion("vivienda", "numero_cuartos"),
+    "indice_hacinamiento": _de_seccion("vivienda", "indice_hacinamiento"),
+    "antiguedad_meses": _de_seccion("empleo_actual", "antiguedad_meses"),
+    "salario_mensual_neto": _de_seccion("empleo_actual", "salario_mensual_neto"),
+}
+for _categoria in CATEGORIAS_GASTO:
+    COLUMNAS[f"gasto_{_categoria}"] = _gasto(_categoria)
+for _categoria in CATEGORIAS_RIESGO:
+    COLUMNAS[f"riesgo_{_categoria}"] = _derivado(f"riesgo_{_categoria}")
+
+# Columna interna con la fecha de modificacion del archivo (para reconciliar)
+COLUMNA_MTIME = "_mtime"
+
+TAMANO_VALOR = array("d").itemsize
+
+
+def extraer_fila(datos: Dict) -> Dict[str, float]:
+    """Calcula todas las columnas numericas de un estudio."""
+    derivados = extraer_campos_consulta("", datos)
+    fila = {}
+    for nombre, extractor in COLUMNAS.items():
+        try:
+            fila[nombre] = float(extractor(datos, derivados))
+        except Exception:
+            fila[nombre] = 0.0
+    return fila
+
+
+def contar_niveles(valores: Iterable[float]) -> Dict[int, int]:
+    """Numero de valores por entero redondeado, de menor a mayor."""
+    conteo: Dict[int, int] = {}
+    for valor in valores:
+        nivel = int(round(valor))
+        conteo[nivel] = conteo.get(nivel, 0) + 1
+    return dict(sorted(conteo.items()))
+
+
+class CacheColumnar:
+    """
+    Arreglos float64 por campo, una fila por estudio.
+    Una instancia por directorio de estudios, obtenida con CacheColumnar.obtener().
+    """
+
+    DIRECTORIO = os.path.join(".indices", "columnas")
+    ARCHIVO_IDS = "ids.txt"
+    ARCHIVO_META = "meta.json"
+    # 2: derivados calculados con el motor de campos derivados
+    VERSION = 2
+
+    _instancias: Dict[str, "CacheColumnar"] = {}
+    # Un candado de carga por directorio, como en IndiceArchivo.obtener
+    _cargas: Dict[str, threading.Lock] = {}
+    _lock_instancias = threading.Lock()
+
+    @classmethod
+    def obtener(cls, ruta_base: str = "data/estudios") -> "CacheColumnar":
+        """Retorna el cache compartido del directorio, cargandolo la primera vez."""
+        clave = os.path.abspath(ruta_base)
+        with cls._lock_instancias:
+            cache = cls._instancias.get(clave)
+            if cache is not None:
+                return cache
+            carga = cls._cargas.setdefault(clave, threading.Lock())
+
+        with carga:
+            with cls._lock_instancias:
+                cache = cls._instancias.get(clave)
+            if cache is None:
+                cache = cls(ruta_base)
+                cache.cargar()
+                with cls._lock_instancias:
+                    cls._instancias[clave] = cache
+                    cls._cargas.pop(clave, None)
+            return cache
+
+    @classmethod
+    def descartar_instancias(cls):
+        """Olvida los caches compartidos (se recargaran desde disco)."""
+        with cls._lock_instancias:
+            cls._instancias.clear()
+
+    def __init__(self, ruta_base: str = "data/estudios"):
+        self.ruta_base = ruta_base
+        self.ruta_columnas = os.path.join(ruta_base, self.DIRECTORIO)
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._posiciones: Dict[str, int] = {}
+        self._columnas: Dict[str, array] = {}
+        self._vaciar()
+
+    def _vaciar(self):
+        self._ids = []
+        self._posiciones = {}
+        self._columnas = {nombre: array("d") for nombre in self._nombres_columnas()}
+
+    @staticmethod
+    def _nombres_columnas() -> List[str]:
+        return list(COLUMNAS) + [COLUMNA_MTIME]
+
+    def _ruta_columna(self, nombre: str) -> str:
+        return os.path.join(self.ruta_columnas, f"{nombre}.f64")
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def cargar(self):
+        """Carga las columnas de disco y reconcilia con el directorio de estudios."""
+        with self._lock:
+            if not self._leer_columnas():
+                self._vaciar()
+                self._escribir_todo()
+            self.sincronizar()
+
+    def _leer_columnas(self) -> bool:
+        """Lee ids y columnas; retorna False si faltan o no son consistentes."""
+        try:
+            with open(os.path.join(self.ruta_columnas, self.ARCHIVO_META), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != self.VERSION or meta.get("columnas") != self._nombres_columnas():
+                return False
+
+            with open(os.path.join(self.ruta_columnas, self.ARCHIVO_IDS), "r", encoding="utf-8") as f:
+                ids = [linea.rstrip("\n") for linea in f if linea.strip()]
+
+            columnas = {}
+            for nombre in self._nombres_columnas():
+                valores = array("d")
+                ruta = self._ruta_columna(nombre)
+                with open(ruta, "rb") as f:
+                    valores.fromfile(f, os.path.getsize(ruta) // TAMANO_VALOR)
+                if len(valores) != len(ids):
+                    return False
+                columnas[nombre] = valores
+        except (OSError, ValueError, EOFError):
+            return False
+
+        self._ids = ids
+        self._posiciones = {id_estudio: i for i, id_estudio in enumerate(ids)}
+        self._columnas = columnas
+        return True
+
+    def _escribir_todo(self):
+        """Reescribe ids y columnas completas (tras reconstruir o eliminar)."""
+        try:
+            os.makedirs(self.ruta_columnas, exist_ok=True)
+            for nombre, valores in self._columnas.items():
+                with open(self._ruta_columna(nombre), "wb") as f:
+                    valores.tofile(f)
+            with open(os.path.join(self.ruta_columnas, self.ARCHIVO_IDS), "w", encoding="utf-8") as f:
+                f.writelines(f"{i}\n" for i in self._ids)
+            with open(os.path.join(self.ruta_columnas, self.ARCHIVO_META), "w", encoding="utf-8") as f:
+                json.dump({"version": self.VERSION, "columnas": self._nombres_columnas()}, f)
+        except Exception as e:
+            print(f"Advertencia: no se pudo guardar el cache columnar: {e}")
+
+    def _escribir_fila(self, posicion: int, nueva: bool):
+        """Escribe en disco una sola fila (8 bytes por columna)."""
+        try:
+            os.makedirs(self.ruta_columnas, exist_ok=True)
+            for nombre, valores in self._columnas.items():
+                ruta = self._ruta_columna(nombre)
+                with open(ruta, "r+b" if os.path.exists(ruta) else "w+b") as f:
+                    f.seek(posicion * TAMANO_VALOR)
+                    array("d", [valores[posicion]]).tofile(f)
+            if nueva:
+                with open(os.path.join(self.ruta_columnas, self.ARCHIVO_IDS), "a", encoding="utf-8") as f:
+                    f.write(f"{self._ids[posicion]}\n")
+        except Exception as e:
+            print(f"Advertencia: no se pudo actualizar el cache columnar: {e}")
+
+    def _agregar_filas(self, desde: int):
+        """Agrega al final de cada archivo las filas nuevas a partir de `desde`."""
+        try:
+            os.makedirs(self.ruta_columnas, exist_ok=True)
+            for nombre, valores in self._columnas.items():
+                with open(self._ruta_columna(nombre), "ab") as f:
+                    valores[desde:].tofile(f)
+            with open(os.path.join(self.ruta_columnas, self.ARCHIVO_IDS), "a", encoding="utf-8") as f:
+                f.writelines(f"{i}\n" for i in self._ids[desde:])
+        except Exception as e:
+            print(f"Advertencia: no se pudo actualizar el cache columnar: {e}")
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def sincronizar(self) -> int:
+        """
+        Reconcilia el cache con los archivos del directorio por fecha de modificacion.
+
+        Returns:
+            Numero de estudios agregados, actualizados o retirados.
+        """
+        with self._lock:
+            if not os.path.isdir(self.ruta_base):
+                return 0
+
+            mtimes = self._columnas[COLUMNA_MTIME]
+            vistos = set()
+            cambios = 0
+            for entrada in os.scandir(self.ruta_base):
+                if not entrada.name.endswith(".json") or not entrada.is_file():
+                    continue
+                id_estudio = entrada.name[:-5]
+                vistos.add(id_estudio)
+                mtime = entrada.stat().st_mtime
+                posicion = self._posiciones.get(id_estudio)
+                if posicion is not None and mtimes[posicion] == mtime:
+                    continue
+                try:
+                    with open(entrada.path, "r", encoding="utf-8") as f:
+                        datos = json.load(f)
+                except Exception:
+                    continue
+                self._poner(id_estudio, datos, mtime, escribir=False)
+                cambios += 1
+
+            retirados = [i for i in self._ids if i not in vistos]
+            for id_estudio in retirados:
+                self._quitar(id_estudio)
+            cambios += len(retirados)
+
+            if cambios:
+                self._escribir_todo()
+            return cambios
+
+    def actualizar(self, id_estudio: str, datos: Dict):
+        """Actualiza (o agrega) la fila de un estudio recien guardado."""
+        with self._lock:
+            archivo = os.path.join(self.ruta_base, f"{id_estudio}.json")
+            mtime = os.path.getmtime(archivo) if os.path.exists(archivo) else 0.0
+            self._poner(id_estudio, datos, mtime, escribir=True)
+
+    def actualizar_lote(self, estudios: Iterable[Tuple[str, Dict]]):
+        """
+        Actualiza (o agrega) las filas de varios estudios recien guardados.
+        Si todos son nuevos solo se agregan las filas al final de cada columna.
+        """
+        with self._lock:
+            desde = len(self._ids)
+            modificadas = False
+            for id_estudio, datos in estudios:
+                modificadas = modificadas or id_estudio in self._posiciones
+                archivo = os.path.join(self.ruta_base, f"{id_estudio}.json")
+                mtime = os.path.getmtime(archivo) if os.path.exists(archivo) else 0.0
+                self._poner(id_estudio, datos, mtime, escribir=False)
+            if modificadas:
+                self._escribir_todo()
+            elif len(self._ids) > desde:
+                self._agregar_filas(desde)
+
+    def eliminar(self, id_estudio: str):
+        """Retira la fila de un estudio eliminado."""
+        with self._lock:
+            if id_estudio in self._posiciones:
+                self._quitar(id_estudio)
+                self._escribir_todo()
+
+    def _poner(self, id_estudio: str, datos: Dict, mtime: float, escribir: bool):
+        fila = extraer_fila(datos)
+        fila[COLUMNA_MTIME] = mtime
+
+        posicion = self._posiciones.get(id_estudio)
+        nueva = posicion is None
+        if nueva:
+            posicion = len(self._ids)
+            self._ids.append(id_estudio)
+            self._posiciones[id_estudio] = posicion
+            for nombre, valores in self._columnas.items():
+                valores.append(fila[nombre])
+        else:
+            for nombre, valores in self._columnas.items():
+                valores[posicion] = fila[nombre]
+
+        if escribir:
+            self._escribir_fila(posicion, nueva)
+
+    def _quitar(self, id_estudio: str):
+        """Quita una fila moviendo la ultima a su lugar (las columnas quedan contiguas)."""
+        posicion = self._posiciones.pop(id_estudio)
+        ultima = len(self._ids) - 1
+        if posicion != ultima:
+            id_ultimo = self._ids[ultima]
+            self._ids[posicion] = id_ultimo
+            self._posiciones[id_ultimo] = posicion
+            for valores in self._columnas.values():
+                valores[posicion] = valores[ultima]
+        self._ids.pop()
+        for valores in self._columnas.values():
+            valores.pop()
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def ids(self) -> List[str]:
+        """Ids de estudio en el orden de las filas."""
+        with self._lock:
+            return list(self._ids)
+
+    def columna(self, nombre: str, como_numpy: bool = False):
+        """
+        Retorna una copia de los valores de una columna en el orden de ids().
+
+        Args:
+            nombre: Nombre de la columna (ver COLUMNAS).
+            como_numpy: Si es True y NumPy esta disponible, retorna un ndarray
+                sobre la copia (sin copiarla de nuevo).
+
+        Raises:
+            KeyError: Si la columna no existe.
+        """
+        return self.columnas([nombre], como_numpy=como_numpy)[1][nombre]
+
+    def columnas(self, nombres: Iterable[str], ids: Optional[Iterable[str]] = None,
+                 como_numpy: bool = False) -> Tuple[List[str], Dict[str, object]]:
+        """
+        Copia varias columnas alineadas por fila en una sola toma del candado.
+
+        Args:
+            nombres: Columnas a copiar (ver COLUMNAS).
+            ids: Restringir a estos estudios, en este orden (los que no esten
+                en el cache se omiten); None para todas las filas.
+            como_numpy: Como en columna().
+
+        Returns:
+            (ids de las filas, {nombre: valores}).
+
+        Raises:
+            KeyError: Si alguna columna no existe.
+        """
+        with self._lock:
+            fuentes = {nombre: self._columnas[nombre] for nombre in nombres}
+            if ids is None:
+                filas = list(self._ids)
+                copias = {nombre: array("d", valores) for nombre, valores in fuentes.items()}
+            else:
+                filas = [i for i in ids if i in self._posiciones]
+                posiciones = [self._posiciones[i] for i in filas]
+                copias = {nombre: array("d", [valores[p] for p in posiciones])
+                          for nombre, valores in fuentes.items()}
+        if como_numpy:
+            try:
+                import numpy as np
+                copias = {nombre: np.frombuffer(valores, dtype=np.float64)
+                          for nombre, valores in copias.items()}
+            except ImportError:
+                pass
+        return filas, copias
+
+    def fila(self, id_estudio: str) -> Optional[Dict[str, float]]:
+        """Valores de todas las columnas para un estudio, o None si no existe."""
+        with self._lock:
+            posicion = self._posiciones.get(id_estudio)
+            if posicion is None:
+                return None
+            return {nombre: self._columnas[nombre][posicion] for nombre in COLUMNAS}
+
+    def estadisticas(self, nombre: str, ids: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Estadisticas descriptivas de una columna.
+
+        Args:
+            nombre: Nombre de la columna.
+            ids: Restringir a estos estudios (por ejemplo, el resultado de una consulta).
+
+        Returns:
+            Dict con n, suma, media, minimo, mediana, p90 y maximo.
+        """
+        with self._lock:
+            columna = self._columnas[nombre]
+            if ids is None:
+                valores = sorted(columna)
+            else:
+                valores = sorted(columna[self._posiciones[i]] for i in ids if i in self._posiciones)
+
+        n = len(valores)
+        if n == 0:
+            return {"n": 0, "suma": 0.0, "media": 0.0, "minimo": 0.0,
+                    "mediana": 0.0, "p90": 0.0, "maximo": 0.0}
+        suma = sum(valores)
+        return {
+            "n": n,
+            "suma": suma,
+            "media": suma / n,
+            "minimo": valores[0],
+            "mediana": valores[n // 2] if n % 2 else (valores[n // 2 - 1] + valores[n // 2]) / 2,
+            "p90": valores[min(n - 1, int(n * 0.9))],
+            "maximo": valores[-1],
+        }
+
+    def distribucion(self, nombre: str, ids: Optional[List[str]] = None) -> Dict[int, int]:
+        """
+        Numero de estudios por valor entero de una columna (p. ej. niveles de
+        riesgo 1 a 5), de menor a mayor.
+        """
+        return contar_niveles(self.columnas([nombre], ids)[1][nombre])
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -0,0 +1,190 @@
+"""
+Catalogo de estudios de solo lectura en un archivo de registros de ancho fijo.
+Autor: DINOS Tech
+Version: 0.5.0
+
+El listado de la ventana principal se guarda en data/estudios/.indices/catalogo.bin
+con este formato:
+
+    encabezado   MAGIA, version, filas, firma del indice, inicio de cadenas
+    registros    un registro de ancho fijo por estudio, ordenados por
+                 fecha de modificacion descendente
+    cadenas      tabla de textos UTF-8 (sin repetir) a la que apuntan los registros
+
+El archivo se abre con mmap: abrir el catalogo no lee ni interpreta los
+registros, y cada fila se decodifica solo cuando la tabla la pide. Asi el
+tiempo hasta mostrar la ventana no depende del tamaño del archivo. El
+catalogo se reconstruye solo cuando la firma del indice de busqueda cambia.
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional
+
+
+MAGIA = b"SOFTSECT"
+VERSION = 1
+
+# Campos de texto de cada registro, en orden
+CAMPOS_TEXTO = ["id", "nombre", "fecha_creacion", "fecha_modificacion", "empresa_solicitante"]
+
+# magia, version, filas, firma, inicio de la tabla de cadenas
+_ENCABEZADO = struct.Struct("<8sHI64sQ")
+# (desplazamiento uint32, longitud uint16) por campo de texto + riesgo global float64
+_REGISTRO = struct.Struct("<" + "IH" * len(CAMPOS_TEXTO) + "d")
+
+# Filas decodificadas que se conservan (la tabla pide la misma fila varias veces)
+MAX_FILAS_EN_CACHE = 512
+
+
+class CatalogoEstudios:
+    """
+    Vista de solo lectura sobre catalogo.bin. Se comporta como una lista de
+    resumenes (len, indice) para que ModeloEstudios la use sin copiarla.
+    """
+
+    DIRECTORIO = ".indices"
+    ARCHIVO = "catalogo.bin"
+
+    def __init__(self, ruta_archivo: str):
+        self.ruta_archivo = ruta_archivo
+        self._archivo = open(ruta_archivo, "rb")
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            magia, version, filas, firma, inicio_cadenas = _ENCABEZADO.unpack_from(self._mapa, 0)
+            if magia != MAGIA or version != VERSION:
+                raise ValueError("Formato de catalogo no reconocido")
+            if _ENCABEZADO.size + filas * _REGISTRO.size > inicio_cadenas or inicio_cadenas > len(self._mapa):
+                raise ValueError("Catalogo truncado")
+        except Exception:
+            self._archivo.close()
+            raise
+        self.filas = filas
+        self.firma = firma.rstrip(b"\0").decode("ascii")
+        self._inicio_cadenas = inicio_cadenas
+        self._cache: Dict[int, Dict] = {}
+        self._posiciones: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def ruta(cls, ruta_base: str = "data/estudios") -> str:
+        return os.path.join(ruta_base, cls.DIRECTORIO, cls.ARCHIVO)
+
+    @classmethod
+    def abrir(cls, ruta_base: str = "data/estudios") -> Optional["CatalogoEstudios"]:
+        """
+        Abre el catalogo existente.
+
+        Returns:
+            El catalogo, o None si no existe o esta dañado.
+        """
+        ruta = cls.ruta(ruta_base)
+        if not os.path.exists(ruta):
+            return None
+        try:
+            return cls(ruta)
+        except Exception as e:
+            print(f"Advertencia: catalogo de estudios ilegible, se reconstruira: {e}")
+            return None
+
+    @classmethod
+    def construir(cls, ruta_base: str, resumenes: List[Dict], firma: str) -> bool:
+        """
+        Escribe el catalogo completo de forma atomica.
+        Si hay un catalogo abierto sobre el mismo archivo debe cerrarse antes
+        (en Windows no se puede reemplazar un archivo mapeado).
+
+        Args:
+            ruta_base: Directorio de estudios.
+            resumenes: Resumenes ya ordenados para mostrar.
+            firma: Firma del indice del que provienen (IndiceArchivo.firma()).
+
+        Returns:
+            True si se escribio correctamente.
+        """
+        cadenas = bytearray()
+        desplazamientos: Dict[bytes, int] = {}
+        registros = bytearray()
+
+        for resumen in resumenes:
+            valores = []
+            for campo in CAMPOS_TEXTO:
+                texto = str(resumen.get(campo) or "").encode("utf-8")[:0xFFFF]
+                if texto not in desplazamientos:
+                    desplazamientos[texto] = len(cadenas)
+                    cadenas.extend(texto)
+                valores.extend((desplazamientos[texto], len(texto)))
+            riesgo = resumen.get("riesgo_global", 0)
+            valores.append(float(riesgo) if isinstance(riesgo, (int, float)) else 1.0)
+            registros.extend(_REGISTRO.pack(*valores))
+
+        inicio_cadenas = _ENCABEZADO.size + len(registros)
+        encabezado = _ENCABEZADO.pack(MAGIA, VERSION, len(resumenes),
+                                      firma.encode("ascii")[:64], inicio_cadenas)
+        ruta = cls.ruta(ruta_base)
+        temporal = ruta + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(temporal, "wb") as f:
+                f.write(encabezado)
+                f.write(registros)
+                f.write(cadenas)
+            os.replace(temporal, ruta)
+            return True
+        except Exception as e:
+            print(f"Advertencia: no se pudo guardar el catalogo de estudios: {e}")
+            return False
+
+    def cerrar(self):
+        """Libera el mapa de memoria y el archivo."""
+        self._cache.clear()
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+
+    # ------------------------------------------------------------------
+    # Acceso por fila
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.filas
+
+    def __getitem__(self, fila: int) -> Dict:
+        if fila < 0:
+            fila += self.filas
+        if not 0 <= fila < self.filas:
+            raise IndexError(fila)
+
+        resumen = self._cache.get(fila)
+        if resumen is None:
+            valores = _REGISTRO.unpack_from(self._mapa, _ENCABEZADO.size + fila * _REGISTRO.size)
+            resumen = {}
+            for i, campo in enumerate(CAMPOS_TEXTO):
+                inicio = self._inicio_cadenas + valores[2 * i]
+                resumen[campo] = self._mapa[inicio:inicio + valores[2 * i + 1]].decode("utf-8")
+            resumen["riesgo_global"] = valores[-1]
+            if len(self._cache) >= MAX_FILAS_EN_CACHE:
+                self._cache.clear()
+            self._cache[fila] = resumen
+        return resumen
+
+    def _id_en_fila(self, fila: int) -> str:
+        desplazamiento, longitud = struct.unpack_from(
+            "<IH", self._mapa, _ENCABEZADO.size + fila * _REGISTRO.size
+        )
+        inicio = self._inicio_cadenas + desplazamiento
+        return self._mapa[inicio:inicio + longitud].decode("utf-8")
+
+    def posiciones(self) -> Dict[str, int]:
+        """
+        Mapa id -> fila. Se construye la primera vez que se necesita (al
+        filtrar), no al abrir el catalogo.
+        """
+        if self._posiciones is None:
+            self._posiciones = {self._id_en_fila(i): i for i in range(self.filas)}
+        return self._posiciones
+
+    def posicion(self, id_estudio: str) -> Optional[int]:
+        """Fila de un estudio, o None si no esta en el catalogo."""
+        return self.posiciones().get(id_estudio)
@@ -0,0 +1,515 @@
+"""
+API de consultas estructuradas sobre el archivo de estudios.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Permite preguntas como "riesgo global >= 4 de la empresa X en los ultimos
+30 dias" o "renta mayor al 40% del ingreso" sin abrir cada estudio: los
+campos de resumen y derivados se guardan planos en IndiceConsulta y se
+actualizan al guardar. La misma API la usan el panel de filtros de la
+ventana principal y la linea de comandos.
+
+Los filtros de rango sobre campos numericos (y "ultimos_dias") se resuelven
+con busqueda binaria sobre las claves (valor, id) ordenadas de cada campo,
+que tambien dan el orden de los resultados; el cursor se ubica con la misma
+busqueda en lugar de volver a filtrar.
+
+Ejemplo:
+    consulta = ConsultaEstudios(
+        filtros=[("riesgo_global", ">=", 4), ("fecha_modificacion", "ultimos_dias", 30)],
+        orden="riesgo_global", descendente=True, limite=50
+    )
+    pagina = IndiceConsulta.obtener().ejecutar(consulta)
+    siguiente = IndiceConsulta.obtener().ejecutar(consulta, pagina["cursor"])
+"""
+
+import base64
+import bisect
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.logic.campos_derivados import valor_derivado
+from src.models.indice_archivo import IndiceArchivo
+from src.models.indice_busqueda import IndiceBusqueda, normalizar_texto
+
+
+CATEGORIAS_RIESGO = ["financiero", "familiar", "vivienda", "laboral", "salud", "estilo_vida", "global"]
+
+# Campos consultables: nombre -> (tipo, descripcion). Tipos: texto, numero, fecha.
+CAMPOS_CONSULTA = {
+    "nombre": ("texto", "Nombre del candidato"),
+    "empresa_solicitante": ("texto", "Empresa que solicita el estudio"),
+    "fecha_creacion": ("fecha", "Fecha de creacion"),
+    "fecha_modificacion": ("fecha", "Ultima modificacion"),
+    "tenencia": ("texto", "Tenencia de la vivienda"),
+    "ingreso_total": ("numero", "Ingreso total mensual"),
+    "gasto_total": ("numero", "Gasto total mensual"),
+    "renta_mensual": ("numero", "Renta mensual"),
+    "porcentaje_renta_ingreso": ("numero", "Renta como % del ingreso"),
+    "porcentaje_gastos_ingreso": ("numero", "Gastos como % del ingreso"),
+    "total_deudas": ("numero", "Total de deudas"),
+    "numero_habitantes": ("numero", "Habitantes de la vivienda"),
+    "indice_hacinamiento": ("numero", "Personas por cuarto"),
+    "antiguedad_meses": ("numero", "Antiguedad en el empleo (meses)"),
+}
+for _categoria in CATEGORIAS_RIESGO:
+    CAMPOS_CONSULTA[f"riesgo_{_categoria}"] = ("numero", f"Riesgo {_categoria.replace('_', ' ')}")
+
+OPERADORES = ("=", "!=", ">", ">=", "<", "<=", "contiene", "ultimos_dias")
+
+_PATRON_FILTRO = re.compile(r"^\s*([a-z_]+)\s*(>=|<=|!=|=|>|<|~|@)\s*(.+?)\s*$")
+# Abreviaturas para la linea de comandos: ~ contiene, @ ultimos_dias
+_ALIAS_OPERADOR = {"~": "contiene", "@": "ultimos_dias"}
+
+# Ordena despues de cualquier id: (v, _ULTIMO_ID) queda tras toda clave (v, id)
+_ULTIMO_ID = "\U0010ffff"
+# Con menos coincidencias que 1/16 del archivo se ordenan directamente; con
+# mas se recorre el orden del campo completo
+FRACCION_ORDEN_DIRECTO = 16
+
+
+def valor_numerico(valor) -> float:
+    """Convierte a float; cualquier valor no numerico cuenta como 0."""
+    if isinstance(valor, bool):
+        return float(valor)
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    try:
+        return float(str(valor).replace(",", "").replace("$", ""))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def extraer_riesgo(datos: Dict, categoria: str) -> float:
+    """
+    Obtiene el puntaje de riesgo de una categoria.
+    Soporta el formato plano (numero) y el de calcular_todos_riesgos ({puntaje: n}).
+    """
+    valor = datos.get("riesgos", {}).get(categoria, 0)
+    if isinstance(valor, dict):
+        valor = valor.get("puntaje", valor.get("nivel", 0))
+    return valor_numerico(valor)
+
+
+def extraer_campos_consulta(id_estudio: str, datos: Dict) -> Dict[str, Any]:
+    """
+    Aplana un estudio en los campos de CAMPOS_CONSULTA.
+
+    Los campos derivados siguen los mismos criterios que CalculadorRiesgos
+    (valor_derivado): el guardado si existe o, si falta, el calculado por el
+    motor de campos derivados.
+    """
+    dp = datos.get("datos_personales", {})
+    fin = datos.get("situacion_financiera", {})
+    viv = datos.get("vivienda", {})
+    emp = datos.get("empleo_actual", {})
+
+    ingreso = valor_derivado(datos, "situacion_financiera.ingreso_total_mensual")
+
+    gastos = fin.get("gastos", {})
+    gasto_total = valor_numerico(gastos.get("total", 0)) if isinstance(gastos, dict) else 0.0
+
+    total_deudas = valor_derivado(datos, "situacion_financiera.total_deudas")
+
+    # La pagina modular captura costo_renta_mensual; renta_mensual es el campo original
+    renta = valor_numerico(viv.get("costo_renta_mensual", 0)) or valor_numerico(viv.get("renta_mensual", 0))
+
+    campos = {
+        "id": id_estudio,
+        "nombre": dp.get("nombre_completo", "Sin nombre"),
+        "empresa_solicitante": datos.get("empresa_solicitante", ""),
+        "fecha_creacion": datos.get("fecha_creacion", ""),
+        "fecha_modificacion": datos.get("fecha_modificacion", ""),
+        "tenencia": viv.get("tenencia", ""),
+        "ingreso_total": ingreso,
+        "gasto_total": gasto_total,
+        "renta_mensual": renta,
+        "porcentaje_renta_ingreso": round(renta / ingreso * 100, 2) if ingreso > 0 else 0.0,
+        "porcentaje_gastos_ingreso": round(gasto_total / ingreso * 100, 2) if ingreso > 0 else 0.0,
+        "total_deudas": total_deudas,
+        "numero_habitantes": valor_numerico(viv.get("numero_habitantes", 0)),
+        "indice_hacinamiento": valor_derivado(datos, "vivienda.indice_hacinamiento"),
+        "antiguedad_meses": valor_numerico(emp.get("antiguedad_meses", 0)),
+    }
+    for categoria in CATEGORIAS_RIESGO:
+        campos[f"riesgo_{categoria}"] = extraer_riesgo(datos, categoria)
+    return campos
+
+
+def interpretar_filtro(texto: str) -> Tuple[str, str, Any]:
+    """
+    Convierte un filtro escrito como texto en una tupla (campo, operador, valor).
+    Ejemplos: "riesgo_global>=4", "empresa_solicitante=TechCorp SA",
+    "fecha_creacion@30" (ultimos 30 dias), "nombre~garcia" (contiene).
+
+    Raises:
+        ValueError: Si el texto no es un filtro valido.
+    """
+    coincidencia = _PATRON_FILTRO.match(texto)
+    if not coincidencia:
+        raise ValueError(f"Filtro no valido: {texto}")
+    campo, operador, valor = coincidencia.groups()
+    operador = _ALIAS_OPERADOR.get(operador, operador)
+    if campo not in CAMPOS_CONSULTA:
+        raise ValueError(f"Campo desconocido: {campo}")
+    if CAMPOS_CONSULTA[campo][0] == "numero" or operador == "ultimos_dias":
+        try:
+            valor = float(valor)
+        except ValueError:
+            raise ValueError(f"El filtro {texto} requiere un valor numerico")
+    return campo, operador, valor
+
+
+class ConsultaEstudios:
+    """
+    Descripcion de una consulta: filtros (todos deben cumplirse), texto libre
+    opcional (se resuelve con IndiceBusqueda), orden y tamaño de pagina.
+    """
+
+    def __init__(self, filtros: Optional[List[Tuple[str, str, Any]]] = None,
+                 texto: str = "", orden: str = "fecha_modificacion",
+                 descendente: bool = True, limite: Optional[int] = None):
+        self.filtros = list(filtros or [])
+        self.texto = texto
+        self.orden = orden
+        self.descendente = descendente
+        self.limite = limite
+        self.validar()
+
+    def validar(self):
+        """
+        Verifica campos y operadores.
+
+        Raises:
+            ValueError: Si algun filtro u orden no es valido.
+        """
+        if self.orden not in CAMPOS_CONSULTA and self.orden != "id":
+            raise ValueError(f"Campo de orden desconocido: {self.orden}")
+        for campo, operador, _valor in self.filtros:
+            if campo not in CAMPOS_CONSULTA:
+                raise ValueError(f"Campo desconocido: {campo}")
+            if operador not in OPERADORES:
+                raise ValueError(f"Operador desconocido: {operador}")
+
+    def _compilar(self) -> Tuple[Dict[str, Tuple[Optional[Tuple], Optional[Tuple]]], List]:
+        """
+        Separa los filtros de rango de los demas.
+
+        Returns:
+            (rangos, predicados): por campo, los limites (desde, hasta) como
+            claves (valor, id) para busqueda binaria (None = sin limite), y
+            los filtros restantes compilados a funciones sobre los campos.
+        """
+        rangos: Dict[str, List] = {}
+        predicados = []
+        for campo, operador, valor in self.filtros:
+            tipo = CAMPOS_CONSULTA[campo][0]
+            if operador == "ultimos_dias":
+                limite = (datetime.now() - timedelta(days=float(valor))).isoformat()
+                rangos.setdefault(campo, []).append(((limite,), None))
+            elif operador == "contiene":
+                buscado = normalizar_texto(valor)
+                predicados.append(
+                    lambda c, campo=campo, b=buscado: b in normalizar_texto(c.get(campo, ""))
+                )
+            elif tipo == "numero" and operador != "!=":
+                numero = valor_numerico(valor)
+                rangos.setdefault(campo, []).append({
+                    "=": ((numero,), (numero, _ULTIMO_ID)),
+                    ">": ((numero, _ULTIMO_ID), None),
+                    ">=": ((numero,), None),
+                    "<": (None, (numero,)),
+                    "<=": (None, (numero, _ULTIMO_ID)),
+                }[operador])
+            elif tipo == "numero":
+                predicados.append(self._comparador(campo, operador, valor_numerico(valor)))
+            else:
+                texto = normalizar_texto(valor)
+                predicados.append(self._comparador(campo, operador, texto, normalizar_texto))
+
+        # Varios rangos sobre un campo se intersectan
+        limites = {}
+        for campo, lista in rangos.items():
+            desdes = [d for d, _ in lista if d is not None]
+            hastas = [h for _, h in lista if h is not None]
+            limites[campo] = (max(desdes) if desdes else None, min(hastas) if hastas else None)
+        return limites, predicados
+
+    @staticmethod
+    def _comparador(campo: str, operador: str, valor, transformar=None):
+        """Crea una comparacion simple campo <operador> valor."""
+        operaciones = {
+            "=": lambda a, b: a == b,
+            "!=": lambda a, b: a != b,
+            ">": lambda a, b: a > b,
+            ">=": lambda a, b: a >= b,
+            "<": lambda a, b: a < b,
+            "<=": lambda a, b: a <= b,
+        }
+        operacion = operaciones[operador]
+        if transformar is None:
+            return lambda c: operacion(c.get(campo, 0.0), valor)
+        return lambda c: operacion(transformar(c.get(campo, "")), valor)
+
+    def clave_orden(self, campos: Dict) -> Tuple:
+        """Clave de orden (valor, id); el id desempata y hace estable el cursor."""
+        return (campos.get(self.orden, ""), campos["id"])
+
+
+def codificar_cursor(clave: Tuple) -> str:
+    """Codifica la clave de orden del ultimo resultado como cursor opaco."""
+    return base64.urlsafe_b64encode(json.dumps(list(clave)).encode("utf-8")).decode("ascii")
+
+
+def decodificar_cursor(cursor: str) -> Tuple:
+    """
+    Recupera la clave de orden desde un cursor.
+
+    Raises:
+        ValueError: Si el cursor esta corrupto.
+    """
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")))
+    except Exception:
+        raise ValueError("Cursor no valido")
+
+
+class _TramoOrden:
+    """Pertenencia de un id al tramo [inicio, fin) del orden de un campo."""
+
+    __slots__ = ("documentos", "campo", "primera", "ultima")
+
+    def __init__(self, claves: List[Tuple], inicio: int, fin: int, documentos: Dict, campo: str):
+        self.documentos = documentos
+        self.campo = campo
+        self.primera = claves[inicio] if inicio < fin else None
+        self.ultima = claves[fin - 1] if inicio < fin else None
+
+    def __contains__(self, id_estudio: str) -> bool:
+        if self.primera is None:
+            return False
+        clave = (self.documentos[id_estudio]["campos"].get(self.campo, ""), id_estudio)
+        return self.primera <= clave <= self.ultima
+
+
+class IndiceConsulta(IndiceArchivo):
+    """
+    Campos planos (resumen + derivados) de cada estudio para consultas.
+    Una instancia por directorio de estudios, obtenida con IndiceConsulta.obtener().
+    """
+
+    ARCHIVO = "consulta.json"
+    ARCHIVO_DIARIO = "consulta.diario"
+    # 2: derivados calculados con el motor de campos derivados
+    VERSION = 2
+
+    # Documentos: id -> {"mtime": float, "campos": dict}
+
+    def __init__(self, ruta_base: str = "data/estudios"):
+        super().__init__(ruta_base)
+        # campo -> claves (valor, id) de todos los estudios, ordenadas; se
+        # arman en el primer uso de cada campo y despues se mantienen
+        self._ordenes: Dict[str, List[Tuple]] = {}
+
+    def _crear_documento(self, id_estudio: str, datos: Dict) -> Dict:
+        return {"campos": extraer_campos_consulta(id_estudio, datos)}
+
+    def _agregar_en_memoria(self, id_estudio: str, doc: Dict):
+        campos = doc["campos"]
+        for campo, claves in self._ordenes.items():
+            bisect.insort(claves, (campos.get(campo, ""), id_estudio))
+
+    def _quitar_de_memoria(self, id_estudio: str, doc: Dict):
+        campos = doc["campos"]
+        for campo, claves in self._ordenes.items():
+            clave = (campos.get(campo, ""), id_estudio)
+            posicion = bisect.bisect_left(claves, clave)
+            if posicion < len(claves) and claves[posicion] == clave:
+                del claves[posicion]
+
+    def _reiniciar_memoria(self):
+        self._ordenes = {}
+
+    def _orden(self, campo: str) -> List[Tuple]:
+        """Claves (valor, id) del campo en orden ascendente (con el candado tomado)."""
+        claves = self._ordenes.get(campo)
+        if claves is None:
+            claves = sorted((doc["campos"].get(campo, ""), id_estudio)
+                            for id_estudio, doc in self._documentos.items())
+            self._ordenes[campo] = claves
+        return claves
+
+    def preparar(self, campos: Iterable[str]):
+        """Arma de antemano el orden de estos campos (p. ej. en un hilo de fondo)."""
+        with self._lock:
+            for campo in campos:
+                self._orden(campo)
+
+    def _limites(self, campo: str, desde: Optional[Tuple], hasta: Optional[Tuple]) -> Tuple[int, int]:
+        """Posiciones [inicio, fin) del orden del campo dentro del rango."""
+        claves = self._orden(campo)
+        inicio = bisect.bisect_left(claves, desde) if desde is not None else 0
+        fin = bisect.bisect_left(claves, hasta) if hasta is not None else len(claves)
+        return inicio, max(inicio, fin)
+
+    def _coincidencias(self, consulta: ConsultaEstudios) -> Tuple[Optional[Iterable[str]], Dict[str, Tuple[int, int]], Optional[str]]:
+        """
+        Ids que cumplen la consulta, sin ordenar (con el candado tomado).
+
+        Returns:
+            (ids, limites de cada campo con rango, campo guia). Los ids son
+            una lista o, si salen solo de la busqueda de texto, ese conjunto
+            (puede traer ids que este indice aun no tiene); None si la
+            consulta es solo el rango del campo guia (las coincidencias son
+            ese tramo de su orden).
+        """
+        rangos, predicados = consulta._compilar()
+        limites = {campo: self._limites(campo, *rango) for campo, rango in rangos.items()}
+
+        candidatos: Optional[Set[str]] = None
+        if consulta.texto.strip():
+            candidatos = IndiceBusqueda.obtener(self.ruta_base).buscar(consulta.texto)
+
+        # El rango mas angosto da los candidatos y los demas los van reduciendo
+        por_tamano = sorted(limites, key=lambda c: limites[c][1] - limites[c][0])
+        guia = por_tamano[0] if por_tamano else None
+        if guia is not None and candidatos is None and not predicados and len(por_tamano) == 1:
+            return None, limites, guia
+
+        documentos = self._documentos
+        if guia is not None:
+            inicio, fin = limites[guia]
+            ids = [clave[1] for clave in self._orden(guia)[inicio:fin]]
+            if candidatos is not None:
+                ids = [i for i in ids if i in candidatos]
+        elif candidatos is not None:
+            ids = candidatos
+        else:
+            ids = list(documentos)
+
+        for campo in por_tamano[1:]:
+            inicio, fin = limites[campo]
+            if inicio == fin:
+                return [], limites, guia
+            primera, ultima = self._orden(campo)[inicio], self._orden(campo)[fin - 1]
+            ids = [i for i in ids
+                   if primera <= (documentos[i]["campos"].get(campo, ""), i) <= ultima]
+
+        if predicados:
+            ids = [i for i in ids
+                   if i in documentos and all(p(documentos[i]["campos"]) for p in predicados)]
+        return ids, limites, guia
+
+    def _ordenar(self, consulta: ConsultaEstudios, cursor: Optional[str] = None,
+                 limite: Optional[int] = None) -> Tuple[List[Tuple], int]:
+        """
+        Claves (valor, id) de las coincidencias en el orden de la consulta,
+        a partir del cursor y hasta limite + 1 (con el candado tomado).
+
+        Returns:
+            (claves, total de coincidencias sin paginar).
+        """
+        ids, limites, guia = self._coincidencias(consulta)
+        documentos = self._documentos
+        claves = self._orden(consulta.orden)
+        inicio, fin = limites.get(consulta.orden, (0, len(claves)))
+        conjunto = None
+
+        if ids is None:
+            # Las coincidencias son un tramo del orden del campo guia
+            total = limites[guia][1] - limites[guia][0]
+            if guia != consulta.orden:
+                conjunto = _TramoOrden(self._orden(guia), *limites[guia], documentos, guia)
+                if limite is None or total * FRACCION_ORDEN_DIRECTO < len(documentos):
+                    ids = [clave[1] for clave in self._orden(guia)[limites[guia][0]:limites[guia][1]]]
+        else:
+            total = len(ids)
+        if ids is not None:
+            if total * FRACCION_ORDEN_DIRECTO < len(documentos):
+                claves = sorted((documentos[i]["campos"].get(consulta.orden, ""), i)
+                                for i in ids if i in documentos)
+                inicio, fin = 0, len(claves)
+                total = len(claves)
+                conjunto = None
+            elif isinstance(ids, set):
+                conjunto = ids
+                if cursor or limite is not None:
+                    total = sum(1 for i in ids if i in documentos)
+            else:
+                conjunto = set(ids)
+
+        if cursor:
+            ultima = decodificar_cursor(cursor)
+            if consulta.descendente:
+                fin = max(inicio, bisect.bisect_left(claves, ultima, inicio, fin))
+            else:
+                inicio = min(fin, bisect.bisect_right(claves, ultima, inicio, fin))
+
+        if limite is None:
+            pagina = claves[inicio:fin]
+            if consulta.descendente:
+                pagina.reverse()
+            if conjunto is not None:
+                pagina = [clave for clave in pagina if clave[1] in conjunto]
+                if not cursor:
+                    total = len(pagina)
+            return pagina, total
+
+        posiciones = range(fin - 1, inicio - 1, -1) if consulta.descendente else range(inicio, fin)
+        pagina = []
+        for posicion in posiciones:
+            clave = claves[posicion]
+            if conjunto is None or clave[1] in conjunto:
+                pagina.append(clave)
+                if len(pagina) > limite:
+                    break
+        return pagina, total
+
+    def ejecutar(self, consulta: ConsultaEstudios, cursor: Optional[str] = None) -> Dict:
+        """
+        Ejecuta una consulta con paginacion por cursor.
+
+        Args:
+            consulta: Filtros, orden y tamaño de pagina.
+            cursor: Valor "cursor" de la pagina anterior, o None para la primera.
+
+        Returns:
+            Dict con "resultados" (campos de cada estudio), "total" (coincidencias
+            sin paginar) y "cursor" (para la pagina siguiente, o None si no hay mas).
+        """
+        with self._lock:
+            claves, total = self._ordenar(consulta, cursor, consulta.limite)
+            siguiente = None
+            if consulta.limite is not None and len(claves) > consulta.limite:
+                claves = claves[:consulta.limite]
+                siguiente = codificar_cursor(claves[-1])
+            resultados = [dict(self._documentos[i]["campos"]) for _, i in claves]
+
+        return {
+            "resultados": resultados,
+            "total": total,
+            "cursor": siguiente,
+        }
+
+    def ids_ordenados(self, consulta: ConsultaEstudios) -> List[str]:
+        """Ids de todas las coincidencias en el orden de la consulta (sin copiar campos)."""
+        with self._lock:
+            claves, _ = self._ordenar(consulta)
+        return [i for _, i in claves]
+
+    def ids(self, consulta: ConsultaEstudios) -> Set[str]:
+        """Ids de todos los estudios que cumplen la consulta (sin paginar)."""
+        with self._lock:
+            ids, limites, guia = self._coincidencias(consulta)
+            if ids is None:
+                inicio, fin = limites[guia]
+                return {clave[1] for clave in self._orden(guia)[inicio:fin]}
+            return {i for i in ids if i in self._documentos}
+
+    def valores_distintos(self, campo: str) -> List[str]:
+        """Valores distintos (no vacios) de un campo de texto, ordenados."""
+        with self._lock:
+            valores = {doc["campos"].get(campo, "") for doc in self._documentos.values()}
+        return sorted(v for v in valores if v)
@@ -7,9 +7,20 @@ Versión: 0.1.0
 import json
 import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+from src.models.indice_busqueda import IndiceBusqueda
+from src.models.indice_identidad import IndiceIdentidad
+from src.models.consulta_estudios import IndiceConsulta
+from src.models.cache_columnar import CacheColumnar
+from src.logic.campos_derivados import MOTOR_DERIVADOS
+from src.utils.instrumentacion import instrumentar
 
+# Índices persistentes que se mantienen al guardar o eliminar un estudio
+INDICES_ARCHIVO = (IndiceBusqueda, IndiceIdentidad, IndiceConsulta, CacheColumnar)
+
+
+@instrumentar('estudio', 'guardar', 'guardar_lote', 'cargar', 'listar_estudios', 'eliminar')
 class EstudioSocioeconomico:
     """
     Clase que representa un estudio socioeconómico completo.
@@ -416,6 +427,43 @@ class EstudioSocioeconomico:
                 "observaciones_finales": ""
             }
         }
+        
+        # Secciones modificadas en memoria desde el último guardado
+        self.secciones_sin_guardar: Set[str] = set()
+        self._observadores_cambios: List[Callable[[Set[str]], None]] = []
+    
+    def suscribir_cambios(self, callback: Callable[[Set[str]], None]):
+        """
+        Registra una función que recibe el conjunto de secciones de datos
+        modificadas cada vez que el wizard vuelca cambios al estudio.
+        """
+        if callback not in self._observadores_cambios:
+            self._observadores_cambios.append(callback)
+    
+    def cancelar_suscripcion(self, callback: Callable[[Set[str]], None]):
+        """Retira una función registrada con suscribir_cambios."""
+        if callback in self._observadores_cambios:
+            self._observadores_cambios.remove(callback)
+    
+    def marcar_secciones_modificadas(self, secciones):
+        """
+        Registra secciones de datos modificadas, recalcula los campos
+        derivados que dependen de ellas y avisa a los suscriptores.
+        
+        Args:
+            secciones: Llaves de self.datos que cambiaron.
+        """
+        secciones = set(secciones)
+        if not secciones:
+            return
+        derivados = MOTOR_DERIVADOS.recalcular(self.datos, secciones)
+        secciones |= MOTOR_DERIVADOS.secciones(derivados)
+        self.secciones_sin_guardar |= secciones
+        for callback in list(self._observadores_cambios):
+            try:
+                callback(secciones)
+            except Exception as e:
+                print(f"Advertencia: error al notificar cambios del estudio: {e}")
     
     def _generar_id(self) -> str:
         """Genera un ID único basado en timestamp."""
@@ -444,11 +492,70 @@ class EstudioSocioeconomico:
             with open(archivo, 'w', encoding='utf-8') as f:
                 json.dump(self.datos, f, ensure_ascii=False, indent=2)
             
+            self._actualizar_indices(ruta_base)
+            self.secciones_sin_guardar.clear()
             return True
         except Exception as e:
             print(f"Error al guardar estudio: {e}")
             return False
     
+    @staticmethod
+    def guardar_lote(estudios: Iterable[Dict], ruta_base: str = "data/estudios",
+                     indexar: bool = True) -> int:
+        """
+        Guarda varios estudios ya completos (cargas masivas e importaciones).
+        Conserva sus fechas y actualiza los índices una sola vez por lote.
+        
+        Args:
+            estudios: Diccionarios de datos, cada uno con su "id".
+            ruta_base: Directorio donde se guardarán los archivos.
+            indexar: False para solo escribir los archivos (los índices se
+                actualizan después con indexar_lote o al sincronizarse).
+            
+        Returns:
+            Número de estudios guardados.
+        """
+        os.makedirs(ruta_base, exist_ok=True)
+        guardados = []
+        for datos in estudios:
+            try:
+                contenido = json.dumps(datos, ensure_ascii=False, indent=2)
+                with open(os.path.join(ruta_base, f"{datos['id']}.json"), 'w', encoding='utf-8') as f:
+                    f.write(contenido)
+                guardados.append((datos['id'], datos))
+            except Exception as e:
+                print(f"Error al guardar estudio {datos.get('id', '')}: {e}")
+        
+        if indexar:
+            EstudioSocioeconomico.indexar_lote(guardados, ruta_base)
+        return len(guardados)
+    
+    @staticmethod
+    def indexar_lote(estudios: List[Tuple[str, Dict]], ruta_base: str = "data/estudios"):
+        """Propaga a los índices del archivo varios estudios ya escritos en disco."""
+        for clase_indice in INDICES_ARCHIVO:
+            try:
+                clase_indice.obtener(ruta_base).actualizar_lote(estudios)
+            except Exception as e:
+                print(f"Advertencia: no se pudo actualizar {clase_indice.__name__}: {e}")
+    
+    def _actualizar_indices(self, ruta_base: str):
+        """Propaga el estudio recién guardado a los índices del archivo."""
+        for clase_indice in INDICES_ARCHIVO:
+            try:
+                clase_indice.obtener(ruta_base).actualizar(self.id, self.datos)
+            except Exception as e:
+                print(f"Advertencia: no se pudo actualizar {clase_indice.__name__}: {e}")
+    
+    @staticmethod
+    def _retirar_de_indices(id_estudio: str, ruta_base: str):
+        """Retira un estudio eliminado de los índices del archivo."""
+        for clase_indice in INDICES_ARCHIVO:
+            try:
+                clase_indice.obtener(ruta_base).eliminar(id_estudio)
+            except Exception as e:
+                print(f"Advertencia: no se pudo actualizar {clase_indice.__name__}: {e}")
+    
     @classmethod
     def cargar(cls, id_estudio: str, ruta_base: str = "data/estudios") -> Optional['EstudioSocioeconomico']:
         """
@@ -545,6 +652,7 @@ class EstudioSocioeconomico:
             if os.path.exists(archivo):
                 os.remove(archivo)
             
+            EstudioSocioeconomico._retirar_de_indices(id_estudio, ruta_base)
             return True
         except Exception as e:
             print(f"Error al eliminar estudio: {e}")
@@ -0,0 +1,310 @@
+"""
+Base comun para los indices persistentes del archivo de estudios.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Cada indice se guarda junto a los estudios (data/estudios/.indices) como una
+instantanea JSON mas un diario de cambios en lineas JSON. Cada guardado o
+eliminacion solo agrega una linea al diario; la instantanea se compacta cuando
+el diario crece. Al abrirse, el indice se reconcilia con el directorio usando
+solo la fecha de modificacion de cada archivo, sin volver a leer los estudios
+que no cambiaron.
+"""
+
+import json
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+
+class IndiceArchivo:
+    """
+    Indice persistente sobre el directorio de estudios.
+
+    Las subclases definen ARCHIVO, ARCHIVO_DIARIO y VERSION, y los metodos
+    _crear_documento, _agregar_en_memoria y _quitar_de_memoria. Se obtiene una
+    instancia compartida por directorio con Subclase.obtener(ruta_base).
+    """
+
+    DIRECTORIO = ".indices"
+    ARCHIVO = ""
+    ARCHIVO_DIARIO = ""
+    VERSION = 1
+    # Numero de cambios en el diario antes de compactar la instantanea
+    MAX_ENTRADAS_DIARIO = 500
+
+    _instancias: Dict[Tuple[str, str], "IndiceArchivo"] = {}
+    # Un candado de carga por indice: cargar uno (segundos con miles de
+    # estudios) no bloquea a quien pide otro ya cargado
+    _cargas: Dict[Tuple[str, str], threading.Lock] = {}
+    _lock_instancias = threading.Lock()
+
+    @classmethod
+    def obtener(cls, ruta_base: str = "data/estudios") -> "IndiceArchivo":
+        """
+        Retorna el indice compartido del directorio, cargandolo y
+        reconciliandolo con el disco la primera vez.
+        """
+        clave = (cls.__name__, os.path.abspath(ruta_base))
+        with IndiceArchivo._lock_instancias:
+            indice = IndiceArchivo._instancias.get(clave)
+            if indice is not None:
+                return indice
+            carga = IndiceArchivo._cargas.setdefault(clave, threading.Lock())
+
+        with carga:
+            # Otro hilo pudo terminar la carga mientras se esperaba
+            with IndiceArchivo._lock_instancias:
+                indice = IndiceArchivo._instancias.get(clave)
+            if indice is None:
+                indice = cls(ruta_base)
+                indice.cargar()
+                with IndiceArchivo._lock_instancias:
+                    IndiceArchivo._instancias[clave] = indice
+                    IndiceArchivo._cargas.pop(clave, None)
+            return indice
+
+    @classmethod
+    def descartar_instancias(cls):
+        """Olvida las instancias compartidas (se recargaran desde disco)."""
+        with IndiceArchivo._lock_instancias:
+            IndiceArchivo._instancias.clear()
+
+    def __init__(self, ruta_base: str = "data/estudios"):
+        self.ruta_base = ruta_base
+        self.ruta_indices = os.path.join(ruta_base, self.DIRECTORIO)
+        self._lock = threading.RLock()
+        # id -> documento propio de cada indice (siempre incluye "mtime")
+        self._documentos: Dict[str, Dict] = {}
+        self._entradas_diario = 0
+
+    # ------------------------------------------------------------------
+    # Puntos de extension
+    # ------------------------------------------------------------------
+
+    def _crear_documento(self, id_estudio: str, datos: Dict) -> Dict:
+        """Extrae del estudio la informacion que guarda el indice."""
+        raise NotImplementedError
+
+    def _agregar_en_memoria(self, id_estudio: str, doc: Dict):
+        """Agrega el documento a las estructuras de consulta."""
+        raise NotImplementedError
+
+    def _quitar_de_memoria(self, id_estudio: str, doc: Dict):
+        """Quita el documento de las estructuras de consulta."""
+        raise NotImplementedError
+
+    def _reiniciar_memoria(self):
+        """Vacia las estructuras de consulta antes de reconstruirlas."""
+        raise NotImplementedError
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def cargar(self):
+        """Carga la instantanea y el diario, y reconcilia con el directorio."""
+        with self._lock:
+            self._documentos = {}
+            archivo = os.path.join(self.ruta_indices, self.ARCHIVO)
+            try:
+                if os.path.exists(archivo):
+                    with open(archivo, "r", encoding="utf-8") as f:
+                        contenido = json.load(f)
+                    if contenido.get("version") == self.VERSION:
+                        self._documentos = contenido.get("documentos", {})
+            except Exception as e:
+                print(f"Advertencia: indice {self.ARCHIVO} ilegible, se reconstruira: {e}")
+                self._documentos = {}
+
+            self._reproducir_diario()
+
+            self._reiniciar_memoria()
+            for id_estudio, doc in self._documentos.items():
+                self._agregar_en_memoria(id_estudio, doc)
+
+            cambios = self.sincronizar()
+            if cambios or self._entradas_diario:
+                self._guardar_instantanea()
+
+    def _reproducir_diario(self):
+        """Aplica sobre la instantanea los cambios registrados en el diario."""
+        diario = os.path.join(self.ruta_indices, self.ARCHIVO_DIARIO)
+        self._entradas_diario = 0
+        if not os.path.exists(diario):
+            return
+        try:
+            with open(diario, "r", encoding="utf-8") as f:
+                for linea in f:
+                    linea = linea.strip()
+                    if not linea:
+                        continue
+                    try:
+                        entrada = json.loads(linea)
+                    except ValueError:
+                        # Linea truncada por un cierre inesperado
+                        continue
+                    if entrada.get("op") == "put":
+                        self._documentos[entrada["id"]] = entrada["doc"]
+                    elif entrada.get("op") == "del":
+                        self._documentos.pop(entrada["id"], None)
+                    self._entradas_diario += 1
+        except Exception as e:
+            print(f"Advertencia: no se pudo leer el diario {self.ARCHIVO_DIARIO}: {e}")
+
+    def _guardar_instantanea(self):
+        """Escribe la instantanea completa de forma atomica y vacia el diario."""
+        try:
+            os.makedirs(self.ruta_indices, exist_ok=True)
+            archivo = os.path.join(self.ruta_indices, self.ARCHIVO)
+            temporal = archivo + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump({"version": self.VERSION, "documentos": self._documentos},
+                          f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temporal, archivo)
+
+            diario = os.path.join(self.ruta_indices, self.ARCHIVO_DIARIO)
+            if os.path.exists(diario):
+                os.remove(diario)
+            self._entradas_diario = 0
+        except Exception as e:
+            print(f"Advertencia: no se pudo guardar el indice {self.ARCHIVO}: {e}")
+
+    def _anotar(self, entrada: Dict):
+        """Agrega un cambio al diario y compacta si es necesario."""
+        if self._escribir_diario([entrada]) and self._entradas_diario >= self.MAX_ENTRADAS_DIARIO:
+            self._guardar_instantanea()
+
+    def _anotar_lote(self, entradas: List[Dict]):
+        """
+        Agrega varios cambios al diario con una sola escritura. Compacta solo
+        cuando el diario supera al indice, para que una carga masiva no
+        reescriba la instantanea en cada lote.
+        """
+        limite = max(self.MAX_ENTRADAS_DIARIO, len(self._documentos))
+        if self._escribir_diario(entradas) and self._entradas_diario >= limite:
+            self._guardar_instantanea()
+
+    def _escribir_diario(self, entradas: List[Dict]) -> bool:
+        try:
+            os.makedirs(self.ruta_indices, exist_ok=True)
+            diario = os.path.join(self.ruta_indices, self.ARCHIVO_DIARIO)
+            with open(diario, "a", encoding="utf-8") as f:
+                f.write("".join(
+                    json.dumps(entrada, ensure_ascii=False, separators=(",", ":")) + "\n"
+                    for entrada in entradas
+                ))
+            self._entradas_diario += len(entradas)
+            return True
+        except Exception as e:
+            print(f"Advertencia: no se pudo escribir el diario {self.ARCHIVO_DIARIO}: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def sincronizar(self) -> int:
+        """
+        Reconcilia el indice con los archivos del directorio.
+        Solo se leen los estudios nuevos o con fecha de modificacion distinta.
+
+        Returns:
+            Numero de estudios agregados, actualizados o retirados.
+        """
+        with self._lock:
+            if not os.path.isdir(self.ruta_base):
+                return 0
+
+            vistos = set()
+            cambios = 0
+            for entrada in os.scandir(self.ruta_base):
+                if not entrada.name.endswith(".json") or not entrada.is_file():
+                    continue
+                id_estudio = entrada.name[:-5]
+                vistos.add(id_estudio)
+                mtime = entrada.stat().st_mtime
+                doc = self._documentos.get(id_estudio)
+                if doc is not None and doc.get("mtime") == mtime:
+                    continue
+                try:
+                    with open(entrada.path, "r", encoding="utf-8") as f:
+                        datos = json.load(f)
+                except Exception:
+                    continue
+                self._indexar(id_estudio, datos, mtime)
+                cambios += 1
+
+            for id_estudio in [i for i in self._documentos if i not in vistos]:
+                self._retirar(id_estudio)
+                cambios += 1
+
+            return cambios
+
+    def actualizar(self, id_estudio: str, datos: Dict):
+        """
+        Indexa (o reindexa) un estudio recien guardado.
+
+        Args:
+            id_estudio: ID del estudio (nombre del archivo sin extension).
+            datos: Diccionario completo del estudio.
+        """
+        with self._lock:
+            archivo = os.path.join(self.ruta_base, f"{id_estudio}.json")
+            mtime = os.path.getmtime(archivo) if os.path.exists(archivo) else 0.0
+            doc = self._indexar(id_estudio, datos, mtime)
+            self._anotar({"op": "put", "id": id_estudio, "doc": doc})
+
+    def actualizar_lote(self, estudios: Iterable[Tuple[str, Dict]]):
+        """
+        Indexa varios estudios recien guardados con una sola escritura del diario.
+
+        Args:
+            estudios: Pares (id, datos) de estudios ya escritos en disco.
+        """
+        with self._lock:
+            entradas = []
+            for id_estudio, datos in estudios:
+                archivo = os.path.join(self.ruta_base, f"{id_estudio}.json")
+                mtime = os.path.getmtime(archivo) if os.path.exists(archivo) else 0.0
+                doc = self._indexar(id_estudio, datos, mtime)
+                entradas.append({"op": "put", "id": id_estudio, "doc": doc})
+            if entradas:
+                self._anotar_lote(entradas)
+
+    def eliminar(self, id_estudio: str):
+        """Retira un estudio del indice."""
+        with self._lock:
+            if id_estudio in self._documentos:
+                self._retirar(id_estudio)
+                self._anotar({"op": "del", "id": id_estudio})
+
+    def _indexar(self, id_estudio: str, datos: Dict, mtime: float) -> Dict:
+        """Actualiza las estructuras en memoria para un estudio."""
+        if id_estudio in self._documentos:
+            self._retirar(id_estudio)
+
+        doc = self._crear_documento(id_estudio, datos)
+        doc["mtime"] = mtime
+        self._documentos[id_estudio] = doc
+        self._agregar_en_memoria(id_estudio, doc)
+        return doc
+
+    def _retirar(self, id_estudio: str):
+        """Quita un estudio de las estructuras en memoria."""
+        doc = self._documentos.pop(id_estudio, None)
+        if doc:
+            self._quitar_de_memoria(id_estudio, doc)
+
+    def firma(self) -> str:
+        """
+        Huella del contenido indexado: cambia con cualquier alta, baja o
+        modificacion (suma exacta de fechas de modificacion, sin importar el orden).
+        """
+        with self._lock:
+            total = math.fsum(doc.get("mtime", 0.0) for doc in self._documentos.values())
+            return f"{len(self._documentos)}:{total:.6f}"
+
+    def __len__(self) -> int:
+        return len(self._documentos)
@@ -0,0 +1,280 @@
+"""
+Indice invertido de busqueda de texto completo sobre el archivo de estudios.
+Autor: DINOS Tech
+Version: 0.5.0
+
+La persistencia (instantanea, diario y reconciliacion con el directorio)
+la provee IndiceArchivo.
+"""
+
+import bisect
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Set
+
+from src.models.indice_archivo import IndiceArchivo
+
+
+# Campos de texto que participan en la busqueda: (seccion, campo).
+# Una seccion None indica un campo en la raiz del estudio.
+CAMPOS_INDEXADOS = [
+    ("datos_personales", "nombre_completo"),
+    ("datos_personales", "curp"),
+    ("datos_personales", "rfc"),
+    ("datos_personales", "telefono"),
+    ("datos_personales", "email"),
+    (None, "empresa_solicitante"),
+    ("situacion_financiera", "empresa_actual"),
+    ("empleo_actual", "empresa"),
+    ("empleo_actual", "empresa_actual"),
+    ("informacion_familiar", "observaciones_familiares"),
+    ("situacion_financiera", "observaciones_financieras"),
+    ("empleo_actual", "observaciones_empleo"),
+    ("validacion_documental", "observaciones_documentacion"),
+    ("investigacion_vecinal", "observaciones_investigacion"),
+    ("analisis_cualitativo", "observaciones_cualitativas"),
+    ("investigador", "observaciones_finales"),
+    (None, "conclusiones"),
+]
+
+# Palabras vacias del español que no aportan a la busqueda
+PALABRAS_VACIAS = {
+    "a", "al", "con", "de", "del", "el", "en", "es", "la", "las", "lo", "los",
+    "no", "o", "para", "por", "que", "se", "su", "sus", "un", "una", "y",
+}
+
+# Longitud minima para expandir un termino como prefijo
+LONGITUD_MINIMA_PREFIJO = 2
+# Un prefijo que abarca mas terminos que este (p. ej. "ma" con miles de
+# estudios) se recuerda ya unido; se conservan los MAX_PREFIJOS_RECORDADOS
+# usados mas recientemente
+TERMINOS_PREFIJO_RECORDADO = 64
+MAX_PREFIJOS_RECORDADOS = 128
+
+_PATRON_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalizar_texto(texto) -> str:
+    """
+    Normaliza texto para comparacion insensible a acentos y mayusculas.
+
+    Args:
+        texto: Valor a normalizar (se convierte a str).
+
+    Returns:
+        Texto en minusculas sin marcas diacriticas (la ñ se vuelve n).
+    """
+    if texto is None:
+        return ""
+    descompuesto = unicodedata.normalize("NFD", str(texto).lower())
+    return "".join(c for c in descompuesto if unicodedata.category(c) != "Mn")
+
+
+def tokenizar(texto) -> List[str]:
+    """
+    Divide un texto en terminos normalizados, omitiendo palabras vacias.
+
+    Args:
+        texto: Texto libre.
+
+    Returns:
+        Lista de terminos en el orden en que aparecen.
+    """
+    return [t for t in _PATRON_TOKEN.findall(normalizar_texto(texto)) if t not in PALABRAS_VACIAS]
+
+
+def extraer_riesgo_global(datos: Dict) -> float:
+    """
+    Obtiene el riesgo global numerico de un estudio.
+    Soporta el formato plano (numero) y el de calcular_todos_riesgos ({puntaje: n}).
+    """
+    valor = datos.get("riesgos", {}).get("global", 0)
+    if isinstance(valor, dict):
+        valor = valor.get("puntaje", valor.get("nivel", 0))
+    return float(valor) if isinstance(valor, (int, float)) else 0.0
+
+
+def crear_resumen(id_estudio: str, datos: Dict) -> Dict:
+    """
+    Crea el registro resumido de un estudio para listados.
+    Mantiene las mismas llaves que EstudioSocioeconomico.listar_estudios.
+    """
+    return {
+        "id": id_estudio,
+        "nombre": datos.get("datos_personales", {}).get("nombre_completo", "Sin nombre"),
+        "fecha_creacion": datos.get("fecha_creacion", ""),
+        "fecha_modificacion": datos.get("fecha_modificacion", ""),
+        "riesgo_global": extraer_riesgo_global(datos),
+        "empresa_solicitante": datos.get("empresa_solicitante", ""),
+    }
+
+
+def extraer_tokens(datos: Dict) -> List[str]:
+    """
+    Extrae los terminos indexables de un estudio.
+
+    Returns:
+        Lista de terminos unicos.
+    """
+    tokens = set()
+    for seccion, campo in CAMPOS_INDEXADOS:
+        origen = datos if seccion is None else datos.get(seccion, {})
+        if not isinstance(origen, dict):
+            continue
+        valor = origen.get(campo, "")
+        if not valor:
+            continue
+        tokens.update(tokenizar(valor))
+        if campo == "telefono":
+            # Permitir buscar el telefono sin separadores
+            digitos = "".join(c for c in str(valor) if c.isdigit())
+            if digitos:
+                tokens.add(digitos)
+    return sorted(tokens)
+
+
+class IndiceBusqueda(IndiceArchivo):
+    """
+    Indice invertido (termino -> ids de estudio) con busqueda por prefijo.
+    Una instancia por directorio de estudios, obtenida con IndiceBusqueda.obtener().
+    """
+
+    ARCHIVO = "busqueda.json"
+    ARCHIVO_DIARIO = "busqueda.diario"
+    VERSION = 1
+
+    def __init__(self, ruta_base: str = "data/estudios"):
+        super().__init__(ruta_base)
+        # Documentos: id -> {"mtime": float, "tokens": [str], "resumen": dict}
+        # termino -> ids que lo contienen
+        self._postings: Dict[str, Set[str]] = {}
+        self._vocabulario: List[str] = []
+        self._vocabulario_vigente = False
+        # prefijo -> union de los ids de sus terminos (solo prefijos amplios)
+        self._uniones: "OrderedDict[str, Set[str]]" = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Estructuras en memoria
+    # ------------------------------------------------------------------
+
+    def _crear_documento(self, id_estudio: str, datos: Dict) -> Dict:
+        return {
+            "tokens": extraer_tokens(datos),
+            "resumen": crear_resumen(id_estudio, datos),
+        }
+
+    def _agregar_en_memoria(self, id_estudio: str, doc: Dict):
+        for token in doc.get("tokens", []):
+            ids = self._postings.get(token)
+            if ids is None:
+                self._postings[token] = {id_estudio}
+                if self._vocabulario_vigente:
+                    bisect.insort(self._vocabulario, token)
+            else:
+                ids.add(id_estudio)
+            # Las uniones recordadas solo crecen al agregar
+            if self._uniones:
+                for fin in range(LONGITUD_MINIMA_PREFIJO, len(token) + 1):
+                    union = self._uniones.get(token[:fin])
+                    if union is not None:
+                        union.add(id_estudio)
+
+    def _quitar_de_memoria(self, id_estudio: str, doc: Dict):
+        for token in doc.get("tokens", []):
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(id_estudio)
+            if not ids:
+                del self._postings[token]
+                if self._vocabulario_vigente:
+                    del self._vocabulario[bisect.bisect_left(self._vocabulario, token)]
+            # Se quitan todos los tokens del estudio: ningun termino lo cubre ya
+            if self._uniones:
+                for fin in range(LONGITUD_MINIMA_PREFIJO, len(token) + 1):
+                    union = self._uniones.get(token[:fin])
+                    if union is not None:
+                        union.discard(id_estudio)
+
+    def _reiniciar_memoria(self):
+        self._postings = {}
+        self._vocabulario_vigente = False
+        self._uniones.clear()
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def _preparar_vocabulario(self):
+        """Ordena el vocabulario si hace falta; despues se mantiene al agregar y quitar."""
+        if not self._vocabulario_vigente:
+            self._vocabulario = sorted(self._postings)
+            self._vocabulario_vigente = True
+
+    def preparar(self):
+        """Ordena de antemano el vocabulario (p. ej. en un hilo de fondo)."""
+        with self._lock:
+            self._preparar_vocabulario()
+
+    def _ids_por_prefijo(self, termino: str) -> Set[str]:
+        """
+        Une los ids de todos los terminos que empiezan con el prefijo.
+        El conjunto puede ser una union recordada: no debe modificarse.
+        """
+        if len(termino) < LONGITUD_MINIMA_PREFIJO:
+            return self._postings.get(termino, set())
+
+        union = self._uniones.get(termino)
+        if union is not None:
+            self._uniones.move_to_end(termino)
+            return union
+
+        self._preparar_vocabulario()
+        inicio = bisect.bisect_left(self._vocabulario, termino)
+        # Los tokens solo tienen [a-z0-9]; "{" ordena despues de todos ellos
+        fin = bisect.bisect_left(self._vocabulario, termino + "{", inicio)
+        union = set()
+        for token in self._vocabulario[inicio:fin]:
+            union |= self._postings[token]
+
+        if fin - inicio > TERMINOS_PREFIJO_RECORDADO:
+            self._uniones[termino] = union
+            if len(self._uniones) > MAX_PREFIJOS_RECORDADOS:
+                self._uniones.popitem(last=False)
+        return union
+
+    def buscar(self, consulta: str) -> Set[str]:
+        """
+        Busca estudios que contengan todos los terminos de la consulta.
+        Cada termino se compara como prefijo, sin distinguir acentos.
+
+        Args:
+            consulta: Texto capturado por el usuario.
+
+        Returns:
+            Conjunto de ids que coinciden (vacio si la consulta no tiene terminos).
+        """
+        terminos = tokenizar(consulta)
+        if not terminos:
+            return set()
+
+        with self._lock:
+            # Resolver primero los terminos mas largos (mas selectivos)
+            resultado = None
+            for termino in sorted(set(terminos), key=len, reverse=True):
+                ids = self._ids_por_prefijo(termino)
+                resultado = set(ids) if resultado is None else resultado & ids
+                if not resultado:
+                    return set()
+            return resultado
+
+    def resumenes(self) -> List[Dict]:
+        """
+        Retorna el listado resumido de estudios sin leer los archivos.
+        Ordenado por fecha de modificacion descendente, como listar_estudios.
+        """
+        with self._lock:
+            estudios = [dict(doc["resumen"]) for doc in self._documentos.values()]
+        estudios.sort(key=lambda x: x["fecha_modificacion"], reverse=True)
+        return estudios
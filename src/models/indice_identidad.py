@@ -0,0 +1,280 @@
+"""
+Indice de identidad para detectar candidatos duplicados en el archivo.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Mantiene indices exactos (valor normalizado -> ids) para CURP, RFC, NSS y
+telefono, y un indice de trigramas sobre el nombre completo para encontrar
+nombres parecidos (capturas con errores, acentos u orden distinto) sin
+comparar el estudio contra todo el archivo.
+"""
+
+import math
+from typing import Dict, List, Optional, Set
+
+from src.models.indice_archivo import IndiceArchivo
+from src.models.indice_busqueda import normalizar_texto
+
+
+# Campos de identificacion exacta: llave del indice -> (campo en datos_personales, etiqueta)
+CAMPOS_IDENTIDAD = {
+    "curp": ("curp", "CURP"),
+    "rfc": ("rfc", "RFC"),
+    "nss": ("nss", "NSS"),
+    "telefono": ("telefono", "Teléfono"),
+}
+
+# Longitud minima de cada valor para considerarlo identificador
+LONGITUD_MINIMA = {
+    "curp": 10,
+    "rfc": 10,
+    "nss": 10,
+    "telefono": 7,
+}
+
+# Similitud (Jaccard de trigramas) a partir de la cual dos nombres se reportan
+UMBRAL_NOMBRE = 0.75
+
+# Identificadores que, capturados en ambos estudios y distintos, indican
+# personas distintas aunque el nombre se parezca (homonimos)
+LLAVES_CONCLUYENTES = ("curp", "rfc")
+
+
+def normalizar_identificador(llave: str, valor) -> str:
+    """
+    Normaliza un identificador para comparacion exacta.
+    CURP y RFC conservan letras y digitos en mayusculas; NSS y telefono solo
+    digitos (del telefono, los ultimos 10 para ignorar la lada internacional).
+
+    Returns:
+        Valor normalizado, o cadena vacia si no alcanza la longitud minima.
+    """
+    texto = normalizar_texto(valor)
+    if llave in ("nss", "telefono"):
+        normalizado = "".join(c for c in texto if c.isdigit())
+        if llave == "telefono":
+            normalizado = normalizado[-10:]
+    else:
+        normalizado = "".join(c for c in texto if c.isalnum()).upper()
+    return normalizado if len(normalizado) >= LONGITUD_MINIMA[llave] else ""
+
+
+def normalizar_nombre(nombre) -> str:
+    """Normaliza un nombre ordenando sus palabras (el orden no importa)."""
+    palabras = "".join(c if c.isalnum() else " " for c in normalizar_texto(nombre)).split()
+    return " ".join(sorted(palabras))
+
+
+def trigramas(nombre_normalizado: str) -> Set[str]:
+    """Trigramas del nombre normalizado, con relleno en los extremos."""
+    if not nombre_normalizado:
+        return set()
+    texto = f"  {nombre_normalizado} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def similitud_trigramas(a: Set[str], b: Set[str]) -> float:
+    """Indice de Jaccard entre dos conjuntos de trigramas."""
+    if not a or not b:
+        return 0.0
+    comunes = len(a & b)
+    return comunes / (len(a) + len(b) - comunes)
+
+
+def identificadores_distintos(a: Dict, b: Dict) -> bool:
+    """Indica si dos identidades tienen CURP o RFC capturados en ambas y distintos."""
+    return any(a.get(llave) and b.get(llave) and a[llave] != b[llave]
+               for llave in LLAVES_CONCLUYENTES)
+
+
+def extraer_identidad(datos: Dict) -> Dict:
+    """Extrae los identificadores normalizados de un estudio."""
+    dp = datos.get("datos_personales", {})
+    if not isinstance(dp, dict):
+        dp = {}
+    identidad = {}
+    for llave, (campo, _etiqueta) in CAMPOS_IDENTIDAD.items():
+        identidad[llave] = normalizar_identificador(llave, dp.get(campo, ""))
+    identidad["nombre"] = normalizar_nombre(dp.get("nombre_completo", ""))
+    return identidad
+
+
+class IndiceIdentidad(IndiceArchivo):
+    """
+    Indices exactos por identificador y de trigramas por nombre.
+    Una instancia por directorio de estudios, obtenida con IndiceIdentidad.obtener().
+    """
+
+    ARCHIVO = "identidad.json"
+    ARCHIVO_DIARIO = "identidad.diario"
+    VERSION = 1
+
+    def __init__(self, ruta_base: str = "data/estudios"):
+        super().__init__(ruta_base)
+        # Documentos: id -> {"mtime", "curp", "rfc", "nss", "telefono", "nombre",
+        #                    "nombre_mostrar", "empresa_solicitante"}
+        # llave -> valor normalizado -> ids
+        self._exactos: Dict[str, Dict[str, Set[str]]] = {}
+        # trigrama -> ids
+        self._trigramas: Dict[str, Set[str]] = {}
+        self._reiniciar_memoria()
+
+    # ------------------------------------------------------------------
+    # Estructuras en memoria
+    # ------------------------------------------------------------------
+
+    def _crear_documento(self, id_estudio: str, datos: Dict) -> Dict:
+        doc = extraer_identidad(datos)
+        doc["nombre_mostrar"] = datos.get("datos_personales", {}).get("nombre_completo", "")
+        doc["empresa_solicitante"] = datos.get("empresa_solicitante", "")
+        return doc
+
+    def _agregar_en_memoria(self, id_estudio: str, doc: Dict):
+        for llave in CAMPOS_IDENTIDAD:
+            valor = doc.get(llave)
+            if valor:
+                self._exactos[llave].setdefault(valor, set()).add(id_estudio)
+        for trigrama in trigramas(doc.get("nombre", "")):
+            self._trigramas.setdefault(trigrama, set()).add(id_estudio)
+
+    def _quitar_de_memoria(self, id_estudio: str, doc: Dict):
+        for llave in CAMPOS_IDENTIDAD:
+            valor = doc.get(llave)
+            ids = self._exactos[llave].get(valor) if valor else None
+            if ids is not None:
+                ids.discard(id_estudio)
+                if not ids:
+                    del self._exactos[llave][valor]
+        for trigrama in trigramas(doc.get("nombre", "")):
+            ids = self._trigramas.get(trigrama)
+            if ids is not None:
+                ids.discard(id_estudio)
+                if not ids:
+                    del self._trigramas[trigrama]
+
+    def _reiniciar_memoria(self):
+        self._exactos = {llave: {} for llave in CAMPOS_IDENTIDAD}
+        self._trigramas = {}
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def _nombres_similares(self, nombre: str, umbral: float) -> Dict[str, float]:
+        """
+        Busca ids con nombre similar usando filtrado por prefijo: un candidato
+        con Jaccard >= umbral debe compartir al menos uno de los trigramas mas
+        raros de la consulta, asi que solo se recorren esas listas.
+        """
+        propios = trigramas(nombre)
+        if not propios:
+            return {}
+
+        # Trigramas comunes minimos para alcanzar el umbral
+        minimo = max(1, math.ceil(umbral * len(propios)))
+        por_rareza = sorted(propios, key=lambda t: len(self._trigramas.get(t, ())))
+        candidatos = set()
+        for trigrama in por_rareza[:len(propios) - minimo + 1]:
+            candidatos |= self._trigramas.get(trigrama, set())
+
+        resultado = {}
+        for id_candidato in candidatos:
+            otro = trigramas(self._documentos[id_candidato].get("nombre", ""))
+            similitud = similitud_trigramas(propios, otro)
+            if similitud >= umbral:
+                resultado[id_candidato] = similitud
+        return resultado
+
+    def _buscar_por_identidad(self, identidad: Dict, id_excluir: Optional[str],
+                              umbral_nombre: float) -> List[Dict]:
+        """Combina coincidencias exactas y de nombre para una identidad."""
+        coincidencias: Dict[str, List[str]] = {}
+        puntajes: Dict[str, float] = {}
+
+        for llave, (_campo, etiqueta) in CAMPOS_IDENTIDAD.items():
+            valor = identidad.get(llave)
+            if not valor:
+                continue
+            for id_otro in self._exactos[llave].get(valor, ()):
+                coincidencias.setdefault(id_otro, []).append(etiqueta)
+                puntajes[id_otro] = 1.0
+
+        for id_otro, similitud in self._nombres_similares(identidad.get("nombre", ""),
+                                                          umbral_nombre).items():
+            # Solo el nombre coincide y la CURP o el RFC dicen que es otra persona
+            if id_otro not in coincidencias and identificadores_distintos(
+                    identidad, self._documentos.get(id_otro, {})):
+                continue
+            coincidencias.setdefault(id_otro, []).append(f"Nombre similar ({similitud:.0%})")
+            puntajes[id_otro] = max(puntajes.get(id_otro, 0.0), similitud)
+
+        coincidencias.pop(id_excluir, None)
+
+        candidatos = []
+        for id_otro, motivos in coincidencias.items():
+            doc = self._documentos.get(id_otro, {})
+            candidatos.append({
+                "id": id_otro,
+                "nombre": doc.get("nombre_mostrar", ""),
+                "empresa_solicitante": doc.get("empresa_solicitante", ""),
+                "coincidencias": motivos,
+                "puntaje": round(puntajes[id_otro], 3),
+            })
+        candidatos.sort(key=lambda c: (-len(c["coincidencias"]), -c["puntaje"], c["id"]))
+        return candidatos
+
+    def buscar_duplicados(self, datos: Dict, id_excluir: Optional[str] = None,
+                          umbral_nombre: float = UMBRAL_NOMBRE) -> List[Dict]:
+        """
+        Busca estudios del archivo que parezcan del mismo candidato.
+
+        Args:
+            datos: Diccionario del estudio a revisar (puede no estar guardado).
+            id_excluir: ID del propio estudio, para no reportarlo.
+            umbral_nombre: Similitud minima de nombre (0 a 1).
+
+        Returns:
+            Lista de candidatos {id, nombre, empresa_solicitante, coincidencias, puntaje},
+            primero los que coinciden en mas campos.
+        """
+        with self._lock:
+            return self._buscar_por_identidad(extraer_identidad(datos), id_excluir, umbral_nombre)
+
+    def detectar_duplicados_archivo(self, umbral_nombre: float = UMBRAL_NOMBRE) -> List[Dict]:
+        """
+        Revisa todo el archivo y reporta cada par de posibles duplicados una vez.
+
+        Returns:
+            Lista de pares {id_a, nombre_a, id_b, nombre_b, coincidencias, puntaje}.
+        """
+        pares: List[Dict] = []
+        with self._lock:
+            for id_estudio in sorted(self._documentos):
+                doc = self._documentos[id_estudio]
+                for candidato in self._buscar_por_identidad(doc, id_estudio, umbral_nombre):
+                    if candidato["id"] <= id_estudio:
+                        continue
+                    pares.append({
+                        "id_a": id_estudio,
+                        "nombre_a": doc.get("nombre_mostrar", ""),
+                        "id_b": candidato["id"],
+                        "nombre_b": candidato["nombre"],
+                        "coincidencias": candidato["coincidencias"],
+                        "puntaje": candidato["puntaje"],
+                    })
+        pares.sort(key=lambda p: (-len(p["coincidencias"]), -p["puntaje"]))
+        return pares
+
+
+def describir_duplicados(candidatos: List[Dict], limite: int = 5) -> List[str]:
+    """Convierte candidatos a lineas de texto para alertas y mensajes."""
+    lineas = []
+    for candidato in candidatos[:limite]:
+        lineas.append(
+            f"{candidato['nombre'] or 'Sin nombre'} ({candidato['id']}): "
+            f"{', '.join(candidato['coincidencias'])}"
+        )
+    if len(candidatos) > limite:
+        lineas.append(f"... y {len(candidatos) - limite} más")
+    return lineas
+
@@ -3,17 +3,48 @@ Dialogo de activacion de licencia.
 Copyright (c) 2026 DINOS Tech. Todos los derechos reservados.
 """
 
+import threading
+
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QMessageBox, QGroupBox, QFormLayout, QFrame
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
 from PyQt5.QtGui import QFont
 
-from src.licensing import LicenseValidator, get_hardware_id
+from src.licensing import LicenseValidator
 from src.licensing.hardware_id import get_hardware_id_display
 
 
+class VerificacionHardwareEnFondo(QObject):
+    """
+    Vuelve a ejecutar las sondas de hardware en un hilo despues de mostrar
+    la ventana principal, cuando la licencia se valido con el cache.
+    """
+    
+    # (licencia_valida, mensaje)
+    terminada = pyqtSignal(bool, str)
+    
+    def __init__(self, validator: LicenseValidator, parent=None):
+        super().__init__(parent)
+        self.validator = validator
+    
+    def iniciar(self):
+        threading.Thread(target=self._ejecutar, name="VerificacionHardware", daemon=True).start()
+    
+    def _ejecutar(self):
+        try:
+            valida, mensaje = self.validator.reverify()
+        except Exception as e:
+            print(f"Advertencia: no se pudo reverificar el hardware: {e}")
+            return
+        try:
+            self.terminada.emit(valida, mensaje)
+        except RuntimeError:
+            # La aplicacion ya se cerro
+            pass
+
+
 class DialogoActivacion(QDialog):
     """Dialogo para activar licencia del software."""
     
@@ -21,6 +52,7 @@ class DialogoActivacion(QDialog):
         super().__init__(parent)
         self.license_file = license_file
         self.validator = LicenseValidator(license_file)
+        self.hardware_id = self.validator.current_hardware_id()
         self.activated = False
         
         self.setWindowTitle("Activacion de Licencia - DINOS Tech")
@@ -53,7 +85,7 @@ class DialogoActivacion(QDialog):
         grupo_hw = QGroupBox("Informacion del Equipo")
         hw_layout = QFormLayout(grupo_hw)
         
-        self.lbl_hardware_id = QLabel(get_hardware_id_display())
+        self.lbl_hardware_id = QLabel(get_hardware_id_display(self.hardware_id))
         self.lbl_hardware_id.setFont(QFont("Consolas", 12))
         self.lbl_hardware_id.setTextInteractionFlags(Qt.TextSelectableByMouse)
         hw_layout.addRow("Hardware ID:", self.lbl_hardware_id)
@@ -110,7 +142,7 @@ class DialogoActivacion(QDialog):
         """Copia el Hardware ID al portapapeles."""
         from PyQt5.QtWidgets import QApplication
         clipboard = QApplication.clipboard()
-        clipboard.setText(get_hardware_id_display())
+        clipboard.setText(get_hardware_id_display(self.hardware_id))
         QMessageBox.information(
             self, "Copiado", 
             "Hardware ID copiado al portapapeles.\n\n"
@@ -167,7 +199,9 @@ class DialogoLicenciaInfo(QDialog):
         form.addRow("Empresa:", QLabel(license_info.get('company', '') or 'N/A'))
         form.addRow("Tipo:", QLabel(license_info.get('license_type', '')))
         form.addRow("Expiracion:", QLabel(license_info.get('expiry_date', '')))
-        form.addRow("Hardware ID:", QLabel(get_hardware_id_display()))
+        # El ID de la licencia ya validada; sin el se mostraria tras correr las sondas
+        hw_id = license_info.get('hardware_id')
+        form.addRow("Hardware ID:", QLabel(get_hardware_id_display(hw_id) if hw_id else 'N/A'))
         
         layout.addWidget(grupo)
         
@@ -0,0 +1,178 @@
+"""
+Dialogo de diagnostico de rendimiento.
+Muestra los percentiles por operacion y los contadores de la instrumentacion,
+y los objetos seguidos por el perfil de memoria.
+Copyright (c) 2026 DINOS Tech. Todos los derechos reservados.
+"""
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont
+
+from src.utils import instrumentacion, perfil_memoria
+
+
+class DialogoDiagnostico(QDialog):
+    """Dialogo con las estadisticas de rendimiento de la sesion."""
+
+    COLUMNAS = ("Operacion", "Llamadas", "Errores", "p50 (ms)", "p90 (ms)",
+                "p99 (ms)", "Max (ms)", "Total (ms)")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostico de Rendimiento")
+        self.resize(820, 680)
+        self._setup_ui()
+        self.actualizar()
+
+    def _setup_ui(self):
+        """Configura la interfaz."""
+        layout = QVBoxLayout(self)
+
+        titulo = QLabel("Diagnostico de Rendimiento")
+        titulo.setFont(QFont("Arial", 14, QFont.Bold))
+        titulo.setAlignment(Qt.AlignCenter)
+        layout.addWidget(titulo)
+
+        self.chk_activa = QCheckBox("Registrar tiempos en esta sesion")
+        self.chk_activa.setChecked(instrumentacion.activa())
+        self.chk_activa.toggled.connect(self._cambiar_activa)
+        layout.addWidget(self.chk_activa)
+
+        self.lbl_estado = QLabel()
+        self.lbl_estado.setStyleSheet("color: #7f8c8d;")
+        layout.addWidget(self.lbl_estado)
+
+        self.tabla = self._crear_tabla(self.COLUMNAS)
+        layout.addWidget(self.tabla, 3)
+
+        layout.addWidget(QLabel("Contadores"))
+        self.tabla_contadores = self._crear_tabla(("Contador", "Valor"))
+        layout.addWidget(self.tabla_contadores, 1)
+
+        self.chk_memoria = QCheckBox("Perfil de memoria (tracemalloc; la aplicacion se vuelve mas lenta)")
+        self.chk_memoria.setChecked(perfil_memoria.activo())
+        self.chk_memoria.toggled.connect(self._cambiar_memoria)
+        layout.addWidget(self.chk_memoria)
+
+        self.lbl_memoria = QLabel()
+        self.lbl_memoria.setStyleSheet("color: #7f8c8d;")
+        self.lbl_memoria.setWordWrap(True)
+        layout.addWidget(self.lbl_memoria)
+        self.tabla_memoria = self._crear_tabla(("Objeto", "Vivos", "Por liberar", "Posibles fugas"))
+        layout.addWidget(self.tabla_memoria, 1)
+
+        botones = QHBoxLayout()
+        btn_actualizar = QPushButton("Actualizar")
+        btn_actualizar.clicked.connect(self.actualizar)
+        botones.addWidget(btn_actualizar)
+
+        btn_reiniciar = QPushButton("Reiniciar")
+        btn_reiniciar.clicked.connect(self._reiniciar)
+        botones.addWidget(btn_reiniciar)
+
+        botones.addStretch()
+        btn_cerrar = QPushButton("Cerrar")
+        btn_cerrar.clicked.connect(self.accept)
+        botones.addWidget(btn_cerrar)
+        layout.addLayout(botones)
+
+    @staticmethod
+    def _crear_tabla(columnas) -> QTableWidget:
+        tabla = QTableWidget(0, len(columnas))
+        tabla.setHorizontalHeaderLabels(columnas)
+        tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        tabla.verticalHeader().setVisible(False)
+        tabla.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        return tabla
+
+    @staticmethod
+    def _celda(valor, numerica=True) -> QTableWidgetItem:
+        if isinstance(valor, float):
+            texto = f"{valor:,.2f}"
+        else:
+            texto = str(valor)
+        item = QTableWidgetItem(texto)
+        if numerica:
+            item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        return item
+
+    def actualizar(self):
+        """Vuelve a leer las estadisticas del registro activo."""
+        registro = instrumentacion.registro_actual()
+        if registro is None:
+            self.lbl_estado.setText(
+                "La instrumentacion esta desactivada. Active la casilla o agregue "
+                '"diagnostico": {"instrumentacion": true} en config.json.'
+            )
+            estadisticas, contadores = [], {}
+        else:
+            self.lbl_estado.setText(f"Registro en {instrumentacion.ARCHIVO_LOG}")
+            estadisticas = registro.estadisticas()
+            contadores = registro.contadores()
+
+        self.tabla.setRowCount(len(estadisticas))
+        for fila, e in enumerate(estadisticas):
+            valores = (e.llamadas, e.errores, e.p50_ms, e.p90_ms, e.p99_ms, e.max_ms, e.total_ms)
+            self.tabla.setItem(fila, 0, self._celda(e.operacion, numerica=False))
+            for columna, valor in enumerate(valores, start=1):
+                self.tabla.setItem(fila, columna, self._celda(valor))
+
+        self.tabla_contadores.setRowCount(len(contadores))
+        for fila, (nombre, valor) in enumerate(sorted(contadores.items())):
+            self.tabla_contadores.setItem(fila, 0, self._celda(nombre, numerica=False))
+            self.tabla_contadores.setItem(fila, 1, self._celda(valor))
+
+        self._actualizar_memoria()
+
+    def _actualizar_memoria(self):
+        perfil = perfil_memoria.perfil_actual()
+        if perfil is None:
+            self.lbl_memoria.setText(
+                'Perfil de memoria desactivado. Active la casilla o agregue '
+                '"diagnostico": {"memoria": true} en config.json.'
+            )
+            self.tabla_memoria.setRowCount(0)
+            return
+
+        texto = f"Reportes en {perfil_memoria.ARCHIVO_REPORTES}."
+        if perfil.reportes:
+            ultimo = perfil.reportes[-1]
+            texto += (f" Ultimo: {ultimo['etapa']}, {ultimo['crecimiento_kib']:+,.1f} KiB "
+                      f"(rastreado {ultimo['rastreado_kib']:,.1f} KiB).")
+            if ultimo['crecimiento']:
+                sitio = ultimo['crecimiento'][0]
+                texto += f" Mayor crecimiento: {sitio['sitio']} ({sitio['kib']:+,.1f} KiB)."
+        self.lbl_memoria.setText(texto)
+
+        estado = perfil.estado()
+        self.tabla_memoria.setRowCount(len(estado))
+        for fila, e in enumerate(estado):
+            self.tabla_memoria.setItem(fila, 0, self._celda(e.categoria, numerica=False))
+            for columna, valor in enumerate((e.vivos, e.por_liberar, e.fugas), start=1):
+                self.tabla_memoria.setItem(fila, columna, self._celda(valor))
+
+    def _cambiar_activa(self, activa: bool):
+        if activa:
+            instrumentacion.activar()
+        else:
+            instrumentacion.desactivar()
+        self.actualizar()
+
+    def _cambiar_memoria(self, activo: bool):
+        # Solo se siguen los objetos creados despues de activarlo
+        if activo:
+            perfil_memoria.activar()
+        else:
+            perfil_memoria.desactivar()
+        self._actualizar_memoria()
+
+    def _reiniciar(self):
+        registro = instrumentacion.registro_actual()
+        if registro is not None:
+            registro.reiniciar()
+        self.actualizar()
@@ -0,0 +1,123 @@
+"""
+Especificaciones compiladas de los formularios modulares.
+Autor: DINOS Tech
+Version: 0.5.0
+
+ConfiguracionCampos describe los campos como listas de diccionarios que se
+reconstruyen en cada llamada. Aqui se compilan una sola vez por seccion en
+registros inmutables (EspecCampo / EspecFormulario) con el tipo ya resuelto,
+el texto de la etiqueta armado y los grupos de captura precalculados. Todos
+los wizards comparten la misma especificacion.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .configuracion_campos import ConfiguracionCampos, TipoCampo
+
+
+# Campos por grupo visual; entre grupos se dibuja un separador
+CAMPOS_POR_GRUPO = 5
+
+
+class EspecCampo(NamedTuple):
+    """Campo de formulario compilado."""
+    id: str
+    etiqueta: str
+    tipo: TipoCampo
+    requerido: bool
+    ayuda: str
+    placeholder: str
+    opciones: Tuple[str, ...]
+    grupo: str
+    # Etiqueta lista para mostrar (con " *" si es obligatorio)
+    texto_etiqueta: str
+
+
+class EspecFormulario(NamedTuple):
+    """Formulario compilado de una seccion."""
+    seccion: str
+    campos: Tuple[EspecCampo, ...]
+    grupos: Tuple[Tuple[EspecCampo, ...], ...]
+    ids: Tuple[str, ...]
+
+
+# Seccion de datos -> definicion de sus campos
+FUENTES_CAMPOS: Dict[str, Callable[[], List[Dict[str, Any]]]] = {
+    'datos_personales': ConfiguracionCampos.obtener_campos_datos_personales,
+    'salud_intereses': ConfiguracionCampos.obtener_campos_salud,
+    'informacion_familiar': ConfiguracionCampos.obtener_campos_informacion_familiar,
+    'situacion_financiera': ConfiguracionCampos.obtener_campos_situacion_financiera,
+    'vivienda': ConfiguracionCampos.obtener_campos_vivienda,
+    'empleo_actual': ConfiguracionCampos.obtener_campos_empleo_actual,
+    'estilo_vida': ConfiguracionCampos.obtener_campos_estilo_vida,
+    'validacion_documental': ConfiguracionCampos.obtener_campos_validacion_documental,
+    'investigacion_vecinal': ConfiguracionCampos.obtener_campos_investigacion_vecinal,
+    'analisis_cualitativo': ConfiguracionCampos.obtener_campos_analisis_cualitativo,
+    'investigador': ConfiguracionCampos.obtener_campos_investigador,
+}
+
+_ESPECIFICACIONES: Dict[str, EspecFormulario] = {}
+
+
+def compilar_campo(config: Dict[str, Any]) -> EspecCampo:
+    """Convierte el diccionario de un campo en su registro compilado."""
+    tipo = config.get('tipo')
+    if not isinstance(tipo, TipoCampo):
+        # Tipo desconocido: texto simple, igual que el generador
+        tipo = TipoCampo.TEXTO
+    etiqueta = config['etiqueta']
+    requerido = bool(config.get('requerido', False))
+    return EspecCampo(
+        id=config['id'],
+        etiqueta=etiqueta,
+        tipo=tipo,
+        requerido=requerido,
+        ayuda=config.get('ayuda', '') or '',
+        placeholder=config.get('placeholder', '') or '',
+        opciones=tuple(config.get('opciones', ()) or ()),
+        grupo=config.get('grupo', '') or '',
+        texto_etiqueta=etiqueta + " *" if requerido else etiqueta,
+    )
+
+
+def compilar_formulario(campos: Iterable[Any], seccion: str = "") -> EspecFormulario:
+    """
+    Compila una lista de campos (diccionarios o EspecCampo ya compilados).
+
+    Args:
+        campos: Definiciones de campos en orden de captura.
+        seccion: Seccion de datos a la que pertenecen.
+    """
+    compilados = tuple(c if isinstance(c, EspecCampo) else compilar_campo(c) for c in campos)
+    grupos = tuple(
+        compilados[i:i + CAMPOS_POR_GRUPO]
+        for i in range(0, len(compilados), CAMPOS_POR_GRUPO)
+    )
+    return EspecFormulario(
+        seccion=seccion,
+        campos=compilados,
+        grupos=grupos,
+        ids=tuple(c.id for c in compilados),
+    )
+
+
+def especificacion(seccion: str) -> EspecFormulario:
+    """
+    Especificacion compilada de una seccion; se compila la primera vez y se
+    comparte con todos los wizards posteriores.
+
+    Raises:
+        KeyError: Si la seccion no tiene definicion de campos.
+    """
+    espec = _ESPECIFICACIONES.get(seccion)
+    if espec is None:
+        espec = _ESPECIFICACIONES[seccion] = compilar_formulario(FUENTES_CAMPOS[seccion](), seccion)
+    return espec
+
+
+def invalidar_especificaciones(seccion: Optional[str] = None):
+    """Descarta las especificaciones compiladas (p. ej. tras editar la configuracion)."""
+    if seccion is None:
+        _ESPECIFICACIONES.clear()
+    else:
+        _ESPECIFICACIONES.pop(seccion, None)
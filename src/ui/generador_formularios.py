@@ -5,6 +5,7 @@ Autor: DINOS Tech
 Versión: 0.2.0
 """
 
+from functools import partial
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
     QLineEdit, QTextEdit, QSpinBox, QDoubleSpinBox, QComboBox,
@@ -12,23 +13,188 @@ from PyQt5.QtWidgets import (
     QFrame, QScrollArea
 )
 from PyQt5.QtCore import Qt, QDate
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
 from .configuracion_campos import TipoCampo
+from .especificacion_campos import (
+    EspecCampo, EspecFormulario, compilar_campo, compilar_formulario
+)
+
+
+# ----------------------------------------------------------------------
+# Lectura y escritura de valores. Los getters son métodos del propio
+# widget; los setters, funciones de módulo ligadas con partial.
+# ----------------------------------------------------------------------
+
+def _asignar_texto(widget, v):
+    widget.setText(str(v) if v else "")
+
+
+def _asignar_texto_largo(widget, v):
+    widget.setPlainText(str(v) if v else "")
+
+
+def _asignar_entero(widget, v):
+    widget.setValue(int(v) if v else 0)
+
+
+def _asignar_decimal(widget, v):
+    widget.setValue(float(v) if v else 0.0)
+
+
+def _leer_fecha(widget):
+    return widget.date().toString("yyyy-MM-dd")
+
+
+def _asignar_fecha(widget, v):
+    widget.setDate(QDate.fromString(str(v), "yyyy-MM-dd") if v else QDate.currentDate())
+
+
+def _asignar_combo(widget, v):
+    widget.setCurrentText(str(v) if v else "")
+
+
+def _asignar_checkbox(widget, v):
+    widget.setChecked(bool(v) if v is not None else False)
+
+
+# ----------------------------------------------------------------------
+# Fábricas por tipo de campo: (espec, parent) -> (widget, get, set)
+# ----------------------------------------------------------------------
+
+def _crear_campo_texto(espec: EspecCampo, parent: QWidget) -> tuple:
+    """Crea campo de texto simple."""
+    widget = QLineEdit(parent)
+    if espec.placeholder:
+        widget.setPlaceholderText(espec.placeholder)
+    return widget, widget.text, partial(_asignar_texto, widget)
+
+
+def _crear_campo_texto_largo(espec: EspecCampo, parent: QWidget) -> tuple:
+    """Crea campo de texto multilínea."""
+    widget = QTextEdit(parent)
+    widget.setMaximumHeight(100)
+    if espec.placeholder:
+        widget.setPlaceholderText(espec.placeholder)
+    return widget, widget.toPlainText, partial(_asignar_texto_largo, widget)
+
+
+def _crear_campo_numero(espec: EspecCampo, parent: QWidget) -> tuple:
+    """Crea campo numérico entero."""
+    widget = QSpinBox(parent)
+    widget.setRange(0, 999999)
+    return widget, widget.value, partial(_asignar_entero, widget)
+
+
+def _crear_campo_decimal(espec: EspecCampo, parent: QWidget) -> tuple:
+    """Crea campo numérico decimal."""
+    widget = QDoubleSpinBox(parent)
+    widget.setRange(0, 999999.99)
+    widget.setDecimals(2)
+    widget.setPrefix("$")
+    return widget, widget.value, partial(_asignar_decimal, widget)
+
+
+def _crear_campo_fecha(espec: EspecCampo, parent: QWidget) -> tuple:
+    """Crea campo de fecha."""
+    widget = QDateEdit(parent)
+    widget.setCalendarPopup(True)
+    widget.setDate(QDate.currentDate())
+    widget.setDisplayFormat("dd/MM/yyyy")
+    return widget, partial(_leer_fecha, widget), partial(_asignar_fecha, widget)
+
+
+def _crear_campo_combo(espec: EspecCampo, parent: QWidget) -> tuple:
+    """Crea campo de selección (combo box)."""
+    widget = QComboBox(parent)
+    widget.addItem("")  # Opción vacía
+    widget.addItems(espec.opciones)
+    return widget, widget.currentText, partial(_asignar_combo, widget)
+
+
+def _crear_campo_checkbox(espec: EspecCampo, parent: QWidget) -> tuple:
+    """Crea campo de checkbox."""
+    widget = QCheckBox(parent)
+    return widget, widget.isChecked, partial(_asignar_checkbox, widget)
+
+
+def _crear_campo_lista(espec: EspecCampo, parent: QWidget) -> tuple:
+    """Crea campo de lista editable."""
+    container = QWidget(parent)
+    layout = QVBoxLayout(container)
+    layout.setContentsMargins(0, 0, 0, 0)
+    
+    list_widget = QListWidget()
+    list_widget.setMaximumHeight(100)
+    
+    btn_layout = QHBoxLayout()
+    btn_agregar = QPushButton("Agregar")
+    btn_eliminar = QPushButton("Eliminar")
+    btn_layout.addWidget(btn_agregar)
+    btn_layout.addWidget(btn_eliminar)
+    btn_layout.addStretch()
+    
+    layout.addWidget(list_widget)
+    layout.addLayout(btn_layout)
+    
+    def agregar_item():
+        from PyQt5.QtWidgets import QInputDialog
+        texto, ok = QInputDialog.getText(parent, "Agregar", "Ingrese el texto:")
+        if ok and texto:
+            list_widget.addItem(texto)
+    
+    def eliminar_item():
+        current = list_widget.currentRow()
+        if current >= 0:
+            list_widget.takeItem(current)
+    
+    btn_agregar.clicked.connect(agregar_item)
+    btn_eliminar.clicked.connect(eliminar_item)
+    
+    def get_value():
+        items = []
+        for i in range(list_widget.count()):
+            items.append(list_widget.item(i).text())
+        return items
+    
+    def set_value(items):
+        list_widget.clear()
+        if items:
+            for item in items:
+                list_widget.addItem(str(item))
+    
+    return container, get_value, set_value
+
+
+# Tipo de campo -> fábrica. El tipo ya viene resuelto en la especificación
+# (los desconocidos se compilan como TEXTO).
+FABRICAS_CAMPO = {
+    TipoCampo.TEXTO: _crear_campo_texto,
+    TipoCampo.TEXTO_LARGO: _crear_campo_texto_largo,
+    TipoCampo.NUMERO: _crear_campo_numero,
+    TipoCampo.DECIMAL: _crear_campo_decimal,
+    TipoCampo.FECHA: _crear_campo_fecha,
+    TipoCampo.COMBO: _crear_campo_combo,
+    TipoCampo.CHECKBOX: _crear_campo_checkbox,
+    TipoCampo.LISTA: _crear_campo_lista,
+}
 
 
 class GeneradorFormularios:
     """
     Genera automáticamente controles de formulario basados en configuración.
     Hace muy fácil agregar nuevos campos sin programar UI manualmente.
+    
+    Trabaja sobre especificaciones compiladas (especificacion_campos); las
+    listas de diccionarios se siguen aceptando y se compilan al vuelo.
     """
     
     @staticmethod
-    def crear_campo(config: Dict[str, Any], parent: QWidget = None) -> tuple:
+    def crear_campo(config: Union[EspecCampo, Dict[str, Any]], parent: QWidget = None) -> tuple:
         """
         Crea un control de formulario basado en configuración.
         
         Args:
-            config: Diccionario con configuración del campo
+            config: Campo compilado o diccionario con configuración del campo
             parent: Widget padre
             
         Returns:
@@ -37,173 +203,18 @@ class GeneradorFormularios:
             - get_value_func: Función para obtener el valor
             - set_value_func: Función para establecer el valor
         """
-        tipo = config.get('tipo')
-        
-        if tipo == TipoCampo.TEXTO:
-            return GeneradorFormularios._crear_campo_texto(config, parent)
-        elif tipo == TipoCampo.TEXTO_LARGO:
-            return GeneradorFormularios._crear_campo_texto_largo(config, parent)
-        elif tipo == TipoCampo.NUMERO:
-            return GeneradorFormularios._crear_campo_numero(config, parent)
-        elif tipo == TipoCampo.DECIMAL:
-            return GeneradorFormularios._crear_campo_decimal(config, parent)
-        elif tipo == TipoCampo.FECHA:
-            return GeneradorFormularios._crear_campo_fecha(config, parent)
-        elif tipo == TipoCampo.COMBO:
-            return GeneradorFormularios._crear_campo_combo(config, parent)
-        elif tipo == TipoCampo.CHECKBOX:
-            return GeneradorFormularios._crear_campo_checkbox(config, parent)
-        elif tipo == TipoCampo.LISTA:
-            return GeneradorFormularios._crear_campo_lista(config, parent)
-        else:
-            # Por defecto, texto simple
-            return GeneradorFormularios._crear_campo_texto(config, parent)
+        espec = config if isinstance(config, EspecCampo) else compilar_campo(config)
+        fabrica = FABRICAS_CAMPO.get(espec.tipo, _crear_campo_texto)
+        return fabrica(espec, parent)
     
     @staticmethod
-    def _crear_campo_texto(config: Dict[str, Any], parent: QWidget) -> tuple:
-        """Crea campo de texto simple."""
-        widget = QLineEdit(parent)
-        
-        placeholder = config.get('placeholder', '')
-        if placeholder:
-            widget.setPlaceholderText(placeholder)
-        
-        get_func = lambda: widget.text()
-        set_func = lambda v: widget.setText(str(v) if v else "")
-        
-        return widget, get_func, set_func
-    
-    @staticmethod
-    def _crear_campo_texto_largo(config: Dict[str, Any], parent: QWidget) -> tuple:
-        """Crea campo de texto multilínea."""
-        widget = QTextEdit(parent)
-        widget.setMaximumHeight(100)
-        
-        placeholder = config.get('placeholder', '')
-        if placeholder:
-            widget.setPlaceholderText(placeholder)
-        
-        get_func = lambda: widget.toPlainText()
-        set_func = lambda v: widget.setPlainText(str(v) if v else "")
-        
-        return widget, get_func, set_func
-    
-    @staticmethod
-    def _crear_campo_numero(config: Dict[str, Any], parent: QWidget) -> tuple:
-        """Crea campo numérico entero."""
-        widget = QSpinBox(parent)
-        widget.setRange(0, 999999)
-        
-        get_func = lambda: widget.value()
-        set_func = lambda v: widget.setValue(int(v) if v else 0)
-        
-        return widget, get_func, set_func
-    
-    @staticmethod
-    def _crear_campo_decimal(config: Dict[str, Any], parent: QWidget) -> tuple:
-        """Crea campo numérico decimal."""
-        widget = QDoubleSpinBox(parent)
-        widget.setRange(0, 999999.99)
-        widget.setDecimals(2)
-        widget.setPrefix("$")
-        
-        get_func = lambda: widget.value()
-        set_func = lambda v: widget.setValue(float(v) if v else 0.0)
-        
-        return widget, get_func, set_func
-    
-    @staticmethod
-    def _crear_campo_fecha(config: Dict[str, Any], parent: QWidget) -> tuple:
-        """Crea campo de fecha."""
-        widget = QDateEdit(parent)
-        widget.setCalendarPopup(True)
-        widget.setDate(QDate.currentDate())
-        widget.setDisplayFormat("dd/MM/yyyy")
-        
-        get_func = lambda: widget.date().toString("yyyy-MM-dd")
-        set_func = lambda v: widget.setDate(QDate.fromString(str(v), "yyyy-MM-dd") if v else QDate.currentDate())
-        
-        return widget, get_func, set_func
-    
-    @staticmethod
-    def _crear_campo_combo(config: Dict[str, Any], parent: QWidget) -> tuple:
-        """Crea campo de selección (combo box)."""
-        widget = QComboBox(parent)
-        
-        opciones = config.get('opciones', [])
-        widget.addItem("")  # Opción vacía
-        widget.addItems(opciones)
-        
-        get_func = lambda: widget.currentText()
-        set_func = lambda v: widget.setCurrentText(str(v) if v else "")
-        
-        return widget, get_func, set_func
-    
-    @staticmethod
-    def _crear_campo_checkbox(config: Dict[str, Any], parent: QWidget) -> tuple:
-        """Crea campo de checkbox."""
-        widget = QCheckBox(parent)
-        
-        get_func = lambda: widget.isChecked()
-        set_func = lambda v: widget.setChecked(bool(v) if v is not None else False)
-        
-        return widget, get_func, set_func
-    
-    @staticmethod
-    def _crear_campo_lista(config: Dict[str, Any], parent: QWidget) -> tuple:
-        """Crea campo de lista editable."""
-        container = QWidget(parent)
-        layout = QVBoxLayout(container)
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        list_widget = QListWidget()
-        list_widget.setMaximumHeight(100)
-        
-        btn_layout = QHBoxLayout()
-        btn_agregar = QPushButton("Agregar")
-        btn_eliminar = QPushButton("Eliminar")
-        btn_layout.addWidget(btn_agregar)
-        btn_layout.addWidget(btn_eliminar)
-        btn_layout.addStretch()
-        
-        layout.addWidget(list_widget)
-        layout.addLayout(btn_layout)
-        
-        def agregar_item():
-            from PyQt5.QtWidgets import QInputDialog
-            texto, ok = QInputDialog.getText(parent, "Agregar", "Ingrese el texto:")
-            if ok and texto:
-                list_widget.addItem(texto)
-        
-        def eliminar_item():
-            current = list_widget.currentRow()
-            if current >= 0:
-                list_widget.takeItem(current)
-        
-        btn_agregar.clicked.connect(agregar_item)
-        btn_eliminar.clicked.connect(eliminar_item)
-        
-        def get_value():
-            items = []
-            for i in range(list_widget.count()):
-                items.append(list_widget.item(i).text())
-            return items
-        
-        def set_value(items):
-            list_widget.clear()
-            if items:
-                for item in items:
-                    list_widget.addItem(str(item))
-        
-        return container, get_value, set_value
-    
-    @staticmethod
-    def crear_formulario_completo(campos: List[Dict[str, Any]], parent: QWidget = None) -> Dict:
+    def crear_formulario_completo(campos: Union[EspecFormulario, List[Dict[str, Any]]],
+                                  parent: QWidget = None) -> Dict:
         """
         Crea un formulario completo con todos los campos especificados.
         
         Args:
-            campos: Lista de configuraciones de campos
+            campos: Formulario compilado o lista de configuraciones de campos
             parent: Widget padre
             
         Returns:
@@ -213,6 +224,8 @@ class GeneradorFormularios:
             - 'getters': Dict {id_campo: func_get_value}
             - 'setters': Dict {id_campo: func_set_value}
         """
+        espec = campos if isinstance(campos, EspecFormulario) else compilar_formulario(campos)
+        
         # Crear scroll area para manejar muchos campos
         scroll = QScrollArea(parent)
         scroll.setWidgetResizable(True)
@@ -227,41 +240,27 @@ class GeneradorFormularios:
         getters = {}
         setters = {}
         
-        for config in campos:
-            campo_id = config['id']
-            etiqueta = config['etiqueta']
-            requerido = config.get('requerido', False)
-            ayuda = config.get('ayuda', '')
-            
-            # Crear etiqueta con indicador de requerido
-            label_text = etiqueta
-            if requerido:
-                label_text += " *"
-            
-            label = QLabel(label_text)
-            if ayuda:
-                label.setToolTip(ayuda)
-            
-            # Crear el control
-            widget, get_func, set_func = GeneradorFormularios.crear_campo(config, container)
-            
-            if ayuda:
-                widget.setToolTip(ayuda)
-            
-            # Agregar al formulario
-            form_layout.addRow(label, widget)
-            
-            # Guardar referencias
-            widgets[campo_id] = widget
-            getters[campo_id] = get_func
-            setters[campo_id] = set_func
-            
-            # Agregar separador visual cada 5 campos
-            if len(widgets) % 5 == 0 and len(widgets) < len(campos):
+        for numero_grupo, grupo in enumerate(espec.grupos):
+            # Separador visual entre grupos de campos
+            if numero_grupo:
                 separator = QFrame()
                 separator.setFrameShape(QFrame.HLine)
                 separator.setFrameShadow(QFrame.Sunken)
                 form_layout.addRow(separator)
+            
+            for campo in grupo:
+                label = QLabel(campo.texto_etiqueta)
+                widget, get_func, set_func = FABRICAS_CAMPO[campo.tipo](campo, container)
+                
+                if campo.ayuda:
+                    label.setToolTip(campo.ayuda)
+                    widget.setToolTip(campo.ayuda)
+                
+                form_layout.addRow(label, widget)
+                
+                widgets[campo.id] = widget
+                getters[campo.id] = get_func
+                setters[campo.id] = set_func
         
         main_layout.addLayout(form_layout)
         main_layout.addStretch()
@@ -294,7 +293,8 @@ class GeneradorFormularios:
         return label
     
     @staticmethod
-    def crear_grupo_campos(titulo: str, campos: List[Dict[str, Any]], parent: QWidget = None) -> Dict:
+    def crear_grupo_campos(titulo: str, campos: Union[EspecFormulario, List[Dict[str, Any]]],
+                           parent: QWidget = None) -> Dict:
         """
         Crea un grupo de campos dentro de un QGroupBox.
         
@@ -0,0 +1,160 @@
+"""
+Modelo de tabla para el listado de estudios de la ventana principal.
+Autor: DINOS Tech
+Version: 0.5.0
+"""
+
+from typing import Dict, List, Optional, Sequence, Set
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt5.QtGui import QColor
+
+from src.logic.calculador_riesgos import CalculadorRiesgos
+
+
+class ModeloEstudios(QAbstractTableModel):
+    """
+    Modelo de solo lectura sobre los resumenes de estudios.
+    Permite filtrar por un conjunto de ids sin reconstruir los datos.
+    Los resumenes pueden ser una lista o un CatalogoEstudios mapeado en
+    memoria, que decodifica cada fila solo cuando se muestra.
+    """
+
+    ENCABEZADOS = [
+        "Nombre del Candidato",
+        "Fecha de Creación",
+        "Última Modificación",
+        "Riesgo Global",
+        "ID"
+    ]
+
+    COLUMNA_RIESGO = 3
+    COLUMNA_ID = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._estudios: Sequence[Dict] = []
+        # id -> posicion en self._estudios (se construye al filtrar por primera vez)
+        self._posiciones: Optional[Dict[str, int]] = None
+        # Posiciones de self._estudios visibles con el filtro actual
+        self._visibles: Sequence[int] = range(0)
+
+    # ------------------------------------------------------------------
+    # Datos
+    # ------------------------------------------------------------------
+
+    def establecer_estudios(self, estudios: Sequence[Dict]):
+        """Reemplaza el listado completo y quita cualquier filtro."""
+        self.beginResetModel()
+        self._estudios = estudios
+        self._posiciones = None
+        self._visibles = range(len(estudios))
+        self.endResetModel()
+
+    def fuente(self) -> Sequence[Dict]:
+        """Listado completo actual (lista o catalogo)."""
+        return self._estudios
+
+    def _mapa_posiciones(self) -> Dict[str, int]:
+        """Mapa id -> fila del listado completo."""
+        if hasattr(self._estudios, "posiciones"):
+            return self._estudios.posiciones()
+        if self._posiciones is None:
+            self._posiciones = {e["id"]: i for i, e in enumerate(self._estudios)}
+        return self._posiciones
+
+    def aplicar_filtro(self, ids: Optional[Set[str]]):
+        """
+        Muestra solo los estudios cuyos ids esten en el conjunto.
+
+        Args:
+            ids: Conjunto de ids visibles, o None para mostrar todos.
+        """
+        self.beginResetModel()
+        if ids is None:
+            self._visibles = range(len(self._estudios))
+        else:
+            self._visibles = [i for i, e in enumerate(self._estudios) if e["id"] in ids]
+        self.endResetModel()
+
+    def mostrar_ids(self, ids: List[str]):
+        """
+        Muestra solo los estudios indicados, en el orden recibido
+        (por ejemplo, el resultado ordenado de una consulta).
+        """
+        self.beginResetModel()
+        posiciones = self._mapa_posiciones()
+        self._visibles = [p for p in map(posiciones.get, ids) if p is not None]
+        self.endResetModel()
+
+    def total(self) -> int:
+        """Numero de estudios sin filtrar."""
+        return len(self._estudios)
+
+    def estudio_en_fila(self, fila: int) -> Optional[Dict]:
+        """Retorna el resumen del estudio mostrado en la fila."""
+        if 0 <= fila < len(self._visibles):
+            return self._estudios[self._visibles[fila]]
+        return None
+
+    # ------------------------------------------------------------------
+    # Interfaz QAbstractTableModel
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._visibles)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ENCABEZADOS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.ENCABEZADOS[section]
+        return QVariant()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+
+        estudio = self._estudios[self._visibles[index.row()]]
+        columna = index.column()
+
+        if role == Qt.DisplayRole:
+            if columna == 0:
+                return estudio["nombre"]
+            if columna == 1:
+                return self._solo_fecha(estudio["fecha_creacion"])
+            if columna == 2:
+                return self._solo_fecha(estudio["fecha_modificacion"])
+            if columna == self.COLUMNA_RIESGO:
+                riesgo = self._riesgo(estudio)
+                return f"{riesgo:.1f} - {CalculadorRiesgos.obtener_interpretacion_riesgo(int(riesgo))}"
+            if columna == self.COLUMNA_ID:
+                return estudio["id"]
+
+        elif columna == self.COLUMNA_RIESGO:
+            riesgo = self._riesgo(estudio)
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+            if role == Qt.BackgroundRole:
+                # Colorear segun riesgo
+                if riesgo <= 1.5:
+                    return QColor(Qt.green)
+                if riesgo <= 2.5:
+                    return QColor(Qt.yellow)
+                if riesgo <= 3.5:
+                    return QColor(255, 165, 0)  # Naranja
+                return QColor(Qt.red)
+            if role == Qt.ForegroundRole and riesgo > 3.5:
+                return QColor(Qt.white)
+
+        return QVariant()
+
+    @staticmethod
+    def _solo_fecha(fecha: str) -> str:
+        return fecha.split('T')[0] if 'T' in fecha else fecha
+
+    @staticmethod
+    def _riesgo(estudio: Dict) -> float:
+        riesgo = estudio.get("riesgo_global", 1)
+        return float(riesgo) if isinstance(riesgo, (int, float)) else 1.0
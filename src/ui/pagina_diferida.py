@@ -0,0 +1,117 @@
+"""
+Pagina de wizard que construye su contenido la primera vez que se necesita.
+Autor: DINOS Tech
+Version: 0.5.0
+"""
+
+from typing import Callable, Optional, Set
+
+from PyQt5.QtWidgets import QWizardPage, QVBoxLayout
+
+
+class PaginaDiferida(QWizardPage):
+    """
+    Marcador ligero que ocupa el lugar de una pagina del wizard.
+
+    La pagina real se crea con la fabrica al llegar a ella (initializePage)
+    o cuando el wizard la preconstruye en tiempo libre, y se inserta como
+    contenido del marcador. Los metodos que usa el wizard (guardar_datos,
+    cargar_datos, validatePage, isComplete) se delegan a la pagina real;
+    mientras no exista no hay nada que guardar, porque nadie la ha editado.
+
+    Nota: los campos registrados con registerField en la pagina real no
+    llegan al wizard; las paginas con campos obligatorios deben crearse
+    directamente.
+    """
+
+    def __init__(self, fabrica: Callable[[], QWizardPage], titulo: str = "", parent=None):
+        super().__init__(parent)
+        self._fabrica = fabrica
+        self._pagina: Optional[QWizardPage] = None
+        self.setTitle(titulo)
+
+        self._layout = QVBoxLayout()
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(self._layout)
+
+    def materializada(self) -> bool:
+        """Indica si la pagina real ya fue construida."""
+        return self._pagina is not None
+
+    def pagina(self) -> Optional[QWizardPage]:
+        """Pagina real, o None si aun no se construye."""
+        return self._pagina
+
+    def materializar(self) -> QWizardPage:
+        """Construye la pagina real si aun no existe y la retorna."""
+        if self._pagina is None:
+            pagina = self._fabrica()
+            self._layout.addWidget(pagina)
+            self.setTitle(pagina.title())
+            self.setSubTitle(pagina.subTitle())
+            pagina.completeChanged.connect(self.completeChanged)
+            self._pagina = pagina
+        return self._pagina
+
+    # ------------------------------------------------------------------
+    # Interfaz QWizardPage
+    # ------------------------------------------------------------------
+
+    def initializePage(self):
+        self.materializar().initializePage()
+
+    def cleanupPage(self):
+        if self._pagina is not None:
+            self._pagina.cleanupPage()
+
+    def validatePage(self):
+        if self._pagina is None:
+            return True
+        return self._pagina.validatePage()
+
+    def isComplete(self):
+        if self._pagina is None:
+            return True
+        return self._pagina.isComplete()
+
+    # ------------------------------------------------------------------
+    # Interfaz de las paginas del estudio
+    # ------------------------------------------------------------------
+
+    def guardar_datos(self):
+        if self._pagina is not None and hasattr(self._pagina, 'guardar_datos'):
+            self._pagina.guardar_datos()
+
+    def cargar_datos(self):
+        if self._pagina is not None and hasattr(self._pagina, 'cargar_datos'):
+            self._pagina.cargar_datos()
+
+    def cargar_sin_marcar(self):
+        if self._pagina is not None and hasattr(self._pagina, 'cargar_sin_marcar'):
+            self._pagina.cargar_sin_marcar()
+        else:
+            self.cargar_datos()
+
+    def hay_cambios(self) -> bool:
+        if self._pagina is None:
+            return False
+        if hasattr(self._pagina, 'hay_cambios'):
+            return self._pagina.hay_cambios()
+        return True
+
+    def limpiar_cambios(self):
+        if self._pagina is not None and hasattr(self._pagina, 'limpiar_cambios'):
+            self._pagina.limpiar_cambios()
+
+    def secciones(self) -> Set[str]:
+        if self._pagina is not None and hasattr(self._pagina, 'secciones'):
+            return self._pagina.secciones()
+        return set()
+
+    def sincronizar_datos(self) -> Set[str]:
+        if self._pagina is None:
+            return set()
+        if hasattr(self._pagina, 'sincronizar_datos'):
+            return self._pagina.sincronizar_datos()
+        self.guardar_datos()
+        return set()
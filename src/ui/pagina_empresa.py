@@ -202,7 +202,20 @@ class PaginaEmpresaSolicitante(QWizardPage):
     
     def on_empresa_changed(self, empresa):
         """Se ejecuta cuando cambia la empresa seleccionada."""
+        if self.estudio.datos.get("empresa_solicitante") == empresa:
+            return
         self.estudio.datos["empresa_solicitante"] = empresa
+        # Esta página escribe directo en el estudio: avisar del cambio
+        self.estudio.marcar_secciones_modificadas({"empresa_solicitante"})
+    
+    def reasignar_estudio(self, estudio):
+        """Enlaza la página a otro estudio (wizard reutilizado)."""
+        self.estudio = estudio
+        self.combo_empresa.blockSignals(True)
+        try:
+            self.cargar_empresas()
+        finally:
+            self.combo_empresa.blockSignals(False)
     
     def initializePage(self):
         """Se ejecuta cuando se muestra la página."""
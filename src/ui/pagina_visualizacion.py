@@ -4,48 +4,183 @@ Autor: DINOS Tech
 Versión: 0.3.0
 """
 
-# NO importar matplotlib al inicio - usar lazy loading
+import io
+import math
+
+# NO importar matplotlib al inicio - se carga en el hilo de dibujo
 from PyQt5.QtWidgets import (
     QWizardPage, QVBoxLayout, QHBoxLayout, QLabel, 
     QScrollArea, QWidget, QPushButton, QTabWidget
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QFont, QPixmap
+
+from src.ui.render_graficas import (
+    CACHE_GRAFICAS, RenderizadorGraficas, copiar_secciones, firma_datos
+)
+from src.utils.instrumentacion import contar, instrumentar
+from src.utils import perfil_memoria
 
 # Variables globales para lazy loading de matplotlib
 _matplotlib_loaded = False
+_estilo_aplicado = False
 Figure = None
-FigureCanvas = None
+FigureCanvasAgg = None
 np = None
-plt = None
 
 
 def _load_matplotlib():
-    """Carga matplotlib solo cuando se necesita."""
-    global _matplotlib_loaded, Figure, FigureCanvas, np, plt
+    """
+    Carga matplotlib (backend Agg, sin pyplot) solo cuando se necesita.
+    Solo importa: se puede llamar desde el hilo de dibujo o el de precalentamiento.
+    """
+    global _matplotlib_loaded, Figure, FigureCanvasAgg, np
     if not _matplotlib_loaded:
-        import matplotlib.pyplot as mplt
-        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FC
-        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg as FCA
+        from matplotlib.figure import Figure as Fig
         import numpy as numpy
         
-        plt = mplt
-        FigureCanvas = FC
+        Figure = Fig
+        FigureCanvasAgg = FCA
         
         np = numpy
-        plt.style.use('seaborn-v0_8-darkgrid')
         _matplotlib_loaded = True
 
 
+def _aplicar_estilo():
+    """
+    Aplica el estilo de las gráficas a los rcParams globales, una sola vez.
+    Debe llamarse en el hilo de la interfaz antes de arrancar el hilo de
+    dibujo: ExportadorPDF dibuja con pyplot en ese mismo hilo, así que el
+    cambio nunca ocurre a mitad de uno de sus dibujos.
+    """
+    global _estilo_aplicado
+    if not _estilo_aplicado:
+        _load_matplotlib()
+        import matplotlib.style as mstyle
+        mstyle.use('seaborn-v0_8-darkgrid')
+        _estilo_aplicado = True
+
+
+class FiguraReutilizable:
+    """
+    Figura Agg de una gráfica que conserva sus artistas entre dibujos: si la
+    estructura no cambia, los constructores solo actualizan alturas, ángulos
+    y textos en lugar de crear una figura nueva.
+    """
+    
+    def __init__(self):
+        self.fig = Figure(facecolor='white')
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.artistas = {}
+        perfil_memoria.seguir(self.canvas, 'FigureCanvas')
+    
+    def nueva(self, figsize, **subplot_kw):
+        """Limpia la figura y crea ejes nuevos (primer dibujo o cambio de estructura)."""
+        self.fig.clear()
+        self.artistas.clear()
+        self.fig.set_size_inches(*figsize)
+        ax = self.fig.add_subplot(111, **subplot_kw)
+        self.artistas['ax'] = ax
+        return ax
+    
+    def png(self):
+        """Dibuja la figura y retorna los bytes PNG."""
+        self.fig.tight_layout()
+        buffer = io.BytesIO()
+        self.canvas.print_png(buffer)
+        return buffer.getvalue()
+    
+    def liberar(self):
+        """Suelta los artistas de la figura."""
+        self.fig.clear()
+        self.artistas.clear()
+        perfil_memoria.esperar_liberacion(self.canvas)
+
+
+def _actualizar_barras(barras, textos, valores, formato, horizontal=False):
+    """Cambia el tamaño de las barras y reubica su texto de valor."""
+    for barra, texto, valor in zip(barras, textos, valores):
+        if horizontal:
+            barra.set_width(valor)
+            texto.set_position((valor + 0.3, barra.get_y() + barra.get_height() / 2.))
+        else:
+            barra.set_height(valor)
+            texto.set_position((barra.get_x() + barra.get_width() / 2., valor))
+        texto.set_text(formato(valor))
+    ax = barras[0].axes
+    ax.relim()
+    ax.autoscale_view()
+
+
+def _actualizar_pastel(wedges, textos, autotextos, valores, etiquetas, angulo_inicial=90):
+    """Recalcula los ángulos de las rebanadas y la posición de sus etiquetas."""
+    total = float(sum(valores))
+    theta1 = angulo_inicial
+    for wedge, texto, autotexto, valor, etiqueta in zip(wedges, textos, autotextos, valores, etiquetas):
+        theta2 = theta1 + 360.0 * valor / total
+        wedge.set_theta1(theta1)
+        wedge.set_theta2(theta2)
+        medio = math.radians((theta1 + theta2) / 2.)
+        x, y = math.cos(medio), math.sin(medio)
+        # Mismas distancias que ax.pie por omisión (etiqueta 1.1, porcentaje 0.6)
+        texto.set_position((1.1 * x, 1.1 * y))
+        texto.set_horizontalalignment('left' if x > 0 else 'right')
+        texto.set_text(etiqueta)
+        autotexto.set_position((0.6 * x, 0.6 * y))
+        autotexto.set_text(f'{100.0 * valor / total:1.1f}%')
+        theta1 = theta2
+
+
+def _trabajo_png(clave, crear_grafica):
+    """Envuelve un constructor de gráfica en un trabajo (datos, pool) -> bytes PNG."""
+    def trabajo(datos, pool):
+        _load_matplotlib()
+        figura = pool.obtener(clave, FiguraReutilizable)
+        crear_grafica(datos, figura)
+        return figura.png()
+    return trabajo
+
+
+@instrumentar('graficas', 'crear_grafica_*')
 class PaginaVisualizacionDatos(QWizardPage):
-    """Página que muestra visualizaciones gráficas de los datos del estudio."""
+    """
+    Página que muestra visualizaciones gráficas de los datos del estudio.
+    
+    Las gráficas de una pestaña se generan al mostrarla; el dibujo ocurre en
+    un hilo de fondo y solo se repite si cambiaron las secciones que lee.
+    Las figuras se reutilizan entre dibujos y se liberan al cerrar el wizard.
+    """
+    
+    # Por pestaña: título y gráficas (clave, secciones que lee, altura mínima).
+    # Cada clave se dibuja con el método crear_grafica_<clave>(datos, figura).
+    PESTANAS = (
+        ("📊 Análisis Financiero Completo", (
+            ("ingresos_vs_gastos", ("situacion_financiera",), 350),
+            ("distribucion_deudas", ("situacion_financiera",), 350),
+            ("indicadores_financieros", ("situacion_financiera",), 350),
+        )),
+        ("💸 Análisis de Gastos Mensuales", (
+            ("distribucion_gastos", ("situacion_financiera",), 400),
+        )),
+        ("⚠️ Análisis de Indicadores de Riesgo", (
+            ("radar_riesgos", ("riesgos", "situacion_financiera", "informacion_familiar",
+                               "vivienda", "historial_laboral", "salud_intereses"), 450),
+        )),
+        ("🎨 Análisis de Estilo de Vida", (
+            ("actividades", ("estilo_vida", "salud_intereses"), 400),
+        )),
+    )
     
     def __init__(self, estudio):
         super().__init__()
         self.estudio = estudio
         self.setTitle("📊 Análisis Visual de Datos")
         self.setSubTitle("Visualización gráfica de la información cuantitativa recopilada")
-        self.matplotlib_initialized = False
+        self.renderizador = None
+        self.etiquetas_graficas = {}
+        # Clave de gráfica -> firma de los datos de la última solicitud
+        self._firmas = {}
         
         self.init_ui()
     
@@ -92,6 +227,10 @@ class PaginaVisualizacionDatos(QWizardPage):
         self.tab_estilo.setWidgetResizable(True)
         self.tabs.addTab(self.tab_estilo, "🎨 Estilo de Vida")
         
+        for indice in range(self.tabs.count()):
+            self._preparar_pestana(indice)
+        self.tabs.currentChanged.connect(self.generar_pestana)
+        
         main_layout.addWidget(self.tabs)
         
         # Botón para regenerar gráficas
@@ -114,72 +253,110 @@ class PaginaVisualizacionDatos(QWizardPage):
         
         self.setLayout(main_layout)
     
-    def _init_matplotlib(self):
-        """Inicializa matplotlib solo cuando se necesita (lazy loading)."""
-        if not self.matplotlib_initialized:
-            _load_matplotlib()
-            self.matplotlib_initialized = True
-    
-    def initializePage(self):
-        """Se ejecuta cuando se muestra la página."""
-        self._init_matplotlib()
-        self.generar_graficas()
-    
-    def generar_graficas(self):
-        """Genera todas las gráficas."""
-        try:
-            self.generar_tab_financiero()
-            self.generar_tab_gastos()
-            self.generar_tab_riesgos()
-            self.generar_tab_estilo_vida()
-        except Exception as e:
-            print(f"Error generando gráficas: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    def generar_tab_financiero(self):
-        """Genera gráficas de análisis financiero."""
+    def _preparar_pestana(self, indice):
+        """Crea el título y una etiqueta por gráfica; el dibujo llega después."""
+        titulo_texto, graficas = self.PESTANAS[indice]
         widget = QWidget()
         layout = QVBoxLayout()
         
-        # Título
-        titulo = QLabel("📊 Análisis Financiero Completo")
+        titulo = QLabel(titulo_texto)
         titulo.setFont(QFont("Arial", 14, QFont.Bold))
         titulo.setStyleSheet("color: #2c3e50; margin: 10px;")
         layout.addWidget(titulo)
         
-        # Datos financieros
-        finanzas = self.estudio.datos.get('situacion_financiera', {})
-        
-        # Gráfica 1: Ingresos vs Gastos vs Ahorros
-        fig1 = self.crear_grafica_ingresos_vs_gastos(finanzas)
-        canvas1 = FigureCanvas(fig1)
-        canvas1.setMinimumHeight(350)
-        layout.addWidget(canvas1)
-        
-        # Gráfica 2: Distribución de Deudas
-        fig2 = self.crear_grafica_distribucion_deudas(finanzas)
-        canvas2 = FigureCanvas(fig2)
-        canvas2.setMinimumHeight(350)
-        layout.addWidget(canvas2)
-        
-        # Gráfica 3: Indicadores Financieros
-        fig3 = self.crear_grafica_indicadores_financieros(finanzas)
-        canvas3 = FigureCanvas(fig3)
-        canvas3.setMinimumHeight(350)
-        layout.addWidget(canvas3)
+        for clave, _, altura in graficas:
+            etiqueta = QLabel("Generando gráfica...")
+            etiqueta.setAlignment(Qt.AlignCenter)
+            etiqueta.setMinimumHeight(altura)
+            etiqueta.setStyleSheet("color: #7f8c8d;")
+            self.etiquetas_graficas[clave] = etiqueta
+            layout.addWidget(etiqueta)
         
         widget.setLayout(layout)
-        self.tab_financiero.setWidget(widget)
+        self.tabs.widget(indice).setWidget(widget)
+    
+    def initializePage(self):
+        """Se ejecuta cuando se muestra la página: solo la pestaña visible."""
+        self.generar_pestana(self.tabs.currentIndex())
+    
+    def generar_graficas(self):
+        """Vuelve a dibujar las gráficas de la pestaña visible."""
+        self.generar_pestana(self.tabs.currentIndex(), forzar=True)
+    
+    def generar_pestana(self, indice, forzar=False):
+        """
+        Encola las gráficas de una pestaña cuyos datos cambiaron desde la
+        última solicitud. Solo se copian las secciones de las gráficas que
+        se van a dibujar.
+        """
+        if indice < 0:
+            return
+        if self.renderizador is None:
+            _aplicar_estilo()
+            self.renderizador = RenderizadorGraficas(self)
+            self.renderizador.grafica_lista.connect(self.mostrar_grafica)
+        
+        datos = self.estudio.datos
+        for clave, secciones, _ in self.PESTANAS[indice][1]:
+            firma = firma_datos({s: datos[s] for s in secciones if s in datos})
+            if not forzar and self._firmas.get(clave) == firma:
+                continue
+            self._firmas[clave] = firma
+            # Mismos datos ya dibujados (en esta u otra pestaña de estudio)
+            png = None if forzar else CACHE_GRAFICAS.obtener(clave, firma)
+            if png is not None:
+                contar('graficas.cache_acierto')
+                self.mostrar_grafica(clave, firma, png)
+                continue
+            contar('graficas.cache_fallo')
+            trabajo = _trabajo_png(clave, getattr(self, f"crear_grafica_{clave}"))
+            self.renderizador.solicitar(clave, firma, trabajo, copiar_secciones(datos, secciones))
+    
+    def mostrar_grafica(self, clave, firma, png):
+        """Recibe el PNG del hilo de dibujo y lo muestra en su etiqueta."""
+        if self._firmas.get(clave) != firma:
+            # Ya se pidió un dibujo con datos más recientes
+            return
+        etiqueta = self.etiquetas_graficas[clave]
+        pixmap = QPixmap()
+        if not png or not pixmap.loadFromData(png, "PNG"):
+            # Se reintenta en la siguiente visita
+            self._firmas.pop(clave, None)
+            etiqueta.setText("No se pudo generar la gráfica")
+            return
+        etiqueta.setPixmap(pixmap)
+        CACHE_GRAFICAS.guardar(clave, firma, png)
+    
+    def pausar_graficas(self, pausado):
+        """Pausa el hilo de dibujo mientras la pestaña del estudio está oculta."""
+        if self.renderizador is not None:
+            self.renderizador.pausar(pausado)
+    
+    def reasignar_estudio(self, estudio):
+        """Enlaza la página a otro estudio; las gráficas se regeneran al mostrarla."""
+        self.estudio = estudio
+        self.liberar_graficas()
+    
+    def liberar_graficas(self):
+        """
+        Detiene el hilo de dibujo (que libera sus figuras) y suelta los
+        pixmaps. Si se vuelve a mostrar la página, las gráficas se regeneran.
+        """
+        if self.renderizador is not None:
+            self.renderizador.detener()
+            self.renderizador = None
+        self._firmas.clear()
+        for etiqueta in self.etiquetas_graficas.values():
+            etiqueta.clear()
+            etiqueta.setText("Generando gráfica...")
     
-    def crear_grafica_ingresos_vs_gastos(self, finanzas):
+    @staticmethod
+    def crear_grafica_ingresos_vs_gastos(datos, figura):
         """Crea gráfica de barras: Ingresos vs Gastos vs Ahorros."""
-        fig = Figure(figsize=(10, 5), facecolor='white')
-        ax = fig.add_subplot(111)
+        finanzas = datos.get('situacion_financiera', {})
         
         ingreso = finanzas.get('sueldo_mensual', 0) or 0
         ahorros = finanzas.get('monto_ahorros_mensuales', 0) or 0
-        pagos_deudas = finanzas.get('total_pagos_mensuales_deudas', 0) or 0
         gastos_comida = (finanzas.get('gastos', {}).get('alimentacion', 0) or 0)
         gastos_vivienda = (finanzas.get('gastos', {}).get('vivienda', 0) or 0)
         gastos_transporte = (finanzas.get('gastos', {}).get('transporte', 0) or 0)
@@ -191,31 +368,35 @@ class PaginaVisualizacionDatos(QWizardPage):
                        (finanzas.get('gastos', {}).get('recreacion', 0) or 0) +
                        (finanzas.get('gastos', {}).get('otros', 0) or 0))
         
-        categorias = ['Ingresos\nMensuales', 'Gastos\nTotales', 'Ahorros\nMensuales', 'Saldo\nDisponible']
         valores = [ingreso, total_gastos, ahorros, ingreso - total_gastos - ahorros]
-        colores = ['#27ae60', '#e74c3c', '#3498db', '#f39c12']
         
-        barras = ax.bar(categorias, valores, color=colores, edgecolor='black', linewidth=1.5, alpha=0.8)
-        
-        # Añadir valores sobre las barras
-        for barra in barras:
-            altura = barra.get_height()
-            ax.text(barra.get_x() + barra.get_width()/2., altura,
-                   f'${altura:,.0f}',
-                   ha='center', va='bottom', fontweight='bold', fontsize=10)
-        
-        ax.set_ylabel('Monto ($)', fontweight='bold', fontsize=12)
-        ax.set_title('Ingresos vs Gastos vs Ahorros Mensuales', fontweight='bold', fontsize=14, pad=20)
-        ax.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
-        ax.grid(axis='y', alpha=0.3)
+        artistas = figura.artistas
+        if 'barras' not in artistas:
+            ax = figura.nueva((10, 5))
+            categorias = ['Ingresos\nMensuales', 'Gastos\nTotales', 'Ahorros\nMensuales', 'Saldo\nDisponible']
+            colores = ['#27ae60', '#e74c3c', '#3498db', '#f39c12']
+            
+            barras = ax.bar(categorias, valores, color=colores, edgecolor='black', linewidth=1.5, alpha=0.8)
+            
+            # Valores sobre las barras (se reubican en cada dibujo)
+            artistas['textos'] = [
+                ax.text(barra.get_x() + barra.get_width()/2., 0, '',
+                       ha='center', va='bottom', fontweight='bold', fontsize=10)
+                for barra in barras
+            ]
+            artistas['barras'] = list(barras)
+            
+            ax.set_ylabel('Monto ($)', fontweight='bold', fontsize=12)
+            ax.set_title('Ingresos vs Gastos vs Ahorros Mensuales', fontweight='bold', fontsize=14, pad=20)
+            ax.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
+            ax.grid(axis='y', alpha=0.3)
         
-        fig.tight_layout()
-        return fig
+        _actualizar_barras(artistas['barras'], artistas['textos'], valores, lambda v: f'${v:,.0f}')
     
-    def crear_grafica_distribucion_deudas(self, finanzas):
+    @staticmethod
+    def crear_grafica_distribucion_deudas(datos, figura):
         """Crea gráfica de pastel: Distribución de Deudas."""
-        fig = Figure(figsize=(10, 5), facecolor='white')
-        ax = fig.add_subplot(111)
+        finanzas = datos.get('situacion_financiera', {})
         
         deuda_tarjetas = finanzas.get('deuda_tarjetas_total', 0) or 0
         prestamos = finanzas.get('monto_prestamos_personales', 0) or 0
@@ -229,30 +410,38 @@ class PaginaVisualizacionDatos(QWizardPage):
         if not finanzas.get('tiene_prestamo_auto', False):
             auto = 0
         
-        if deuda_tarjetas + prestamos + hipoteca + auto == 0:
-            ax.text(0.5, 0.5, '✅ Sin Deudas Registradas', 
-                   ha='center', va='center', fontsize=16, fontweight='bold', color='#27ae60')
-            ax.set_xlim(0, 1)
-            ax.set_ylim(0, 1)
-            ax.axis('off')
-        else:
-            etiquetas = []
-            valores = []
+        etiquetas = []
+        valores = []
+        if prestamos > 0:
+            etiquetas.append(f'Préstamos\n${prestamos:,.0f}')
+            valores.append(prestamos)
+        if hipoteca > 0:
+            etiquetas.append(f'Hipoteca\n${hipoteca:,.0f}')
+            valores.append(hipoteca)
+        if auto > 0:
+            etiquetas.append(f'Auto\n${auto:,.0f}')
+            valores.append(auto)
+        if deuda_tarjetas > 0:
+            etiquetas.append(f'Tarjetas\n${deuda_tarjetas:,.0f}')
+            valores.append(deuda_tarjetas)
+        
+        artistas = figura.artistas
+        if not valores:
+            if artistas.get('modo') != 'vacio':
+                ax = figura.nueva((10, 5))
+                ax.text(0.5, 0.5, '✅ Sin Deudas Registradas', 
+                       ha='center', va='center', fontsize=16, fontweight='bold', color='#27ae60')
+                ax.set_xlim(0, 1)
+                ax.set_ylim(0, 1)
+                ax.axis('off')
+                artistas['modo'] = 'vacio'
+            return
+        
+        modo = ('pastel', len(valores))
+        if artistas.get('modo') != modo:
+            ax = figura.nueva((10, 5))
             colores_pastel = ['#e74c3c', '#e67e22', '#f39c12', '#3498db']
             
-            if prestamos > 0:
-                etiquetas.append(f'Préstamos\n${prestamos:,.0f}')
-                valores.append(prestamos)
-            if hipoteca > 0:
-                etiquetas.append(f'Hipoteca\n${hipoteca:,.0f}')
-                valores.append(hipoteca)
-            if auto > 0:
-                etiquetas.append(f'Auto\n${auto:,.0f}')
-                valores.append(auto)
-            if deuda_tarjetas > 0:
-                etiquetas.append(f'Tarjetas\n${deuda_tarjetas:,.0f}')
-                valores.append(deuda_tarjetas)
-            
             wedges, texts, autotexts = ax.pie(valores, labels=etiquetas, autopct='%1.1f%%',
                                               colors=colores_pastel[:len(valores)],
                                               startangle=90, textprops={'fontweight': 'bold'})
@@ -260,21 +449,19 @@ class PaginaVisualizacionDatos(QWizardPage):
             for autotext in autotexts:
                 autotext.set_color('white')
                 autotext.set_fontsize(11)
-            
-            ax.set_title(f'Distribución de Deudas\nTotal: ${sum(valores):,.0f}', 
-                        fontweight='bold', fontsize=14, pad=20)
+            artistas.update(modo=modo, pastel=(wedges, texts, autotexts))
+        else:
+            _actualizar_pastel(*artistas['pastel'], valores, etiquetas)
         
-        fig.tight_layout()
-        return fig
+        artistas['ax'].set_title(f'Distribución de Deudas\nTotal: ${sum(valores):,.0f}', 
+                                 fontweight='bold', fontsize=14, pad=20)
     
-    def crear_grafica_indicadores_financieros(self, finanzas):
+    @staticmethod
+    def crear_grafica_indicadores_financieros(datos, figura):
         """Crea gráfica de indicadores financieros clave."""
-        fig = Figure(figsize=(10, 5), facecolor='white')
-        ax = fig.add_subplot(111)
+        finanzas = datos.get('situacion_financiera', {})
         
         ingreso = finanzas.get('sueldo_mensual', 0) or 1
-        gastos = (finanzas.get('gastos', {}).get('total', 0) or 
-                 sum((finanzas.get('gastos', {}) or {}).values()))
         ahorros = finanzas.get('monto_ahorros_mensuales', 0) or 0
         total_deudas = finanzas.get('total_deudas', 0) or 0
         
@@ -286,61 +473,43 @@ class PaginaVisualizacionDatos(QWizardPage):
         ahorro_saludable = 20  # 20% ideal
         deuda_maxima = 35  # 35% máximo recomendado
         
-        indicadores = ['% Ahorro\n(meta: 20%)', '% Deudas/Ingreso\n(max: 35%)']
         valores_actuales = [porcentaje_ahorro, porcentaje_deudas]
         valores_referencia = [ahorro_saludable, deuda_maxima]
         
-        x = np.arange(len(indicadores))
-        ancho = 0.35
-        
-        barras1 = ax.bar(x - ancho/2, valores_actuales, ancho, label='Valor Actual',
-                        color=['#3498db', '#e74c3c'], alpha=0.8, edgecolor='black')
-        barras2 = ax.bar(x + ancho/2, valores_referencia, ancho, label='Valor Referencia',
-                        color=['#95a5a6', '#95a5a6'], alpha=0.5, edgecolor='black')
-        
-        ax.set_ylabel('Porcentaje (%)', fontweight='bold', fontsize=12)
-        ax.set_title('Indicadores Financieros Clave', fontweight='bold', fontsize=14, pad=20)
-        ax.set_xticks(x)
-        ax.set_xticklabels(indicadores, fontweight='bold')
-        ax.legend(loc='upper right')
-        ax.grid(axis='y', alpha=0.3)
-        
-        # Añadir valores sobre las barras
-        for barras in [barras1, barras2]:
-            for barra in barras:
-                altura = barra.get_height()
-                ax.text(barra.get_x() + barra.get_width()/2., altura,
-                       f'{altura:.1f}%',
+        artistas = figura.artistas
+        if 'barras' not in artistas:
+            ax = figura.nueva((10, 5))
+            indicadores = ['% Ahorro\n(meta: 20%)', '% Deudas/Ingreso\n(max: 35%)']
+            x = np.arange(len(indicadores))
+            ancho = 0.35
+            
+            barras1 = ax.bar(x - ancho/2, valores_actuales, ancho, label='Valor Actual',
+                            color=['#3498db', '#e74c3c'], alpha=0.8, edgecolor='black')
+            barras2 = ax.bar(x + ancho/2, valores_referencia, ancho, label='Valor Referencia',
+                            color=['#95a5a6', '#95a5a6'], alpha=0.5, edgecolor='black')
+            
+            ax.set_ylabel('Porcentaje (%)', fontweight='bold', fontsize=12)
+            ax.set_title('Indicadores Financieros Clave', fontweight='bold', fontsize=14, pad=20)
+            ax.set_xticks(x)
+            ax.set_xticklabels(indicadores, fontweight='bold')
+            ax.legend(loc='upper right')
+            ax.grid(axis='y', alpha=0.3)
+            
+            # Valores sobre las barras (se reubican en cada dibujo)
+            artistas['barras'] = list(barras1) + list(barras2)
+            artistas['textos'] = [
+                ax.text(barra.get_x() + barra.get_width()/2., 0, '',
                        ha='center', va='bottom', fontweight='bold', fontsize=9)
+                for barra in artistas['barras']
+            ]
         
-        fig.tight_layout()
-        return fig
+        _actualizar_barras(artistas['barras'], artistas['textos'],
+                           valores_actuales + valores_referencia, lambda v: f'{v:.1f}%')
     
-    def generar_tab_gastos(self):
-        """Genera gráficas de distribución de gastos."""
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        titulo = QLabel("💸 Análisis de Gastos Mensuales")
-        titulo.setFont(QFont("Arial", 14, QFont.Bold))
-        titulo.setStyleSheet("color: #2c3e50; margin: 10px;")
-        layout.addWidget(titulo)
-        
-        # Gráfica de distribución de gastos
-        fig = self.crear_grafica_distribucion_gastos()
-        canvas = FigureCanvas(fig)
-        canvas.setMinimumHeight(400)
-        layout.addWidget(canvas)
-        
-        widget.setLayout(layout)
-        self.tab_gastos.setWidget(widget)
-    
-    def crear_grafica_distribucion_gastos(self):
+    @staticmethod
+    def crear_grafica_distribucion_gastos(datos, figura):
         """Crea gráfica de pastel con distribución de gastos."""
-        fig = Figure(figsize=(10, 6), facecolor='white')
-        ax = fig.add_subplot(111)
-        
-        finanzas = self.estudio.datos.get('situacion_financiera', {})
+        finanzas = datos.get('situacion_financiera', {})
         gastos = finanzas.get('gastos', {}) or {}
         
         # Recopilar gastos
@@ -358,16 +527,24 @@ class PaginaVisualizacionDatos(QWizardPage):
         # Filtrar gastos mayores a 0
         gastos_filtrados = {k: v for k, v in gastos_data.items() if v > 0}
         
+        artistas = figura.artistas
         if not gastos_filtrados:
-            ax.text(0.5, 0.5, '📊 Sin Gastos Registrados', 
-                   ha='center', va='center', fontsize=16, fontweight='bold', color='#7f8c8d')
-            ax.set_xlim(0, 1)
-            ax.set_ylim(0, 1)
-            ax.axis('off')
-        else:
-            etiquetas = [f'{k}\n${v:,.0f}' for k, v in gastos_filtrados.items()]
-            valores = list(gastos_filtrados.values())
-            
+            if artistas.get('modo') != 'vacio':
+                ax = figura.nueva((10, 6))
+                ax.text(0.5, 0.5, '📊 Sin Gastos Registrados', 
+                       ha='center', va='center', fontsize=16, fontweight='bold', color='#7f8c8d')
+                ax.set_xlim(0, 1)
+                ax.set_ylim(0, 1)
+                ax.axis('off')
+                artistas['modo'] = 'vacio'
+            return
+        
+        etiquetas = [f'{k}\n${v:,.0f}' for k, v in gastos_filtrados.items()]
+        valores = list(gastos_filtrados.values())
+        
+        modo = ('pastel', len(valores))
+        if artistas.get('modo') != modo:
+            ax = figura.nueva((10, 6))
             # Paleta de colores profesional
             colores = ['#3498db', '#e74c3c', '#f39c12', '#27ae60', '#9b59b6', 
                       '#1abc9c', '#e67e22', '#34495e']
@@ -379,47 +556,24 @@ class PaginaVisualizacionDatos(QWizardPage):
             for autotext in autotexts:
                 autotext.set_color('white')
                 autotext.set_fontsize(10)
-            
-            total = sum(valores)
-            ax.set_title(f'Distribución de Gastos Mensuales\nTotal: ${total:,.0f}', 
-                        fontweight='bold', fontsize=14, pad=20)
-        
-        fig.tight_layout()
-        return fig
-    
-    def generar_tab_riesgos(self):
-        """Genera gráficas de indicadores de riesgo."""
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        titulo = QLabel("⚠️ Análisis de Indicadores de Riesgo")
-        titulo.setFont(QFont("Arial", 14, QFont.Bold))
-        titulo.setStyleSheet("color: #2c3e50; margin: 10px;")
-        layout.addWidget(titulo)
-        
-        # Gráfica de radar para riesgos
-        fig = self.crear_grafica_radar_riesgos()
-        canvas = FigureCanvas(fig)
-        canvas.setMinimumHeight(450)
-        layout.addWidget(canvas)
+            artistas.update(modo=modo, pastel=(wedges, texts, autotexts))
+        else:
+            _actualizar_pastel(*artistas['pastel'], valores, etiquetas)
         
-        widget.setLayout(layout)
-        self.tab_riesgos.setWidget(widget)
+        total = sum(valores)
+        artistas['ax'].set_title(f'Distribución de Gastos Mensuales\nTotal: ${total:,.0f}', 
+                                 fontweight='bold', fontsize=14, pad=20)
     
-    def crear_grafica_radar_riesgos(self):
+    @staticmethod
+    def crear_grafica_radar_riesgos(datos, figura):
         """Crea gráfica de radar para indicadores de riesgo."""
-        fig = Figure(figsize=(10, 7), facecolor='white')
-        ax = fig.add_subplot(111, projection='polar')
-        
         # Obtener riesgos del estudio
-        riesgos_data = self.estudio.datos.get('riesgos', {})
+        riesgos_data = datos.get('riesgos', {})
         
         # Si no hay datos de riesgos, usar valores predeterminados
         if not riesgos_data:
             # Intentar calcular riesgos desde los datos disponibles
-            riesgos_data = self._calcular_riesgos_desde_datos()
-        
-        categorias = ['Financiero', 'Familiar', 'Vivienda', 'Laboral', 'Salud', 'Estilo Vida']
+            riesgos_data = PaginaVisualizacionDatos._calcular_riesgos_desde_datos(datos)
         
         def get_riesgo_valor(key):
             """Extrae el valor numérico de riesgo de un dict o número."""
@@ -442,13 +596,22 @@ class PaginaVisualizacionDatos(QWizardPage):
         # Completar el círculo
         valores_plot = valores + valores[:1]
         
+        artistas = figura.artistas
+        if 'linea' in artistas:
+            artistas['linea'].set_ydata(valores_plot)
+            artistas['relleno'].set_xy(np.column_stack([artistas['angulos'], valores_plot]))
+            return
+        
+        ax = figura.nueva((10, 7), projection='polar')
+        categorias = ['Financiero', 'Familiar', 'Vivienda', 'Laboral', 'Salud', 'Estilo Vida']
+        
         # Ángulos
         angulos = np.linspace(0, 2 * np.pi, len(categorias), endpoint=False).tolist()
         angulos += angulos[:1]
         
         # Dibujar
-        ax.plot(angulos, valores_plot, 'o-', linewidth=2, color='#e74c3c', label='Nivel de Riesgo')
-        ax.fill(angulos, valores_plot, alpha=0.25, color='#e74c3c')
+        linea, = ax.plot(angulos, valores_plot, 'o-', linewidth=2, color='#e74c3c', label='Nivel de Riesgo')
+        relleno, = ax.fill(angulos, valores_plot, alpha=0.25, color='#e74c3c')
         
         # Zona segura (riesgo < 3)
         zona_segura = [3] * len(angulos)
@@ -464,16 +627,16 @@ class PaginaVisualizacionDatos(QWizardPage):
         ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1))
         ax.grid(True, alpha=0.3)
         
-        fig.tight_layout()
-        return fig
+        artistas.update(linea=linea, relleno=relleno, angulos=angulos)
     
-    def _calcular_riesgos_desde_datos(self):
+    @staticmethod
+    def _calcular_riesgos_desde_datos(datos):
         """Calcula riesgos desde los datos disponibles del estudio."""
         try:
             riesgos = {}
             
             # Riesgo Financiero: basado en balance y gastos
-            finanzas = self.estudio.datos.get('situacion_financiera', {})
+            finanzas = datos.get('situacion_financiera', {})
             gastos = finanzas.get('gastos', {}) or {}
             ingreso = finanzas.get('sueldo_mensual', 0) or 0
             total_gastos = sum(gastos.values()) if gastos else 0
@@ -489,7 +652,7 @@ class PaginaVisualizacionDatos(QWizardPage):
                 riesgos['financiero'] = 2  # Bajo riesgo
             
             # Riesgo Familiar: basado en dependientes
-            familia = self.estudio.datos.get('informacion_familiar', {})
+            familia = datos.get('informacion_familiar', {})
             numero_hijos = familia.get('numero_hijos', 0)
             miembros = familia.get('miembros_hogar', [])
             dependientes = sum(1 for m in miembros if isinstance(m, dict) and m.get('es_dependiente', True))
@@ -502,7 +665,7 @@ class PaginaVisualizacionDatos(QWizardPage):
                 riesgos['familiar'] = 2
             
             # Riesgo de Vivienda
-            vivienda = self.estudio.datos.get('vivienda', {})
+            vivienda = datos.get('vivienda', {})
             tipo_vivienda = vivienda.get('tipo_vivienda', '')
             if tipo_vivienda == 'Rentada':
                 riesgos['vivienda'] = 3
@@ -512,7 +675,7 @@ class PaginaVisualizacionDatos(QWizardPage):
                 riesgos['vivienda'] = 2
             
             # Riesgo Laboral (basado en estabilidad)
-            historial = self.estudio.datos.get('historial_laboral', [])
+            historial = datos.get('historial_laboral', [])
             if isinstance(historial, list):
                 if len(historial) > 3:
                     riesgos['laboral'] = 3  # Muchos trabajos previos
@@ -522,7 +685,7 @@ class PaginaVisualizacionDatos(QWizardPage):
                 riesgos['laboral'] = 2
             
             # Riesgo Salud
-            salud = self.estudio.datos.get('salud_intereses', {})
+            salud = datos.get('salud_intereses', {})
             padecimientos = salud.get('padecimientos', '')
             if padecimientos and padecimientos.lower() not in ['', 'ninguno', 'ninguna']:
                 riesgos['salud'] = 3
@@ -537,32 +700,11 @@ class PaginaVisualizacionDatos(QWizardPage):
             print(f"Error calculando riesgos: {e}")
             return {'financiero': 2, 'familiar': 2, 'vivienda': 2, 'laboral': 2, 'salud': 2, 'estilo_vida': 2}
     
-    def generar_tab_estilo_vida(self):
-        """Genera gráficas de estilo de vida."""
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        titulo = QLabel("🎨 Análisis de Estilo de Vida")
-        titulo.setFont(QFont("Arial", 14, QFont.Bold))
-        titulo.setStyleSheet("color: #2c3e50; margin: 10px;")
-        layout.addWidget(titulo)
-        
-        # Gráfica de actividades
-        fig = self.crear_grafica_actividades()
-        canvas = FigureCanvas(fig)
-        canvas.setMinimumHeight(400)
-        layout.addWidget(canvas)
-        
-        widget.setLayout(layout)
-        self.tab_estilo.setWidget(widget)
-    
-    def crear_grafica_actividades(self):
+    @staticmethod
+    def crear_grafica_actividades(datos, figura):
         """Crea gráfica de barras horizontales para actividades."""
-        fig = Figure(figsize=(10, 6), facecolor='white')
-        ax = fig.add_subplot(111)
-        
-        estilo = self.estudio.datos.get('estilo_vida', {})
-        salud = self.estudio.datos.get('salud_intereses', {})
+        estilo = datos.get('estilo_vida', {})
+        salud = datos.get('salud_intereses', {})
         
         actividades = {
             'Hobbies': estilo.get('numero_hobbies', 0) or 0,
@@ -573,34 +715,40 @@ class PaginaVisualizacionDatos(QWizardPage):
             'Copas/Semana': salud.get('copas_por_semana', 0) or 0,
             'Cigarros/Día': salud.get('cigarros_por_dia', 0) or 0
         }
-        
-        # Colores según tipo de actividad
-        colores = {
-            'Hobbies': '#9b59b6',
-            'Salidas/Mes': '#3498db',
-            'Viajes/Año': '#1abc9c',
-            'Ejercicio/Semana': '#27ae60',
-            'Actividades Culturales/Mes': '#f39c12',
-            'Copas/Semana': '#e67e22',
-            'Cigarros/Día': '#e74c3c'
-        }
-        
-        categorias = list(actividades.keys())
         valores = list(actividades.values())
-        colores_barras = [colores.get(cat, '#34495e') for cat in categorias]
-        
-        barras = ax.barh(categorias, valores, color=colores_barras, edgecolor='black', linewidth=1, alpha=0.8)
-        
-        # Añadir valores al final de las barras
-        for i, (barra, valor) in enumerate(zip(barras, valores)):
-            ax.text(valor + 0.3, i, str(int(valor)), va='center', fontweight='bold', fontsize=10)
-        
-        ax.set_xlabel('Frecuencia', fontweight='bold', fontsize=12)
-        ax.set_title('Frecuencia de Actividades y Hábitos', fontweight='bold', fontsize=14, pad=20)
-        ax.grid(axis='x', alpha=0.3)
         
-        # Invertir eje Y para que el primer elemento esté arriba
-        ax.invert_yaxis()
+        artistas = figura.artistas
+        if 'barras' not in artistas:
+            ax = figura.nueva((10, 6))
+            # Colores según tipo de actividad
+            colores = {
+                'Hobbies': '#9b59b6',
+                'Salidas/Mes': '#3498db',
+                'Viajes/Año': '#1abc9c',
+                'Ejercicio/Semana': '#27ae60',
+                'Actividades Culturales/Mes': '#f39c12',
+                'Copas/Semana': '#e67e22',
+                'Cigarros/Día': '#e74c3c'
+            }
+            
+            categorias = list(actividades.keys())
+            colores_barras = [colores.get(cat, '#34495e') for cat in categorias]
+            
+            barras = ax.barh(categorias, valores, color=colores_barras, edgecolor='black', linewidth=1, alpha=0.8)
+            
+            # Valores al final de las barras (se reubican en cada dibujo)
+            artistas['barras'] = list(barras)
+            artistas['textos'] = [
+                ax.text(0, i, '', va='center', fontweight='bold', fontsize=10)
+                for i in range(len(barras))
+            ]
+            
+            ax.set_xlabel('Frecuencia', fontweight='bold', fontsize=12)
+            ax.set_title('Frecuencia de Actividades y Hábitos', fontweight='bold', fontsize=14, pad=20)
+            ax.grid(axis='x', alpha=0.3)
+            
+            # Invertir eje Y para que el primer elemento esté arriba
+            ax.invert_yaxis()
         
-        fig.tight_layout()
-        return fig
+        _actualizar_barras(artistas['barras'], artistas['textos'], valores,
+                           lambda v: str(int(v)), horizontal=True)
@@ -18,9 +18,11 @@ from PyQt5.QtGui import QFont
 import os
 import shutil
 from datetime import datetime
+from src.ui.seguimiento_cambios import SeguimientoCambios
+from src.logic.campos_derivados import recalcular_derivados
 
 
-class PaginaBase(QWizardPage):
+class PaginaBase(SeguimientoCambios, QWizardPage):
     """Clase base para todas las páginas del wizard."""
     
     def __init__(self, estudio, titulo, parent=None):
@@ -41,6 +43,8 @@ class PaginaBase(QWizardPage):
 class PaginaDatosPersonales(PaginaBase):
     """Página 1: Datos Personales."""
     
+    SECCIONES = ("datos_personales",)
+    
     def __init__(self, estudio):
         super().__init__(estudio, "Datos Personales")
         self.init_ui()
@@ -238,6 +242,8 @@ class PaginaDatosPersonales(PaginaBase):
 class PaginaSaludIntereses(PaginaBase):
     """Página 2: Salud e Intereses."""
     
+    SECCIONES = ("salud_intereses",)
+    
     def __init__(self, estudio):
         super().__init__(estudio, "Salud e Intereses Personales")
         self.init_ui()
@@ -329,6 +335,8 @@ class PaginaSaludIntereses(PaginaBase):
 class PaginaInformacionFamiliar(PaginaBase):
     """Página 3: Información Familiar."""
     
+    SECCIONES = ("informacion_familiar",)
+    
     def __init__(self, estudio):
         super().__init__(estudio, "Información Familiar")
         self.init_ui()
@@ -482,9 +490,8 @@ class PaginaInformacionFamiliar(PaginaBase):
         
         fam['miembros_hogar'] = miembros
         
-        # Calcular ingreso total
-        total = sum(m['ingreso'] for m in miembros)
-        fam['ingreso_familiar_total'] = total
+        # Ingreso total, per cápita y porcentaje de dependientes
+        recalcular_derivados(self.estudio.datos, ['informacion_familiar'])
     
     def cargar_datos(self):
         """Carga los datos desde el estudio."""
@@ -522,6 +529,8 @@ from src.ui.paginas_parte2 import PaginaSituacionFinanciera, PaginaVivienda
 class PaginaHistorialLaboral(PaginaBase):
     """Página 6: Historial Laboral."""
     
+    SECCIONES = ("historial_laboral",)
+    
     def __init__(self, estudio):
         super().__init__(estudio, "Historial Laboral")
         self.init_ui()
@@ -631,6 +640,8 @@ class PaginaHistorialLaboral(PaginaBase):
 class PaginaReferencias(PaginaBase):
     """Página 7: Referencias Personales."""
     
+    SECCIONES = ("referencias",)
+    
     def __init__(self, estudio):
         super().__init__(estudio, "Referencias Personales")
         self.init_ui()
@@ -735,6 +746,8 @@ class PaginaReferencias(PaginaBase):
 class PaginaConclusiones(PaginaBase):
     """Página 8: Conclusiones del Evaluador."""
     
+    SECCIONES = ("conclusiones",)
+    
     def __init__(self, estudio):
         super().__init__(estudio, "Conclusiones y Recomendaciones")
         self.init_ui()
@@ -775,6 +788,8 @@ class PaginaConclusiones(PaginaBase):
 class PaginaFotografias(PaginaBase):
     """Página 9: Fotografías."""
     
+    SECCIONES = ("fotos",)
+    
     def __init__(self, estudio):
         super().__init__(estudio, "Evidencia Fotográfica")
         self.init_ui()
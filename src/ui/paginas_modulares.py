@@ -9,31 +9,69 @@ from PyQt5.QtWidgets import (
     QWizardPage, QVBoxLayout, QLabel, QMessageBox
 )
 from PyQt5.QtCore import Qt
-from .configuracion_campos import ConfiguracionCampos
+from .especificacion_campos import especificacion
 from .generador_formularios import GeneradorFormularios
-from typing import Dict, Any
+from .seguimiento_cambios import SeguimientoCambios, conectar_arbol
+from typing import Dict, Any, Set
 
 
-class PaginaBaseModular(QWizardPage):
+class PaginaBaseModular(SeguimientoCambios, QWizardPage):
     """
     Clase base modular para páginas del wizard.
     Genera automáticamente formularios desde configuración.
+    Con seguimiento activo solo se vuelcan al estudio los campos editados.
     """
     
     def __init__(self, estudio, titulo: str, seccion_datos: str, parent=None):
         super().__init__(parent)
         self.estudio = estudio
         self.seccion_datos = seccion_datos
+        self.SECCIONES = (seccion_datos,)
         self.setTitle(titulo)
         
         self.form_data = None  # Se llenará con crear_formulario_desde_config
+        self._campos_sucios: Set[str] = set()
+    
+    def iniciar_seguimiento(self, al_editar=None):
+        """Conecta cada campo del formulario para saber cuáles se editaron."""
+        if self.seguimiento_activo() or not self.form_data:
+            return
+        self._al_editar = al_editar
+        for campo_id, widget in self.form_data['widgets'].items():
+            conectar_arbol(widget, lambda campo=campo_id: self.marcar_cambio(campo))
+        self._seguimiento_activo = True
+        # Primer volcado completo, como si todos los campos se hubieran editado
+        self.marcar_todo_pendiente()
+    
+    def marcar_todo_pendiente(self):
+        super().marcar_todo_pendiente()
+        if self.form_data:
+            self._campos_sucios = set(self.form_data['getters'])
+    
+    def reiniciar_controles(self):
+        """Cada setter acepta None y deja su control vacío."""
+        if not self.form_data:
+            return
+        for set_func in self.form_data['setters'].values():
+            set_func(None)
+    
+    def marcar_cambio(self, campo=None):
+        if self._suspendido:
+            return
+        super().marcar_cambio(campo)
+        if campo:
+            self._campos_sucios.add(campo)
+    
+    def limpiar_cambios(self):
+        super().limpiar_cambios()
+        self._campos_sucios.clear()
         
     def crear_formulario_desde_config(self, campos_config, subtitulo: str = ""):
         """
         Crea el formulario automáticamente desde configuración de campos.
         
         Args:
-            campos_config: Lista de configuraciones de campos
+            campos_config: Formulario compilado (especificacion) o lista de campos
             subtitulo: Texto explicativo para mostrar arriba
         """
         layout = QVBoxLayout()
@@ -64,8 +102,14 @@ class PaginaBaseModular(QWizardPage):
         
         seccion = self.estudio.datos.get(self.seccion_datos, {})
         
-        for campo_id, get_func in self.form_data['getters'].items():
-            valor = get_func()
+        getters = self.form_data['getters']
+        if self.seguimiento_activo():
+            campos = [c for c in getters if c in self._campos_sucios]
+        else:
+            campos = list(getters)
+        
+        for campo_id in campos:
+            valor = getters[campo_id]()
             seccion[campo_id] = valor
         
         self.estudio.datos[self.seccion_datos] = seccion
@@ -87,8 +131,8 @@ class PaginaBaseModular(QWizardPage):
     
     def validatePage(self):
         """Valida la página antes de continuar."""
-        # Guardar datos automáticamente
-        self.guardar_datos()
+        # Guardar datos automáticamente (solo si hubo cambios)
+        self.sincronizar_datos()
         return True
 
 
@@ -109,7 +153,7 @@ class PaginaDatosPersonalesModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automáticamente."""
-        campos = ConfiguracionCampos.obtener_campos_datos_personales()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -140,7 +184,7 @@ class PaginaSaludModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automáticamente."""
-        campos = ConfiguracionCampos.obtener_campos_salud()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -166,7 +210,7 @@ class PaginaEmpleoActualModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automáticamente."""
-        campos = ConfiguracionCampos.obtener_campos_empleo_actual()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -192,7 +236,7 @@ class PaginaEstiloVidaModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automáticamente."""
-        campos = ConfiguracionCampos.obtener_campos_estilo_vida()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -218,7 +262,7 @@ class PaginaValidacionDocumentalModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automaticamente."""
-        campos = ConfiguracionCampos.obtener_campos_validacion_documental()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -244,7 +288,7 @@ class PaginaInvestigacionVecinalModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automaticamente."""
-        campos = ConfiguracionCampos.obtener_campos_investigacion_vecinal()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -270,7 +314,7 @@ class PaginaAnalisisCualitativoModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automaticamente."""
-        campos = ConfiguracionCampos.obtener_campos_analisis_cualitativo()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -296,7 +340,7 @@ class PaginaInvestigadorModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automaticamente."""
-        campos = ConfiguracionCampos.obtener_campos_investigador()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -322,7 +366,7 @@ class PaginaInformacionFamiliarModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automaticamente."""
-        campos = ConfiguracionCampos.obtener_campos_informacion_familiar()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -348,7 +392,7 @@ class PaginaSituacionFinancieraModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automaticamente."""
-        campos = ConfiguracionCampos.obtener_campos_situacion_financiera()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
@@ -374,7 +418,7 @@ class PaginaViviendaModular(PaginaBaseModular):
     
     def init_ui(self):
         """Inicializa la interfaz automaticamente."""
-        campos = ConfiguracionCampos.obtener_campos_vivienda()
+        campos = especificacion(self.seccion_datos)
         
         self.crear_formulario_desde_config(
             campos,
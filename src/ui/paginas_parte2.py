@@ -16,11 +16,15 @@ from PyQt5.QtGui import QPixmap
 import os
 import shutil
 from datetime import datetime
+from src.ui.seguimiento_cambios import SeguimientoCambios
+from src.logic.campos_derivados import calcular_derivado, recalcular_derivados
 
 
-class PaginaSituacionFinanciera(QWizardPage):
+class PaginaSituacionFinanciera(SeguimientoCambios, QWizardPage):
     """Página 4: Situación Financiera."""
     
+    SECCIONES = ("situacion_financiera",)
+    
     def __init__(self, estudio):
         super().__init__()
         self.estudio = estudio
@@ -186,38 +190,49 @@ class PaginaSituacionFinanciera(QWizardPage):
         # Conectar cambios de sueldo
         self.campos['sueldo_mensual'].valueChanged.connect(self.calcular_totales)
     
+    def leer_campos(self):
+        """Valores capturados en la página, con la forma de la sección situacion_financiera."""
+        fin = {
+            'trabaja_actualmente': self.campos['trabaja_actualmente'].isChecked(),
+            'empresa_actual': self.campos['empresa_actual'].text(),
+            'puesto_actual': self.campos['puesto_actual'].text(),
+            'sueldo_mensual': self.campos['sueldo_mensual'].value(),
+            'horario': self.campos['horario'].text(),
+            'gastos': {
+                key: self.campos[f'gasto_{key}'].value()
+                for key in ['alimentacion', 'salud', 'educacion', 'recreacion', 'vivienda', 'transporte', 'servicios', 'otros']
+            },
+            'tiene_prestamos_personales': self.campos['tiene_prestamos_personales'].isChecked(),
+            'monto_prestamos_personales': self.campos['monto_prestamos_personales'].value(),
+            'tiene_prestamo_hipotecario': self.campos['tiene_prestamo_hipotecario'].isChecked(),
+            'monto_hipoteca': self.campos['monto_hipoteca'].value(),
+            'pago_mensual_hipoteca': self.campos['pago_mensual_hipoteca'].value(),
+            'tiene_prestamo_auto': self.campos['tiene_prestamo_auto'].isChecked(),
+            'monto_prestamo_auto': self.campos['monto_prestamo_auto'].value(),
+            'pago_mensual_auto': self.campos['pago_mensual_auto'].value(),
+            'observaciones_financieras': self.campos['observaciones_financieras'].toPlainText(),
+        }
+        return fin
+    
     def calcular_totales(self):
         """Calcula los totales de gastos y balance."""
-        # Calcular total de gastos
-        total_gastos = 0
-        for key in ['alimentacion', 'salud', 'educacion', 'recreacion', 'vivienda', 'transporte', 'servicios', 'otros']:
-            total_gastos += self.campos[f'gasto_{key}'].value()
+        # Los totales salen del motor de campos derivados, aplicado a lo
+        # capturado en pantalla sobre el resto de la sección
+        fin = dict(self.estudio.datos.get('situacion_financiera', {}))
+        fin.update(self.leer_campos())
+        datos = {'situacion_financiera': fin}
         
+        total_gastos = calcular_derivado(datos, 'situacion_financiera.gastos.total')
         self.campos['total_gastos'].setText(f"${total_gastos:,.2f}")
         
-        # Calcular total de deudas
-        total_deudas = 0
-        if self.campos['tiene_prestamos_personales'].isChecked():
-            total_deudas += self.campos['monto_prestamos_personales'].value()
-        if self.campos['tiene_prestamo_hipotecario'].isChecked():
-            total_deudas += self.campos['monto_hipoteca'].value()
-        if self.campos['tiene_prestamo_auto'].isChecked():
-            total_deudas += self.campos['monto_prestamo_auto'].value()
-        
+        total_deudas = calcular_derivado(datos, 'situacion_financiera.total_deudas')
         self.campos['total_deudas'].setText(f"${total_deudas:,.2f}")
         
-        # Calcular total pagos mensuales de deudas
-        total_pagos_deudas = 0
-        if self.campos['tiene_prestamo_hipotecario'].isChecked():
-            total_pagos_deudas += self.campos['pago_mensual_hipoteca'].value()
-        if self.campos['tiene_prestamo_auto'].isChecked():
-            total_pagos_deudas += self.campos['pago_mensual_auto'].value()
-        
+        total_pagos_deudas = calcular_derivado(datos, 'situacion_financiera.total_pagos_mensuales_deudas')
         self.campos['total_pagos_mensuales_deudas'].setText(f"${total_pagos_deudas:,.2f}")
         
-        # Calcular balance (considerando gastos + pagos de deudas)
-        sueldo = self.campos['sueldo_mensual'].value()
-        balance = sueldo - total_gastos - total_pagos_deudas
+        # Balance: ingreso - gastos - pagos de deudas
+        balance = calcular_derivado(datos, 'situacion_financiera.balance')
         
         self.campos['balance'].setText(f"${balance:,.2f}")
         
@@ -230,44 +245,10 @@ class PaginaSituacionFinanciera(QWizardPage):
     def guardar_datos(self):
         """Guarda los datos en el estudio."""
         fin = self.estudio.datos['situacion_financiera']
+        fin.update(self.leer_campos())
         
-        fin['trabaja_actualmente'] = self.campos['trabaja_actualmente'].isChecked()
-        fin['empresa_actual'] = self.campos['empresa_actual'].text()
-        fin['puesto_actual'] = self.campos['puesto_actual'].text()
-        fin['sueldo_mensual'] = self.campos['sueldo_mensual'].value()
-        fin['horario'] = self.campos['horario'].text()
-        
-        # Gastos
-        gastos = {}
-        for key in ['alimentacion', 'salud', 'educacion', 'recreacion', 'vivienda', 'transporte', 'servicios', 'otros']:
-            gastos[key] = self.campos[f'gasto_{key}'].value()
-        
-        gastos['total'] = sum(gastos.values())
-        fin['gastos'] = gastos
-        
-        # Préstamos y deudas
-        fin['tiene_prestamos_personales'] = self.campos['tiene_prestamos_personales'].isChecked()
-        fin['monto_prestamos_personales'] = self.campos['monto_prestamos_personales'].value()
-        fin['tiene_prestamo_hipotecario'] = self.campos['tiene_prestamo_hipotecario'].isChecked()
-        fin['monto_hipoteca'] = self.campos['monto_hipoteca'].value()
-        fin['pago_mensual_hipoteca'] = self.campos['pago_mensual_hipoteca'].value()
-        fin['tiene_prestamo_auto'] = self.campos['tiene_prestamo_auto'].isChecked()
-        fin['monto_prestamo_auto'] = self.campos['monto_prestamo_auto'].value()
-        fin['pago_mensual_auto'] = self.campos['pago_mensual_auto'].value()
-        
-        # Calcular totales
-        total_deudas = 0
-        if fin['tiene_prestamos_personales']:
-            total_deudas += fin['monto_prestamos_personales']
-        if fin['tiene_prestamo_hipotecario']:
-            total_deudas += fin['monto_hipoteca']
-        if fin['tiene_prestamo_auto']:
-            total_deudas += fin['monto_prestamo_auto']
-        
-        fin['total_deudas'] = total_deudas
-        fin['total_pagos_mensuales_deudas'] = fin['pago_mensual_hipoteca'] + fin['pago_mensual_auto']
-        fin['balance'] = fin['sueldo_mensual'] - gastos['total'] - fin['total_pagos_mensuales_deudas']
-        fin['observaciones_financieras'] = self.campos['observaciones_financieras'].toPlainText()
+        # Totales, balance y porcentajes
+        recalcular_derivados(self.estudio.datos, ['situacion_financiera'])
     
     def cargar_datos(self):
         """Carga los datos desde el estudio."""
@@ -297,9 +278,11 @@ class PaginaSituacionFinanciera(QWizardPage):
         self.calcular_totales()
 
 
-class PaginaVivienda(QWizardPage):
+class PaginaVivienda(SeguimientoCambios, QWizardPage):
     """Página 5: Vivienda y Patrimonio."""
     
+    SECCIONES = ("vivienda",)
+    
     def __init__(self, estudio):
         super().__init__()
         self.estudio = estudio
@@ -0,0 +1,195 @@
+"""
+Edicion de varios estudios en pestañas de la ventana principal.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Cada estudio abierto es un WizardEstudio incrustado en una pestaña. Los
+wizards salen de la ReservaWizard y vuelven a ella al terminar la captura;
+las especificaciones de formularios y la cache de graficas son comunes a
+todos. Solo la pestaña visible trabaja en segundo plano (vista previa de
+riesgos, preconstruccion y dibujo de graficas).
+
+WizardEstudio se importa hasta que se abre la primera captura, para no
+cargar sus paginas al arrancar la ventana principal.
+"""
+
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtWidgets import QMessageBox, QTabBar, QTabWidget, QWizard
+
+from src.utils import perfil_memoria
+
+
+class ReservaWizard:
+    """
+    Conserva un WizardEstudio libre entre capturas. Al abrir otro estudio el
+    wizard libre se reasigna (reasignar_estudio) en lugar de volver a crear
+    sus páginas y controles; cambiar de estudio se vuelve una carga de datos.
+    """
+
+    def __init__(self, parent=None, config_empresa=None, activa=True):
+        """
+        Args:
+            parent: Widget padre de los wizards.
+            config_empresa: Configuración de la empresa.
+            activa: False para crear un wizard nuevo en cada captura.
+        """
+        self.parent = parent
+        self.config_empresa = config_empresa
+        self.activa = activa
+        self._libre = None
+
+    def obtener(self, estudio=None):
+        """
+        Wizard listo para capturar el estudio (None para uno nuevo): el
+        wizard libre reasignado, o uno nuevo si no hay libre.
+        """
+        if self.activa and self._libre is not None:
+            wizard, self._libre = self._libre, None
+            wizard.reasignar_estudio(estudio)
+            return wizard
+        # Importacion diferida: el wizard arrastra todas sus paginas
+        from src.ui.wizard_estudio import WizardEstudio
+        return WizardEstudio(self.parent, self.config_empresa, estudio)
+
+    def devolver(self, wizard):
+        """
+        La captura del wizard terminó. Se conserva como libre (uno como
+        máximo); los demás se destruyen.
+        """
+        if self.activa and self._libre is None and wizard.config_empresa is self.config_empresa:
+            self._libre = wizard
+        else:
+            perfil_memoria.esperar_liberacion(wizard)
+            wizard.deleteLater()
+
+    def descartar(self):
+        """Destruye el wizard libre."""
+        if self._libre is not None:
+            perfil_memoria.esperar_liberacion(self._libre)
+            self._libre.deleteLater()
+        self._libre = None
+
+    def configurar(self, config_empresa):
+        """Cambia la configuración de empresa; el wizard libre se descarta."""
+        self.config_empresa = config_empresa
+        self.descartar()
+
+
+class PestanasEstudio(QObject):
+    """Administra las pestañas de captura de un QTabWidget."""
+
+    # Pestañas de estudio abiertas a la vez (acota la memoria de widgets)
+    MAX_PESTANAS = 6
+
+    # (aceptado, es_edicion)
+    captura_terminada = pyqtSignal(bool, bool)
+
+    def __init__(self, pestanas: QTabWidget, reserva, parent=None):
+        """
+        Args:
+            pestanas: QTabWidget cuya primera pestaña (la lista) no se cierra.
+            reserva: ReservaWizard de la que se obtienen los wizards.
+        """
+        super().__init__(parent)
+        self.pestanas = pestanas
+        self.reserva = reserva
+        # id de estudio -> wizard abierto
+        self._abiertos: Dict[str, QWizard] = {}
+        self._al_terminar: Dict[int, object] = {}
+        # id(wizard) -> instantanea de memoria al abrirlo (perfil de memoria)
+        self._ciclos_memoria: Dict[int, object] = {}
+
+        pestanas.setTabsClosable(True)
+        barra = pestanas.tabBar()
+        for lado in (QTabBar.LeftSide, QTabBar.RightSide):
+            barra.setTabButton(0, lado, None)
+        pestanas.tabCloseRequested.connect(self.cerrar)
+        pestanas.currentChanged.connect(self.al_cambiar_pestana)
+
+    def mostrar(self, id_estudio: str) -> bool:
+        """Activa la pestaña del estudio si ya esta abierto."""
+        wizard = self._abiertos.get(id_estudio)
+        if wizard is None:
+            return False
+        self.pestanas.setCurrentWidget(wizard)
+        return True
+
+    def hay_espacio(self) -> bool:
+        return len(self._abiertos) < self.MAX_PESTANAS
+
+    def abiertos(self) -> List[QWizard]:
+        """Wizards con captura en curso, en el orden de las pestañas."""
+        return [w for w in (self.pestanas.widget(i) for i in range(self.pestanas.count()))
+                if w in self._abiertos.values()]
+
+    def abrir(self, estudio=None) -> Optional[QWizard]:
+        """
+        Abre el estudio en una pestaña (None para uno nuevo).
+
+        Returns:
+            El wizard de la pestaña, o None si ya se alcanzo MAX_PESTANAS.
+        """
+        if estudio is not None and self.mostrar(estudio.id):
+            return self._abiertos[estudio.id]
+        if not self.hay_espacio():
+            return None
+
+        ciclo = perfil_memoria.abrir_ciclo('wizard')
+        wizard = self.reserva.obtener(estudio)
+        self._ciclos_memoria[id(wizard)] = ciclo
+        wizard.setWindowFlags(Qt.Widget)
+        self._abiertos[wizard.estudio.id] = wizard
+
+        al_terminar = lambda resultado, w=wizard: self._terminar(w, resultado)
+        self._al_terminar[id(wizard)] = al_terminar
+        wizard.finished.connect(al_terminar)
+
+        indice = self.pestanas.addTab(wizard, self._titulo(wizard))
+        self.pestanas.setCurrentIndex(indice)
+        wizard.show()
+        return wizard
+
+    def cerrar(self, indice: int):
+        """Cierra una pestaña de estudio cancelando su captura, previa confirmacion."""
+        wizard = self.pestanas.widget(indice)
+        if indice == 0 or wizard not in self._abiertos.values():
+            return
+        respuesta = QMessageBox.question(
+            self.pestanas,
+            "Cerrar estudio",
+            f"¿Cerrar {self.pestanas.tabText(indice)} sin guardar?\n"
+            "Los cambios no guardados se descartan.",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if respuesta == QMessageBox.Yes:
+            wizard.reject()
+
+    def al_cambiar_pestana(self, indice: int):
+        """Solo el wizard visible trabaja en segundo plano."""
+        actual = self.pestanas.widget(indice)
+        for wizard in self._abiertos.values():
+            wizard.pausar_segundo_plano(wizard is not actual)
+
+    def _terminar(self, wizard, resultado: int):
+        # al_finalizar del wizard ya guardo (o descarto) el estudio
+        self._abiertos.pop(wizard.estudio.id, None)
+        al_terminar = self._al_terminar.pop(id(wizard), None)
+        if al_terminar is not None:
+            wizard.finished.disconnect(al_terminar)
+        indice = self.pestanas.indexOf(wizard)
+        if indice >= 0:
+            self.pestanas.removeTab(indice)
+        wizard.pausar_segundo_plano(False)
+        self.reserva.devolver(wizard)
+        perfil_memoria.cerrar_ciclo(self._ciclos_memoria.pop(id(wizard), None))
+        self.captura_terminada.emit(resultado == QWizard.Accepted, wizard.es_edicion)
+
+    @staticmethod
+    def _titulo(wizard) -> str:
+        if not wizard.es_edicion:
+            return "Nuevo estudio"
+        nombre = wizard.estudio.datos.get('datos_personales', {}).get('nombre_completo', '')
+        return nombre or wizard.estudio.id
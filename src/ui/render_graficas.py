@@ -0,0 +1,181 @@
+"""
+Renderizado de graficas fuera del hilo de la interfaz.
+Autor: DINOS Tech
+Version: 0.5.0
+
+La pagina de visualizacion copia las secciones que lee cada grafica y encola
+un trabajo; el hilo de fondo prepara los datos, dibuja la figura con Agg y
+devuelve solo los bytes PNG. La interfaz convierte esos bytes en QPixmap.
+
+Las figuras se conservan en un PoolFiguras del hilo de dibujo y se actualizan
+en su lugar en los siguientes dibujos; al detener el hilo se liberan.
+
+Los PNG ya dibujados se guardan en CACHE_GRAFICAS (compartida por todos los
+wizards abiertos) con la firma de sus datos como llave.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+def copiar_secciones(datos: Dict, secciones: Iterable[str]) -> Dict:
+    """Copia profunda de las secciones indicadas (en el hilo que llama)."""
+    return {s: copy.deepcopy(datos[s]) for s in secciones if s in datos}
+
+
+def firma_datos(datos: Dict) -> str:
+    """Huella del contenido de las secciones; iguales si los datos no cambiaron."""
+    texto = json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+class CacheGraficas:
+    """
+    PNG dibujados por (grafica, firma de datos), acotados por tamaño total.
+    Solo se usa desde el hilo de la interfaz.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._png: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+
+    def obtener(self, clave: str, firma: str) -> Optional[bytes]:
+        png = self._png.get((clave, firma))
+        if png is not None:
+            self._png.move_to_end((clave, firma))
+        return png
+
+    def guardar(self, clave: str, firma: str, png: bytes):
+        llave = (clave, firma)
+        if llave in self._png:
+            self._png.move_to_end(llave)
+            return
+        self._png[llave] = png
+        self._bytes += len(png)
+        # Descartar las menos usadas recientemente
+        while self._bytes > self.max_bytes and len(self._png) > 1:
+            _, viejo = self._png.popitem(last=False)
+            self._bytes -= len(viejo)
+
+    def limpiar(self):
+        self._png.clear()
+        self._bytes = 0
+
+
+CACHE_GRAFICAS = CacheGraficas()
+
+
+class PoolFiguras:
+    """
+    Figuras reutilizables por clave de grafica. Solo lo usa el hilo de dibujo,
+    por lo que no necesita candado.
+    """
+
+    def __init__(self):
+        self._figuras: Dict[str, Any] = {}
+
+    def obtener(self, clave: str, fabrica: Callable[[], Any]) -> Any:
+        """Figura de la clave; se crea con la fabrica la primera vez."""
+        figura = self._figuras.get(clave)
+        if figura is None:
+            figura = self._figuras[clave] = fabrica()
+        return figura
+
+    def descartar(self, clave: str):
+        """Libera la figura de una clave (p. ej. si un dibujo fallo a la mitad)."""
+        figura = self._figuras.pop(clave, None)
+        if figura is not None and hasattr(figura, "liberar"):
+            figura.liberar()
+
+    def liberar(self):
+        """Libera todas las figuras."""
+        for clave in list(self._figuras):
+            self.descartar(clave)
+
+    def __len__(self):
+        return len(self._figuras)
+
+
+class RenderizadorGraficas(QObject):
+    """
+    Hilo que ejecuta los trabajos de dibujo. Por cada grafica solo se conserva
+    la ultima solicitud pendiente; las intermedias se descartan. En pausa
+    (pestaña oculta) las solicitudes se acumulan sin dibujarse.
+    """
+
+    # (clave, firma, png); png vacio si el dibujo fallo
+    grafica_lista = pyqtSignal(str, str, bytes)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._condicion = threading.Condition()
+        self._pendientes: Dict[str, Tuple[str, Callable[[Dict, PoolFiguras], bytes], Dict]] = {}
+        self._activo = True
+        self._pausado = False
+        self._pool = PoolFiguras()
+        self._hilo = threading.Thread(target=self._ejecutar, name="RenderizadorGraficas", daemon=True)
+        self._hilo.start()
+
+    def solicitar(self, clave: str, firma: str, trabajo: Callable[[Dict, PoolFiguras], bytes],
+                  datos: Dict):
+        """
+        Encola el dibujo de una grafica.
+
+        Args:
+            clave: Identificador de la grafica.
+            firma: Huella de los datos; se devuelve con el resultado.
+            trabajo: Funcion (datos, pool) -> bytes PNG. Se ejecuta en el hilo
+                de fondo y no debe tocar widgets.
+            datos: Copia de las secciones que lee el trabajo.
+        """
+        with self._condicion:
+            self._pendientes[clave] = (firma, trabajo, datos)
+            self._condicion.notify()
+
+    def pausar(self, pausado: bool):
+        """Detiene o reanuda el dibujo de las solicitudes pendientes."""
+        with self._condicion:
+            self._pausado = pausado
+            self._condicion.notify()
+
+    def detener(self):
+        """
+        Termina el hilo (no espera al dibujo en curso). El hilo libera las
+        figuras del pool al salir.
+        """
+        with self._condicion:
+            self._activo = False
+            self._pendientes.clear()
+            self._condicion.notify()
+
+    def _ejecutar(self):
+        while True:
+            with self._condicion:
+                while self._activo and (self._pausado or not self._pendientes):
+                    self._condicion.wait()
+                if not self._activo:
+                    break
+                # Primero en entrar, primero en dibujarse
+                clave = next(iter(self._pendientes))
+                firma, trabajo, datos = self._pendientes.pop(clave)
+
+            try:
+                png = trabajo(datos, self._pool)
+            except Exception as e:
+                print(f"Advertencia: no se pudo generar la grafica {clave}: {e}")
+                self._pool.descartar(clave)
+                png = b""
+            try:
+                self.grafica_lista.emit(clave, firma, png)
+            except RuntimeError:
+                # La pagina ya fue destruida
+                break
+
+        self._pool.liberar()
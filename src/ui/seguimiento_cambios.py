@@ -0,0 +1,238 @@
+"""
+Seguimiento de cambios en las paginas del wizard.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Las paginas marcan cuando el usuario modifica algun control (conectando las
+señales de cambio de sus widgets) y solo esas paginas se sincronizan con
+estudio.datos. Al sincronizar se avisa al estudio que secciones cambiaron.
+
+Una pagina ya construida puede enlazarse a otro estudio (reasignar_estudio):
+sus controles se reinician y se cargan con los datos nuevos sin recrearse.
+"""
+
+from typing import Callable, Iterable, Optional, Set, Tuple
+
+from PyQt5.QtCore import QDate, QTimer
+from PyQt5.QtWidgets import (
+    QWidget, QLineEdit, QTextEdit, QPlainTextEdit, QSpinBox, QDoubleSpinBox,
+    QComboBox, QCheckBox, QRadioButton, QDateEdit, QAbstractItemView,
+    QAbstractSpinBox
+)
+
+
+_PROPIEDAD_CONECTADO = "seguimientoCambios"
+
+
+def _es_lista_de_combo(widget: QWidget) -> bool:
+    """La lista desplegable de un QComboBox no es un control de captura."""
+    padre = widget.parentWidget()
+    while padre is not None:
+        if isinstance(padre, QComboBox):
+            return True
+        padre = padre.parentWidget()
+    return False
+
+
+def conectar_senales_cambio(widget: QWidget, callback: Callable[[], None]):
+    """
+    Conecta las señales de cambio de un control a un callback sin argumentos.
+
+    Cada control se conecta una sola vez aunque se vuelva a recorrer el arbol.
+
+    Returns:
+        True si el widget es un control de captura reconocido.
+    """
+    if widget.property(_PROPIEDAD_CONECTADO):
+        return True
+    aviso = lambda *args: callback()
+
+    if isinstance(widget, QLineEdit):
+        widget.textEdited.connect(aviso)
+    elif isinstance(widget, (QTextEdit, QPlainTextEdit)):
+        widget.textChanged.connect(aviso)
+    elif isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+        widget.valueChanged.connect(aviso)
+    elif isinstance(widget, QDateEdit):
+        widget.dateChanged.connect(aviso)
+    elif isinstance(widget, QComboBox):
+        widget.currentIndexChanged.connect(aviso)
+        widget.editTextChanged.connect(aviso)
+    elif isinstance(widget, (QCheckBox, QRadioButton)):
+        widget.toggled.connect(aviso)
+    elif isinstance(widget, QAbstractItemView) and widget.model() is not None \
+            and not _es_lista_de_combo(widget):
+        modelo = widget.model()
+        modelo.dataChanged.connect(aviso)
+        modelo.rowsInserted.connect(aviso)
+        modelo.rowsRemoved.connect(aviso)
+        # Los combos de celda (setCellWidget) se agregan despues de insertar
+        # la fila; se conectan en cuanto termina el evento que los creo.
+        modelo.rowsInserted.connect(
+            lambda *args: QTimer.singleShot(0, lambda: conectar_arbol(widget, callback))
+        )
+    else:
+        return False
+    widget.setProperty(_PROPIEDAD_CONECTADO, True)
+    return True
+
+
+def conectar_arbol(raiz: QWidget, callback: Callable[[], None]):
+    """Conecta el control raiz y todos sus descendientes de captura."""
+    conectar_senales_cambio(raiz, callback)
+    for hijo in raiz.findChildren(QWidget):
+        conectar_senales_cambio(hijo, callback)
+
+
+def _dentro_de_vista(widget: QWidget, raiz: QWidget) -> bool:
+    """Controles de celda o internos de una vista: los maneja cargar_datos."""
+    padre = widget.parentWidget()
+    while padre is not None and padre is not raiz:
+        if isinstance(padre, (QAbstractItemView, QAbstractSpinBox, QComboBox)):
+            return True
+        padre = padre.parentWidget()
+    return False
+
+
+def reiniciar_control(widget: QWidget):
+    """Deja un control de captura vacio o en su primera opcion."""
+    if isinstance(widget, QLineEdit):
+        widget.clear()
+    elif isinstance(widget, (QTextEdit, QPlainTextEdit)):
+        widget.clear()
+    elif isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+        widget.setValue(widget.minimum())
+    elif isinstance(widget, QDateEdit):
+        widget.setDate(QDate.currentDate())
+    elif isinstance(widget, QComboBox):
+        widget.setCurrentIndex(0 if widget.count() else -1)
+        if widget.isEditable():
+            widget.clearEditText()
+    elif isinstance(widget, QCheckBox):
+        widget.setChecked(False)
+
+
+def reiniciar_arbol(raiz: QWidget):
+    """
+    Reinicia los controles de captura de una pagina antes de cargar otro
+    estudio, para que no queden valores del anterior en los campos que
+    cargar_datos solo asigna cuando el estudio trae dato. Las tablas no se
+    tocan: sus cargar_datos ya las vacian.
+    """
+    for hijo in raiz.findChildren(QWidget):
+        if not _dentro_de_vista(hijo, raiz):
+            reiniciar_control(hijo)
+
+
+class SeguimientoCambios:
+    """
+    Mixin para paginas del wizard con guardar_datos/cargar_datos.
+
+    Cada pagina declara en SECCIONES las llaves de estudio.datos que escribe.
+    El wizard llama iniciar_seguimiento() despues de construir la pagina y
+    sincronizar_datos() para volcar solo las paginas modificadas.
+    """
+
+    SECCIONES: Tuple[str, ...] = ()
+
+    _seguimiento_activo = False
+    _suspendido = False
+    _sucia = False
+    _al_editar: Optional[Callable[[], None]] = None
+
+    def iniciar_seguimiento(self, al_editar: Optional[Callable[[], None]] = None):
+        """
+        Conecta las señales de cambio de todos los controles de la pagina.
+        La pagina queda pendiente de un primer volcado completo para que los
+        valores iniciales de sus controles lleguen al estudio.
+
+        Args:
+            al_editar: Funcion que se llama en cada edicion del usuario
+                (el wizard la usa para reiniciar el autoguardado).
+        """
+        if self._seguimiento_activo:
+            return
+        self._al_editar = al_editar
+        conectar_arbol(self, self.marcar_cambio)
+        self._seguimiento_activo = True
+        self._sucia = True
+
+    def seguimiento_activo(self) -> bool:
+        return self._seguimiento_activo
+
+    def marcar_cambio(self, campo: Optional[str] = None):
+        """Registra que el usuario modifico la pagina."""
+        if self._suspendido:
+            return
+        self._sucia = True
+        if self._al_editar is not None:
+            self._al_editar()
+
+    def hay_cambios(self) -> bool:
+        """True si hay cambios sin volcar (o si la pagina no tiene seguimiento)."""
+        return self._sucia or not self._seguimiento_activo
+
+    def limpiar_cambios(self):
+        self._sucia = False
+
+    def secciones(self) -> Set[str]:
+        """Secciones de estudio.datos que escribe la pagina."""
+        return set(self.SECCIONES)
+
+    def cargar_sin_marcar(self):
+        """Ejecuta cargar_datos sin que los cambios de los controles cuenten como edicion."""
+        self._suspendido = True
+        try:
+            self.cargar_datos()
+        finally:
+            self._suspendido = False
+        self.limpiar_cambios()
+
+    def marcar_todo_pendiente(self):
+        """Deja la pagina pendiente de un volcado completo."""
+        self._sucia = True
+
+    def reiniciar_controles(self):
+        """Vacia los controles de la pagina (ver reiniciar_arbol)."""
+        reiniciar_arbol(self)
+
+    def reasignar_estudio(self, estudio):
+        """
+        Enlaza la pagina a otro estudio sin reconstruirla: reinicia los
+        controles, carga los datos nuevos y queda pendiente de un volcado
+        completo, como una pagina recien construida.
+        """
+        self.estudio = estudio
+        self._suspendido = True
+        try:
+            self.reiniciar_controles()
+            self.cargar_datos()
+        finally:
+            self._suspendido = False
+        self.marcar_todo_pendiente()
+
+    def sincronizar_datos(self) -> Set[str]:
+        """
+        Vuelca la pagina a estudio.datos solo si tiene cambios y avisa al
+        estudio que secciones se modificaron.
+
+        Returns:
+            Secciones modificadas (vacio si no habia cambios).
+        """
+        if not self.hay_cambios():
+            return set()
+        self.guardar_datos()
+        self.limpiar_cambios()
+        secciones = self.secciones()
+        if hasattr(self.estudio, 'marcar_secciones_modificadas'):
+            self.estudio.marcar_secciones_modificadas(secciones)
+        return secciones
+
+
+def secciones_de(paginas: Iterable) -> Set[str]:
+    """Une las secciones declaradas por varias paginas."""
+    resultado = set()
+    for pagina in paginas:
+        if hasattr(pagina, 'secciones'):
+            resultado |= pagina.secciones()
+    return resultado
@@ -7,22 +7,91 @@ Versión: 0.4.0
 import sys
 import os
 import json
+import threading
+from typing import Dict, List, Optional
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QLabel, QMessageBox, QFileDialog,
-    QHeaderView, QDialog, QMenuBar, QMenu, QAction
+    QTableView, QLabel, QMessageBox, QFileDialog, QLineEdit,
+    QHeaderView, QDialog, QMenuBar, QMenu, QAction, QGroupBox,
+    QComboBox, QDoubleSpinBox, QSpinBox, QTabWidget
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QObject, pyqtSignal
 from PyQt5.QtGui import QPixmap, QFont, QIcon
 from src.models.estudio import EstudioSocioeconomico
-from src.logic.calculador_riesgos import CalculadorRiesgos
-from src.ui.wizard_estudio import WizardEstudio
-from src.ui.dialogo_info_ia import DialogoInfoIA
-from src.ui.dialogo_configuracion import DialogoConfiguracion
-from src.ui.dialogo_backup import DialogoBackup
-from src.export.exportador_pdf import ExportadorPDF
-from src.export.exportador_word import ExportadorWord
-from src.export.exportador_excel import ExportadorExcel
+from src.models.indice_busqueda import IndiceBusqueda
+from src.models.consulta_estudios import ConsultaEstudios, IndiceConsulta
+from src.models.indice_identidad import IndiceIdentidad
+from src.models.catalogo_estudios import CatalogoEstudios
+from src.models.borrador_estudio import DiarioBorrador, EscritorBorradores, borradores_pendientes
+from src.ui.modelo_estudios import ModeloEstudios
+from src.ui.pestanas_estudio import PestanasEstudio, ReservaWizard
+from src.utils.precalentamiento import Precalentador
+from src.utils import perfil_memoria
+# El wizard, los dialogos y los exportadores (reportlab, python-docx,
+# openpyxl) se importan en el primer uso para no retrasar la ventana.
+
+
+class ReconciliacionIndices(QObject):
+    """
+    Reconcilia IndiceBusqueda, IndiceConsulta e IndiceIdentidad con el disco
+    en un hilo (con miles de estudios tarda alrededor de un segundo) y
+    entrega el resultado a la ventana con la señal terminada.
+    """
+    
+    # (resúmenes, o None si la firma no cambió; firma; empresas)
+    terminada = pyqtSignal(object, str, list)
+    # Firma del catálogo recién escrito en disco
+    catalogo_guardado = pyqtSignal(str)
+    # Orden por omisión y filtros de rango del panel: se ordenan aquí para
+    # que la primera búsqueda no lo haga en el hilo de la interfaz
+    CAMPOS_PREPARADOS = ("fecha_modificacion", "riesgo_global", "porcentaje_renta_ingreso")
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Una reconciliación o escritura del catálogo a la vez
+        self._lock = threading.Lock()
+    
+    def iniciar(self, firma_actual: Optional[str]):
+        """Reconcilia en segundo plano; firma_actual es la del listado mostrado."""
+        threading.Thread(target=self._ejecutar, args=(firma_actual,),
+                         name="ReconciliacionIndices", daemon=True).start()
+    
+    def _ejecutar(self, firma_actual: Optional[str]):
+        try:
+            with self._lock:
+                indice = IndiceBusqueda.obtener()
+                indice.sincronizar()
+                indice.preparar()
+                firma = indice.firma()
+                resumenes = indice.resumenes() if firma != firma_actual else None
+                consultas = IndiceConsulta.obtener()
+                consultas.sincronizar()
+                consultas.preparar(self.CAMPOS_PREPARADOS)
+                empresas = consultas.valores_distintos("empresa_solicitante")
+                # Que la revisión de duplicados del primer guardado no lo cargue en frío
+                IndiceIdentidad.obtener().sincronizar()
+        except Exception as e:
+            print(f"Advertencia: no se pudieron reconciliar los índices: {e}")
+            return
+        try:
+            self.terminada.emit(resumenes, firma, empresas)
+        except RuntimeError:
+            # La ventana ya se cerró
+            pass
+    
+    def guardar_catalogo(self, ruta_base: str, resumenes: List[Dict], firma: str):
+        """Escribe el catálogo en un hilo (el anterior ya debe estar cerrado)."""
+        threading.Thread(target=self._construir, args=(ruta_base, resumenes, firma),
+                         name="CatalogoEstudios", daemon=True).start()
+    
+    def _construir(self, ruta_base: str, resumenes: List[Dict], firma: str):
+        with self._lock:
+            guardado = CatalogoEstudios.construir(ruta_base, resumenes, firma)
+        if guardado:
+            try:
+                self.catalogo_guardado.emit(firma)
+            except RuntimeError:
+                pass
 
 
 class VentanaPrincipal(QMainWindow):
@@ -31,8 +100,32 @@ class VentanaPrincipal(QMainWindow):
     def __init__(self):
         super().__init__()
         self.config_empresa = self.cargar_configuracion()
+        preferencias = self.cargar_preferencias()
+        # El wizard se conserva entre capturas salvo que config.json lo desactive
+        self.reserva_wizard = ReservaWizard(
+            self, self.config_empresa, preferencias.get('reutilizar_wizard', True)
+        )
+        self.precalentador = Precalentador() if preferencias.get('precalentar', True) else None
+        # Reexportar un estudio sin cambios copia el documento ya generado
+        self.cache_exportaciones = preferencias.get('cache_exportaciones', True)
         self.init_ui()
-        self.cargar_estudios()
+        
+        # Firma del índice del que proviene el listado mostrado
+        self.firma_listado = None
+        self.reconciliacion = ReconciliacionIndices(self)
+        self.reconciliacion.terminada.connect(self.al_reconciliar_indices)
+        self.reconciliacion.catalogo_guardado.connect(self.al_guardar_catalogo)
+        
+        # Mostrar de inmediato el catálogo mapeado en memoria y reconciliar
+        # los índices con el disco después de la primera pintura
+        self.mostrar_catalogo()
+        QTimer.singleShot(100, self.cargar_estudios)
+        # Ofrecer recuperar capturas interrumpidas por un cierre inesperado
+        QTimer.singleShot(200, self.ofrecer_recuperacion_borradores)
+        # Con la lista ya lista, cargar en segundo plano el wizard, matplotlib
+        # y los exportadores antes de su primer uso
+        if self.precalentador is not None:
+            QTimer.singleShot(300, self.precalentador.iniciar)
     
     def cargar_configuracion(self):
         """Carga la configuración de la empresa desde config.json."""
@@ -51,14 +144,26 @@ class VentanaPrincipal(QMainWindow):
                 "logo": ""
             }
     
+    def cargar_preferencias(self):
+        """Preferencias de la interfaz (sección "interfaz" de config.json)."""
+        try:
+            with open('config.json', 'r', encoding='utf-8') as f:
+                return json.load(f).get('interfaz', {})
+        except Exception:
+            return {}
+    
     def init_ui(self):
         """Inicializa la interfaz de usuario."""
         self.setWindowTitle(f"SoftSE - {self.config_empresa.get('nombre', 'DINOS Tech')}")
         self.setGeometry(100, 100, 1200, 700)
         
-        # Widget central
+        # Pestañas: la lista de estudios y un wizard por estudio abierto
+        self.pestanas = QTabWidget()
+        self.setCentralWidget(self.pestanas)
         central_widget = QWidget()
-        self.setCentralWidget(central_widget)
+        self.pestanas.addTab(central_widget, "Estudios")
+        self.pestanas_estudio = PestanasEstudio(self.pestanas, self.reserva_wizard, self)
+        self.pestanas_estudio.captura_terminada.connect(self.al_terminar_captura)
         
         # Layout principal
         main_layout = QVBoxLayout()
@@ -135,6 +240,21 @@ class VentanaPrincipal(QMainWindow):
         btn_backup.clicked.connect(self.abrir_backup)
         config_buttons_layout.addWidget(btn_backup)
         
+        btn_diagnostico = QPushButton("Diagnostico")
+        btn_diagnostico.setStyleSheet("""
+            QPushButton {
+                background-color: #bdc3c7;
+                color: #2c3e50;
+                padding: 4px 15px;
+                font-size: 10px;
+                border: none;
+                border-radius: 4px;
+            }
+            QPushButton:hover { background-color: #95a5a6; }
+        """)
+        btn_diagnostico.clicked.connect(self.abrir_diagnostico)
+        config_buttons_layout.addWidget(btn_diagnostico)
+        
         header_layout.addLayout(config_buttons_layout)
         
         main_layout.addLayout(header_layout)
@@ -238,6 +358,24 @@ class VentanaPrincipal(QMainWindow):
         self.btn_exportar_word.setEnabled(False)
         buttons_layout.addWidget(self.btn_exportar_word)
         
+        self.btn_exportar_paquete = QPushButton("Paquete PDF + Word + Excel")
+        self.btn_exportar_paquete.setStyleSheet("""
+            QPushButton {
+                background-color: #8e44ad;
+                color: white;
+                padding: 10px 20px;
+                font-size: 12px;
+                border: none;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #71368a;
+            }
+        """)
+        self.btn_exportar_paquete.clicked.connect(self.exportar_paquete)
+        self.btn_exportar_paquete.setEnabled(False)
+        buttons_layout.addWidget(self.btn_exportar_paquete)
+        
         self.btn_exportar_excel = QPushButton("Exportar a Excel")
         self.btn_exportar_excel.setStyleSheet("""
             QPushButton {
@@ -257,21 +395,92 @@ class VentanaPrincipal(QMainWindow):
         
         main_layout.addLayout(buttons_layout)
         
+        # Búsqueda de texto completo (con retardo para no filtrar en cada tecla)
+        busqueda_layout = QHBoxLayout()
+        busqueda_layout.addWidget(QLabel("Buscar:"))
+        self.campo_busqueda = QLineEdit()
+        self.campo_busqueda.setPlaceholderText(
+            "Nombre, CURP, RFC, teléfono, email, empresa u observaciones"
+        )
+        self.campo_busqueda.setClearButtonEnabled(True)
+        busqueda_layout.addWidget(self.campo_busqueda)
+        main_layout.addLayout(busqueda_layout)
+        
+        self.timer_busqueda = QTimer(self)
+        self.timer_busqueda.setSingleShot(True)
+        self.timer_busqueda.setInterval(250)
+        self.timer_busqueda.timeout.connect(self.aplicar_busqueda)
+        self.campo_busqueda.textChanged.connect(self.timer_busqueda.start)
+        
+        # Panel de filtros (misma API de consultas que la línea de comandos)
+        filtros_group = QGroupBox("Filtros")
+        filtros_layout = QHBoxLayout()
+        filtros_group.setLayout(filtros_layout)
+        
+        filtros_layout.addWidget(QLabel("Riesgo global ≥"))
+        self.filtro_riesgo = QDoubleSpinBox()
+        self.filtro_riesgo.setRange(0, 5)
+        self.filtro_riesgo.setSingleStep(0.5)
+        self.filtro_riesgo.setDecimals(1)
+        self.filtro_riesgo.setSpecialValueText("Cualquiera")
+        filtros_layout.addWidget(self.filtro_riesgo)
+        
+        filtros_layout.addWidget(QLabel("Empresa:"))
+        self.filtro_empresa = QComboBox()
+        self.filtro_empresa.setMinimumWidth(180)
+        self.filtro_empresa.addItem("Todas", None)
+        filtros_layout.addWidget(self.filtro_empresa)
+        
+        filtros_layout.addWidget(QLabel("Periodo:"))
+        self.filtro_periodo = QComboBox()
+        for etiqueta, dias in [("Cualquier fecha", None), ("Últimos 7 días", 7),
+                               ("Últimos 30 días", 30), ("Últimos 90 días", 90),
+                               ("Último año", 365)]:
+            self.filtro_periodo.addItem(etiqueta, dias)
+        filtros_layout.addWidget(self.filtro_periodo)
+        
+        filtros_layout.addWidget(QLabel("Renta >"))
+        self.filtro_renta = QSpinBox()
+        self.filtro_renta.setRange(0, 100)
+        self.filtro_renta.setSuffix("% del ingreso")
+        self.filtro_renta.setSpecialValueText("Sin filtro")
+        filtros_layout.addWidget(self.filtro_renta)
+        
+        filtros_layout.addWidget(QLabel("Ordenar por:"))
+        self.filtro_orden = QComboBox()
+        for etiqueta, campo, descendente in [
+            ("Última modificación", "fecha_modificacion", True),
+            ("Riesgo global (mayor primero)", "riesgo_global", True),
+            ("Nombre", "nombre", False),
+            ("Fecha de creación", "fecha_creacion", True),
+            ("Ingreso (mayor primero)", "ingreso_total", True),
+        ]:
+            self.filtro_orden.addItem(etiqueta, (campo, descendente))
+        filtros_layout.addWidget(self.filtro_orden)
+        
+        filtros_layout.addStretch()
+        
+        btn_limpiar_filtros = QPushButton("Limpiar")
+        btn_limpiar_filtros.clicked.connect(self.limpiar_filtros)
+        filtros_layout.addWidget(btn_limpiar_filtros)
+        
+        self.filtro_riesgo.valueChanged.connect(self.timer_busqueda.start)
+        self.filtro_renta.valueChanged.connect(self.timer_busqueda.start)
+        self.filtro_empresa.currentIndexChanged.connect(self.timer_busqueda.start)
+        self.filtro_periodo.currentIndexChanged.connect(self.timer_busqueda.start)
+        self.filtro_orden.currentIndexChanged.connect(self.timer_busqueda.start)
+        
+        main_layout.addWidget(filtros_group)
+        
         # Tabla de estudios
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(5)
-        self.tabla.setHorizontalHeaderLabels([
-            "Nombre del Candidato", 
-            "Fecha de Creación", 
-            "Última Modificación",
-            "Riesgo Global",
-            "ID"
-        ])
+        self.modelo_estudios = ModeloEstudios(self)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo_estudios)
         
         # Configurar tabla
-        self.tabla.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tabla.setSelectionMode(QTableWidget.SingleSelection)
-        self.tabla.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabla.setSelectionBehavior(QTableView.SelectRows)
+        self.tabla.setSelectionMode(QTableView.SingleSelection)
+        self.tabla.setEditTriggers(QTableView.NoEditTriggers)
         self.tabla.horizontalHeader().setStretchLastSection(False)
         self.tabla.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         self.tabla.setColumnWidth(1, 150)
@@ -279,7 +488,8 @@ class VentanaPrincipal(QMainWindow):
         self.tabla.setColumnWidth(3, 120)
         self.tabla.setColumnWidth(4, 150)
         
-        self.tabla.itemSelectionChanged.connect(self.actualizar_botones)
+        self.tabla.selectionModel().selectionChanged.connect(self.actualizar_botones)
+        self.modelo_estudios.modelReset.connect(self.actualizar_botones)
         self.tabla.doubleClicked.connect(self.editar_estudio)
         
         main_layout.addWidget(self.tabla)
@@ -287,97 +497,227 @@ class VentanaPrincipal(QMainWindow):
         # Barra de estado
         self.statusBar().showMessage("Listo")
     
+    def mostrar_catalogo(self):
+        """Muestra el último catálogo guardado sin leer los índices ni los estudios."""
+        catalogo = CatalogoEstudios.abrir()
+        if catalogo is None:
+            self.statusBar().showMessage("Cargando estudios...")
+            return
+        self.modelo_estudios.establecer_estudios(catalogo)
+        self.firma_listado = catalogo.firma
+        self.statusBar().showMessage(f"{len(catalogo)} estudio(s) cargado(s)")
+    
     def cargar_estudios(self):
-        """Carga la lista de estudios en la tabla."""
-        self.tabla.setRowCount(0)
-        estudios = EstudioSocioeconomico.listar_estudios()
-        
-        for estudio in estudios:
-            row = self.tabla.rowCount()
-            self.tabla.insertRow(row)
-            
-            # Nombre
-            self.tabla.setItem(row, 0, QTableWidgetItem(estudio['nombre']))
-            
-            # Fecha creación
-            fecha_creacion = estudio['fecha_creacion'].split('T')[0] if 'T' in estudio['fecha_creacion'] else estudio['fecha_creacion']
-            self.tabla.setItem(row, 1, QTableWidgetItem(fecha_creacion))
-            
-            # Fecha modificación
-            fecha_mod = estudio['fecha_modificacion'].split('T')[0] if 'T' in estudio['fecha_modificacion'] else estudio['fecha_modificacion']
-            self.tabla.setItem(row, 2, QTableWidgetItem(fecha_mod))
-            
-            # Riesgo global con color
-            riesgo_raw = estudio.get('riesgo_global', 1)
-            # Handle case where riesgo_global is a dict instead of a number
-            if isinstance(riesgo_raw, dict):
-                riesgo = riesgo_raw.get('nivel', 1) if isinstance(riesgo_raw.get('nivel'), (int, float)) else 1
-            elif isinstance(riesgo_raw, (int, float)):
-                riesgo = float(riesgo_raw)
-            else:
-                riesgo = 1
-            riesgo_item = QTableWidgetItem(f"{riesgo:.1f} - {CalculadorRiesgos.obtener_interpretacion_riesgo(int(riesgo))}")
-            riesgo_item.setTextAlignment(Qt.AlignCenter)
-            
-            # Colorear según riesgo
-            if riesgo <= 1.5:
-                riesgo_item.setBackground(Qt.green)
-            elif riesgo <= 2.5:
-                riesgo_item.setBackground(Qt.yellow)
-            elif riesgo <= 3.5:
-                riesgo_item.setBackground(Qt.GlobalColor(208))  # Naranja
-            else:
-                riesgo_item.setBackground(Qt.red)
-                riesgo_item.setForeground(Qt.white)
-            
-            self.tabla.setItem(row, 3, riesgo_item)
-            
-            # ID (oculto pero útil)
-            self.tabla.setItem(row, 4, QTableWidgetItem(estudio['id']))
+        """
+        Reconcilia los índices con el disco en segundo plano; la tabla se
+        actualiza en al_reconciliar_indices.
+        """
+        self.reconciliacion.iniciar(self.firma_listado)
+    
+    def al_reconciliar_indices(self, resumenes, firma, empresas):
+        """
+        Aplica a la tabla el resultado de la reconciliación.
+        El catálogo en disco solo se reconstruye si el índice cambió.
+        """
+        if resumenes is not None:
+            actual = self.modelo_estudios.fuente()
+            self.modelo_estudios.establecer_estudios(resumenes)
+            self.firma_listado = firma
+            if isinstance(actual, CatalogoEstudios):
+                actual.cerrar()
+            self.reconciliacion.guardar_catalogo(IndiceBusqueda.obtener().ruta_base, resumenes, firma)
+        
+        self.actualizar_empresas_filtro(empresas)
+        
+        if self.hay_filtros_activos():
+            self.aplicar_busqueda()
+        else:
+            self.statusBar().showMessage(f"{self.modelo_estudios.total()} estudio(s) cargado(s)")
+    
+    def al_guardar_catalogo(self, firma):
+        """
+        Cambia los resúmenes en memoria por el catálogo recién escrito, que
+        se lee del mapa de memoria sin conservar un dict por estudio.
+        """
+        if firma != self.firma_listado or isinstance(self.modelo_estudios.fuente(), CatalogoEstudios):
+            # Una reconciliación posterior ya cambió el listado
+            return
+        catalogo = CatalogoEstudios.abrir(IndiceBusqueda.obtener().ruta_base)
+        if catalogo is None:
+            return
+        if catalogo.firma != firma:
+            catalogo.cerrar()
+            return
+        self.modelo_estudios.establecer_estudios(catalogo)
+        if self.hay_filtros_activos():
+            self.aplicar_busqueda()
+    
+    def actualizar_empresas_filtro(self, empresas):
+        """Repuebla el combo de empresas conservando la selección actual."""
+        actual = self.filtro_empresa.currentData()
+        self.filtro_empresa.blockSignals(True)
+        self.filtro_empresa.clear()
+        self.filtro_empresa.addItem("Todas", None)
+        for empresa in empresas:
+            self.filtro_empresa.addItem(empresa, empresa)
+        indice = self.filtro_empresa.findData(actual) if actual else 0
+        self.filtro_empresa.setCurrentIndex(max(indice, 0))
+        self.filtro_empresa.blockSignals(False)
+    
+    def construir_consulta(self) -> ConsultaEstudios:
+        """Traduce el campo de búsqueda y el panel de filtros a una consulta."""
+        filtros = []
+        if self.filtro_riesgo.value() > 0:
+            filtros.append(("riesgo_global", ">=", self.filtro_riesgo.value()))
+        if self.filtro_empresa.currentData():
+            filtros.append(("empresa_solicitante", "=", self.filtro_empresa.currentData()))
+        if self.filtro_periodo.currentData():
+            filtros.append(("fecha_modificacion", "ultimos_dias", self.filtro_periodo.currentData()))
+        if self.filtro_renta.value() > 0:
+            filtros.append(("porcentaje_renta_ingreso", ">", self.filtro_renta.value()))
+        
+        orden, descendente = self.filtro_orden.currentData()
+        return ConsultaEstudios(
+            filtros=filtros,
+            texto=self.campo_busqueda.text().strip(),
+            orden=orden,
+            descendente=descendente
+        )
+    
+    def hay_filtros_activos(self) -> bool:
+        """Indica si hay texto, filtros u orden distintos al listado normal."""
+        consulta = self.construir_consulta()
+        return bool(consulta.texto or consulta.filtros or self.filtro_orden.currentIndex() != 0)
+    
+    def limpiar_filtros(self):
+        """Restablece el panel de filtros y la búsqueda."""
+        for widget in (self.campo_busqueda, self.filtro_riesgo, self.filtro_renta,
+                       self.filtro_empresa, self.filtro_periodo, self.filtro_orden):
+            widget.blockSignals(True)
+        self.campo_busqueda.clear()
+        self.filtro_riesgo.setValue(0)
+        self.filtro_renta.setValue(0)
+        self.filtro_empresa.setCurrentIndex(0)
+        self.filtro_periodo.setCurrentIndex(0)
+        self.filtro_orden.setCurrentIndex(0)
+        for widget in (self.campo_busqueda, self.filtro_riesgo, self.filtro_renta,
+                       self.filtro_empresa, self.filtro_periodo, self.filtro_orden):
+            widget.blockSignals(False)
+        self.aplicar_busqueda()
+    
+    def aplicar_busqueda(self):
+        """Filtra y ordena la tabla con la búsqueda y el panel de filtros."""
+        if not self.hay_filtros_activos():
+            self.modelo_estudios.aplicar_filtro(None)
+            self.statusBar().showMessage(f"{self.modelo_estudios.total()} estudio(s) cargado(s)")
+            return
         
-        self.statusBar().showMessage(f"{len(estudios)} estudio(s) cargado(s)")
+        self.modelo_estudios.mostrar_ids(IndiceConsulta.obtener().ids_ordenados(self.construir_consulta()))
+        self.statusBar().showMessage(
+            f"{self.modelo_estudios.rowCount()} de {self.modelo_estudios.total()} estudio(s) coinciden con los filtros"
+        )
+    
+    def estudio_seleccionado(self):
+        """
+        Retorna el resumen del estudio seleccionado en la tabla.
+        
+        Returns:
+            Dict con id, nombre y fechas, o None si no hay selección.
+        """
+        filas = self.tabla.selectionModel().selectedRows()
+        if not filas:
+            return None
+        return self.modelo_estudios.estudio_en_fila(filas[0].row())
     
     def actualizar_botones(self):
         """Actualiza el estado de los botones según la selección."""
-        hay_seleccion = len(self.tabla.selectedItems()) > 0
+        hay_seleccion = self.estudio_seleccionado() is not None
         self.btn_editar.setEnabled(hay_seleccion)
         self.btn_eliminar.setEnabled(hay_seleccion)
         self.btn_exportar_pdf.setEnabled(hay_seleccion)
         self.btn_exportar_word.setEnabled(hay_seleccion)
+        self.btn_exportar_paquete.setEnabled(hay_seleccion)
+    
+    def abrir_en_pestana(self, estudio=None):
+        """Abre el wizard del estudio (None para uno nuevo) en su propia pestaña."""
+        if self.pestanas_estudio.abrir(estudio) is None:
+            QMessageBox.information(
+                self, "Demasiados estudios abiertos",
+                f"Ya hay {PestanasEstudio.MAX_PESTANAS} estudios abiertos. "
+                "Termine o cierre alguno antes de abrir otro."
+            )
+    
+    def al_terminar_captura(self, aceptado, es_edicion):
+        """Una pestaña de estudio terminó: refrescar la lista si se guardó."""
+        if not aceptado:
+            return
+        self.cargar_estudios()
+        mensaje = "Estudio actualizado correctamente" if es_edicion else "Estudio creado correctamente"
+        QMessageBox.information(self, "Éxito", mensaje)
     
     def crear_nuevo_estudio(self):
         """Abre el wizard para crear un nuevo estudio."""
-        wizard = WizardEstudio(self, self.config_empresa)
-        if wizard.exec_() == QDialog.Accepted:
-            self.cargar_estudios()
-            QMessageBox.information(self, "Éxito", "Estudio creado correctamente")
+        self.abrir_en_pestana()
     
     def editar_estudio(self):
         """Abre el wizard para editar el estudio seleccionado."""
-        row = self.tabla.currentRow()
-        if row < 0:
+        seleccionado = self.estudio_seleccionado()
+        if not seleccionado:
             return
         
-        id_estudio = self.tabla.item(row, 4).text()
-        estudio = EstudioSocioeconomico.cargar(id_estudio)
+        # Si ya está abierto, solo se muestra su pestaña (sin volver a cargarlo)
+        if self.pestanas_estudio.mostrar(seleccionado['id']):
+            return
+        
+        estudio = EstudioSocioeconomico.cargar(seleccionado['id'])
         
         if not estudio:
             QMessageBox.critical(self, "Error", "No se pudo cargar el estudio")
             return
         
-        wizard = WizardEstudio(self, self.config_empresa, estudio)
-        if wizard.exec_() == QDialog.Accepted:
-            self.cargar_estudios()
-            QMessageBox.information(self, "Éxito", "Estudio actualizado correctamente")
+        self.abrir_en_pestana(estudio)
+    
+    def ofrecer_recuperacion_borradores(self):
+        """Pregunta por cada borrador de autoguardado que quedó sin terminar."""
+        for pendiente in borradores_pendientes():
+            tipo = "nuevo estudio" if pendiente['nuevo'] else "edición del estudio"
+            fecha = pendiente['fecha'][:16].replace("T", " ")
+            respuesta = QMessageBox.question(
+                self,
+                "Recuperar captura",
+                f"Se encontró una captura sin terminar ({tipo}) de "
+                f"{pendiente['nombre']}, guardada el {fecha}.\n\n"
+                "¿Desea recuperarla?\n"
+                "Sí: abrir el asistente con la información recuperada\n"
+                "No: descartar el borrador\n"
+                "Cancelar: decidir en el próximo inicio",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
+                QMessageBox.Yes
+            )
+            diario = DiarioBorrador(pendiente['id'])
+            if respuesta == QMessageBox.No:
+                diario.descartar()
+            elif respuesta == QMessageBox.Yes:
+                estudio = diario.recuperar()
+                if estudio is None:
+                    QMessageBox.critical(self, "Error", "No se pudo recuperar el borrador")
+                    continue
+                self.abrir_en_pestana(estudio)
     
     def eliminar_estudio(self):
         """Elimina el estudio seleccionado."""
-        row = self.tabla.currentRow()
-        if row < 0:
+        seleccionado = self.estudio_seleccionado()
+        if not seleccionado:
             return
         
-        nombre = self.tabla.item(row, 0).text()
-        id_estudio = self.tabla.item(row, 4).text()
+        nombre = seleccionado['nombre']
+        id_estudio = seleccionado['id']
+        
+        if self.pestanas_estudio.mostrar(id_estudio):
+            QMessageBox.warning(self, "Estudio abierto",
+                                f"El estudio de {nombre} está abierto en una pestaña. "
+                                "Ciérrelo antes de eliminarlo.")
+            return
         
         respuesta = QMessageBox.question(
             self, 
@@ -396,12 +736,11 @@ class VentanaPrincipal(QMainWindow):
     
     def exportar_pdf(self):
         """Exporta el estudio seleccionado a PDF."""
-        row = self.tabla.currentRow()
-        if row < 0:
+        seleccionado = self.estudio_seleccionado()
+        if not seleccionado:
             return
         
-        id_estudio = self.tabla.item(row, 4).text()
-        estudio = EstudioSocioeconomico.cargar(id_estudio)
+        estudio = EstudioSocioeconomico.cargar(seleccionado['id'])
         
         if not estudio:
             QMessageBox.critical(self, "Error", "No se pudo cargar el estudio")
@@ -419,20 +758,28 @@ class VentanaPrincipal(QMainWindow):
         )
         
         if ruta:
-            exportador = ExportadorPDF(self.config_empresa)
-            if exportador.exportar(estudio.datos, ruta):
+            from src.export.exportador_pdf import ExportadorPDF
+            with perfil_memoria.medir('exportar.pdf'):
+                exportado = self._exportar_documento(ExportadorPDF(self.config_empresa), estudio.datos, ruta)
+            if exportado:
                 QMessageBox.information(self, "Éxito", f"PDF exportado correctamente:\n{ruta}")
             else:
                 QMessageBox.critical(self, "Error", "No se pudo exportar el PDF")
     
+    def _exportar_documento(self, exportador, datos, ruta):
+        """Exporta con el cache de exportaciones si está habilitado."""
+        if not self.cache_exportaciones:
+            return exportador.exportar(datos, ruta)
+        from src.export.cache_exportaciones import CacheExportaciones
+        return CacheExportaciones.obtener().exportar(exportador, datos, ruta)
+    
     def exportar_word(self):
         """Exporta el estudio seleccionado a Word."""
-        row = self.tabla.currentRow()
-        if row < 0:
+        seleccionado = self.estudio_seleccionado()
+        if not seleccionado:
             return
         
-        id_estudio = self.tabla.item(row, 4).text()
-        estudio = EstudioSocioeconomico.cargar(id_estudio)
+        estudio = EstudioSocioeconomico.cargar(seleccionado['id'])
         
         if not estudio:
             QMessageBox.critical(self, "Error", "No se pudo cargar el estudio")
@@ -450,12 +797,54 @@ class VentanaPrincipal(QMainWindow):
         )
         
         if ruta:
-            exportador = ExportadorWord(self.config_empresa)
-            if exportador.exportar(estudio.datos, ruta):
+            from src.export.exportador_word import ExportadorWord
+            with perfil_memoria.medir('exportar.docx'):
+                exportado = self._exportar_documento(ExportadorWord(self.config_empresa), estudio.datos, ruta)
+            if exportado:
                 QMessageBox.information(self, "Éxito", f"Word exportado correctamente:\n{ruta}")
             else:
                 QMessageBox.critical(self, "Error", "No se pudo exportar el Word")
     
+    def exportar_paquete(self):
+        """Exporta el estudio seleccionado a PDF, Word y Excel en una sola pasada."""
+        seleccionado = self.estudio_seleccionado()
+        if not seleccionado:
+            return
+        
+        estudio = EstudioSocioeconomico.cargar(seleccionado['id'])
+        
+        if not estudio:
+            QMessageBox.critical(self, "Error", "No se pudo cargar el estudio")
+            return
+        
+        directorio = QFileDialog.getExistingDirectory(self, "Carpeta del paquete", "export")
+        if not directorio:
+            return
+        
+        respuesta = QMessageBox.question(
+            self, "Paquete de exportación",
+            "¿Reunir los archivos en un ZIP para enviarlo a la empresa?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        
+        from src.export.paquete_exportacion import exportar_paquete
+        with perfil_memoria.medir('exportar.paquete'):
+            resultado = exportar_paquete(
+                estudio.datos, directorio, self.config_empresa,
+                comprimir=respuesta == QMessageBox.Yes,
+                usar_cache=self.cache_exportaciones
+            )
+        
+        lineas = [resultado.zip] if resultado.zip else list(resultado.archivos.values())
+        lineas += [f"{formato}: {motivo}" for formato, motivo in resultado.fallidos.items()]
+        if resultado.fallidos and not resultado.archivos:
+            QMessageBox.critical(self, "Error", "No se pudo exportar el paquete:\n" + "\n".join(lineas))
+        elif resultado.fallidos:
+            QMessageBox.warning(self, "Advertencia",
+                                "El paquete se exportó incompleto:\n" + "\n".join(lineas))
+        else:
+            QMessageBox.information(self, "Éxito", "Paquete exportado correctamente:\n" + "\n".join(lineas))
+    
     def exportar_excel(self):
         """Exporta todos los estudios a Excel."""
         estudios_lista = EstudioSocioeconomico.listar_estudios()
@@ -487,8 +876,10 @@ class VentanaPrincipal(QMainWindow):
         )
         
         if ruta:
-            exportador = ExportadorExcel(self.config_empresa)
-            if exportador.exportar(estudios_datos, ruta):
+            from src.export.exportador_excel import ExportadorExcel
+            with perfil_memoria.medir('exportar.xlsx'):
+                exportado = ExportadorExcel(self.config_empresa).exportar(estudios_datos, ruta)
+            if exportado:
                 QMessageBox.information(self, "Éxito", 
                     f"Excel exportado correctamente:\n{ruta}\n\n"
                     f"Se incluyeron {len(estudios_datos)} estudio(s)")
@@ -497,10 +888,12 @@ class VentanaPrincipal(QMainWindow):
     
     def abrir_configuracion(self):
         """Abre el dialogo de configuracion de empresa."""
+        from src.ui.dialogo_configuracion import DialogoConfiguracion
         dialogo = DialogoConfiguracion(self)
         if dialogo.exec_() and dialogo.cambios_guardados:
             # Recargar configuracion
             self.config_empresa = self.cargar_configuracion()
+            self.reserva_wizard.configurar(self.config_empresa)
             # Notificar al usuario
             QMessageBox.information(
                 self,
@@ -510,6 +903,7 @@ class VentanaPrincipal(QMainWindow):
     
     def abrir_backup(self):
         """Abre el dialogo de gestion de backups."""
+        from src.ui.dialogo_backup import DialogoBackup
         dialogo = DialogoBackup(self)
         dialogo.exec_()
         
@@ -517,3 +911,34 @@ class VentanaPrincipal(QMainWindow):
         if dialogo.backup_importado:
             self.cargar_estudios()
             self.statusBar().showMessage("Estudios actualizados desde backup")
+    
+    def abrir_diagnostico(self):
+        """Abre el dialogo de diagnostico de rendimiento."""
+        from src.ui.dialogo_diagnostico import DialogoDiagnostico
+        dialogo = DialogoDiagnostico(self)
+        dialogo.exec_()
+    
+    def closeEvent(self, event):
+        """
+        Antes de salir confirma si hay capturas abiertas, vuelca cada una a su
+        borrador y espera a que el escritor de borradores termine, para que
+        se puedan recuperar en el siguiente inicio.
+        """
+        wizards = self.pestanas_estudio.abiertos()
+        if wizards:
+            respuesta = QMessageBox.question(
+                self,
+                "Salir",
+                f"Hay {len(wizards)} estudio(s) en captura.\n"
+                "¿Desea salir? Lo capturado se conserva como borrador y se "
+                "ofrecerá recuperarlo en el próximo inicio.",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if respuesta != QMessageBox.Yes:
+                event.ignore()
+                return
+            for wizard in wizards:
+                wizard.autoguardar()
+        EscritorBorradores.obtener().esperar()
+        super().closeEvent(event)
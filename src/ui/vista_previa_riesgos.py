@@ -0,0 +1,170 @@
+"""
+Vista previa de riesgos mientras se captura el estudio.
+Autor: DINOS Tech
+Version: 0.5.0
+
+El wizard avisa que secciones cambiaron; un hilo de fondo recalcula solo las
+categorias que dependen de ellas (DEPENDENCIAS_RIESGO) y el panel lateral se
+actualiza con el resultado sin bloquear la captura.
+"""
+
+import copy
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QVBoxLayout, QLabel, QFrame
+
+from src.logic.calculador_riesgos import CalculadorRiesgos, DEPENDENCIAS_RIESGO
+
+
+# Categoria -> etiqueta del panel, en orden de presentacion
+ETIQUETAS_RIESGO = {
+    "global": "Global",
+    "financiero": "Financiero",
+    "familiar": "Familiar",
+    "vivienda": "Vivienda",
+    "laboral": "Laboral",
+    "salud": "Salud",
+    "estilo_vida": "Estilo de vida",
+}
+
+COLORES_RIESGO = {1: "#27ae60", 2: "#2ecc71", 3: "#f39c12", 4: "#e67e22", 5: "#e74c3c"}
+
+
+def secciones_requeridas(categorias: Iterable[str]) -> Set[str]:
+    """Secciones de datos que leen los calculadores de las categorias dadas."""
+    secciones = set()
+    for categoria in categorias:
+        secciones.update(DEPENDENCIAS_RIESGO.get(categoria, ()))
+    return secciones
+
+
+class CalculoRiesgosEnFondo(QObject):
+    """
+    Hilo de calculo de riesgos. Solo se conserva la ultima solicitud pendiente:
+    si el usuario sigue editando mientras se calcula, las secciones se acumulan
+    y se calculan juntas en la siguiente vuelta.
+    """
+
+    # (riesgos, categorias recalculadas)
+    riesgos_actualizados = pyqtSignal(dict, set)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._condicion = threading.Condition()
+        self._datos: Dict = {}
+        self._secciones: Optional[Set[str]] = None
+        self._pendiente = False
+        self._activo = True
+        self._riesgos: Dict = {}
+        self._hilo = threading.Thread(target=self._ejecutar, name="CalculoRiesgos", daemon=True)
+        self._hilo.start()
+
+    def solicitar(self, datos: Dict, secciones: Optional[Iterable[str]] = None):
+        """
+        Encola un recalculo. Copia (en el hilo que llama) solo las secciones
+        que necesitan los calculadores afectados.
+
+        Args:
+            datos: estudio.datos.
+            secciones: Secciones modificadas; None recalcula todas las categorias.
+        """
+        if secciones is None:
+            requeridas = secciones_requeridas(DEPENDENCIAS_RIESGO)
+        else:
+            secciones = set(secciones)
+            requeridas = secciones_requeridas(CalculadorRiesgos.categorias_afectadas(secciones))
+            if not requeridas:
+                return
+        copia = {s: copy.deepcopy(datos[s]) for s in requeridas if s in datos}
+
+        with self._condicion:
+            self._datos.update(copia)
+            if secciones is None or (self._secciones is None and self._pendiente):
+                self._secciones = None
+            else:
+                self._secciones = (self._secciones or set()) | secciones
+            self._pendiente = True
+            self._condicion.notify()
+
+    def detener(self):
+        """Termina el hilo de calculo (no espera al calculo en curso)."""
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify()
+
+    def _ejecutar(self):
+        while True:
+            with self._condicion:
+                while self._activo and not self._pendiente:
+                    self._condicion.wait()
+                if not self._activo:
+                    return
+                datos = dict(self._datos)
+                secciones = self._secciones
+                self._secciones = set()
+                self._pendiente = False
+
+            try:
+                if secciones is None or not self._riesgos:
+                    categorias = set(ETIQUETAS_RIESGO)
+                else:
+                    categorias = CalculadorRiesgos.categorias_afectadas(secciones)
+                self._riesgos = CalculadorRiesgos.recalcular_riesgos(datos, self._riesgos, secciones)
+                self.riesgos_actualizados.emit(self._riesgos, categorias)
+            except Exception as e:
+                print(f"Advertencia: no se pudo calcular la vista previa de riesgos: {e}")
+
+
+class PanelRiesgos(QFrame):
+    """Panel lateral con el puntaje de cada categoria de riesgo."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFrameShape(QFrame.StyledPanel)
+        self.setMinimumWidth(170)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        titulo = QLabel("Riesgo estimado")
+        fuente = QFont()
+        fuente.setBold(True)
+        titulo.setFont(fuente)
+        layout.addWidget(titulo)
+
+        self.etiquetas: Dict[str, QLabel] = {}
+        for categoria, nombre in ETIQUETAS_RIESGO.items():
+            etiqueta = QLabel(f"{nombre}: -")
+            if categoria == "global":
+                etiqueta.setFont(fuente)
+            self.etiquetas[categoria] = etiqueta
+            layout.addWidget(etiqueta)
+
+        nota = QLabel("Se actualiza mientras captura")
+        nota.setStyleSheet("color: #7f8c8d; font-size: 9px;")
+        nota.setWordWrap(True)
+        layout.addWidget(nota)
+        layout.addStretch()
+
+    def reiniciar(self):
+        """Vuelve a mostrar todas las categorias sin puntaje."""
+        for categoria, etiqueta in self.etiquetas.items():
+            etiqueta.setText(f"{ETIQUETAS_RIESGO[categoria]}: -")
+            etiqueta.setStyleSheet("")
+            etiqueta.setToolTip("")
+
+    def mostrar_riesgos(self, riesgos: Dict, categorias: Set[str]):
+        """Actualiza solo las etiquetas de las categorias recalculadas."""
+        for categoria in categorias:
+            etiqueta = self.etiquetas.get(categoria)
+            resultado = riesgos.get(categoria)
+            if etiqueta is None or not resultado:
+                continue
+            puntaje = resultado.get("puntaje", 0)
+            color = COLORES_RIESGO.get(puntaje, "#2c3e50")
+            etiqueta.setText(f"{ETIQUETAS_RIESGO[categoria]}: {puntaje}/5")
+            etiqueta.setStyleSheet(f"color: {color};")
+            etiqueta.setToolTip("\n".join(resultado.get("justificaciones", [])))
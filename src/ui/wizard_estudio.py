@@ -5,10 +5,17 @@ Versión: 0.2.0 - Sistema modular con 150+ campos
 """
 
 from PyQt5.QtWidgets import QWizard, QWizardPage, QMessageBox
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from src.models.estudio import EstudioSocioeconomico
 from src.logic.calculador_riesgos import CalculadorRiesgos
+from src.logic.validador import ValidadorEstudio
+from src.models.indice_identidad import describir_duplicados
+from src.models.borrador_estudio import EscritorBorradores
 from src.utils.generador_datos_prueba import GeneradorDatosPrueba
+from src.utils import perfil_memoria
+
+from src.ui.pagina_diferida import PaginaDiferida
+from src.ui.vista_previa_riesgos import PanelRiesgos, CalculoRiesgosEnFondo
 
 # Importar página de empresa (NUEVA v0.3.0)
 from src.ui.pagina_empresa import PaginaEmpresaSolicitante
@@ -71,6 +78,13 @@ class WizardEstudio(QWizard):
     PAGE_CONCLUSIONES = 18
     PAGE_FOTOGRAFIAS = 19
     
+    # Espera sin navegar antes de preconstruir la página siguiente
+    RETARDO_PRECONSTRUCCION_MS = 400
+    # Espera sin editar antes de escribir el borrador de autoguardado
+    RETARDO_AUTOGUARDADO_MS = 3000
+    # Espera sin editar antes de recalcular la vista previa de riesgos
+    RETARDO_VISTA_PREVIA_MS = 60
+    
     def __init__(self, parent=None, config_empresa=None, estudio=None):
         """
         Inicializa el wizard.
@@ -81,6 +95,7 @@ class WizardEstudio(QWizard):
             estudio: EstudioSocioeconomico existente (None para crear nuevo).
         """
         super().__init__(parent)
+        perfil_memoria.seguir(self, 'WizardEstudio')
         
         self.config_empresa = config_empresa or {}
         self.estudio = estudio or EstudioSocioeconomico()
@@ -90,13 +105,10 @@ class WizardEstudio(QWizard):
     
     def init_ui(self):
         """Inicializa la interfaz del wizard."""
-        titulo = "Editar Estudio Socioeconómico" if self.es_edicion else "Nuevo Estudio Socioeconómico"
-        self.setWindowTitle(titulo)
         self.setWizardStyle(QWizard.ModernStyle)
         self.setOption(QWizard.HaveHelpButton, False)
         
         # Botón "Info Concentrada" (CustomButton1)
-        self.setOption(QWizard.HaveCustomButton1, True)
         self.setButtonText(QWizard.CustomButton1, "Info Concentrada")
         self.customButtonClicked.connect(self.on_custom_button_clicked)
         
@@ -104,60 +116,245 @@ class WizardEstudio(QWizard):
         self.setOption(QWizard.HaveCustomButton2, True)
         self.setButtonText(QWizard.CustomButton2, "🎲 Generar Datos de Prueba")
         
-        # Solo mostrar el botón de Info Concentrada si es edición
-        if not self.es_edicion:
-            self.setOption(QWizard.HaveCustomButton1, False)
-        
+        self.aplicar_modo()
         self.resize(900, 700)
         
+        # Autoguardado: las secciones modificadas se escriben al diario de
+        # borrador en segundo plano cuando el usuario deja de editar
+        self.timer_autoguardado = QTimer(self)
+        self.timer_autoguardado.setSingleShot(True)
+        self.timer_autoguardado.setInterval(self.RETARDO_AUTOGUARDADO_MS)
+        self.timer_autoguardado.timeout.connect(self.autoguardar)
+        
+        # Vista previa de riesgos: se recalculan en segundo plano solo las
+        # categorías que dependen de las secciones modificadas
+        self.panel_riesgos = PanelRiesgos()
+        self.setSideWidget(self.panel_riesgos)
+        self.calculo_riesgos = None
+        self.timer_vista_previa = QTimer(self)
+        self.timer_vista_previa.setSingleShot(True)
+        self.timer_vista_previa.setInterval(self.RETARDO_VISTA_PREVIA_MS)
+        self.timer_vista_previa.timeout.connect(self.actualizar_vista_previa)
+        
+        self.conectar_estudio()
+        
         # Agregar páginas (v0.3.0 - Ahora inicia con selector de empresa)
+        # Solo se crean de inmediato las páginas con campos obligatorios; las
+        # demás se construyen al llegar a ellas o en tiempo libre (PaginaDiferida)
         # Página INICIAL: Empresa Solicitante
-        self.setPage(self.PAGE_EMPRESA, PaginaEmpresaSolicitante(self.estudio))
+        self.setPage(self.PAGE_EMPRESA, self.con_seguimiento(PaginaEmpresaSolicitante(self.estudio)))
         
         # Páginas MODULARES (generadas automáticamente desde configuración)
-        self.setPage(self.PAGE_DATOS_PERSONALES, PaginaDatosPersonalesModular(self.estudio))
-        self.setPage(self.PAGE_SALUD, PaginaSaludModular(self.estudio))
+        self.setPage(self.PAGE_DATOS_PERSONALES, self.con_seguimiento(PaginaDatosPersonalesModular(self.estudio)))
+        self.diferir_pagina(self.PAGE_SALUD, PaginaSaludModular, "Salud e Intereses")
         
         # Paginas TRADICIONALES (tablas y campos basicos)
-        self.setPage(self.PAGE_FAMILIA, PaginaInformacionFamiliar(self.estudio))
+        self.diferir_pagina(self.PAGE_FAMILIA, PaginaInformacionFamiliar, "Información Familiar")
         # NUEVA v0.3.3: Campos adicionales de informacion familiar
-        self.setPage(self.PAGE_FAMILIA_ADICIONAL, PaginaInformacionFamiliarModular(self.estudio))
+        self.diferir_pagina(self.PAGE_FAMILIA_ADICIONAL, PaginaInformacionFamiliarModular,
+                            "Informacion Familiar Adicional")
         
-        self.setPage(self.PAGE_FINANZAS, PaginaSituacionFinanciera(self.estudio))
+        self.diferir_pagina(self.PAGE_FINANZAS, PaginaSituacionFinanciera, "Situación Financiera")
         # NUEVA v0.3.3: Campos adicionales financieros (ahorros, tarjetas, historial)
-        self.setPage(self.PAGE_FINANZAS_ADICIONAL, PaginaSituacionFinancieraModular(self.estudio))
+        self.diferir_pagina(self.PAGE_FINANZAS_ADICIONAL, PaginaSituacionFinancieraModular,
+                            "Situacion Financiera Detallada")
         
-        self.setPage(self.PAGE_VIVIENDA, PaginaVivienda(self.estudio))
+        self.diferir_pagina(self.PAGE_VIVIENDA, PaginaVivienda, "Vivienda y Patrimonio")
         # NUEVA v0.3.3: Campos adicionales vivienda (dimensiones, valor, propiedades)
-        self.setPage(self.PAGE_VIVIENDA_ADICIONAL, PaginaViviendaModular(self.estudio))
+        self.diferir_pagina(self.PAGE_VIVIENDA_ADICIONAL, PaginaViviendaModular, "Vivienda Detallada")
         
         # Paginas MODULARES v0.2.0
-        self.setPage(self.PAGE_EMPLEO_ACTUAL, PaginaEmpleoActualModular(self.estudio))
+        self.diferir_pagina(self.PAGE_EMPLEO_ACTUAL, PaginaEmpleoActualModular, "Empleo Actual")
         
         # Páginas TRADICIONALES (continúan)
-        self.setPage(self.PAGE_HISTORIAL, PaginaHistorialLaboral(self.estudio))
+        self.diferir_pagina(self.PAGE_HISTORIAL, PaginaHistorialLaboral, "Historial Laboral")
         
         # Página NUEVA MODULAR v0.2.0
-        self.setPage(self.PAGE_ESTILO_VIDA, PaginaEstiloVidaModular(self.estudio))
+        self.diferir_pagina(self.PAGE_ESTILO_VIDA, PaginaEstiloVidaModular, "Estilo de Vida")
         
         # Páginas TRADICIONALES (finales)
-        self.setPage(self.PAGE_REFERENCIAS, PaginaReferencias(self.estudio))
+        self.diferir_pagina(self.PAGE_REFERENCIAS, PaginaReferencias, "Referencias Personales")
         
         # Página NUEVA v0.3.0: Visualización con Gráficas
-        self.setPage(self.PAGE_VISUALIZACION, PaginaVisualizacionDatos(self.estudio))
+        self.diferir_pagina(self.PAGE_VISUALIZACION, PaginaVisualizacionDatos, "📊 Análisis Visual de Datos")
         
         # Páginas NUEVAS v0.3.2: Secciones Institucionales
-        self.setPage(self.PAGE_VALIDACION_DOCUMENTAL, PaginaValidacionDocumentalModular(self.estudio))
-        self.setPage(self.PAGE_INVESTIGACION_VECINAL, PaginaInvestigacionVecinalModular(self.estudio))
-        self.setPage(self.PAGE_ANALISIS_CUALITATIVO, PaginaAnalisisCualitativoModular(self.estudio))
-        self.setPage(self.PAGE_INVESTIGADOR, PaginaInvestigadorModular(self.estudio))
+        self.diferir_pagina(self.PAGE_VALIDACION_DOCUMENTAL, PaginaValidacionDocumentalModular,
+                            "Validacion Documental")
+        self.diferir_pagina(self.PAGE_INVESTIGACION_VECINAL, PaginaInvestigacionVecinalModular,
+                            "Investigacion Vecinal")
+        self.diferir_pagina(self.PAGE_ANALISIS_CUALITATIVO, PaginaAnalisisCualitativoModular,
+                            "Analisis Cualitativo")
+        self.diferir_pagina(self.PAGE_INVESTIGADOR, PaginaInvestigadorModular, "Datos del Investigador")
         
-        self.setPage(self.PAGE_CONCLUSIONES, PaginaConclusiones(self.estudio))
-        self.setPage(self.PAGE_FOTOGRAFIAS, PaginaFotografias(self.estudio))
+        self.diferir_pagina(self.PAGE_CONCLUSIONES, PaginaConclusiones, "Conclusiones y Recomendaciones")
+        self.diferir_pagina(self.PAGE_FOTOGRAFIAS, PaginaFotografias, "Evidencia Fotográfica")
+        
+        # Preconstruir la siguiente página cuando el usuario está inactivo
+        self.timer_preconstruccion = QTimer(self)
+        self.timer_preconstruccion.setSingleShot(True)
+        self.timer_preconstruccion.setInterval(self.RETARDO_PRECONSTRUCCION_MS)
+        self.timer_preconstruccion.timeout.connect(self.preconstruir_siguiente)
+        self.currentIdChanged.connect(lambda _id: self.timer_preconstruccion.start())
         
         # Conectar señal de finalización
         self.finished.connect(self.al_finalizar)
     
+    def aplicar_modo(self):
+        """Título y botones según sea captura nueva o edición."""
+        titulo = "Editar Estudio Socioeconómico" if self.es_edicion else "Nuevo Estudio Socioeconómico"
+        self.setWindowTitle(titulo)
+        # Solo mostrar el botón de Info Concentrada si es edición
+        self.setOption(QWizard.HaveCustomButton1, self.es_edicion)
+    
+    def conectar_estudio(self):
+        """Suscribe el autoguardado y la vista previa al estudio actual."""
+        self._secciones_borrador = set()
+        self._secciones_riesgo = set()
+        self.estudio.suscribir_cambios(self.registrar_secciones_borrador)
+        self.estudio.suscribir_cambios(self.registrar_secciones_riesgo)
+        
+        # El hilo de cálculo se detiene al finalizar; cada captura usa uno nuevo
+        if self.calculo_riesgos is not None:
+            self.calculo_riesgos.detener()
+            self.calculo_riesgos.deleteLater()
+        self.panel_riesgos.reiniciar()
+        self.calculo_riesgos = CalculoRiesgosEnFondo(self)
+        self.calculo_riesgos.riesgos_actualizados.connect(self.panel_riesgos.mostrar_riesgos)
+        self.calculo_riesgos.solicitar(self.estudio.datos)
+    
+    def desconectar_estudio(self):
+        """Detiene los temporizadores y cancela las suscripciones al estudio."""
+        self.timer_autoguardado.stop()
+        self.timer_vista_previa.stop()
+        self.calculo_riesgos.detener()
+        self.estudio.cancelar_suscripcion(self.registrar_secciones_borrador)
+        self.estudio.cancelar_suscripcion(self.registrar_secciones_riesgo)
+    
+    def reasignar_estudio(self, estudio=None):
+        """
+        Reutiliza el wizard con otro estudio sin reconstruir sus páginas.
+        
+        El wizard vuelve a la primera página; cada página ya construida se
+        enlaza al estudio nuevo, reinicia sus controles y carga los datos.
+        Las páginas que aún son marcadores se construirán con el estudio
+        nuevo al llegar a ellas.
+        
+        Args:
+            estudio: EstudioSocioeconomico existente (None para crear nuevo).
+        """
+        self.desconectar_estudio()
+        self.estudio = estudio or EstudioSocioeconomico()
+        self.es_edicion = estudio is not None
+        self.aplicar_modo()
+        
+        paginas = []
+        for page_id in self.pageIds():
+            pagina = self.page(page_id)
+            if isinstance(pagina, PaginaDiferida):
+                pagina = pagina.pagina()
+            if pagina is not None and hasattr(pagina, 'reasignar_estudio'):
+                # Antes de restart(): la página inicial se inicializa con el estudio nuevo
+                pagina.estudio = self.estudio
+                paginas.append(pagina)
+        
+        # Limpia el historial de navegación y muestra la página inicial; después
+        # se cargan los datos para que cleanupPage no los sobrescriba
+        self.restart()
+        for pagina in paginas:
+            pagina.reasignar_estudio(self.estudio)
+        
+        self.conectar_estudio()
+    
+    def diferir_pagina(self, page_id, clase_pagina, titulo):
+        """
+        Registra una página que se construye al llegar a ella.
+        
+        Args:
+            page_id: ID de la página en el wizard.
+            clase_pagina: Clase de la página; se instancia con el estudio.
+            titulo: Título provisional mientras no se construye.
+        """
+        self.setPage(page_id, PaginaDiferida(lambda: self.con_seguimiento(clase_pagina(self.estudio)), titulo))
+    
+    def con_seguimiento(self, pagina):
+        """Activa el seguimiento de cambios de una página recién construida."""
+        perfil_memoria.seguir(pagina, dueno=self)
+        if hasattr(pagina, 'iniciar_seguimiento'):
+            pagina.iniciar_seguimiento(self.al_editar_pagina)
+        return pagina
+    
+    def al_editar_pagina(self):
+        """Cada edición reinicia la espera del autoguardado y de la vista previa."""
+        self.timer_autoguardado.start()
+        self.timer_vista_previa.start()
+    
+    def registrar_secciones_riesgo(self, secciones):
+        """Acumula las secciones modificadas para el siguiente recálculo de riesgos."""
+        self._secciones_riesgo |= secciones
+        self.timer_vista_previa.start()
+    
+    def actualizar_vista_previa(self):
+        """Vuelca la página actual y solicita el recálculo de las categorías afectadas."""
+        pagina = self.currentPage()
+        if pagina is not None and hasattr(pagina, 'sincronizar_datos'):
+            pagina.sincronizar_datos()
+        self.timer_vista_previa.stop()
+        if self._secciones_riesgo:
+            self.calculo_riesgos.solicitar(self.estudio.datos, self._secciones_riesgo)
+            self._secciones_riesgo = set()
+    
+    def registrar_secciones_borrador(self, secciones):
+        """Acumula las secciones modificadas para la siguiente entrada del borrador."""
+        self._secciones_borrador |= secciones
+        self.timer_autoguardado.start()
+    
+    def autoguardar(self):
+        """Vuelca las páginas editadas y encola las secciones modificadas al borrador."""
+        self.guardar_datos_temporales()
+        self.timer_autoguardado.stop()
+        if not self._secciones_borrador:
+            return
+        EscritorBorradores.obtener().encolar(
+            self.estudio.id, self.estudio.datos, self._secciones_borrador
+        )
+        self._secciones_borrador = set()
+    
+    def pagina_graficas(self):
+        """Página de gráficas, o None si todavía no se construye."""
+        pagina = self.page(self.PAGE_VISUALIZACION)
+        if isinstance(pagina, PaginaDiferida):
+            pagina = pagina.pagina()
+        return pagina
+    
+    def liberar_graficas(self):
+        """Libera las figuras y pixmaps de la página de gráficas, si se llegó a construir."""
+        pagina = self.pagina_graficas()
+        if pagina is not None:
+            pagina.liberar_graficas()
+    
+    def pausar_segundo_plano(self, pausado):
+        """
+        Con el wizard en una pestaña oculta no se recalcula la vista previa,
+        no se preconstruyen páginas ni se dibujan gráficas. El autoguardado
+        sigue activo para no perder lo capturado.
+        """
+        if pausado:
+            self.timer_vista_previa.stop()
+            self.timer_preconstruccion.stop()
+        elif self._secciones_riesgo:
+            self.timer_vista_previa.start()
+        pagina = self.pagina_graficas()
+        if pagina is not None:
+            pagina.pausar_graficas(pausado)
+    
+    def preconstruir_siguiente(self):
+        """Construye la página siguiente si todavía es un marcador."""
+        siguiente = self.nextId()
+        pagina = self.page(siguiente) if siguiente != -1 else None
+        if isinstance(pagina, PaginaDiferida) and not pagina.materializada():
+            pagina.materializar()
+    
     def on_custom_button_clicked(self, which):
         """Maneja clics en botones personalizados."""
         if which == QWizard.CustomButton1:
@@ -185,16 +382,17 @@ class WizardEstudio(QWizard):
                 for seccion, datos in datos_prueba.items():
                     # Siempre sobrescribir con los nuevos datos
                     self.estudio.datos[seccion] = datos
+                self.estudio.marcar_secciones_modificadas(datos_prueba.keys())
                 
-                # Recargar la página actual para mostrar los nuevos datos
-                pagina_actual_id = self.currentId()
-                pagina_actual = self.currentPage()
-                
-                # Si la página tiene método cargar_datos, llamarlo
-                if hasattr(pagina_actual, 'cargar_datos'):
-                    pagina_actual.cargar_datos()
+                # Recargar las páginas ya construidas; lo que tenían capturado
+                # quedó reemplazado, así que no deben volver a escribirlo
+                for page_id in self.pageIds():
+                    page = self.page(page_id)
+                    if hasattr(page, 'cargar_sin_marcar'):
+                        page.cargar_sin_marcar()
                 
                 # Si es una página modular, reinicializar
+                pagina_actual = self.currentPage()
                 if hasattr(pagina_actual, 'initializePage'):
                     pagina_actual.initializePage()
                 
@@ -226,11 +424,20 @@ class WizardEstudio(QWizard):
         dialogo.exec_()
     
     def guardar_datos_temporales(self):
-        """Guarda los datos actuales de todas las páginas en el estudio."""
+        """
+        Vuelca al estudio solo las páginas con cambios sin guardar.
+        
+        Returns:
+            Conjunto de secciones de datos que se actualizaron.
+        """
+        secciones = set()
         for page_id in range(self.PAGE_DATOS_PERSONALES, self.PAGE_FOTOGRAFIAS + 1):
             page = self.page(page_id)
-            if page and hasattr(page, 'guardar_datos'):
+            if page and hasattr(page, 'sincronizar_datos'):
+                secciones |= page.sincronizar_datos()
+            elif page and hasattr(page, 'guardar_datos'):
                 page.guardar_datos()
+        return secciones
     
     def al_finalizar(self, result):
         """
@@ -239,6 +446,10 @@ class WizardEstudio(QWizard):
         Args:
             result: Resultado del wizard (aceptado o rechazado).
         """
+        self.desconectar_estudio()
+        self.liberar_graficas()
+        escritor = EscritorBorradores.obtener()
+        
         if result == QWizard.Accepted:
             # Guardar datos de todas las páginas
             self.guardar_datos_temporales()
@@ -247,15 +458,37 @@ class WizardEstudio(QWizard):
             riesgos = CalculadorRiesgos.calcular_todos_riesgos(self.estudio.datos)
             self.estudio.datos['riesgos'] = riesgos
             
-            # Guardar estudio
+            # Revisar si el candidato ya existe en el archivo
+            duplicados = ValidadorEstudio.detectar_posibles_duplicados(
+                self.estudio.datos, self.estudio.id
+            )
+            self.estudio.datos.setdefault('alertas', {})['posibles_duplicados'] = [
+                {"id": d["id"], "nombre": d["nombre"], "coincidencias": d["coincidencias"]}
+                for d in duplicados
+            ]
+            
+            # Guardar estudio (el borrador queda compactado en el archivo)
             if self.estudio.guardar():
+                escritor.descartar(self.estudio.id)
+                if duplicados:
+                    QMessageBox.warning(
+                        self,
+                        "Posible estudio duplicado",
+                        "El estudio se guardó, pero el candidato coincide con "
+                        "estudios existentes:\n\n" + "\n".join(describir_duplicados(duplicados))
+                    )
                 return True
             else:
+                # Conservar lo capturado en el borrador para recuperarlo después
+                escritor.encolar(self.estudio.id, self.estudio.datos, self.estudio.secciones_sin_guardar)
                 QMessageBox.critical(
                     self,
                     "Error",
-                    "No se pudo guardar el estudio. Verifique los permisos de escritura."
+                    "No se pudo guardar el estudio. Verifique los permisos de escritura.\n"
+                    "La información capturada se conserva como borrador."
                 )
                 return False
         
+        # Captura cancelada por el usuario
+        escritor.descartar(self.estudio.id)
         return False
@@ -0,0 +1,307 @@
+"""
+Banco de pruebas de rendimiento del flujo de datos completo.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Genera archivos sinteticos de estudios (generador_archivo con semilla fija,
+una fotografia de marcador por estudio) de 1k, 10k y 100k estudios y mide
+sobre cada uno:
+
+    indices                    carga en frio de los indices del archivo
+    listar_estudios            listado completo
+    cargar / guardar           por estudio, sobre una muestra
+    calcular_todos_riesgos     por estudio
+    validar_estudio_completo   por estudio
+    exportar_pdf / _docx       por estudio (requieren reportlab / python-docx)
+    exportar_xlsx              comparativa de hasta MAX_ESTUDIOS_XLSX estudios
+    backup_exportar / _importar  respaldo completo del archivo
+
+Los archivos generados se conservan en el directorio de trabajo y se
+reutilizan mientras coincidan tamaño, semilla y version del generador.
+
+El resultado es un JSON con la mediana, p90 y minimo (ms) de cada operacion;
+comparar() lo contrasta con una base guardada y reporta las operaciones cuya
+mediana empeoro mas que el umbral y, ademas, al menos DELTA_MINIMO_MS (en
+operaciones de centesimas de milisegundo la razon es puro ruido).
+
+Uso:
+    python -m src.cli rendimiento --tamanos 1000 10000 --salida resultados.json
+    python -m src.cli rendimiento --base base.json --umbral 0.15
+    python -m src.cli rendimiento --guardar-base base.json
+"""
+
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.utils.instrumentacion import percentil
+
+
+VERSION_BANCO = 3
+
+TAMANOS = (1000, 10000, 100000)
+SEMILLA = 20260101
+MUESTRAS = 200
+MUESTRAS_EXPORTACION = 5
+MAX_ESTUDIOS_XLSX = 1000
+UMBRAL_REGRESION = 0.15
+DELTA_MINIMO_MS = 1.0
+
+DIRECTORIO_TRABAJO = os.path.join(tempfile.gettempdir(), 'softse_banco')
+# Sin extension .json: el listado y los indices no deben leerla
+MARCA_ARCHIVO = '.banco'
+
+OPERACIONES = (
+    'indices',
+    'listar_estudios',
+    'cargar',
+    'guardar',
+    'calcular_todos_riesgos',
+    'validar_estudio_completo',
+    'exportar_pdf',
+    'exportar_docx',
+    'exportar_xlsx',
+    'backup_exportar',
+    'backup_importar',
+)
+
+
+def _resumen(tiempos: Sequence[float]) -> Dict:
+    """Mediana, p90 y minimo en ms de una lista de duraciones en segundos."""
+    ordenados = sorted(tiempos)
+    return {
+        'n': len(ordenados),
+        'mediana_ms': round(percentil(ordenados, 50) * 1000.0, 3),
+        'p90_ms': round(percentil(ordenados, 90) * 1000.0, 3),
+        'min_ms': round(ordenados[0] * 1000.0, 3) if ordenados else 0.0,
+    }
+
+
+def _cronometrar(funcion: Callable[[], object]) -> float:
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def preparar_archivo(directorio: str, tamano: int, semilla: int = SEMILLA) -> str:
+    """
+    Directorio con un archivo sintetico de `tamano` estudios. Si ya existe
+    uno con la misma semilla se reutiliza.
+    """
+    ruta = os.path.join(directorio, f"archivo_{tamano}")
+    marca = {'version': VERSION_BANCO, 'tamano': tamano, 'semilla': semilla}
+    ruta_marca = os.path.join(ruta, MARCA_ARCHIVO)
+    try:
+        with open(ruta_marca, 'r', encoding='utf-8') as f:
+            if json.load(f) == marca:
+                return ruta
+    except (OSError, ValueError):
+        pass
+
+    from src.utils.generador_archivo import ParametrosGeneracion, generar_archivo
+
+    shutil.rmtree(ruta, ignore_errors=True)
+    parametros = ParametrosGeneracion(semilla=semilla, prefijo='BANCO')
+    generar_archivo(ruta, tamano, parametros, ruta_fotos=os.path.join(ruta, 'fotos'))
+    with open(ruta_marca, 'w', encoding='utf-8') as f:
+        json.dump(marca, f)
+    return ruta
+
+
+class BancoRendimiento:
+    """Ejecuta las operaciones sobre un archivo y acumula los resultados."""
+
+    def __init__(self, ruta_archivo: str, tamano: int, semilla: int = SEMILLA,
+                 muestras: int = MUESTRAS, repeticiones: int = 3):
+        self.ruta = ruta_archivo
+        self.tamano = tamano
+        self.muestras = muestras
+        self.repeticiones = repeticiones
+        azar = random.Random(semilla)
+        self.ids = [f"BANCO{i:06d}" for i in azar.sample(range(tamano), min(muestras, tamano))]
+        self._datos: List[Dict] = []
+
+    def _datos_muestra(self) -> List[Dict]:
+        if not self._datos:
+            from src.models.estudio import EstudioSocioeconomico
+            self._datos = [EstudioSocioeconomico.cargar(i, self.ruta).datos for i in self.ids]
+        return self._datos
+
+    def medir(self, operacion: str) -> Dict:
+        """Resultado de una operacion; {'omitido': motivo} si no se pudo medir."""
+        try:
+            return getattr(self, f"_medir_{operacion}")()
+        except ImportError as e:
+            return {'omitido': f"dependencia no disponible: {e}"}
+        except Exception as e:
+            print(f"Advertencia: fallo la medicion de {operacion} ({self.tamano}): {e}")
+            return {'omitido': f"error: {e}"}
+
+    def _medir_indices(self) -> Dict:
+        from src.models.cache_columnar import CacheColumnar
+        from src.models.estudio import INDICES_ARCHIVO
+        from src.models.indice_archivo import IndiceArchivo
+
+        IndiceArchivo.descartar_instancias()
+        CacheColumnar.descartar_instancias()
+
+        def construir():
+            for clase_indice in INDICES_ARCHIVO:
+                clase_indice.obtener(self.ruta)
+        return _resumen([_cronometrar(construir)])
+
+    def _medir_listar_estudios(self) -> Dict:
+        from src.models.estudio import EstudioSocioeconomico
+        return _resumen([
+            _cronometrar(lambda: EstudioSocioeconomico.listar_estudios(self.ruta))
+            for _ in range(self.repeticiones)
+        ])
+
+    def _medir_cargar(self) -> Dict:
+        from src.models.estudio import EstudioSocioeconomico
+        return _resumen([
+            _cronometrar(lambda i=i: EstudioSocioeconomico.cargar(i, self.ruta))
+            for i in self.ids
+        ])
+
+    def _medir_guardar(self) -> Dict:
+        from src.models.estudio import EstudioSocioeconomico
+        estudios = [EstudioSocioeconomico.cargar(i, self.ruta) for i in self.ids]
+        # Incluye la actualizacion de los indices, como al guardar desde el wizard
+        return _resumen([_cronometrar(lambda e=e: e.guardar(self.ruta)) for e in estudios])
+
+    def _medir_calcular_todos_riesgos(self) -> Dict:
+        from src.logic.calculador_riesgos import CalculadorRiesgos
+        return _resumen([
+            _cronometrar(lambda d=d: CalculadorRiesgos.calcular_todos_riesgos(d))
+            for d in self._datos_muestra()
+        ])
+
+    def _medir_validar_estudio_completo(self) -> Dict:
+        from src.logic.validador import ValidadorEstudio
+        return _resumen([
+            _cronometrar(lambda d=d: ValidadorEstudio.validar_estudio_completo(d))
+            for d in self._datos_muestra()
+        ])
+
+    def _medir_exportacion(self, crear_exportador: Callable[[], object], extension: str) -> Dict:
+        exportador = crear_exportador()
+        with tempfile.TemporaryDirectory() as salida:
+            tiempos = []
+            for indice, datos in enumerate(self._datos_muestra()[:MUESTRAS_EXPORTACION]):
+                ruta = os.path.join(salida, f"{indice}.{extension}")
+                tiempos.append(_cronometrar(lambda: exportador.exportar(datos, ruta)))
+        return _resumen(tiempos)
+
+    def _medir_exportar_pdf(self) -> Dict:
+        from src.export.exportador_pdf import ExportadorPDF
+        return self._medir_exportacion(lambda: ExportadorPDF({}), 'pdf')
+
+    def _medir_exportar_docx(self) -> Dict:
+        from src.export.exportador_word import ExportadorWord
+        return self._medir_exportacion(lambda: ExportadorWord({}), 'docx')
+
+    def _medir_exportar_xlsx(self) -> Dict:
+        from src.export.exportador_excel import ExportadorExcel
+        from src.models.estudio import EstudioSocioeconomico
+        ids = [f"BANCO{i:06d}" for i in range(min(self.tamano, MAX_ESTUDIOS_XLSX))]
+        datos = [EstudioSocioeconomico.cargar(i, self.ruta).datos for i in ids]
+        exportador = ExportadorExcel({})
+        with tempfile.TemporaryDirectory() as salida:
+            ruta = os.path.join(salida, 'comparativa.xlsx')
+            resultado = _resumen([_cronometrar(lambda: exportador.exportar(datos, ruta))])
+        resultado['estudios'] = len(datos)
+        return resultado
+
+    def _medir_backup_exportar(self) -> Dict:
+        from src.utils.gestor_backup import GestorBackup
+        gestor = GestorBackup(self.ruta, os.path.join(self.ruta, 'fotos'))
+        with tempfile.TemporaryDirectory() as salida:
+            destino = os.path.join(salida, 'respaldo.zip')
+            return _resumen([_cronometrar(lambda: gestor.exportar_backup(destino))])
+
+    def _medir_backup_importar(self) -> Dict:
+        from src.utils.gestor_backup import GestorBackup
+        with tempfile.TemporaryDirectory() as salida:
+            origen = GestorBackup(self.ruta, os.path.join(self.ruta, 'fotos'))
+            respaldo = os.path.join(salida, 'respaldo.zip')
+            origen.exportar_backup(respaldo)
+            destino = GestorBackup(os.path.join(salida, 'estudios'), os.path.join(salida, 'fotos'))
+            return _resumen([_cronometrar(lambda: destino.importar_backup(respaldo))])
+
+
+def ejecutar(tamanos: Iterable[int] = TAMANOS, semilla: int = SEMILLA,
+             directorio: str = DIRECTORIO_TRABAJO, operaciones: Sequence[str] = OPERACIONES,
+             muestras: int = MUESTRAS, repeticiones: int = 3,
+             progreso: Optional[Callable[[str], None]] = print) -> Dict:
+    """
+    Ejecuta el banco completo.
+
+    Returns:
+        Diccionario serializable con el entorno y resultados[tamano][operacion].
+    """
+    desconocidas = [o for o in operaciones if o not in OPERACIONES]
+    if desconocidas:
+        raise ValueError(f"Operaciones desconocidas: {', '.join(desconocidas)}")
+
+    resultados = {}
+    for tamano in tamanos:
+        if progreso:
+            progreso(f"Preparando archivo de {tamano} estudios...")
+        ruta = preparar_archivo(directorio, tamano, semilla)
+        banco = BancoRendimiento(ruta, tamano, semilla, muestras, repeticiones)
+        resultados[str(tamano)] = {}
+        for operacion in operaciones:
+            if progreso:
+                progreso(f"  {tamano}: {operacion}")
+            resultados[str(tamano)][operacion] = banco.medir(operacion)
+
+    return {
+        'version': VERSION_BANCO,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'semilla': semilla,
+        'muestras': muestras,
+        'resultados': resultados,
+    }
+
+
+def comparar(actual: Dict, base: Dict, umbral: float = UMBRAL_REGRESION,
+             delta_minimo_ms: float = DELTA_MINIMO_MS) -> List[Dict]:
+    """
+    Compara la mediana de cada operacion medida en ambos resultados.
+
+    Args:
+        umbral: Aumento relativo de la mediana que cuenta como regresion.
+        delta_minimo_ms: Aumento absoluto minimo para contar como regresion.
+
+    Returns:
+        Una entrada por operacion comparable con la razon actual/base y si
+        excede ambos umbrales (regresion).
+    """
+    comparacion = []
+    for tamano, operaciones in actual.get('resultados', {}).items():
+        previas = base.get('resultados', {}).get(tamano, {})
+        for operacion, resultado in operaciones.items():
+            previo = previas.get(operacion, {})
+            if 'mediana_ms' not in resultado or not previo.get('mediana_ms'):
+                continue
+            razon = resultado['mediana_ms'] / previo['mediana_ms']
+            delta = resultado['mediana_ms'] - previo['mediana_ms']
+            comparacion.append({
+                'tamano': int(tamano),
+                'operacion': operacion,
+                'base_ms': previo['mediana_ms'],
+                'actual_ms': resultado['mediana_ms'],
+                'razon': round(razon, 3),
+                'regresion': razon > 1.0 + umbral and delta >= delta_minimo_ms,
+            })
+    return comparacion
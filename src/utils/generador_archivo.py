@@ -0,0 +1,239 @@
+"""
+Generador de archivos sinteticos de estudios para pruebas de carga.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Produce N estudios completos con GeneradorDatosPrueba, de forma determinista:
+cada estudio usa su propia semilla (semilla global + indice), asi que el
+resultado no depende del numero de procesos ni del tamano de los lotes. El
+ingreso, la deuda total y el tamano del hogar siguen distribuciones
+configurables; el resto de los campos, los derivados y los riesgos se
+calculan como al capturar un estudio.
+
+Los lotes se generan en procesos separados y cada proceso escribe sus
+archivos con EstudioSocioeconomico.guardar_lote. El proceso principal
+actualiza los indices del archivo una vez por lote. Opcionalmente se agregan
+fotografias de marcador (PNG de color liso) a cada estudio.
+
+Distribuciones ("tipo:parametros"):
+    fija:V                  siempre V
+    uniforme:A:B            entre A y B
+    normal:MEDIA:DESV
+    lognormal:MU:SIGMA      MU y SIGMA del logaritmo (mediana = e^MU)
+    triangular:A:B:MODA
+    discreta:V=P,V=P,...    valores con sus pesos
+
+Uso:
+    python -m src.cli generar 100000 --semilla 7 --ingreso lognormal:9.7:0.55
+"""
+
+import os
+import random
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+SEMILLA = 20260101
+TAMANO_LOTE = 500
+
+INGRESO = 'lognormal:9.7:0.55'
+DEUDA = 'lognormal:10.2:1.1'
+MIEMBROS = 'discreta:1=10,2=22,3=24,4=22,5=13,6=9'
+
+# Categoria de la pagina de fotografias y color del marcador
+FOTOS_MARCADOR = (
+    ('Fachada', (149, 165, 166)),
+    ('Interior', (230, 126, 34)),
+    ('Entorno', (39, 174, 96)),
+    ('Cocina', (41, 128, 185)),
+    ('Otro', (142, 68, 173)),
+)
+
+
+class Distribucion:
+    """Distribucion de un valor del estudio, escrita como "tipo:param:param"."""
+
+    PARAMETROS = {'fija': 1, 'uniforme': 2, 'normal': 2, 'lognormal': 2, 'triangular': 3}
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        tipo, _, resto = texto.partition(':')
+        self.tipo = tipo.strip().lower()
+        self.parametros: Tuple[float, ...] = ()
+        self.valores: List[float] = []
+        self.pesos: List[float] = []
+        try:
+            if self.tipo == 'discreta':
+                for par in resto.split(','):
+                    valor, _, peso = par.partition('=')
+                    self.valores.append(float(valor))
+                    self.pesos.append(float(peso) if peso else 1.0)
+                valida = bool(self.valores) and sum(self.pesos) > 0
+            else:
+                self.parametros = tuple(float(p) for p in resto.split(':')) if resto else ()
+                valida = len(self.parametros) == self.PARAMETROS.get(self.tipo, -1)
+        except ValueError:
+            valida = False
+        if not valida:
+            raise ValueError(f"Distribucion invalida: {texto!r}")
+
+    def muestrear(self, azar) -> float:
+        p = self.parametros
+        if self.tipo == 'fija':
+            return p[0]
+        if self.tipo == 'uniforme':
+            return azar.uniform(p[0], p[1])
+        if self.tipo == 'normal':
+            return azar.gauss(p[0], p[1])
+        if self.tipo == 'lognormal':
+            return azar.lognormvariate(p[0], p[1])
+        if self.tipo == 'triangular':
+            return azar.triangular(p[0], p[1], p[2])
+        return azar.choices(self.valores, self.pesos)[0]
+
+    def __repr__(self) -> str:
+        return f"Distribucion({self.texto!r})"
+
+
+class ParametrosGeneracion(NamedTuple):
+    """Configuracion de un archivo sintetico."""
+    semilla: int = SEMILLA
+    prefijo: str = 'SINT'
+    fecha_base: datetime = datetime(2026, 1, 1)
+    ingreso: Distribucion = Distribucion(INGRESO)
+    deuda: Distribucion = Distribucion(DEUDA)
+    miembros: Distribucion = Distribucion(MIEMBROS)
+    fotos: int = 1
+
+
+def id_sintetico(indice: int, prefijo: str = 'SINT') -> str:
+    return f"{prefijo}{indice:06d}"
+
+
+def generar_estudio(indice: int, parametros: ParametrosGeneracion,
+                    ruta_fotos: Optional[str] = None) -> Dict:
+    """
+    Datos completos del estudio `indice`. Reinicia el random global con la
+    semilla del estudio (GeneradorDatosPrueba lo usa).
+    """
+    from src.logic.calculador_riesgos import CalculadorRiesgos
+    from src.logic.campos_derivados import recalcular_derivados
+    from src.models.estudio import EstudioSocioeconomico
+    from src.utils.generador_datos_prueba import GeneradorDatosPrueba
+
+    random.seed(f"{parametros.semilla}:{indice}")
+    ingreso = max(0.0, parametros.ingreso.muestrear(random))
+    deuda = max(0.0, parametros.deuda.muestrear(random))
+    miembros = max(1, int(round(parametros.miembros.muestrear(random))))
+
+    estudio = EstudioSocioeconomico(id_sintetico(indice, parametros.prefijo))
+    datos = estudio.datos
+    fecha = (parametros.fecha_base + timedelta(minutes=indice)).isoformat()
+    datos['fecha_creacion'] = datos['fecha_modificacion'] = fecha
+    datos.update(GeneradorDatosPrueba.generar_estudio_completo(
+        ingreso, deuda, miembros, parametros.fecha_base
+    ))
+    datos.pop('fotografias', None)
+
+    datos['fotos'] = []
+    if ruta_fotos:
+        for numero in range(parametros.fotos):
+            tipo, _ = FOTOS_MARCADOR[(indice + numero) % len(FOTOS_MARCADOR)]
+            datos['fotos'].append({
+                'archivo': os.path.join(ruta_fotos, f"{datos['id']}_{numero + 1}.png"),
+                'tipo': tipo,
+                'descripcion': f"Fotografia de marcador {numero + 1}",
+            })
+
+    recalcular_derivados(datos)
+    datos['riesgos'] = CalculadorRiesgos.calcular_todos_riesgos(datos)
+    return datos
+
+
+@lru_cache(maxsize=None)
+def png_marcador(color: Tuple[int, int, int], ancho: int = 160, alto: int = 120) -> bytes:
+    """PNG RGB de color liso, sin depender de Pillow."""
+    def bloque(tipo: bytes, contenido: bytes) -> bytes:
+        return (struct.pack('>I', len(contenido)) + tipo + contenido
+                + struct.pack('>I', zlib.crc32(tipo + contenido) & 0xFFFFFFFF))
+
+    fila = b'\x00' + bytes(color) * ancho
+    return (b'\x89PNG\r\n\x1a\n'
+            + bloque(b'IHDR', struct.pack('>IIBBBBB', ancho, alto, 8, 2, 0, 0, 0))
+            + bloque(b'IDAT', zlib.compress(fila * alto, 9))
+            + bloque(b'IEND', b''))
+
+
+def _generar_lote(tarea: Tuple[str, Optional[str], ParametrosGeneracion, int, int]) -> List[Tuple[str, Dict]]:
+    """Genera y escribe los estudios [inicio, fin) (corre en un proceso del grupo)."""
+    from src.models.estudio import EstudioSocioeconomico
+
+    ruta_base, ruta_fotos, parametros, inicio, fin = tarea
+    colores = dict(FOTOS_MARCADOR)
+    estudios = [generar_estudio(indice, parametros, ruta_fotos) for indice in range(inicio, fin)]
+    for datos in estudios:
+        for foto in datos['fotos']:
+            with open(foto['archivo'], 'wb') as f:
+                f.write(png_marcador(colores[foto['tipo']]))
+    EstudioSocioeconomico.guardar_lote(estudios, ruta_base, indexar=False)
+    return [(datos['id'], datos) for datos in estudios]
+
+
+def generar_archivo(ruta_base: str, cantidad: int,
+                    parametros: Optional[ParametrosGeneracion] = None,
+                    ruta_fotos: Optional[str] = None,
+                    procesos: Optional[int] = None,
+                    tamano_lote: int = TAMANO_LOTE,
+                    progreso: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Genera `cantidad` estudios en ruta_base (los ids existentes se sobrescriben).
+
+    Args:
+        parametros: Semilla, prefijo de ids, distribuciones y fotos por estudio.
+        ruta_fotos: Directorio de las fotografias de marcador; None para no crearlas.
+        procesos: Procesos generadores (por defecto uno por nucleo).
+        progreso: Se llama con (generados, cantidad) al terminar cada lote.
+
+    Returns:
+        Diccionario con estudios y fotos generados y los segundos que tomo.
+    """
+    from src.models.estudio import EstudioSocioeconomico
+
+    parametros = parametros or ParametrosGeneracion()
+    procesos = procesos or os.cpu_count() or 1
+    inicio = time.perf_counter()
+
+    os.makedirs(ruta_base, exist_ok=True)
+    if ruta_fotos:
+        os.makedirs(ruta_fotos, exist_ok=True)
+    # Cargar los indices antes de escribir: si se abrieran despues, su primera
+    # sincronizacion volveria a leer del disco cada estudio generado
+    EstudioSocioeconomico.indexar_lote([], ruta_base)
+
+    tareas = [
+        (ruta_base, ruta_fotos, parametros, desde, min(desde + tamano_lote, cantidad))
+        for desde in range(0, cantidad, tamano_lote)
+    ]
+    ejecutor = ProcessPoolExecutor(procesos) if procesos > 1 and len(tareas) > 1 else None
+    generados = 0
+    try:
+        lotes = ejecutor.map(_generar_lote, tareas) if ejecutor else map(_generar_lote, tareas)
+        for estudios in lotes:
+            EstudioSocioeconomico.indexar_lote(estudios, ruta_base)
+            generados += len(estudios)
+            if progreso:
+                progreso(generados, cantidad)
+    finally:
+        if ejecutor:
+            ejecutor.shutdown()
+
+    return {
+        'estudios': generados,
+        'fotos': generados * parametros.fotos if ruta_fotos else 0,
+        'segundos': round(time.perf_counter() - inicio, 2),
+    }
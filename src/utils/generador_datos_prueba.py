@@ -6,7 +6,7 @@ Versión: 0.3.0
 
 import random
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 
 class GeneradorDatosPrueba:
@@ -38,9 +38,9 @@ class GeneradorDatosPrueba:
         return f"{nombre} {apellido1} {apellido2}"
     
     @classmethod
-    def generar_fecha_nacimiento(cls, edad: int) -> str:
+    def generar_fecha_nacimiento(cls, edad: int, fecha_referencia: Optional[datetime] = None) -> str:
         """Genera una fecha de nacimiento coherente con la edad."""
-        hoy = datetime.now()
+        hoy = fecha_referencia or datetime.now()
         anio_nacimiento = hoy.year - edad
         mes = random.randint(1, 12)
         dia = random.randint(1, 28)
@@ -73,7 +73,7 @@ class GeneradorDatosPrueba:
         return f"{random.choice(calles)} #{random.randint(100, 999)}, Col. Centro, CP {random.randint(10000, 99999)}"
     
     @classmethod
-    def generar_datos_personales(cls) -> Dict[str, Any]:
+    def generar_datos_personales(cls, fecha_referencia: Optional[datetime] = None) -> Dict[str, Any]:
         """Genera la sección de datos personales."""
         edad = random.randint(22, 65)
         nombre = cls.generar_nombre_completo()
@@ -81,7 +81,7 @@ class GeneradorDatosPrueba:
         return {
             "nombre_completo": nombre,
             "edad": edad,
-            "fecha_nacimiento": cls.generar_fecha_nacimiento(edad),
+            "fecha_nacimiento": cls.generar_fecha_nacimiento(edad, fecha_referencia),
             "genero": random.choice(cls.GENEROS),
             "nacionalidad": random.choice(cls.NACIONALIDADES),
             "estado_nacimiento": random.choice(cls.ESTADOS),
@@ -161,10 +161,11 @@ class GeneradorDatosPrueba:
         }
     
     @classmethod
-    def generar_informacion_familiar(cls) -> Dict[str, Any]:
+    def generar_informacion_familiar(cls, num_miembros: Optional[int] = None) -> Dict[str, Any]:
         """Genera la sección de información familiar."""
         num_hijos = random.randint(0, 4)
-        num_miembros = random.randint(2, 6)
+        if num_miembros is None:
+            num_miembros = random.randint(2, 6)
         num_hijos_menores = random.randint(0, num_hijos) if num_hijos > 0 else 0
         num_trabajando = random.randint(1, num_miembros)
         
@@ -190,16 +191,53 @@ class GeneradorDatosPrueba:
             "observaciones_familiares": "Familia estable con buena comunicación"
         }
     
+    @staticmethod
+    def _repartir_deuda(total_deudas: float, deuda_tarjetas: float,
+                        prestamos: Dict[str, float]) -> Tuple[float, Dict[str, float]]:
+        """
+        Ajusta el saldo de tarjetas y los montos de préstamos para que sumen
+        total_deudas (el total se recalcula a partir de ellos). Los préstamos
+        conservan su proporción. Todo se reparte en pesos enteros salvo el
+        último préstamo, que se queda con el resto y los centavos: así la
+        suma en punto flotante de un total entero es exacta.
+        """
+        total_centavos = max(0, int(round(total_deudas * 100)))
+        tarjetas = min(int(deuda_tarjetas), total_centavos // 100)
+        restante = total_centavos - tarjetas * 100
+        
+        pesos = {campo: monto for campo, monto in prestamos.items() if monto > 0}
+        if not pesos:
+            pesos = {"monto_prestamos_personales": 1.0}
+        suma_pesos = sum(pesos.values())
+        montos = {campo: 0.0 for campo in prestamos}
+        asignado = 0
+        for campo, peso in pesos.items():
+            montos[campo] = float(int(restante / 100 * peso / suma_pesos))
+            asignado += int(montos[campo]) * 100
+        montos[campo] = (int(montos[campo]) * 100 + restante - asignado) / 100
+        return float(tarjetas), montos
+    
     @classmethod
-    def generar_situacion_financiera(cls) -> Dict[str, Any]:
+    def generar_situacion_financiera(cls, ingreso: Optional[float] = None,
+                                     total_deudas: Optional[float] = None) -> Dict[str, Any]:
         """Genera la sección de situación financiera."""
-        ingreso = round(random.uniform(8000, 50000), 2)
+        if ingreso is None:
+            ingreso = random.uniform(8000, 50000)
+        ingreso = round(ingreso, 2)
         ahorros = round(random.uniform(500, 5000), 2)
         num_tarjetas = random.randint(0, 5)
         limite_credito = round(random.uniform(10000, 100000), 2) if num_tarjetas > 0 else 0
         deuda_tarjetas = round(random.uniform(0, limite_credito * 0.6), 2) if num_tarjetas > 0 else 0
+        prestamos = {
+            "monto_prestamos_personales": round(random.uniform(0, 50000), 2),
+            "monto_hipoteca": round(random.uniform(0, 500000), 2) if random.random() > 0.6 else 0,
+            "monto_prestamo_auto": round(random.uniform(0, 200000), 2) if random.random() > 0.5 else 0,
+        }
         
-        total_deudas = deuda_tarjetas + round(random.uniform(0, 50000), 2)
+        if total_deudas is not None:
+            deuda_tarjetas, prestamos = cls._repartir_deuda(total_deudas, deuda_tarjetas, prestamos)
+        # Igual que el campo derivado: tarjetas mas préstamos
+        total_deudas = round(deuda_tarjetas + sum(prestamos.values()), 2)
         porcentaje_ahorro = round((ahorros / ingreso * 100), 2) if ingreso > 0 else 0
         porcentaje_deudas = round((total_deudas / ingreso * 100), 2) if ingreso > 0 else 0
         
@@ -240,10 +278,8 @@ class GeneradorDatosPrueba:
             "numero_tarjetas_credito": num_tarjetas,
             "limite_credito_total": limite_credito,
             "deuda_tarjetas_total": deuda_tarjetas,
-            "monto_prestamos_personales": round(random.uniform(0, 50000), 2),
-            "monto_hipoteca": round(random.uniform(0, 500000), 2) if random.random() > 0.6 else 0,
+            **prestamos,
             "pago_mensual_hipoteca": round(random.uniform(3000, 15000), 2) if random.random() > 0.6 else 0,
-            "monto_prestamo_auto": round(random.uniform(0, 200000), 2) if random.random() > 0.5 else 0,
             "pago_mensual_auto": round(random.uniform(2000, 8000), 2) if random.random() > 0.5 else 0,
             "monto_apoyos_gubernamentales": round(random.uniform(0, 3000), 2) if random.random() > 0.3 else 0,
             "gasto_promedio_comida_diaria": round(random.uniform(100, 500), 2),
@@ -261,12 +297,13 @@ class GeneradorDatosPrueba:
         }
     
     @classmethod
-    def generar_vivienda(cls) -> Dict[str, Any]:
+    def generar_vivienda(cls, num_personas: Optional[int] = None) -> Dict[str, Any]:
         """Genera la sección de vivienda."""
         num_habitaciones = random.randint(1, 5)
         num_banos = random.randint(1, 3)
         metros_cuadrados = round(random.uniform(40, 250), 2)
-        num_personas = random.randint(2, 6)
+        if num_personas is None:
+            num_personas = random.randint(2, 6)
         tenencia = random.choice(["Propia", "Rentada", "Prestada", "Pagándose"])
         
         return {
@@ -431,15 +468,27 @@ class GeneradorDatosPrueba:
         return referencias
     
     @classmethod
-    def generar_estudio_completo(cls) -> Dict[str, Any]:
-        """Genera un estudio socioeconómico completo con datos aleatorios."""
+    def generar_estudio_completo(cls, ingreso: Optional[float] = None,
+                                 total_deudas: Optional[float] = None,
+                                 num_miembros: Optional[int] = None,
+                                 fecha_referencia: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Genera un estudio socioeconómico completo con datos aleatorios.
+        
+        Args:
+            ingreso: Ingreso mensual; si es None se elige al azar.
+            total_deudas: Monto total de deudas; si es None se elige al azar.
+            num_miembros: Integrantes del hogar; si es None se elige al azar.
+            fecha_referencia: Fecha contra la que se calculan las fechas de
+                nacimiento (por defecto hoy).
+        """
         return {
             "empresa_solicitante": random.choice(["TechCorp SA", "InnovaSoft", "Grupo Industrial MX"]),
-            "datos_personales": cls.generar_datos_personales(),
+            "datos_personales": cls.generar_datos_personales(fecha_referencia),
             "salud_intereses": cls.generar_salud_intereses(),
-            "informacion_familiar": cls.generar_informacion_familiar(),
-            "situacion_financiera": cls.generar_situacion_financiera(),
-            "vivienda": cls.generar_vivienda(),
+            "informacion_familiar": cls.generar_informacion_familiar(num_miembros),
+            "situacion_financiera": cls.generar_situacion_financiera(ingreso, total_deudas),
+            "vivienda": cls.generar_vivienda(num_miembros),
             "empleo_actual": cls.generar_empleo_actual(),
             "historial_laboral": cls.generar_historial_laboral(),
             "estilo_vida": cls.generar_estilo_vida(),
@@ -11,7 +11,11 @@ import zipfile
 from datetime import datetime
 from typing import Tuple, List
 
+from src.logic.campos_derivados import recalcular_derivados
+from src.utils.instrumentacion import instrumentar
 
+
+@instrumentar('backup', 'exportar_backup', 'importar_backup', 'obtener_info_backup')
 class GestorBackup:
     """Gestiona exportacion e importacion de backups."""
     
@@ -118,8 +122,18 @@ class GestorBackup:
                             estudios_omitidos += 1
                             continue
                         
-                        with zf.open(nombre) as src, open(destino, 'wb') as dst:
-                            dst.write(src.read())
+                        # Completar los campos derivados que falten (respaldos
+                        # de versiones anteriores); los calculados se respetan
+                        contenido = zf.read(nombre)
+                        try:
+                            datos = json.loads(contenido.decode('utf-8'))
+                            if isinstance(datos, dict) and recalcular_derivados(datos, solo_faltantes=True):
+                                contenido = json.dumps(datos, ensure_ascii=False, indent=2).encode('utf-8')
+                        except ValueError:
+                            pass
+                        
+                        with open(destino, 'wb') as dst:
+                            dst.write(contenido)
                         estudios_importados += 1
                     
                     elif nombre.startswith('fotos/'):
@@ -0,0 +1,323 @@
+"""
+Instrumentacion de rendimiento (tramos y contadores).
+Autor: DINOS Tech
+Version: 0.5.0
+
+Mide la duracion de las operaciones costosas (carga y guardado de estudios,
+calculo de riesgos, validacion, exportaciones, graficas y respaldos) y lleva
+contadores de eventos. Los tramos se escriben como lineas JSON en un log
+rotativo (logs/rendimiento.log) y se conservan las ultimas muestras de cada
+operacion en memoria para calcular percentiles (DialogoDiagnostico).
+
+Desactivada (valor por defecto) cada funcion instrumentada solo agrega una
+lectura de variable global. Se activa con "diagnostico": {"instrumentacion":
+true} en config.json, con la variable de entorno SOFTSE_INSTRUMENTACION=1 o
+desde el dialogo de diagnostico.
+
+Uso:
+    @instrumentar('pdf', 'exportar', '_crear_seccion_*')
+    class ExportadorPDF: ...
+
+    @medir('estudio.guardar')
+    def guardar(...): ...
+
+    with tramo('lista.refrescar'):
+        ...
+
+    contar('graficas.cache_acierto')
+"""
+
+import atexit
+import fnmatch
+import functools
+import json
+import logging
+import logging.handlers
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+
+ARCHIVO_LOG = os.path.join('logs', 'rendimiento.log')
+VARIABLE_ENTORNO = 'SOFTSE_INSTRUMENTACION'
+
+# Rotacion del log
+MAX_BYTES_LOG = 1024 * 1024
+COPIAS_LOG = 3
+
+# Muestras por operacion que se conservan para los percentiles
+MUESTRAS_POR_OPERACION = 500
+
+
+class EstadisticaOperacion(NamedTuple):
+    """Resumen de los tramos de una operacion (tiempos en ms)."""
+    operacion: str
+    llamadas: int
+    errores: int
+    total_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def percentil(valores_ordenados: List[float], p: float) -> float:
+    """Percentil por rango mas cercano de una lista ya ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    rango = math.ceil(p / 100.0 * len(valores_ordenados))
+    indice = max(0, min(len(valores_ordenados) - 1, rango - 1))
+    return valores_ordenados[indice]
+
+
+class RegistroRendimiento:
+    """Destino de los tramos y contadores mientras la instrumentacion esta activa."""
+
+    def __init__(self, ruta_log: Optional[str] = ARCHIVO_LOG,
+                 muestras: int = MUESTRAS_POR_OPERACION):
+        self._candado = threading.Lock()
+        self._muestras = muestras
+        self._duraciones: Dict[str, Deque[float]] = {}
+        self._llamadas: Dict[str, int] = {}
+        self._errores: Dict[str, int] = {}
+        self._total: Dict[str, float] = {}
+        self._contadores: Dict[str, int] = {}
+        self._logger: Optional[logging.Logger] = None
+        self._handler: Optional[logging.Handler] = None
+        if ruta_log:
+            self._abrir_log(ruta_log)
+
+    def _abrir_log(self, ruta_log: str):
+        try:
+            directorio = os.path.dirname(ruta_log)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            rotativo = logging.handlers.RotatingFileHandler(
+                ruta_log, maxBytes=MAX_BYTES_LOG, backupCount=COPIAS_LOG, encoding='utf-8'
+            )
+        except OSError as e:
+            print(f"Advertencia: no se pudo abrir el log de rendimiento: {e}")
+            return
+        rotativo.setFormatter(logging.Formatter('%(message)s'))
+        # Se escribe al disco por lotes, no en cada tramo
+        self._handler = logging.handlers.MemoryHandler(200, logging.ERROR, rotativo)
+        self._logger = logging.getLogger('softse.rendimiento')
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(self._handler)
+
+    def registrar_tramo(self, operacion: str, segundos: float, error: bool = False):
+        with self._candado:
+            muestras = self._duraciones.get(operacion)
+            if muestras is None:
+                muestras = self._duraciones[operacion] = deque(maxlen=self._muestras)
+            muestras.append(segundos)
+            self._llamadas[operacion] = self._llamadas.get(operacion, 0) + 1
+            self._total[operacion] = self._total.get(operacion, 0.0) + segundos
+            if error:
+                self._errores[operacion] = self._errores.get(operacion, 0) + 1
+        if self._logger is not None:
+            self._logger.info(json.dumps({
+                't': round(time.time(), 3),
+                'op': operacion,
+                'ms': round(segundos * 1000.0, 3),
+                'hilo': threading.current_thread().name,
+                'error': error,
+            }))
+
+    def contar(self, contador: str, n: int = 1):
+        with self._candado:
+            self._contadores[contador] = self._contadores.get(contador, 0) + n
+
+    def estadisticas(self) -> List[EstadisticaOperacion]:
+        """Estadisticas por operacion, de mayor a menor tiempo total."""
+        with self._candado:
+            copia = {op: sorted(m) for op, m in self._duraciones.items()}
+            llamadas = dict(self._llamadas)
+            errores = dict(self._errores)
+            total = dict(self._total)
+        resultado = [
+            EstadisticaOperacion(
+                operacion=op,
+                llamadas=llamadas.get(op, 0),
+                errores=errores.get(op, 0),
+                total_ms=total.get(op, 0.0) * 1000.0,
+                p50_ms=percentil(valores, 50) * 1000.0,
+                p90_ms=percentil(valores, 90) * 1000.0,
+                p99_ms=percentil(valores, 99) * 1000.0,
+                max_ms=(valores[-1] if valores else 0.0) * 1000.0,
+            )
+            for op, valores in copia.items()
+        ]
+        resultado.sort(key=lambda e: e.total_ms, reverse=True)
+        return resultado
+
+    def contadores(self) -> Dict[str, int]:
+        with self._candado:
+            return dict(self._contadores)
+
+    def reiniciar(self):
+        """Descarta las muestras y contadores en memoria (el log se conserva)."""
+        with self._candado:
+            self._duraciones.clear()
+            self._llamadas.clear()
+            self._errores.clear()
+            self._total.clear()
+            self._contadores.clear()
+
+    def cerrar(self):
+        """Escribe los contadores al log y cierra el archivo."""
+        if self._logger is None:
+            return
+        contadores = self.contadores()
+        if contadores:
+            self._logger.info(json.dumps({
+                't': round(time.time(), 3),
+                'contadores': contadores,
+            }))
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+        self._logger = None
+        self._handler = None
+
+
+# Registro activo; None con la instrumentacion desactivada
+_registro: Optional[RegistroRendimiento] = None
+_candado_activacion = threading.Lock()
+
+
+def activar(ruta_log: Optional[str] = ARCHIVO_LOG) -> RegistroRendimiento:
+    """Activa la instrumentacion (si ya estaba activa conserva el registro)."""
+    global _registro
+    with _candado_activacion:
+        if _registro is None:
+            _registro = RegistroRendimiento(ruta_log)
+        return _registro
+
+
+def desactivar():
+    """Desactiva la instrumentacion y cierra el log."""
+    global _registro
+    with _candado_activacion:
+        registro, _registro = _registro, None
+    if registro is not None:
+        registro.cerrar()
+
+
+def activa() -> bool:
+    return _registro is not None
+
+
+def registro_actual() -> Optional[RegistroRendimiento]:
+    return _registro
+
+
+def configurar_desde_archivo(ruta_config: str = 'config.json'):
+    """Activa la instrumentacion segun config.json o la variable de entorno."""
+    valor = os.environ.get(VARIABLE_ENTORNO)
+    if valor is not None:
+        habilitada = valor.strip().lower() not in ('', '0', 'false', 'no')
+    else:
+        try:
+            with open(ruta_config, 'r', encoding='utf-8') as f:
+                habilitada = bool(json.load(f).get('diagnostico', {}).get('instrumentacion', False))
+        except (OSError, ValueError, AttributeError):
+            habilitada = False
+    if habilitada:
+        activar()
+
+
+atexit.register(desactivar)
+
+
+def medir(operacion: str) -> Callable:
+    """Decorador que registra un tramo por cada llamada a la funcion."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            registro = _registro
+            if registro is None:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            error = True
+            try:
+                resultado = funcion(*args, **kwargs)
+                error = False
+                return resultado
+            finally:
+                registro.registrar_tramo(operacion, time.perf_counter() - inicio, error)
+        return envoltura
+    return decorador
+
+
+class _Tramo:
+    __slots__ = ('operacion', 'registro', 'inicio')
+
+    def __init__(self, operacion: str, registro: RegistroRendimiento):
+        self.operacion = operacion
+        self.registro = registro
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.registro.registrar_tramo(
+            self.operacion, time.perf_counter() - self.inicio, tipo is not None
+        )
+        return False
+
+
+class _TramoNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return False
+
+
+_TRAMO_NULO = _TramoNulo()
+
+
+def tramo(operacion: str):
+    """Administrador de contexto que registra la duracion del bloque."""
+    registro = _registro
+    if registro is None:
+        return _TRAMO_NULO
+    return _Tramo(operacion, registro)
+
+
+def contar(contador: str, n: int = 1):
+    """Incrementa un contador (sin efecto con la instrumentacion desactivada)."""
+    registro = _registro
+    if registro is not None:
+        registro.contar(contador, n)
+
+
+def instrumentar(prefijo: str, *patrones: str) -> Callable:
+    """
+    Decorador de clase que mide los metodos cuyo nombre coincide con alguno
+    de los patrones (fnmatch). La operacion se registra como
+    "<prefijo>.<metodo>". Respeta staticmethod y classmethod.
+    """
+    def decorador(clase):
+        for nombre, atributo in list(vars(clase).items()):
+            if not any(fnmatch.fnmatchcase(nombre, p) for p in patrones):
+                continue
+            operacion = f"{prefijo}.{nombre}"
+            if isinstance(atributo, staticmethod):
+                envuelto = staticmethod(medir(operacion)(atributo.__func__))
+            elif isinstance(atributo, classmethod):
+                envuelto = classmethod(medir(operacion)(atributo.__func__))
+            elif callable(atributo):
+                envuelto = medir(operacion)(atributo)
+            else:
+                continue
+            setattr(clase, nombre, envuelto)
+        return clase
+    return decorador
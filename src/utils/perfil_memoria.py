@@ -0,0 +1,391 @@
+"""
+Perfil de memoria para sesiones largas (tracemalloc y referencias debiles).
+Autor: DINOS Tech
+Version: 0.5.0
+
+Con el perfil activo, tracemalloc registra las asignaciones y se toman
+instantaneas alrededor de la vida de cada wizard (apertura y cierre) y de
+cada exportacion. Cada reporte incluye los sitios que mas crecieron entre
+las dos instantaneas, los sitios con mas memoria retenida y el total
+rastreado.
+
+Ademas los wizards, sus paginas y los lienzos de matplotlib se siguen con
+referencias debiles. Cuando el codigo los suelta (esperar_liberacion) y
+siguen vivos despues de una recoleccion y de un periodo de gracia, se
+reportan como fugas junto con el tipo de los objetos que aun los retienen.
+
+Los reportes se escriben como lineas JSON en logs/memoria.log (rotativo).
+Se activa con "diagnostico": {"memoria": true} en config.json, con
+SOFTSE_MEMORIA=1 o desde el dialogo de diagnostico. Desactivado, cada punto
+de medicion solo lee una variable global.
+"""
+
+import atexit
+import gc
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import types
+import weakref
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, NamedTuple, Optional
+
+
+ARCHIVO_REPORTES = os.path.join('logs', 'memoria.log')
+VARIABLE_ENTORNO = 'SOFTSE_MEMORIA'
+
+# Cuadros de pila por asignacion (mas cuadros = mas memoria y mas lento)
+CUADROS = 8
+SITIOS_REPORTE = 10
+# Segundos que se espera a que Qt destruya un objeto soltado (deleteLater)
+GRACIA_LIBERACION_S = 2.0
+MAX_REPORTES = 50
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Asignaciones del propio tracemalloc y del sistema de importacion
+FILTROS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+class _Seguido:
+    __slots__ = ('categoria', 'referencia', 'creado', 'soltado', 'dependientes', 'reportado')
+
+    def __init__(self, categoria: str, referencia: weakref.ref):
+        self.categoria = categoria
+        self.referencia = referencia
+        self.creado = time.monotonic()
+        self.soltado: Optional[float] = None
+        self.dependientes: List[int] = []
+        self.reportado = False
+
+
+class EstadoCategoria(NamedTuple):
+    """Objetos seguidos de una categoria."""
+    categoria: str
+    vivos: int
+    por_liberar: int
+    fugas: int
+
+
+def _sitio(estadistica) -> str:
+    """archivo:linea, relativo al proyecto o a site-packages."""
+    cuadro = estadistica.traceback[0]
+    ruta = cuadro.filename
+    if 'site-packages' in ruta:
+        ruta = ruta.split('site-packages', 1)[1].lstrip('\\/')
+    elif ruta.startswith(RAIZ_PROYECTO):
+        ruta = os.path.relpath(ruta, RAIZ_PROYECTO)
+    return f"{ruta}:{cuadro.lineno}"
+
+
+def _kib(n: int) -> float:
+    return round(n / 1024.0, 1)
+
+
+class PerfilMemoria:
+    """Instantaneas de tracemalloc y seguimiento de objetos por categoria."""
+
+    def __init__(self, ruta_reportes: Optional[str] = ARCHIVO_REPORTES, cuadros: int = CUADROS):
+        self._iniciado_aqui = not tracemalloc.is_tracing()
+        if self._iniciado_aqui:
+            tracemalloc.start(cuadros)
+        self.ruta_reportes = ruta_reportes
+        self._candado = threading.Lock()
+        # id del objeto -> seguimiento (se retira cuando el objeto muere)
+        self._seguidos: Dict[int, _Seguido] = {}
+        # Claves de objetos muertos: las retrollamadas de weakref pueden
+        # llegar durante una recoleccion, con el candado tomado
+        self._muertos: List[int] = []
+        self._logger: Optional[logging.Logger] = None
+        # Reportes de la sesion (los mas recientes al final)
+        self.reportes: List[dict] = []
+
+    # ------------------------------------------------------------------
+    # Seguimiento de objetos
+    # ------------------------------------------------------------------
+
+    def seguir(self, objeto, categoria: Optional[str] = None, dueno=None):
+        """
+        Sigue un objeto con una referencia debil. Si tiene dueno, se espera
+        que se libere junto con el.
+        """
+        clave = id(objeto)
+        try:
+            referencia = weakref.ref(objeto, lambda _, clave=clave: self._muertos.append(clave))
+        except TypeError:
+            return
+        with self._candado:
+            self._purgar()
+            self._seguidos[clave] = _Seguido(categoria or type(objeto).__name__, referencia)
+            padre = self._seguidos.get(id(dueno)) if dueno is not None else None
+            if padre is not None:
+                padre.dependientes.append(clave)
+
+    def _purgar(self):
+        """Retira los objetos muertos (con el candado tomado)."""
+        while self._muertos:
+            clave = self._muertos.pop()
+            seguido = self._seguidos.get(clave)
+            # El id pudo reutilizarse para un objeto nuevo
+            if seguido is not None and seguido.referencia() is None:
+                del self._seguidos[clave]
+
+    def esperar_liberacion(self, objeto):
+        """El codigo ya no usa el objeto (ni sus dependientes): deberia liberarse."""
+        ahora = time.monotonic()
+        with self._candado:
+            pendientes = [id(objeto)]
+            while pendientes:
+                seguido = self._seguidos.get(pendientes.pop())
+                if seguido is not None and seguido.soltado is None:
+                    seguido.soltado = ahora
+                    pendientes.extend(seguido.dependientes)
+
+    def estado(self) -> List[EstadoCategoria]:
+        """Objetos vivos por categoria, tras una recoleccion."""
+        gc.collect()
+        limite = time.monotonic() - GRACIA_LIBERACION_S
+        conteo: Dict[str, List[int]] = {}
+        with self._candado:
+            self._purgar()
+            for seguido in list(self._seguidos.values()):
+                if seguido.referencia() is None:
+                    continue
+                fila = conteo.setdefault(seguido.categoria, [0, 0, 0])
+                fila[0] += 1
+                if seguido.soltado is not None:
+                    fila[2 if seguido.soltado <= limite else 1] += 1
+        return [EstadoCategoria(c, *fila) for c, fila in sorted(conteo.items())]
+
+    def fugas(self) -> List[dict]:
+        """
+        Objetos soltados hace mas de GRACIA_LIBERACION_S que siguen vivos
+        tras una recoleccion (cada uno se reporta una sola vez).
+        """
+        gc.collect()
+        limite = time.monotonic() - GRACIA_LIBERACION_S
+        with self._candado:
+            self._purgar()
+            candidatos = [s for s in list(self._seguidos.values())
+                          if s.soltado is not None and s.soltado <= limite and not s.reportado]
+        resultado = []
+        for seguido in candidatos:
+            objeto = seguido.referencia()
+            if objeto is None:
+                continue
+            seguido.reportado = True
+            retenedores = sorted({type(r).__name__ for r in gc.get_referrers(objeto)
+                                  if not isinstance(r, types.FrameType)})
+            resultado.append({
+                'categoria': seguido.categoria,
+                'soltado_hace_s': round(time.monotonic() - seguido.soltado, 1),
+                'retenido_por': retenedores[:8],
+            })
+            del objeto
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Instantaneas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def instantanea() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(FILTROS)
+
+    def reportar(self, etiqueta: str, antes: tracemalloc.Snapshot,
+                 despues: Optional[tracemalloc.Snapshot] = None) -> dict:
+        """Crecimiento entre dos instantaneas, sitios principales y fugas."""
+        despues = despues or self.instantanea()
+        diferencias = despues.compare_to(antes, 'lineno')
+        crecimiento = [e for e in diferencias if e.size_diff > 0]
+        actual, pico = tracemalloc.get_traced_memory()
+        reporte = {
+            't': round(time.time(), 3),
+            'etapa': etiqueta,
+            'crecimiento_kib': _kib(sum(e.size_diff for e in diferencias)),
+            'rastreado_kib': _kib(actual),
+            'pico_kib': _kib(pico),
+            'crecimiento': [
+                {'sitio': _sitio(e), 'kib': _kib(e.size_diff), 'bloques': e.count_diff}
+                for e in crecimiento[:SITIOS_REPORTE]
+            ],
+            'principales': [
+                {'sitio': _sitio(e), 'kib': _kib(e.size), 'bloques': e.count}
+                for e in despues.statistics('lineno')[:SITIOS_REPORTE]
+            ],
+            'vivos': {e.categoria: e.vivos for e in self.estado()},
+            'fugas': self.fugas(),
+        }
+        self.reportes.append(reporte)
+        del self.reportes[:-MAX_REPORTES]
+
+        for fuga in reporte['fugas']:
+            print(f"Advertencia: posible fuga de memoria: {fuga['categoria']} sigue vivo "
+                  f"{fuga['soltado_hace_s']} s despues de soltarse")
+        self._escribir(reporte)
+        return reporte
+
+    def _escribir(self, reporte: dict):
+        if not self.ruta_reportes:
+            return
+        if self._logger is None:
+            try:
+                directorio = os.path.dirname(self.ruta_reportes)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                handler = RotatingFileHandler(
+                    self.ruta_reportes, maxBytes=1024 * 1024, backupCount=2, encoding='utf-8'
+                )
+            except OSError as e:
+                print(f"Advertencia: no se pudo abrir el log de memoria: {e}")
+                self.ruta_reportes = None
+                return
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._logger = logging.getLogger('softse.memoria')
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            self._logger.addHandler(handler)
+        self._logger.info(json.dumps(reporte, ensure_ascii=False))
+
+    def cerrar(self):
+        """Detiene tracemalloc (si lo inicio este perfil) y cierra el log."""
+        if self._iniciado_aqui and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self._logger is not None:
+            for handler in list(self._logger.handlers):
+                self._logger.removeHandler(handler)
+                handler.close()
+            self._logger = None
+
+
+# Perfil activo; None con el perfil desactivado
+_perfil: Optional[PerfilMemoria] = None
+_candado_activacion = threading.Lock()
+
+
+def activar(ruta_reportes: Optional[str] = ARCHIVO_REPORTES) -> PerfilMemoria:
+    """Activa el perfil (si ya estaba activo lo conserva)."""
+    global _perfil
+    with _candado_activacion:
+        if _perfil is None:
+            _perfil = PerfilMemoria(ruta_reportes)
+        return _perfil
+
+
+def desactivar():
+    """Desactiva el perfil y detiene tracemalloc."""
+    global _perfil
+    with _candado_activacion:
+        perfil, _perfil = _perfil, None
+    if perfil is not None:
+        perfil.cerrar()
+
+
+def activo() -> bool:
+    return _perfil is not None
+
+
+def perfil_actual() -> Optional[PerfilMemoria]:
+    return _perfil
+
+
+def configurar_desde_archivo(ruta_config: str = 'config.json'):
+    """Activa el perfil segun config.json o la variable de entorno."""
+    valor = os.environ.get(VARIABLE_ENTORNO)
+    if valor is not None:
+        habilitado = valor.strip().lower() not in ('', '0', 'false', 'no')
+    else:
+        try:
+            with open(ruta_config, 'r', encoding='utf-8') as f:
+                habilitado = bool(json.load(f).get('diagnostico', {}).get('memoria', False))
+        except (OSError, ValueError, AttributeError):
+            habilitado = False
+    if habilitado:
+        activar()
+
+
+atexit.register(desactivar)
+
+
+def seguir(objeto, categoria: Optional[str] = None, dueno=None):
+    """Sigue el objeto con una referencia debil (sin efecto con el perfil desactivado)."""
+    perfil = _perfil
+    if perfil is not None:
+        perfil.seguir(objeto, categoria, dueno)
+
+
+def esperar_liberacion(objeto):
+    """Marca el objeto (y sus dependientes) como soltado."""
+    perfil = _perfil
+    if perfil is not None:
+        perfil.esperar_liberacion(objeto)
+
+
+class Ciclo:
+    """Instantanea al iniciar una etapa larga (p. ej. la vida de un wizard)."""
+    __slots__ = ('etiqueta', 'perfil', 'antes')
+
+    def __init__(self, etiqueta: str, perfil: PerfilMemoria):
+        self.etiqueta = etiqueta
+        self.perfil = perfil
+        self.antes = perfil.instantanea()
+
+    def cerrar(self) -> dict:
+        return self.perfil.reportar(self.etiqueta, self.antes)
+
+
+def abrir_ciclo(etiqueta: str) -> Optional[Ciclo]:
+    """Toma la instantanea inicial de una etapa; None con el perfil desactivado."""
+    perfil = _perfil
+    if perfil is None:
+        return None
+    return Ciclo(etiqueta, perfil)
+
+
+def cerrar_ciclo(ciclo: Optional[Ciclo]):
+    """Reporta el crecimiento desde abrir_ciclo (acepta None)."""
+    if ciclo is not None and ciclo.perfil is _perfil:
+        ciclo.cerrar()
+
+
+class _Medicion:
+    __slots__ = ('ciclo',)
+
+    def __init__(self, ciclo: Ciclo):
+        self.ciclo = ciclo
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        cerrar_ciclo(self.ciclo)
+        return False
+
+
+class _MedicionNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return False
+
+
+_MEDICION_NULA = _MedicionNula()
+
+
+def medir(etiqueta: str):
+    """Administrador de contexto con instantaneas antes y despues del bloque."""
+    ciclo = abrir_ciclo(etiqueta)
+    if ciclo is None:
+        return _MEDICION_NULA
+    return _Medicion(ciclo)
@@ -0,0 +1,114 @@
+"""
+Precalentamiento de bibliotecas pesadas despues del arranque.
+Autor: DINOS Tech
+Version: 0.5.0
+
+El arranque ya no importa el wizard ni los exportadores. Para que la primera
+captura, grafica o exportacion no se detenga a cargarlos, un hilo de fondo
+los importa por etapas en orden de prioridad una vez que la ventana
+principal muestra sus estudios. Si el usuario llega antes a una de ellas,
+la importacion en curso solo se completa (el candado de importacion de
+Python evita cargarla dos veces).
+
+Se desactiva con "interfaz": {"precalentar": false} en config.json.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Sequence
+
+
+class Etapa(NamedTuple):
+    """Etapa de precalentamiento."""
+    nombre: str
+    funcion: Callable[[], None]
+
+
+def _precalentar_wizard():
+    # Modulos del wizard y de todas sus paginas (sin crear widgets)
+    import src.ui.wizard_estudio  # noqa: F401
+
+
+def _precalentar_graficas():
+    # Solo importa; el estilo se aplica despues en el hilo de la interfaz
+    from src.ui.pagina_visualizacion import _load_matplotlib
+    _load_matplotlib()
+
+
+def _precalentar_pdf():
+    import src.export.exportador_pdf  # noqa: F401
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    getSampleStyleSheet()
+    # Las metricas de las fuentes estandar se cargan en su primer uso
+    for fuente in ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique'):
+        stringWidth('SoftSE', fuente, 10)
+
+
+def _precalentar_excel():
+    import src.export.exportador_excel  # noqa: F401
+
+
+def _precalentar_word():
+    import src.export.exportador_word  # noqa: F401
+    from docx import Document
+    # Lee y analiza la plantilla por defecto de python-docx
+    Document()
+
+
+# En orden de prioridad: lo que el usuario suele abrir primero
+ETAPAS: Sequence[Etapa] = (
+    Etapa('wizard', _precalentar_wizard),
+    Etapa('graficas', _precalentar_graficas),
+    Etapa('pdf', _precalentar_pdf),
+    Etapa('excel', _precalentar_excel),
+    Etapa('word', _precalentar_word),
+)
+
+
+class Precalentador:
+    """Ejecuta las etapas en un hilo de fondo, una tras otra."""
+
+    def __init__(self, etapas: Sequence[Etapa] = ETAPAS):
+        self.etapas = tuple(etapas)
+        self._terminadas: Dict[str, threading.Event] = {
+            etapa.nombre: threading.Event() for etapa in self.etapas
+        }
+        # nombre -> segundos que tomo la etapa
+        self.duraciones: Dict[str, float] = {}
+        self._cancelado = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        if self._hilo is not None:
+            return
+        self._hilo = threading.Thread(target=self._ejecutar, name="Precalentamiento", daemon=True)
+        self._hilo.start()
+
+    def cancelar(self):
+        """Omite las etapas que aun no empiezan."""
+        self._cancelado.set()
+
+    def terminada(self, nombre: str) -> bool:
+        evento = self._terminadas.get(nombre)
+        return evento is not None and evento.is_set()
+
+    def esperar(self, nombre: str, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine una etapa; False si no termino a tiempo."""
+        evento = self._terminadas.get(nombre)
+        return evento is not None and evento.wait(timeout)
+
+    def _ejecutar(self):
+        for etapa in self.etapas:
+            if self._cancelado.is_set():
+                break
+            inicio = time.perf_counter()
+            try:
+                etapa.funcion()
+            except Exception as e:
+                # El primer uso volvera a intentarlo y mostrara el error
+                print(f"Advertencia: no se pudo precalentar {etapa.nombre}: {e}")
+            self.duraciones[etapa.nombre] = time.perf_counter() - inicio
+            self._terminadas[etapa.nombre].set()
+            # Ceder el GIL a la interfaz entre etapas
+            time.sleep(0.05)
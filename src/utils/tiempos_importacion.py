@@ -0,0 +1,257 @@
+"""
+Medicion de tiempos de importacion durante el arranque.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Equivalente interno de `python -X importtime`, util tambien en el ejecutable
+empaquetado (donde no hay interprete al que pasarle -X). Un buscador al
+frente de sys.meta_path envuelve el cargador de cada modulo nuevo y mide su
+ejecucion: tiempo propio y acumulado (con sus importaciones anidadas).
+
+Al pintarse la ventana principal se compara contra el presupuesto de
+arranque: tiempo total de importacion, tiempo hasta la primera ventana y
+modulos que deben cargarse en su primer uso (exportadores, wizard, graficas).
+
+Uso:
+    python main.py --tiempos-importacion          # presupuesto por defecto
+    python main.py --tiempos-importacion=600      # presupuesto de ventana en ms
+
+El reporte se imprime y se guarda en logs/tiempos_importacion.txt; la
+aplicacion termina con codigo 1 si se excede el presupuesto.
+"""
+
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+
+OPCION_TIEMPOS = "--tiempos-importacion"
+
+# Presupuesto de arranque (ms)
+PRESUPUESTO_VENTANA_MS = 800.0
+PRESUPUESTO_IMPORTACION_MS = 400.0
+
+# Paquetes que no deben importarse antes de mostrar la ventana principal
+MODULOS_DIFERIDOS = (
+    'reportlab',
+    'docx',
+    'openpyxl',
+    'PIL',
+    'matplotlib',
+    'numpy',
+    'src.export',
+    'src.ui.wizard_estudio',
+    'src.ui.dialogo_configuracion',
+    'src.ui.dialogo_backup',
+)
+
+ARCHIVO_REPORTE = os.path.join('logs', 'tiempos_importacion.txt')
+
+
+class RegistroImportacion(NamedTuple):
+    """Tiempo de carga de un modulo (microsegundos, como -X importtime)."""
+    modulo: str
+    propio_us: int
+    acumulado_us: int
+    nivel: int
+
+
+class _CargadorMedido:
+    """Envuelve el cargador de un modulo y mide create_module/exec_module."""
+
+    def __init__(self, cargador, medidor: "MedidorImportaciones"):
+        self._cargador = cargador
+        self._medidor = medidor
+
+    def create_module(self, spec):
+        return self._medidor._medir(spec.name, self._cargador.create_module, spec)
+
+    def exec_module(self, modulo):
+        return self._medidor._medir(modulo.__name__, self._cargador.exec_module, modulo)
+
+    def __getattr__(self, nombre):
+        # get_source, get_resource_reader, is_package, ...
+        return getattr(self._cargador, nombre)
+
+
+class MedidorImportaciones(importlib.abc.MetaPathFinder):
+    """
+    Buscador que no localiza modulos por si mismo: delega en el resto de
+    sys.meta_path y envuelve el cargador resultante para medirlo.
+    """
+
+    def __init__(self, presupuesto_ventana_ms: float = PRESUPUESTO_VENTANA_MS):
+        self.inicio = time.perf_counter()
+        self.presupuesto_ventana_ms = presupuesto_ventana_ms
+        self._local = threading.local()
+        self._candado = threading.Lock()
+        # modulo -> [propio_s, acumulado_s, nivel], en orden de termino
+        self._tiempos: Dict[str, List] = {}
+        self._previos = frozenset(sys.modules)
+
+    def instalar(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def desinstalar(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, nombre, ruta, objetivo=None):
+        if getattr(self._local, 'buscando', False):
+            return None
+        self._local.buscando = True
+        try:
+            spec = None
+            for buscador in list(sys.meta_path):
+                if buscador is self:
+                    continue
+                buscar = getattr(buscador, 'find_spec', None)
+                if buscar is None:
+                    continue
+                spec = buscar(nombre, ruta, objetivo)
+                if spec is not None:
+                    break
+        finally:
+            self._local.buscando = False
+
+        if spec is not None and spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _CargadorMedido(spec.loader, self)
+        return spec
+
+    def _medir(self, nombre: str, funcion, *args):
+        pila = getattr(self._local, 'pila', None)
+        if pila is None:
+            pila = self._local.pila = []
+        # Acumulador del tiempo de las importaciones anidadas
+        pila.append(0.0)
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args)
+        finally:
+            total = time.perf_counter() - inicio
+            hijos = pila.pop()
+            if pila:
+                pila[-1] += total
+            with self._candado:
+                registro = self._tiempos.pop(nombre, None) or [0.0, 0.0, len(pila)]
+                registro[0] += total - hijos
+                registro[1] += total
+                self._tiempos[nombre] = registro
+
+    def registros(self) -> List[RegistroImportacion]:
+        """Modulos medidos en orden de termino de su carga."""
+        with self._candado:
+            return [
+                RegistroImportacion(modulo, int(t[0] * 1e6), int(t[1] * 1e6), t[2])
+                for modulo, t in self._tiempos.items()
+            ]
+
+    def total_ms(self) -> float:
+        """Tiempo de importacion de los modulos de primer nivel."""
+        return sum(r.acumulado_us for r in self.registros() if r.nivel == 0) / 1000.0
+
+    def transcurrido_ms(self) -> float:
+        return (time.perf_counter() - self.inicio) * 1000.0
+
+    def evaluar(self, ventana_ms: Optional[float] = None,
+                presupuesto_ventana_ms: Optional[float] = None,
+                presupuesto_importacion_ms: float = PRESUPUESTO_IMPORTACION_MS,
+                diferidos: Sequence[str] = MODULOS_DIFERIDOS) -> List[str]:
+        """
+        Compara el arranque contra el presupuesto.
+
+        Returns:
+            Lista de excesos; vacia si el arranque esta dentro del presupuesto.
+        """
+        if presupuesto_ventana_ms is None:
+            presupuesto_ventana_ms = self.presupuesto_ventana_ms
+        excesos = []
+        total = self.total_ms()
+        if total > presupuesto_importacion_ms:
+            excesos.append(
+                f"importacion: {total:.0f} ms (presupuesto {presupuesto_importacion_ms:.0f} ms)"
+            )
+        if ventana_ms is not None and ventana_ms > presupuesto_ventana_ms:
+            excesos.append(
+                f"primera ventana: {ventana_ms:.0f} ms (presupuesto {presupuesto_ventana_ms:.0f} ms)"
+            )
+        for modulo in sorted(cargados_antes_de_tiempo(diferidos)):
+            excesos.append(f"modulo cargado al arrancar: {modulo}")
+        return excesos
+
+    def reporte(self, ventana_ms: Optional[float] = None, limite: int = 30,
+                **presupuesto) -> str:
+        """Reporte de texto: modulos de mayor tiempo acumulado y resultado del presupuesto."""
+        registros = self.registros()
+        lineas = [
+            f"Modulos importados: {len(registros)} "
+            f"(ya cargados al iniciar la medicion: {len(self._previos)})",
+            f"Tiempo de importacion: {self.total_ms():.1f} ms",
+        ]
+        if ventana_ms is not None:
+            lineas.append(f"Primera ventana: {ventana_ms:.1f} ms")
+        lineas.append("")
+        lineas.append("import time: self [us] | cumulative | imported package")
+        for r in sorted(registros, key=lambda r: r.acumulado_us, reverse=True)[:limite]:
+            lineas.append(f"import time: {r.propio_us:>9} | {r.acumulado_us:>10} | {r.modulo}")
+        lineas.append("")
+        excesos = self.evaluar(ventana_ms, **presupuesto)
+        if excesos:
+            lineas.append("PRESUPUESTO EXCEDIDO:")
+            lineas.extend(f"  - {e}" for e in excesos)
+        else:
+            lineas.append("Arranque dentro del presupuesto.")
+        return "\n".join(lineas)
+
+
+def cargados_antes_de_tiempo(diferidos: Sequence[str] = MODULOS_DIFERIDOS) -> List[str]:
+    """Paquetes diferidos que ya estan en sys.modules."""
+    return [
+        d for d in diferidos
+        if d in sys.modules or any(m.startswith(d + '.') for m in list(sys.modules))
+    ]
+
+
+def medidor_desde_argumentos(argv: List[str]) -> Optional[MedidorImportaciones]:
+    """
+    Instala un medidor si argv trae --tiempos-importacion[=ms]. La opcion se
+    quita de argv (QApplication no la conoce).
+    """
+    for i, argumento in enumerate(argv):
+        if argumento == OPCION_TIEMPOS or argumento.startswith(OPCION_TIEMPOS + '='):
+            del argv[i]
+            _, _, valor = argumento.partition('=')
+            presupuesto = PRESUPUESTO_VENTANA_MS
+            if valor:
+                try:
+                    presupuesto = float(valor)
+                except ValueError:
+                    print(f"Advertencia: presupuesto no valido '{valor}', se usa el predeterminado")
+            medidor = MedidorImportaciones(presupuesto)
+            medidor.instalar()
+            return medidor
+    return None
+
+
+def terminar_medicion(medidor: MedidorImportaciones) -> bool:
+    """
+    Imprime y guarda el reporte al mostrarse la ventana principal.
+
+    Returns:
+        True si el arranque esta dentro del presupuesto.
+    """
+    ventana_ms = medidor.transcurrido_ms()
+    medidor.desinstalar()
+    texto = medidor.reporte(ventana_ms)
+    print(texto)
+    try:
+        os.makedirs(os.path.dirname(ARCHIVO_REPORTE), exist_ok=True)
+        with open(ARCHIVO_REPORTE, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+    except OSError as e:
+        print(f"Advertencia: no se pudo guardar el reporte de importacion: {e}")
+    return not medidor.evaluar(ventana_ms)
@@ -0,0 +1,222 @@
+"""
+Vigilante de congelamientos de la interfaz.
+Autor: DINOS Tech
+Version: 0.5.0
+
+Las exportaciones, el refresco de la lista y la pagina de graficas corren en
+el hilo de la interfaz. Para saber cuales congelan la ventana, un temporizador
+del bucle de eventos marca un latido (latido()) y un hilo vigilante revisa
+que el latido no se atrase. Si se atrasa mas del umbral, el vigilante toma
+muestras de la pila del hilo principal hasta que el bucle se recupera y
+escribe un reporte compacto: duracion, funcion que bloqueaba y pila mas
+frecuente.
+
+Los reportes se escriben como lineas JSON en logs/congelamientos.log
+(rotativo). Con la instrumentacion activa tambien se registran como tramos
+"interfaz.congelamiento".
+
+Se activa con "diagnostico": {"vigilante": true, "umbral_ms": 500} en
+config.json o con SOFTSE_VIGILANTE=1.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional, Tuple
+
+from src.utils import instrumentacion
+
+
+ARCHIVO_REPORTES = os.path.join('logs', 'congelamientos.log')
+VARIABLE_ENTORNO = 'SOFTSE_VIGILANTE'
+
+UMBRAL_MS = 500
+INTERVALO_LATIDO_MS = 100
+INTERVALO_MUESTREO_S = 0.05
+# Cuadros de pila que se guardan en el reporte
+PROFUNDIDAD_PILA = 12
+
+# Raiz del proyecto: distingue el codigo propio del de las bibliotecas
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (archivo, linea, funcion, es_codigo_propio)
+Cuadro = Tuple[str, int, str, bool]
+
+
+def _describir(cuadro) -> str:
+    archivo, linea, funcion = cuadro[:3]
+    return f"{archivo}:{linea} {funcion}"
+
+
+def _es_propio(ruta: str) -> bool:
+    return ruta.startswith(RAIZ_PROYECTO) and 'site-packages' not in ruta
+
+
+class VigilanteInterfaz:
+    """
+    Hilo que detecta atrasos del bucle de eventos y muestrea la pila del
+    hilo principal mientras duran.
+    """
+
+    def __init__(self, umbral_ms: float = UMBRAL_MS,
+                 ruta_reportes: Optional[str] = ARCHIVO_REPORTES):
+        """
+        Debe crearse desde el hilo de la interfaz (es el que se vigila).
+
+        Args:
+            umbral_ms: Atraso del latido a partir del cual se considera
+                congelada la interfaz.
+            ruta_reportes: Log de reportes; None para no escribirlos.
+        """
+        self.umbral = umbral_ms / 1000.0
+        self.ruta_reportes = ruta_reportes
+        self._hilo_vigilado = threading.get_ident()
+        self._latido = time.monotonic()
+        self._activo = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._logger: Optional[logging.Logger] = None
+        # Reportes de la sesion (los mas recientes al final)
+        self.reportes: List[dict] = []
+
+    def latido(self):
+        """Lo llama un temporizador del hilo de la interfaz."""
+        self._latido = time.monotonic()
+
+    def iniciar(self):
+        if self._hilo is not None:
+            return
+        self._latido = time.monotonic()
+        self._activo.set()
+        self._hilo = threading.Thread(target=self._vigilar, name="VigilanteInterfaz", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._activo.clear()
+        self._hilo = None
+        if self._logger is not None:
+            for handler in list(self._logger.handlers):
+                self._logger.removeHandler(handler)
+                handler.close()
+            self._logger = None
+
+    def _muestra(self) -> List[Cuadro]:
+        """Pila actual del hilo vigilado, de afuera hacia adentro."""
+        cuadro = sys._current_frames().get(self._hilo_vigilado)
+        pila = []
+        while cuadro is not None:
+            codigo = cuadro.f_code
+            ruta = codigo.co_filename
+            propio = _es_propio(ruta)
+            archivo = os.path.relpath(ruta, RAIZ_PROYECTO) if propio else os.path.basename(ruta)
+            pila.append((archivo, cuadro.f_lineno, codigo.co_name, propio))
+            cuadro = cuadro.f_back
+        pila.reverse()
+        return pila
+
+    def _vigilar(self):
+        muestras: List[List[Cuadro]] = []
+        inicio_atraso = None
+        anterior = time.monotonic()
+        while self._activo.is_set():
+            time.sleep(INTERVALO_MUESTREO_S)
+            ahora = time.monotonic()
+            if ahora - anterior > max(1.0, 4 * self.umbral):
+                # Este hilo tampoco corrio (equipo suspendido): no es un congelamiento
+                muestras, inicio_atraso = [], None
+                self._latido = ahora
+            anterior = ahora
+
+            atraso = ahora - self._latido
+            if atraso > self.umbral:
+                if inicio_atraso is None:
+                    inicio_atraso = self._latido
+                muestras.append(self._muestra())
+            elif inicio_atraso is not None:
+                self._reportar(self._latido - inicio_atraso, muestras)
+                muestras, inicio_atraso = [], None
+
+    def _reportar(self, duracion: float, muestras: List[List[Cuadro]]):
+        muestras = [m for m in muestras if m]
+        if not muestras:
+            return
+        # Cuadro mas interno de cada muestra, total y del codigo propio
+        internos = Counter(m[-1][:3] for m in muestras)
+        propios = Counter(
+            next((c[:3] for c in reversed(m) if c[3]), m[-1][:3]) for m in muestras
+        )
+        pilas = Counter(tuple(c[:3] for c in m if c[3]) for m in muestras)
+        bloqueo, _ = propios.most_common(1)[0]
+        interno, _ = internos.most_common(1)[0]
+        pila, veces = pilas.most_common(1)[0]
+
+        reporte = {
+            't': round(time.time(), 3),
+            'duracion_ms': round(duracion * 1000.0),
+            'muestras': len(muestras),
+            'bloqueo': _describir(bloqueo),
+            'interno': _describir(interno),
+            'pila': [_describir(c) for c in pila[-PROFUNDIDAD_PILA:]],
+            'pila_frecuencia': round(veces / len(muestras), 2),
+        }
+        self.reportes.append(reporte)
+        del self.reportes[:-50]
+
+        registro = instrumentacion.registro_actual()
+        if registro is not None:
+            registro.registrar_tramo('interfaz.congelamiento', duracion)
+            registro.contar(f"interfaz.congelamiento:{bloqueo[2]}")
+
+        print(f"Advertencia: interfaz congelada {reporte['duracion_ms']} ms en {reporte['bloqueo']}")
+        self._escribir(reporte)
+
+    def _escribir(self, reporte: dict):
+        if not self.ruta_reportes:
+            return
+        if self._logger is None:
+            try:
+                directorio = os.path.dirname(self.ruta_reportes)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                handler = RotatingFileHandler(
+                    self.ruta_reportes, maxBytes=512 * 1024, backupCount=2, encoding='utf-8'
+                )
+            except OSError as e:
+                print(f"Advertencia: no se pudo abrir el log de congelamientos: {e}")
+                self.ruta_reportes = None
+                return
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._logger = logging.getLogger('softse.congelamientos')
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            self._logger.addHandler(handler)
+        self._logger.info(json.dumps(reporte, ensure_ascii=False))
+
+
+def configuracion_vigilante(ruta_config: str = 'config.json') -> Optional[float]:
+    """
+    Umbral en ms si el vigilante esta habilitado (config.json o variable de
+    entorno), o None si no lo esta.
+    """
+    try:
+        with open(ruta_config, 'r', encoding='utf-8') as f:
+            diagnostico = json.load(f).get('diagnostico', {})
+    except (OSError, ValueError, AttributeError):
+        diagnostico = {}
+    umbral = diagnostico.get('umbral_ms', UMBRAL_MS)
+
+    valor = os.environ.get(VARIABLE_ENTORNO)
+    if valor is not None:
+        habilitado = valor.strip().lower() not in ('', '0', 'false', 'no')
+    else:
+        habilitado = bool(diagnostico.get('vigilante', False))
+    if not habilitado:
+        return None
+    try:
+        return float(umbral)
+    except (TypeError, ValueError):
+        return float(UMBRAL_MS)